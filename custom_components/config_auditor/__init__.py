@@ -7,7 +7,6 @@ import logging
 import os
 import shutil
 import json
-from datetime import timedelta
 from pathlib import Path
 from typing import Any
 
@@ -19,17 +18,15 @@ from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, cal
 from homeassistant.helpers import device_registry as dr, config_validation as cv
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers.start import async_at_started
-from homeassistant.util import dt as _dt_util
 from .const import (
-    MODULE_9_DASHBOARD_ANALYZER,
+    MODULE_3_PERFORMANCE_ANALYZER,
     MODULE_10_EVENT_MONITORING,
     DEFAULT_EVENT_DEBOUNCE_SECONDS,
-    MODULE_11_RECORDER_ANALYZER,
     MODULE_12_AUDIT_HISTORY,
     DOMAIN,
     NAME,
     VERSION,
-    DEFAULT_SCAN_INTERVAL,
+    ALL_SCAN_SCOPES,
     SERVICE_SCAN_ALL,
     SERVICE_SCAN_AUTOMATIONS,
     SERVICE_SCAN_ENTITIES,
@@ -49,70 +46,41 @@ from .const import (
     MODULE_4_COMPLIANCE_REPORT,
     MODULE_5_REFACTORING_ASSISTANT,
     BACKUP_DIR,
+    CAPTURES_DIR,
     REPORTS_DIR,
 )
-from .automation_analyzer import AutomationAnalyzer
-from .entity_analyzer import EntityAnalyzer
-from .battery_monitor import BatteryMonitor
-from .dependency_mapper import DependencyMapper
-from .performance_analyzer import PerformanceAnalyzer
-from .security_analyzer import SecurityAnalyzer
-from .dashboard_analyzer import DashboardAnalyzer
-from .recorder_analyzer import RecorderAnalyzer
 from .history_manager import HistoryManager
 from .custom_panel import async_register_panel, async_unregister_panel, async_register_cards
 from .websocket import async_register_websocket_handlers
-from .conversation import async_setup_conversation, explain_issue_ai, analyze_complexity_ai
-from .health_score import calculate_health_score
 from .event_monitor import async_setup_event_monitor
+from .config_watcher import async_setup_config_watcher
+from .trigger_telemetry import async_setup_trigger_telemetry
+from .state_rate_monitor import async_setup_state_rate_monitor
+from .entity_health import async_setup_entity_health
+from .report_jobs import ReportJobQueue
+from .ai_jobs import AiJobQueue
+from .scan_orchestrator import ScanOrchestrator
+from .scan_pipeline import ScanPipeline
+from .scan_scheduler import ScanScheduler
 from .repairs import async_update_repairs
 from .services import async_setup_services
-from .automation_optimizer import AutomationOptimizer
+from .translation_utils import async_setup_haca_ignore_cache
 
-if MODULE_4_COMPLIANCE_REPORT:
-    from .report_generator import ReportGenerator
-
-if MODULE_5_REFACTORING_ASSISTANT:
-    from .refactoring_assistant import RefactoringAssistant
+# Report generator, refactoring assistant, automation optimizer, MCP tool
+# handlers, proactive agent and AI helpers are loaded on first use (lazy.py)
+from .lazy import LazyInstance, async_import
 
 # ── v1.4.0 ────────────────────────────────────────────────────────────────
 from .const import (
     MODULE_15_MCP_SERVER,
     MODULE_16_PROACTIVE_AGENT,
-    MODULE_17_COMPLIANCE_ANALYZER,
 )
 
 if MODULE_15_MCP_SERVER:
-    from .mcp_server import async_setup_mcp_server
+    from .mcp_views import async_setup_mcp_server
 
 from .llm_api import HacaLLMAPI, HACA_LLM_API_ID
 
-if MODULE_16_PROACTIVE_AGENT:
-    from .proactive_agent import async_setup_proactive_agent
-
-if MODULE_17_COMPLIANCE_ANALYZER:
-    from .compliance_analyzer import ComplianceAnalyzer
-
-# ── v1.5.0 ────────────────────────────────────────────────────────────────
-from .const import (
-    MODULE_18_BATTERY_PREDICTOR,
-    MODULE_19_AREA_COMPLEXITY,
-    MODULE_20_REDUNDANCY_ANALYZER,
-    MODULE_21_RECORDER_IMPACT,
-)
-
-if MODULE_18_BATTERY_PREDICTOR:
-    from .battery_predictor import BatteryPredictor
-
-if MODULE_19_AREA_COMPLEXITY:
-    from .area_complexity_analyzer import AreaComplexityAnalyzer
-
-if MODULE_20_REDUNDANCY_ANALYZER:
-    from .redundancy_analyzer import RedundancyAnalyzer
-
-if MODULE_21_RECORDER_IMPACT:
-    from .recorder_impact_analyzer import RecorderImpactAnalyzer
-
 from .const import MODULE_22_INTEGRATION_MONITOR
 if MODULE_22_INTEGRATION_MONITOR:
     from .integration_analyzer import IntegrationAnalyzer
@@ -256,409 +224,121 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if entry.entry_id in hass.data[DOMAIN]:
         _LOGGER.warning("H.A.C.A already set up for this entry")
         return True
+
+    # haca_ignore set cache — invalidated by registry events only
+    async_setup_haca_ignore_cache(hass, entry)
+
+    # Unavailable / unknown / stale index — maintained from state_changed
+    async_setup_entity_health(hass, entry)
+
+    # Trigger-rate telemetry — measured rates for PerformanceAnalyzer
+    if MODULE_3_PERFORMANCE_ANALYZER:
+        async_setup_trigger_telemetry(hass, entry)
+        # Live state_changed counters — noisy entities without the 24h DB query
+        await async_setup_state_rate_monitor(hass, entry)
     
-    # Create analyzers
-    automation_analyzer = AutomationAnalyzer(hass)
-    entity_analyzer = EntityAnalyzer(hass)
-    battery_monitor = BatteryMonitor(
-        hass,
-        critical=entry.options.get("battery_critical", 5),
-        low=entry.options.get("battery_low", 15),
-        warning=entry.options.get("battery_warning", 25),
-    )
-    dependency_mapper = DependencyMapper(hass)
-    automation_optimizer = AutomationOptimizer(hass)
-    performance_analyzer = PerformanceAnalyzer(hass)
-    security_analyzer = SecurityAnalyzer(hass)
-    dashboard_analyzer = DashboardAnalyzer(hass) if MODULE_9_DASHBOARD_ANALYZER else None
-    recorder_analyzer = RecorderAnalyzer(hass) if MODULE_11_RECORDER_ANALYZER else None
+    # Create analyzers — owned by the scan pipeline (see scan_pipeline.py)
     history_manager = HistoryManager(
         hass,
         retention_days=entry.options.get("history_retention_days", 365),
     ) if MODULE_12_AUDIT_HISTORY else None
-    
+    scan_scheduler = ScanScheduler(entry)
+    pipeline = ScanPipeline(hass, entry, scan_scheduler, history_manager)
+    automation_optimizer = LazyInstance(hass, "automation_optimizer", "AutomationOptimizer")
+
     # Create optional modules
-    report_generator = ReportGenerator(hass) if MODULE_4_COMPLIANCE_REPORT else None
-    refactoring_assistant = RefactoringAssistant(hass) if MODULE_5_REFACTORING_ASSISTANT else None
-    compliance_analyzer = ComplianceAnalyzer(hass) if MODULE_17_COMPLIANCE_ANALYZER else None
-
-    # ── v1.5.0 analyzers ──────────────────────────────────────────────────
-    battery_predictor = BatteryPredictor(hass) if MODULE_18_BATTERY_PREDICTOR else None
-    area_complexity_analyzer = AreaComplexityAnalyzer(hass) if MODULE_19_AREA_COMPLEXITY else None
-    redundancy_analyzer = RedundancyAnalyzer(hass) if MODULE_20_REDUNDANCY_ANALYZER else None
-    recorder_impact_analyzer = RecorderImpactAnalyzer(hass) if MODULE_21_RECORDER_IMPACT else None
+    report_generator = (
+        LazyInstance(hass, "report_generator", "ReportGenerator")
+        if MODULE_4_COMPLIANCE_REPORT else None
+    )
+    refactoring_assistant = (
+        LazyInstance(hass, "refactoring_assistant", "RefactoringAssistant")
+        if MODULE_5_REFACTORING_ASSISTANT else None
+    )
     integration_analyzer = IntegrationAnalyzer(hass) if MODULE_22_INTEGRATION_MONITOR else None
-    
-    scan_interval = entry.options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
-    
-    async def async_update_data() -> dict[str, Any]:
-        """Update data."""
-        _LOGGER.debug("Running scheduled scan")
 
-        # Catégories exclues configurées dans le panel HACA
-        excluded: set = set(entry.options.get("excluded_categories", []))
 
-        try:
-            automation_issues = (
-                await automation_analyzer.analyze_all()
-                if "automations" not in excluded else []
-            )
-        except Exception as _auto_err:
-            _LOGGER.error(
-                "HACA: automation_analyzer.analyze_all() CRASHED — %s",
-                _auto_err, exc_info=True,
-            )
-            automation_issues = []
-
-        try:
-            entity_issues = (
-                await entity_analyzer.analyze_all(
-                    automation_analyzer.automation_configs,
-                    automation_analyzer.script_configs,
-                )
-                if "entities" not in excluded else []
-            )
-        except Exception as _ent_err:
-            _LOGGER.error(
-                "HACA: entity_analyzer.analyze_all() CRASHED — %s",
-                _ent_err, exc_info=True,
-            )
-            entity_issues = []
-
-        # ── Phase 2: parallel analysis ────────────────────────────────────
-        # All analyzers below depend on automation_analyzer results (already
-        # available) but are independent of each other.  Running them with
-        # asyncio.gather reduces total scan time by 40-60% on large setups.
-
-        async def _safe_perf() -> list:
-            if "performance" in excluded:
-                return []
-            return await performance_analyzer.analyze_all(
-                automation_analyzer.automation_configs
-            )
-
-        async def _safe_security() -> list:
-            if "security" in excluded:
-                return []
-            return await security_analyzer.analyze_all(
-                automation_analyzer.automation_configs
-            )
+    async def async_update_data() -> dict[str, Any]:
+        """Update data.
 
-        async def _safe_dashboard() -> list:
-            if not dashboard_analyzer or "dashboards" in excluded:
-                return []
-            return await dashboard_analyzer.analyze_all()
-
-        async def _safe_battery() -> list:
-            if "batteries" in excluded:
-                return []
-            return await battery_monitor.analyze_all(
-                critical=entry.options.get("battery_critical", 5),
-                low=entry.options.get("battery_low", 15),
-                warning=entry.options.get("battery_warning", 25),
-            )
+        The first scan and explicit requests (``scan_scheduler.request_full``)
+        run every analyzer; periodic ticks only run the scopes that are due.
+        """
+        if not pipeline.full_scan_done or scan_scheduler.consume_full_request():
+            scope = ALL_SCAN_SCOPES
+        else:
+            scope = await scan_scheduler.async_select()
+            if not scope:
+                _LOGGER.debug("Scheduled tick: nothing due")
+                return coordinator.data
+        _LOGGER.debug("Running scheduled scan: %s", ", ".join(sorted(scope)))
+        return await scan_orchestrator.async_run(scope)
+
+    async def async_rescan(scope: frozenset[str] | set[str]) -> None:
+        """Rerun only the analyzers in ``scope`` and publish merged results.
+
+        Results of the other analyzers are kept from their last run.  Falls
+        back to a full refresh until a first full scan has populated them.
+        The periodic refresh schedule is left untouched.
+        """
+        if not pipeline.full_scan_done:
+            await coordinator.async_refresh()
+            return
+        scope = frozenset(scope) & ALL_SCAN_SCOPES
+        if not scope:
+            return
+        _LOGGER.debug("Running partial rescan: %s", ", ".join(sorted(scope)))
+        coordinator.data = await scan_orchestrator.async_run(scope)
+        coordinator.async_update_listeners()
 
-        async def _safe_recorder() -> tuple[list, float]:
-            if not recorder_analyzer or "recorder" in excluded:
-                return [], 0.0
-            orphans = await recorder_analyzer.analyze_all()
-            return orphans, recorder_analyzer.total_wasted_mb
-
-        async def _safe_compliance() -> list:
-            if not compliance_analyzer or "compliance" in excluded:
-                return []
-            return await compliance_analyzer.async_analyze()
-
-        results = await asyncio.gather(
-            _safe_perf(),
-            _safe_security(),
-            _safe_dashboard(),
-            _safe_battery(),
-            _safe_recorder(),
-            _safe_compliance(),
-            return_exceptions=True,
-        )
+    async def _async_publish_partial(scopes: frozenset[str]) -> None:
+        """Merge the results of the phases finished since the last publication."""
+        coordinator.data = pipeline.partial_data(coordinator.data, scopes)
+        coordinator.async_update_listeners()
 
-        # Unpack results with safe fallbacks for exceptions
-        performance_issues = results[0] if not isinstance(results[0], BaseException) else []
-        security_issues    = results[1] if not isinstance(results[1], BaseException) else []
-        dashboard_issues   = results[2] if not isinstance(results[2], BaseException) else []
-        battery_list       = results[3] if not isinstance(results[3], BaseException) else []
-        recorder_result    = results[4] if not isinstance(results[4], BaseException) else ([], 0.0)
-        compliance_issues  = results[5] if not isinstance(results[5], BaseException) else []
-
-        # Log any exceptions from parallel phase
-        for idx, (label, res) in enumerate([
-            ("performance", results[0]), ("security", results[1]),
-            ("dashboard", results[2]), ("battery", results[3]),
-            ("recorder", results[4]), ("compliance", results[5]),
-        ]):
-            if isinstance(res, BaseException):
-                _LOGGER.error("HACA: %s analyzer CRASHED — %s", label, res, exc_info=res)
-
-        recorder_orphans: list = recorder_result[0]
-        recorder_wasted_mb: float = recorder_result[1]
-
-        # ── Post-parallel filtering ───────────────────────────────────────
-        excluded_types: set = set(entry.options.get("excluded_issue_types", []))
-        if excluded_types and compliance_issues:
-            compliance_issues = [i for i in compliance_issues if i.get("type", "") not in excluded_types]
-
-        # Get separated issue lists from automation analyzer
-        automation_only_issues = automation_analyzer.automation_issues
-        script_issues = automation_analyzer.script_issues
-        scene_issues = automation_analyzer.scene_issues
-        blueprint_issues = automation_analyzer.blueprint_issues
-
-        # Get helper issues separated by entity_analyzer
-        helper_issues = getattr(entity_analyzer, "helper_issues", [])
-
-        # Route scene.* issues from entity_analyzer into scene_issue_list
-        # (entity_analyzer produces unavailable/stale/zombie issues for scene.* that
-        #  belong in the Scenes tab, not the Entities tab)
-        entity_scene_issues = [i for i in entity_issues if i.get("entity_id", "").startswith("scene.")]
-        entity_issues       = [i for i in entity_issues if not i.get("entity_id", "").startswith("scene.")]
-        scene_issues        = scene_issues + entity_scene_issues
-
-        # Filtrage par type d'issue (configuré dans le panel HACA → onglet Configuration)
-        if excluded_types:
-            def _filter(lst):
-                return [i for i in lst if i.get("type", "") not in excluded_types]
-            automation_only_issues = _filter(automation_only_issues)
-            script_issues          = _filter(script_issues)
-            scene_issues           = _filter(scene_issues)
-            blueprint_issues       = _filter(blueprint_issues)
-            entity_issues          = _filter(entity_issues)
-            helper_issues          = _filter(helper_issues)
-            performance_issues     = _filter(performance_issues)
-            security_issues        = _filter(security_issues)
-            dashboard_issues       = _filter(dashboard_issues)
-
-        # ── Tag each issue with haca_id for frontend display ──────────────
-        import hashlib as _hl
-        def _tag_ids(issue_list: list, cat_code: str) -> list:
-            for issue in issue_list:
-                eid = issue.get("entity_id") or issue.get("alias") or "unknown"
-                itype = (issue.get("type") or "unknown").upper()
-                h = _hl.md5(eid.encode()).hexdigest()[:6]
-                issue["haca_id"] = f"HACA-{cat_code}-{itype}-{h}"
-            return issue_list
-        _tag_ids(automation_only_issues, "AUTO")
-        _tag_ids(script_issues, "SCRIPT")
-        _tag_ids(scene_issues, "SCENE")
-        _tag_ids(blueprint_issues, "BP")
-        _tag_ids(entity_issues, "ENT")
-        _tag_ids(helper_issues, "HELPER")
-        _tag_ids(performance_issues, "PERF")
-        _tag_ids(security_issues, "SEC")
-        _tag_ids(dashboard_issues, "DASH")
-        _tag_ids(compliance_issues, "COMPL")
-        
-        total_entities     = len(hass.states.async_all())
-        total_automations  = len(automation_analyzer.automation_configs) + len(automation_analyzer.script_configs)
-        health_score = calculate_health_score(
-            automation_only_issues, entity_issues, performance_issues, security_issues, dashboard_issues,
-            total_entities=total_entities,
-            total_automations=total_automations,
-            helper_issues=helper_issues,
-            compliance_issues=compliance_issues,
-            script_issues=script_issues,
-            scene_issues=scene_issues,
-            blueprint_issues=blueprint_issues,
-        )        
-        _LOGGER.info(
-            "Health Score Calculation: Automation=%d, Scripts=%d, Blueprints=%d, Entities=%d, Helpers=%d, Performance=%d, Dashboard=%d. Score=%d%%",
-            len(automation_only_issues), len(script_issues), len(blueprint_issues),
-            len(entity_issues), len(helper_issues), len(performance_issues), len(dashboard_issues), health_score
-        )
- 
-        # ── Save audit snapshot to history ───────────────────────────────
-        scan_result = {
-            "health_score":    health_score,
-            "total_issues":    len(automation_only_issues) + len(script_issues) + len(scene_issues)
-                             + len(blueprint_issues) + len(entity_issues) + len(helper_issues)
-                             + len(performance_issues) + len(security_issues)
-                             + len(dashboard_issues),
-            "automation_issues":   len(automation_only_issues),
-            "script_issues":       len(script_issues),
-            "scene_issues":        len(scene_issues),
-            "entity_issues":       len(entity_issues),
-            "helper_issues":       len(helper_issues),
-            "performance_issues":  len(performance_issues),
-            "security_issues":     len(security_issues),
-            "blueprint_issues":    len(blueprint_issues),
-            "dashboard_issues":    len(dashboard_issues),
-        }
-        if history_manager:
-            try:
-                await history_manager.async_save_scan(scan_result)
-            except Exception as hist_err:
-                _LOGGER.warning("HACA History save error: %s", hist_err)
+    scan_orchestrator = ScanOrchestrator(
+        hass, entry.entry_id, pipeline.async_scan, _async_publish_partial
+    )
 
-        # ── v1.5.0 — Battery prediction ───────────────────────────────────
-        battery_predictions: list = []
-        if battery_predictor and battery_list:
-            try:
-                await battery_predictor.async_save_battery_snapshot(battery_list)
-                battery_predictions = await battery_predictor.async_compute_predictions(battery_list)
-            except Exception as bp_err:
-                _LOGGER.warning("Battery predictor error: %s", bp_err)
-
-        # ── v1.5.0 — Area complexity heatmap ──────────────────────────────
-        area_complexity_data: dict = {}
-        if area_complexity_analyzer:
-            try:
-                area_complexity_data = await area_complexity_analyzer.async_analyze(
-                    automation_configs=automation_analyzer.automation_configs,
-                    complexity_scores=automation_analyzer.complexity_scores,
-                )
-            except Exception as ac_err:
-                _LOGGER.warning("Area complexity analyzer error: %s", ac_err)
-
-        # ── v1.5.0 — Redundancy analysis ──────────────────────────────────
-        redundancy_data: dict = {}
-        if redundancy_analyzer:
-            try:
-                redundancy_data = await redundancy_analyzer.async_analyze(
-                    automation_configs=automation_analyzer.automation_configs,
-                    blueprint_stats=automation_analyzer.blueprint_stats,
-                    complexity_scores=automation_analyzer.complexity_scores,
-                )
-            except Exception as red_err:
-                _LOGGER.warning("Redundancy analyzer error: %s", red_err)
-
-        # ── Flatten redundancy into a standard issue list ─────────────────
-        redundancy_issue_list: list[dict] = []
-        for item in redundancy_data.get("blueprint_matches", []):
-            item["type"] = "redundancy_blueprint_candidate"
-            item["fix_available"] = True
-            item["message"] = f"Could be replaced by blueprint: {item.get('blueprint_id', '?')}"
-            item["recommendation"] = "Use AI to create a blueprint and convert this automation"
-            redundancy_issue_list.append(item)
-        for item in redundancy_data.get("native_feature_matches", []):
-            item["type"] = "redundancy_native_replacement"
-            item["fix_available"] = True
-            item["message"] = f"Can be replaced by native HA feature: {item.get('description') or item.get('pattern', '?')}"
-            item["recommendation"] = "Use AI to refactor this automation using the native HA feature"
-            redundancy_issue_list.append(item)
-        for item in redundancy_data.get("trigger_overlaps", []):
-            item["type"] = "redundancy_trigger_overlap"
-            item["entity_id"] = item.get("entity_id_a", "")
-            item["alias"] = f"{item.get('alias_a', '')} ↔ {item.get('alias_b', '')}"
-            item["fix_available"] = False
-            item["message"] = f"Trigger overlap with {item.get('alias_b', '?')}: {item.get('trigger_sig', '?')}"
-            item["recommendation"] = "Review both automations to determine if they conflict or should be merged"
-            redundancy_issue_list.append(item)
-        _tag_ids(redundancy_issue_list, "REDUND")
-
-        # ── v1.5.0 — Recorder impact analysis ────────────────────────────
-        recorder_impact_data: dict = {}
-        if recorder_impact_analyzer:
-            try:
-                recorder_impact_data = await recorder_impact_analyzer.async_analyze(
-                    automation_configs=automation_analyzer.automation_configs,
-                    complexity_scores=automation_analyzer.complexity_scores,
-                )
-            except Exception as ri_err:
-                _LOGGER.warning("Recorder impact analyzer error: %s", ri_err)
-
-        # Build dependency graph
-        dependency_graph = {"nodes": [], "edges": []}
-        try:
-            all_flat_issues = (
-                automation_only_issues + script_issues + scene_issues +
-                blueprint_issues + entity_issues + helper_issues + performance_issues +
-                security_issues + dashboard_issues
-            )
-            dependency_graph = await dependency_mapper.build(
-                automation_configs=automation_analyzer.automation_configs,
-                script_configs=automation_analyzer.script_configs,
-                scene_configs=automation_analyzer.scene_configs,
-                entity_references=dict(entity_analyzer.entity_references),
-                alias_map=entity_analyzer.automation_alias_map,
-                all_issues=all_flat_issues,
-            )
-        except Exception as dep_err:
-            _LOGGER.error("Dependency mapper error: %s", dep_err)
-
-        return {
-            "health_score": health_score,
-            "automation_issues": len(automation_only_issues),
-            "script_issues": len(script_issues),
-            "scene_issues": len(scene_issues),
-            "blueprint_issues": len(blueprint_issues),
-            "entity_issues": len(entity_issues),
-            "helper_issues": len(helper_issues),
-            "performance_issues": len(performance_issues),
-            "security_issues": len(security_issues),
-            "dashboard_issues": len(dashboard_issues),
-            "total_issues": len(automation_only_issues) + len(script_issues) + len(scene_issues)
-                          + len(blueprint_issues) + len(entity_issues) + len(helper_issues)
-                          + len(performance_issues) + len(security_issues)
-                          + len(dashboard_issues) + len(compliance_issues),
-            "compliance_issues": len(compliance_issues),
-            "compliance_issue_list": compliance_issues,
-            "automation_issue_list": automation_only_issues,
-            "complexity_scores":        sorted(automation_analyzer.complexity_scores, key=lambda x: x["score"], reverse=True) if automation_analyzer else [],
-            "script_complexity_scores": automation_analyzer.script_complexity_scores if automation_analyzer else [],
-            "scene_stats":              automation_analyzer.scene_stats if automation_analyzer else [],
-            "blueprint_stats":          automation_analyzer.blueprint_stats if automation_analyzer else [],
-            "script_issue_list": script_issues,
-            "scene_issue_list": scene_issues,
-            "blueprint_issue_list": blueprint_issues,
-            "entity_issue_list": entity_issues,
-            "helper_issue_list": helper_issues,
-            "performance_issue_list": performance_issues,
-            "security_issue_list": security_issues,
-            "dashboard_issue_list": dashboard_issues,
-            "recorder_orphans": recorder_orphans,
-            "recorder_orphan_count": len(recorder_orphans),
-            "recorder_wasted_mb": recorder_wasted_mb,
-            "recorder_db_available": getattr(recorder_analyzer, "db_available", False),
-            "battery_list": battery_list,
-            "battery_count": len(battery_list),
-            "battery_alerts": sum(1 for b in battery_list if b["severity"] is not None),
-            "battery_alert_entities": [
-                {"entity_id": b["entity_id"], "level": b["level"], "unit": b.get("unit", "%"),
-                 "device_class": b.get("device_class", ""), "severity": b["severity"]}
-                for b in battery_list if b["severity"] is not None
-            ],
-            "dependency_graph": dependency_graph,
-            # ── v1.5.0 ────────────────────────────────────────────────────
-            "battery_predictions": battery_predictions,
-            "battery_predictions_count": len(battery_predictions),
-            "battery_alert_7d": sum(1 for p in battery_predictions if p.get("alert_7d")),
-            "area_complexity": area_complexity_data,
-            "redundancy": redundancy_data,
-            "redundancy_issue_list": redundancy_issue_list,
-            "recorder_impact": recorder_impact_data,
-            "last_scan": _dt_util.utcnow().isoformat(),
-        }
-    
     coordinator = DataUpdateCoordinator(
         hass,
         _LOGGER,
         name=DOMAIN,
         update_method=async_update_data,
-        update_interval=timedelta(minutes=scan_interval) if scan_interval > 0 else None,
+        update_interval=scan_scheduler.tick_interval(),
     )
     
+    # Report generation runs as background jobs (see report_jobs.py)
+    report_jobs = (
+        ReportJobQueue(hass, entry.entry_id, coordinator, report_generator)
+        if report_generator is not None else None
+    )
+
+    ai_jobs = AiJobQueue(hass, entry, coordinator, refactoring_assistant)
+
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "entry": entry,
-        "_scan_in_progress": False,
-        "automation_analyzer": automation_analyzer,
-        "entity_analyzer": entity_analyzer,
-        "performance_analyzer": performance_analyzer,
+        "automation_analyzer": pipeline.automation_analyzer,
+        "entity_analyzer": pipeline.entity_analyzer,
+        "performance_analyzer": pipeline.performance_analyzer,
         "report_generator": report_generator,
+        "report_jobs": report_jobs,
+        # Bulk AI descriptions / explanations (see ai_jobs.py)
+        "ai_jobs": ai_jobs,
         "refactoring_assistant": refactoring_assistant,
-        "security_analyzer": security_analyzer,
-        "dashboard_analyzer": dashboard_analyzer,
-        "recorder_analyzer": recorder_analyzer,
+        "security_analyzer": pipeline.security_analyzer,
+        "dashboard_analyzer": pipeline.dashboard_analyzer,
+        "recorder_analyzer": pipeline.recorder_analyzer,
         "history_manager": history_manager,
         "automation_optimizer": automation_optimizer,
-        "compliance_analyzer": compliance_analyzer,
+        "compliance_analyzer": pipeline.compliance_analyzer,
         "integration_analyzer": integration_analyzer,
+        "battery_predictor": pipeline.battery_predictor,
+        "async_rescan": async_rescan,
+        "scan_scheduler": scan_scheduler,
+        "scan_orchestrator": scan_orchestrator,
+        "scan_pipeline": pipeline,
     }
     
     device_registry = dr.async_get(hass)
@@ -757,6 +437,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             _LOGGER.warning("HACA initial scan error: %s", exc)
 
     entry.async_on_unload(async_at_started(hass, _first_scan_when_ready))
+    # AI jobs interrupted by the last restart pick up where they stopped
+    entry.async_on_unload(async_at_started(hass, ai_jobs.async_resume))
     # ──────────────────────────────────────────────────────────────────────
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -765,8 +447,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if len([e for e in hass.config_entries.async_entries(DOMAIN)]) == 1:
         await async_register_panel(hass)
         async_register_websocket_handlers(hass)
-        await async_setup_conversation(hass, entry)
-        _LOGGER.info("Panel, WebSocket handlers and Conversation agent registered")
+        _LOGGER.info("Panel and WebSocket handlers registered")
     
     if len([e for e in hass.config_entries.async_entries(DOMAIN)]) == 1:
         await async_setup_services(hass, entry)
@@ -780,6 +461,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # ── Event-Based Monitoring (MODULE 10) ───────────────────────────────
     if MODULE_10_EVENT_MONITORING:
         async_setup_event_monitor(hass, entry)
+        async_setup_config_watcher(hass, entry)
     # ── End Event-Based Monitoring ────────────────────────────────────────
 
     # ── v1.4.0 : Serveur MCP (MODULE 15) ─────────────────────────────────
@@ -797,7 +479,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # ── v1.4.0 : Agent IA Proactif (MODULE 16) ───────────────────────────
     if MODULE_16_PROACTIVE_AGENT:
-        async_setup_proactive_agent(hass, entry)
+        proactive_agent = await async_import(hass, "proactive_agent")
+        proactive_agent.async_setup_proactive_agent(hass, entry)
 
     # ── Post-scan notification listener ──────────────────────────────────
     # Après chaque refresh du coordinator (scan périodique OU déclenché par
@@ -955,7 +638,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id, None) or {}
+        if entry_data.get("scan_orchestrator"):
+            await entry_data["scan_orchestrator"].async_cancel()
+        if entry_data.get("report_jobs"):
+            await entry_data["report_jobs"].async_cancel()
+        if entry_data.get("ai_jobs"):
+            await entry_data["ai_jobs"].async_cancel()
+        ai_router = hass.data[DOMAIN].pop("ai_router", None)
+        if ai_router is not None:
+            ai_router.async_stop()
 
     return unload_ok
 
@@ -978,11 +670,18 @@ async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     backups_path = hass.config.path(BACKUP_DIR)
     history_path = Path(hass.config.config_dir) / ".haca_history"
     battery_history_path = Path(hass.config.config_dir) / ".haca_battery_history"
+    captures_path = hass.config.path(CAPTURES_DIR)
+    state_rates_path = Path(hass.config.config_dir) / ".haca_state_rates.json"
+    ai_cache_path = Path(hass.config.config_dir) / ".haca_ai_cache.json"
+    ai_jobs_path = Path(hass.config.config_dir) / ".haca_ai_jobs"
 
     # 2. Blocking cleanup — runs in the executor to avoid blocking the event loop
     def _cleanup_files() -> None:
         """Remove all HACA data directories (blocking I/O, runs in executor)."""
-        for dir_path in (reports_path, backups_path, history_path, battery_history_path):
+        for dir_path in (
+            reports_path, backups_path, history_path, battery_history_path, captures_path,
+            ai_jobs_path,
+        ):
             p = Path(dir_path)
             if p.exists() and p.is_dir():
                 try:
@@ -990,6 +689,11 @@ async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
                     _LOGGER.info("Removed directory: %s", p)
                 except Exception as e:
                     _LOGGER.error("Failed to remove directory %s: %s", p, e)
+        for file_path in (state_rates_path, ai_cache_path):
+            try:
+                file_path.unlink(missing_ok=True)
+            except OSError as e:
+                _LOGGER.error("Failed to remove %s: %s", file_path, e)
 
     await hass.async_add_executor_job(_cleanup_files)
 
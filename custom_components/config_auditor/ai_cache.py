@@ -0,0 +1,255 @@
+"""H.A.C.A — Persistent cache of AI replies.
+
+Explaining an issue, suggesting a description or an alias, analysing a
+complex automation and optimising one each cost an LLM call of 5–30 s.
+``AiResponseCache`` keeps the raw replies in ``.haca_ai_cache.json`` so the
+same input is not sent twice, keyed by a hash of:
+
+  • the prompt kind (explain, suggest_fix, description, complexity, optimize)
+    and the HACA version — prompt templates change between releases;
+  • the reply language;
+  • the normalized config of the automation/script (parsed then dumped
+    with sorted keys, so formatting or key order changes are not changes);
+  • the prompt parameters (issue type, message, score, blueprints…);
+  • the provider that answers first.
+
+Entries expire after ``AI_CACHE_TTL_SECONDS`` and the least recently used go
+beyond ``AI_CACHE_MAX_ENTRIES``.  Storing a reply for an automation whose
+config hash changed drops every reply about its previous version.  Only
+real replies are cached: empty replies and local fallbacks never are.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any
+
+import yaml
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+AI_RESPONSE_CACHE_KEY = "ai_response_cache"
+AI_CACHE_FILE = ".haca_ai_cache.json"
+STORAGE_VERSION = 1
+
+AI_CACHE_TTL_SECONDS = 30 * 86400
+AI_CACHE_MAX_ENTRIES = 500
+
+
+def config_hash(config: Any) -> str:
+    """Hash of an automation/script config, insensitive to formatting and key order.
+
+    ``config`` is the parsed item or its YAML text; "" when there is none.
+    """
+    if isinstance(config, str):
+        try:
+            config = yaml.safe_load(config) if config.strip() else None
+        except yaml.YAMLError:
+            pass  # hash the text itself
+    if config in (None, "", {}, []):
+        return ""
+    normalized = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def cache_key(
+    kind: str, language: str, cfg_hash: str, params: dict[str, Any], provider: str
+) -> str:
+    payload = json.dumps(
+        [VERSION, kind, language, cfg_hash, params, provider],
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AiResponseCache:
+    """LRU + TTL cache of AI replies, persisted as one JSON file."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = AI_CACHE_MAX_ENTRIES,
+        ttl: float = AI_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key → {"reply", "kind", "entity_id", "config_hash", "created", "used"};
+        # least recently used first
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._loaded = False
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> None:
+        """Read the cache file (executor); unreadable files start empty."""
+        entries: list[tuple[str, dict[str, Any]]] = []
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == STORAGE_VERSION:
+                entries = [
+                    (key, entry) for key, entry in data.get("entries", {}).items()
+                    if isinstance(entry, dict) and "reply" in entry
+                ]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as exc:
+            _LOGGER.debug("[HACA AI Cache] Ignoring unreadable %s: %s", self.path.name, exc)
+        entries.sort(key=lambda item: item[1].get("used", 0))
+        with self._lock:
+            self._entries = OrderedDict(entries)
+            self._loaded = True
+            self._expire(time.time())
+
+    def save(self) -> None:
+        """Write the cache atomically if it changed (executor)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(
+                {"version": STORAGE_VERSION, "entries": self._entries}, ensure_ascii=False
+            )
+            self._dirty = False
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def get(self, key: str, now: float | None = None) -> str | None:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry["created"] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                    self._dirty = True
+                self.misses += 1
+                return None
+            entry["used"] = now
+            self._entries.move_to_end(key)
+            self._dirty = True
+            self.hits += 1
+            return entry["reply"]
+
+    def put(
+        self,
+        key: str,
+        reply: str,
+        *,
+        kind: str = "",
+        entity_id: str = "",
+        cfg_hash: str = "",
+        now: float | None = None,
+    ) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            if entity_id and cfg_hash:
+                # The automation changed: replies about older versions are stale
+                self._drop(
+                    lambda e: e["entity_id"] == entity_id
+                    and e["config_hash"] and e["config_hash"] != cfg_hash
+                )
+            self._entries[key] = {
+                "reply": reply,
+                "kind": kind,
+                "entity_id": entity_id,
+                "config_hash": cfg_hash,
+                "created": now,
+                "used": now,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def invalidate(self, entity_id: str | None = None) -> int:
+        """Drop the replies about ``entity_id`` (every reply when None)."""
+        with self._lock:
+            return self._drop(lambda e: entity_id is None or e["entity_id"] == entity_id)
+
+    def _drop(self, predicate) -> int:
+        stale = [key for key, entry in self._entries.items() if predicate(entry)]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self.invalidations += len(stale)
+            self._dirty = True
+        return len(stale)
+
+    def _expire(self, now: float) -> None:
+        self._drop(lambda e: now - e["created"] > self.ttl)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return counters for diagnostics."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "max_entries": self.max_entries,
+            "ttl_days": round(self.ttl / 86400, 1),
+        }
+
+
+def get_ai_cache(hass: HomeAssistant) -> AiResponseCache:
+    """Return the shared AI reply cache (created on first use, loaded lazily)."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    cache = domain_data.get(AI_RESPONSE_CACHE_KEY)
+    if cache is None:
+        cache = domain_data[AI_RESPONSE_CACHE_KEY] = AiResponseCache(
+            Path(hass.config.config_dir) / AI_CACHE_FILE
+        )
+    return cache
+
+
+def _match_item(document: Any, entity_id: str) -> Any:
+    """Automation (list, by id / alias slug) or script (mapping, by key) of ``entity_id``."""
+    slug = entity_id.split(".", 1)[-1]
+    if isinstance(document, dict):
+        return document.get(slug)
+    for item in document if isinstance(document, list) else []:
+        if not isinstance(item, dict):
+            continue
+        alias = str(item.get("alias") or "")
+        if str(item.get("id", "")) == slug or alias.lower().replace(" ", "_") == slug:
+            return item
+    return None
+
+
+async def async_entity_config_hash(hass: HomeAssistant, entity_id: str) -> str:
+    """Config hash of an automation/script from automations.yaml / scripts.yaml ("" if unknown)."""
+    if not entity_id.startswith(("automation.", "script.")):
+        return ""
+    from .config_watcher import get_parsed_config_cache
+
+    is_script = entity_id.startswith("script.")
+    path = Path(hass.config.config_dir) / ("scripts.yaml" if is_script else "automations.yaml")
+    cache = get_parsed_config_cache(hass)
+
+    def _hash() -> str:
+        try:
+            document = cache.load(path, ("automations",), copy=False)
+        except (OSError, yaml.YAMLError):
+            return ""
+        return config_hash(_match_item(document, entity_id))
+
+    return await hass.async_add_executor_job(_hash)
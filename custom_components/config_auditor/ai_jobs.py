@@ -0,0 +1,573 @@
+"""Background AI jobs — bulk descriptions and issue explanations.
+
+``AiJobQueue`` runs a selection of items — descriptions for hundreds of
+automations, explanations of every HIGH issue — as one background job:
+
+* ``submit`` returns at once; jobs run one after the other so their rate
+  limit is the provider's, and ``haca_ai_job_progress`` events report each
+  finished chunk;
+* prompts are sent ``concurrency`` at a time and no faster than
+  ``rate_limit`` per minute (both from the options, overridable per job);
+* items whose reply is already in the AI cache (see ai_cache.py) are not
+  sent again, and small items are grouped ``batch_size`` per prompt with a
+  JSON reply keyed by item — a provider whose reply cannot be parsed gets
+  one prompt per item for the rest of the job;
+* the state of the job is checkpointed to ``.haca_ai_jobs/<job_id>.json``
+  after every chunk, so a job interrupted by a restart resumes with the
+  items it had not finished;
+* descriptions are written at the end through one ``ConfigTransaction``
+  (one backup, one write per file, one reload per domain).
+
+The AI layer (conversation.py) is only imported when a job runs.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .job_queue import (
+    FINISHED_STATUSES,
+    STATUS_CANCELLED,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_QUEUED,
+    STATUS_RUNNING,
+    JobQueue,
+    new_job_id,
+)
+from .lazy import async_import, async_resolve
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_AI_JOB_PROGRESS = "haca_ai_job_progress"
+AI_JOB_DIR = ".haca_ai_jobs"
+
+KIND_DESCRIBE = "describe"
+KIND_EXPLAIN = "explain"
+JOB_KINDS = (KIND_DESCRIBE, KIND_EXPLAIN)
+
+CONF_AI_JOB_CONCURRENCY = "ai_job_concurrency"
+CONF_AI_JOB_RATE_LIMIT = "ai_job_rate_limit"
+DEFAULT_CONCURRENCY = 2
+MAX_CONCURRENCY = 8
+DEFAULT_RATE_LIMIT = 20         # prompts per minute, 0 = unlimited
+DEFAULT_BATCH_SIZE = 5
+BATCH_ITEM_MAX_CHARS = 1500     # larger prompts are always sent alone
+BATCH_MAX_CHARS = 8000
+
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+
+# coordinator.data lists searched for the issues to explain
+_ISSUE_LISTS = (
+    "automation_issue_list", "script_issue_list", "scene_issue_list",
+    "blueprint_issue_list", "entity_issue_list", "helper_issue_list",
+    "performance_issue_list", "security_issue_list",
+    "dashboard_issue_list", "compliance_issue_list",
+)
+_NO_DESCRIPTION_TYPES = (
+    "compliance_automation_no_description", "compliance_script_no_description",
+)
+
+
+def issue_key(issue: dict[str, Any]) -> str:
+    """Stable key of an issue within a job."""
+    if issue.get("id"):
+        return str(issue["id"])
+    return f"{issue.get('entity_id') or issue.get('alias', '')}|{issue.get('type', '')}"
+
+
+@dataclass
+class AiJob:
+    """One bulk AI request over a selection of items."""
+
+    job_id: str
+    kind: str
+    language: str
+    # key → entity_id (describe) or issue dict (explain), in processing order
+    items: dict[str, Any]
+    apply: bool = False
+    concurrency: int = DEFAULT_CONCURRENCY
+    rate_limit: int = DEFAULT_RATE_LIMIT
+    batch_size: int = DEFAULT_BATCH_SIZE
+    status: str = STATUS_QUEUED
+    # key → {"status", "text", "error", "cached"}
+    results: dict[str, dict[str, Any]] = field(default_factory=dict)
+    batching: bool = True
+    prompts: int = 0
+    batches: int = 0
+    applied: dict[str, Any] | None = None
+    error: str | None = None
+    created: float = field(default_factory=time.time)
+    finished: float | None = None
+    resumed: bool = False
+    task: asyncio.Task | None = field(default=None, repr=False, compare=False)
+    cancel_requested: bool = field(default=False, repr=False, compare=False)
+
+    @property
+    def percent(self) -> int:
+        if not self.items:
+            return 100
+        return int(100 * len(self.results) / len(self.items))
+
+    def counts(self) -> dict[str, int]:
+        statuses = [r["status"] for r in self.results.values()]
+        return {
+            "total": len(self.items),
+            "done": statuses.count(ITEM_DONE),
+            "failed": statuses.count(ITEM_FAILED),
+            "cached": sum(1 for r in self.results.values() if r.get("cached")),
+        }
+
+    def as_dict(self, with_results: bool = True) -> dict[str, Any]:
+        data = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "language": self.language,
+            "status": self.status,
+            "percent": self.percent,
+            **self.counts(),
+            "apply": self.apply,
+            "concurrency": self.concurrency,
+            "rate_limit": self.rate_limit,
+            "batch_size": self.batch_size,
+            "batching": self.batching,
+            "prompts": self.prompts,
+            "batches": self.batches,
+            "applied": self.applied,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished,
+            "resumed": self.resumed,
+        }
+        if with_results:
+            data["results"] = dict(self.results)
+        return data
+
+    def checkpoint(self) -> dict[str, Any]:
+        return {**self.as_dict(), "items": self.items}
+
+    @classmethod
+    def from_checkpoint(cls, data: dict[str, Any]) -> AiJob:
+        return cls(
+            job_id=data["job_id"],
+            kind=data["kind"],
+            language=data["language"],
+            items=dict(data["items"]),
+            apply=bool(data.get("apply")),
+            concurrency=int(data.get("concurrency", DEFAULT_CONCURRENCY)),
+            rate_limit=int(data.get("rate_limit", DEFAULT_RATE_LIMIT)),
+            batch_size=int(data.get("batch_size", DEFAULT_BATCH_SIZE)),
+            results=dict(data.get("results") or {}),
+            batching=bool(data.get("batching", True)),
+            prompts=int(data.get("prompts", 0)),
+            batches=int(data.get("batches", 0)),
+            created=float(data.get("created") or time.time()),
+            resumed=True,
+        )
+
+
+@dataclass
+class _ItemPrompt:
+    """The prompt of one pending item and where its reply is cached."""
+
+    key: str
+    prompt: str
+    slot: Any = None            # conversation._AiCacheSlot, None without provider
+
+
+class _RateLimiter:
+    """At most ``per_minute`` prompts per minute, evenly spaced."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def async_wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def parse_batch_reply(reply: str, keys: list[str]) -> dict[str, str] | None:
+    """Answers of a batched prompt, by key; None when the reply is not a JSON object."""
+    match = re.search(r"\{.*\}", reply or "", re.DOTALL)
+    if match is None:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    return {
+        key: str(data[key]).strip()
+        for key in keys
+        if isinstance(data.get(key), (str, int, float)) and str(data[key]).strip()
+    }
+
+
+def _read_checkpoints(directory: Path) -> list[dict[str, Any]]:
+    checkpoints = []
+    for path in sorted(directory.glob("*.json")) if directory.is_dir() else []:
+        try:
+            checkpoints.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError) as exc:
+            _LOGGER.warning("[HACA AI Jobs] Ignoring unreadable checkpoint %s: %s", path.name, exc)
+    return checkpoints
+
+
+def _write_checkpoint(path: Path, payload: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(payload, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class AiJobQueue(JobQueue[AiJob]):
+    """Run bulk AI jobs in the background, one at a time."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: Any,
+        coordinator: Any,
+        refactoring_assistant: Any,
+    ) -> None:
+        super().__init__(hass)
+        self.entry = entry
+        self._coordinator = coordinator
+        self._refactoring = refactoring_assistant   # RefactoringAssistant or LazyInstance
+        self._dir = Path(hass.config.config_dir) / AI_JOB_DIR
+
+    # ── Submission ────────────────────────────────────────────────────────
+
+    def _option(self, key: str, default: int) -> int:
+        try:
+            return int(self.entry.options.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def select(
+        self,
+        kind: str,
+        entity_ids: list[str] | None = None,
+        issues: list[dict[str, Any]] | None = None,
+        severity: str = "high",
+    ) -> dict[str, Any]:
+        """Items of a new job: the given selection, or every matching issue.
+
+        ``describe`` without ``entity_ids`` takes the automations and scripts
+        reported without a description; ``explain`` without ``issues`` takes
+        every issue of ``severity``.
+        """
+        if kind == KIND_DESCRIBE:
+            if entity_ids is None:
+                entity_ids = [
+                    issue.get("entity_id", "")
+                    for issue in (self._coordinator.data or {}).get("compliance_issue_list", [])
+                    if issue.get("type") in _NO_DESCRIPTION_TYPES
+                ]
+            return {
+                entity_id: entity_id for entity_id in entity_ids
+                if entity_id.startswith(("automation.", "script."))
+            }
+        if issues is None:
+            data = self._coordinator.data or {}
+            issues = [
+                issue for key in _ISSUE_LISTS for issue in data.get(key, [])
+                if issue.get("severity") == severity
+            ]
+        return {issue_key(issue): issue for issue in issues if isinstance(issue, dict)}
+
+    @callback
+    def submit(
+        self,
+        kind: str,
+        items: dict[str, Any],
+        *,
+        language: str | None = None,
+        apply: bool = False,
+        concurrency: int | None = None,
+        rate_limit: int | None = None,
+        batch_size: int | None = None,
+    ) -> AiJob:
+        """Queue a job over ``items`` (see ``select``) and return it without waiting."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown AI job kind '{kind}'")
+        if concurrency is None:
+            concurrency = self._option(CONF_AI_JOB_CONCURRENCY, DEFAULT_CONCURRENCY)
+        if rate_limit is None:
+            rate_limit = self._option(CONF_AI_JOB_RATE_LIMIT, DEFAULT_RATE_LIMIT)
+        job = AiJob(
+            job_id=new_job_id(),
+            kind=kind,
+            language=language or self._default_language(),
+            items=dict(items),
+            apply=apply and kind == KIND_DESCRIBE,
+            concurrency=max(1, min(int(concurrency), MAX_CONCURRENCY)),
+            rate_limit=max(0, int(rate_limit)),
+            batch_size=max(1, int(batch_size or DEFAULT_BATCH_SIZE)),
+        )
+        self._start(job)
+        return job
+
+    async def async_resume(self, _hass: HomeAssistant | None = None) -> list[AiJob]:
+        """Restart the jobs a restart interrupted (called once HA has started)."""
+        checkpoints = await self.hass.async_add_executor_job(_read_checkpoints, self._dir)
+        resumed = []
+        for data in checkpoints:
+            if data.get("status") in FINISHED_STATUSES or data.get("job_id") in self._jobs:
+                continue
+            try:
+                job = AiJob.from_checkpoint(data)
+            except (KeyError, TypeError, ValueError) as exc:
+                _LOGGER.warning("[HACA AI Jobs] Cannot resume checkpoint: %s", exc)
+                continue
+            _LOGGER.info(
+                "[HACA AI Jobs] Resuming job %s (%d/%d items done)",
+                job.job_id, len(job.results), len(job.items),
+            )
+            self._start(job)
+            resumed.append(job)
+        return resumed
+
+    async def async_cancel_job(self, job_id: str) -> AiJob | None:
+        """Cancel one job for good: its checkpoint is removed, it will not resume."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+        job.cancel_requested = True
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    # ── Execution ─────────────────────────────────────────────────────────
+
+    async def _async_run(self, job: AiJob) -> None:
+        try:
+            await self._async_checkpoint(job)    # a queued job survives a restart too
+            async with self._lock:
+                job.status = STATUS_RUNNING
+                self._fire(job)
+                await async_import(self.hass, "conversation")
+                prompts = await self._async_prepare(job)
+                limiter = _RateLimiter(job.rate_limit)
+                semaphore = asyncio.Semaphore(job.concurrency)
+                await asyncio.gather(*(
+                    self._async_chunk(job, chunk, semaphore, limiter)
+                    for chunk in self._chunks(job, prompts)
+                ))
+                if job.apply:
+                    await self._async_apply(job)
+                job.status = STATUS_DONE
+                _LOGGER.info(
+                    "[HACA AI Jobs] Job %s done — %s", job.job_id, job.as_dict(with_results=False),
+                )
+        except asyncio.CancelledError:
+            if job.cancel_requested:
+                job.status = STATUS_CANCELLED
+                job.error = "cancelled"
+            else:
+                # Unload / shutdown: keep the checkpoint as "running" to resume it
+                await asyncio.shield(self._async_checkpoint(job))
+            raise
+        except Exception as err:
+            job.status = STATUS_FAILED
+            job.error = str(err)
+            _LOGGER.error("[HACA AI Jobs] Job %s failed: %s", job.job_id, err, exc_info=True)
+        finally:
+            if job.status in FINISHED_STATUSES:
+                job.finished = time.time()
+                await asyncio.shield(self._async_remove_checkpoint(job))
+            self._fire(job)
+
+    async def _async_prepare(self, job: AiJob) -> list[_ItemPrompt]:
+        """Prompts of the pending items; items already in the AI cache are done here."""
+        from .conversation import _async_ai_cache_slot, _async_explain_prompt
+
+        refactoring = await async_resolve(self._refactoring) if job.kind == KIND_DESCRIBE else None
+        prompts = []
+        for key, item in job.items.items():
+            if key in job.results:
+                continue
+            if job.kind == KIND_DESCRIBE:
+                config = await refactoring.load_description_target(item)
+                if not config:
+                    job.results[key] = {"status": ITEM_FAILED, "error": "not_found"}
+                    continue
+                prompt = await self.hass.async_add_executor_job(
+                    refactoring.description_prompt, config, item.startswith("script."), job.language
+                )
+                # Same cache slot as suggest_description_ai
+                slot = await _async_ai_cache_slot(
+                    self.hass, "description", job.language, entity_id=item, config=config
+                )
+            else:
+                prompt, params = await _async_explain_prompt(self.hass, item, job.language)
+                # Same cache slot as explain_issue_ai
+                slot = await _async_ai_cache_slot(
+                    self.hass, "explain", job.language,
+                    entity_id=item.get("entity_id") or "", params=params,
+                )
+            cached = slot.cache.get(slot.key) if slot is not None else None
+            text = self._parse(job, cached)
+            if text:
+                job.results[key] = {"status": ITEM_DONE, "text": text, "cached": True}
+            else:
+                prompts.append(_ItemPrompt(key, prompt, slot))
+        return prompts
+
+    @staticmethod
+    def _chunks(job: AiJob, prompts: list[_ItemPrompt]) -> list[list[_ItemPrompt]]:
+        """Group small prompts ``batch_size`` at a time; large ones go alone."""
+        chunks: list[list[_ItemPrompt]] = []
+        batch: list[_ItemPrompt] = []
+        size = 0
+        for item in prompts:
+            if job.batch_size <= 1 or len(item.prompt) > BATCH_ITEM_MAX_CHARS:
+                chunks.append([item])
+                continue
+            if batch and (len(batch) >= job.batch_size or size + len(item.prompt) > BATCH_MAX_CHARS):
+                chunks.append(batch)
+                batch, size = [], 0
+            batch.append(item)
+            size += len(item.prompt)
+        if batch:
+            chunks.append(batch)
+        return chunks
+
+    async def _async_chunk(
+        self,
+        job: AiJob,
+        chunk: list[_ItemPrompt],
+        semaphore: asyncio.Semaphore,
+        limiter: _RateLimiter,
+    ) -> None:
+        from .conversation import _async_call_ai, _async_save_ai_cache
+
+        async with semaphore:
+            pending = chunk
+            if len(chunk) > 1 and job.batching:
+                pending = await self._async_batch(job, chunk, limiter)
+            for item in pending:
+                await limiter.async_wait()
+                job.prompts += 1
+                reply = await _async_call_ai(self.hass, item.prompt, f"HACA AI Job ({job.kind})")
+                self._record(job, item, reply)
+            await _async_save_ai_cache(self.hass)
+            await self._async_checkpoint(job)
+            self._fire(job)
+
+    async def _async_batch(
+        self, job: AiJob, chunk: list[_ItemPrompt], limiter: _RateLimiter
+    ) -> list[_ItemPrompt]:
+        """Send ``chunk`` as one prompt; return the items it did not answer."""
+        from .conversation import _async_call_ai
+        from .translation_utils import TranslationHelper
+
+        labels = {str(n): item for n, item in enumerate(chunk, 1)}
+        helper = TranslationHelper(self.hass)
+        await helper.async_load_language_section(job.language, "ai_prompts")
+        prompt = helper.t("batch_wrapper").format(
+            count=len(chunk),
+            requests="\n\n".join(f"[[{label}]]\n{item.prompt}" for label, item in labels.items()),
+        )
+        await limiter.async_wait()
+        job.prompts += 1
+        job.batches += 1
+        reply = await _async_call_ai(self.hass, prompt, f"HACA AI Job ({job.kind}, batch)")
+        answers = parse_batch_reply(reply, list(labels)) if reply else {}
+        if answers is None:
+            # This provider does not follow the JSON format: one prompt per item from now on
+            _LOGGER.info("[HACA AI Jobs] Job %s: unparsable batch reply, batching off", job.job_id)
+            job.batching = False
+            answers = {}
+        for label, text in answers.items():
+            self._record(job, labels[label], text)
+        return [item for label, item in labels.items() if label not in answers]
+
+    def _record(self, job: AiJob, item: _ItemPrompt, reply: str) -> None:
+        text = self._parse(job, reply)
+        if not text:
+            job.results[item.key] = {"status": ITEM_FAILED, "error": "no_reply"}
+            return
+        job.results[item.key] = {"status": ITEM_DONE, "text": text, "cached": False}
+        if item.slot is not None:
+            item.slot.store(reply)
+
+    @staticmethod
+    def _parse(job: AiJob, reply: str | None) -> str:
+        if not reply:
+            return ""
+        if job.kind == KIND_DESCRIBE:
+            # Loaded with the assistant by _async_prepare
+            from .refactoring_assistant import RefactoringAssistant
+
+            return RefactoringAssistant.parse_description(reply)
+        return reply.strip()
+
+    async def _async_apply(self, job: AiJob) -> None:
+        """Write every suggested description in one transaction."""
+        descriptions = {
+            job.items[key]: result["text"]
+            for key, result in job.results.items()
+            if result["status"] == ITEM_DONE and key in job.items
+        }
+        if not descriptions:
+            job.applied = {"applied": 0}
+            return
+        from .config_transaction import STATUS_APPLIED
+
+        refactoring = await async_resolve(self._refactoring)
+        outcome = await refactoring.apply_descriptions(descriptions)
+        for result in outcome["results"]:
+            if result["id"] in job.results:
+                job.results[result["id"]]["applied"] = result["status"]
+        job.applied = {
+            "applied": sum(1 for r in outcome["results"] if r["status"] == STATUS_APPLIED),
+            "backup_path": outcome.get("backup_path"),
+            "reloaded": outcome.get("reloaded"),
+            "error": outcome.get("error"),
+        }
+
+    # ── Checkpoints ───────────────────────────────────────────────────────
+
+    def _checkpoint_path(self, job: AiJob) -> Path:
+        return self._dir / f"{job.job_id}.json"
+
+    async def _async_checkpoint(self, job: AiJob) -> None:
+        payload = json.dumps(job.checkpoint(), ensure_ascii=False, default=str)
+        try:
+            await self.hass.async_add_executor_job(
+                _write_checkpoint, self._checkpoint_path(job), payload
+            )
+        except OSError as exc:
+            _LOGGER.warning("[HACA AI Jobs] Could not checkpoint job %s: %s", job.job_id, exc)
+
+    async def _async_remove_checkpoint(self, job: AiJob) -> None:
+        path = self._checkpoint_path(job)
+        await self.hass.async_add_executor_job(lambda: path.unlink(missing_ok=True))
+
+    @callback
+    def _fire(self, job: AiJob) -> None:
+        self.hass.bus.async_fire(EVENT_AI_JOB_PROGRESS, {
+            "entry_id": self.entry.entry_id,
+            **job.as_dict(with_results=False),
+        })
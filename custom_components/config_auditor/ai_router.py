@@ -0,0 +1,325 @@
+"""H.A.C.A — Routing of AI calls across ai_task entities and conversation agents.
+
+``AiProviderRouter`` picks the ai_task entity or conversation agent that
+answers an AI call, and skips the ones that are failing:
+
+  • caches the discovered providers (preferred pipeline agent first), and
+    drops that list when an ai_task / conversation entity is registered,
+    changed or removed, when a config entry changes, or after
+    ``DISCOVERY_TTL_SECONDS`` (a preferred pipeline change fires no event);
+  • keeps rolling stats per provider — median latency and error rate over
+    the last ``STATS_WINDOW`` calls;
+  • opens a circuit breaker after ``CIRCUIT_FAILURE_THRESHOLD`` consecutive
+    failures (errors, error replies, timeouts): the provider is skipped for
+    ``CIRCUIT_OPEN_SECONDS``, doubled after each failed trial call;
+  • bounds every call with the ``ai_provider_timeout`` option (default
+    ``PROVIDER_TIMEOUT_SECONDS``, generous enough for a local LLM on modest
+    hardware);
+  • with the ``ai_hedging`` option, sends the prompt to the two fastest
+    healthy providers at once and keeps the first valid reply (twice the
+    tokens for a latency that no longer depends on one provider).
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import logging
+import statistics
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+AI_ROUTER_KEY = "ai_router"
+CONF_AI_HEDGING = "ai_hedging"
+CONF_AI_PROVIDER_TIMEOUT = "ai_provider_timeout"
+
+DISCOVERY_TTL_SECONDS = 600
+PROVIDER_TIMEOUT_SECONDS = 300
+STATS_WINDOW = 20
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_OPEN_SECONDS = 60.0
+CIRCUIT_MAX_OPEN_SECONDS = 1800.0
+
+_PROVIDER_DOMAINS = ("ai_task", "conversation")
+
+
+class ProviderError(Exception):
+    """A provider answered with nothing usable (empty or error reply)."""
+
+
+@dataclass(frozen=True)
+class Provider:
+    """One AI backend: an ai_task entity or a conversation agent."""
+
+    kind: str   # "ai_task" | "conversation"
+    id: str
+
+
+class ProviderStats:
+    """Rolling latency / error stats and circuit breaker of one provider."""
+
+    def __init__(self) -> None:
+        self.window: deque[tuple[float, bool]] = deque(maxlen=STATS_WINDOW)
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.cooldown = CIRCUIT_OPEN_SECONDS
+        self.last_error = ""
+
+    def state(self, now: float) -> str:
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+    def allows(self, now: float) -> bool:
+        return self.state(now) != "open"
+
+    def latency(self) -> float | None:
+        """Median latency of the recent successful calls."""
+        ok = [latency for latency, success in self.window if success]
+        return statistics.median(ok) if ok else None
+
+    def error_rate(self) -> float:
+        if not self.window:
+            return 0.0
+        return sum(1 for _latency, success in self.window if not success) / len(self.window)
+
+    def record_success(self, latency: float) -> None:
+        self.calls += 1
+        self.window.append((latency, True))
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.cooldown = CIRCUIT_OPEN_SECONDS
+
+    def record_failure(self, latency: float, error: str, now: float) -> bool:
+        """Record a failed call; True when it opened the circuit."""
+        self.calls += 1
+        self.failures += 1
+        self.window.append((latency, False))
+        self.consecutive_failures += 1
+        self.last_error = error[:200]
+        if self.state(now) == "half_open":
+            # The trial call failed: stay away twice as long
+            self.cooldown = min(self.cooldown * 2, CIRCUIT_MAX_OPEN_SECONDS)
+        elif self.consecutive_failures < CIRCUIT_FAILURE_THRESHOLD:
+            return False
+        self.open_until = now + self.cooldown
+        return True
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        latency = self.latency()
+        return {
+            "state": self.state(now),
+            "calls": self.calls,
+            "failures": self.failures,
+            "error_rate": round(self.error_rate(), 2),
+            "latency_s": round(latency, 2) if latency is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+class AiProviderRouter:
+    """Cached provider discovery, circuit breakers and optional hedging."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._providers: list[Provider] | None = None
+        self._expires = 0.0
+        self._discovery_lock = asyncio.Lock()
+        self._stats: dict[Provider, ProviderStats] = {}
+        self._unsubs: list[Callable[[], None]] = []
+        self.discoveries = 0
+        self.invalidations = 0
+        self.skipped = 0
+        self.hedged = 0
+
+    # ── Discovery ─────────────────────────────────────────────────────────
+
+    @callback
+    def async_start(self) -> None:
+        """Drop the cached providers when AI entities or config entries change."""
+
+        @callback
+        def _on_registry(event) -> None:
+            entity_id = str(event.data.get("entity_id", ""))
+            if entity_id.split(".", 1)[0] in _PROVIDER_DOMAINS:
+                self.invalidate()
+
+        @callback
+        def _on_entry_changed(*_args) -> None:
+            self.invalidate()
+
+        self._unsubs.append(self.hass.bus.async_listen("entity_registry_updated", _on_registry))
+        try:
+            from homeassistant.config_entries import SIGNAL_CONFIG_ENTRY_CHANGED
+            from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+            self._unsubs.append(async_dispatcher_connect(
+                self.hass, SIGNAL_CONFIG_ENTRY_CHANGED, _on_entry_changed
+            ))
+        except Exception as exc:  # older HA: the TTL still bounds staleness
+            _LOGGER.debug("[HACA AI Router] No config entry signal: %s", exc)
+
+    @callback
+    def async_stop(self) -> None:
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    @callback
+    def invalidate(self) -> None:
+        if self._providers is not None:
+            self.invalidations += 1
+        self._providers = None
+
+    async def async_providers(self) -> list[Provider]:
+        """Every provider, preferred first (ai_task entities, then conversation agents)."""
+        async with self._discovery_lock:
+            if self._providers is None or time.monotonic() >= self._expires:
+                from .conversation import (
+                    _async_find_all_ai_task_entities,
+                    _async_find_all_conversation_agents,
+                )
+
+                providers = [
+                    Provider("ai_task", entity_id)
+                    for entity_id in await _async_find_all_ai_task_entities(self.hass)
+                ]
+                providers += [
+                    Provider("conversation", agent_id)
+                    for agent_id in await _async_find_all_conversation_agents(self.hass)
+                ]
+                self._providers = providers
+                self._expires = time.monotonic() + DISCOVERY_TTL_SECONDS
+                self.discoveries += 1
+            return list(self._providers)
+
+    # ── Calls ─────────────────────────────────────────────────────────────
+
+    def stats(self, provider: Provider) -> ProviderStats:
+        return self._stats.setdefault(provider, ProviderStats())
+
+    def _options(self) -> dict[str, Any]:
+        entries = self.hass.config_entries.async_entries(DOMAIN)
+        return entries[0].options if entries else {}
+
+    def hedging_enabled(self) -> bool:
+        return bool(self._options().get(CONF_AI_HEDGING, False))
+
+    def provider_timeout(self) -> float:
+        """Seconds one provider may take to answer (``ai_provider_timeout``)."""
+        try:
+            timeout = float(self._options().get(CONF_AI_PROVIDER_TIMEOUT, PROVIDER_TIMEOUT_SECONDS))
+        except (TypeError, ValueError):
+            return PROVIDER_TIMEOUT_SECONDS
+        return timeout if timeout > 0 else PROVIDER_TIMEOUT_SECONDS
+
+    async def async_call(
+        self, task_name: str, ask: Callable[[Provider], Awaitable[str]]
+    ) -> str:
+        """Ask the providers in turn (or two at once); "" when all failed."""
+        now = time.monotonic()
+        providers = await self.async_providers()
+        candidates = [p for p in providers if self.stats(p).allows(now)]
+        if len(candidates) < len(providers):
+            self.skipped += len(providers) - len(candidates)
+            _LOGGER.debug(
+                "[HACA AI Router] %s: skipping %s (circuit open)", task_name,
+                ", ".join(p.id for p in providers if p not in candidates),
+            )
+
+        if len(candidates) >= 2 and self.hedging_enabled():
+            pair = self._fastest(candidates, 2)
+            reply = await self._async_hedge(task_name, pair, ask)
+            if reply:
+                return reply
+            candidates = [p for p in candidates if p not in pair]
+
+        for provider in candidates:
+            reply = await self._async_attempt(task_name, provider, ask)
+            if reply:
+                return reply
+        return ""
+
+    def _fastest(self, providers: list[Provider], count: int) -> list[Provider]:
+        """Providers with the lowest median latency; unmeasured ones keep their order after."""
+        order = {p: i for i, p in enumerate(providers)}
+
+        def _rank(p: Provider):
+            latency = self.stats(p).latency()
+            return (latency is None, latency or 0.0, order[p])
+
+        return sorted(providers, key=_rank)[:count]
+
+    async def _async_attempt(
+        self, task_name: str, provider: Provider, ask: Callable[[Provider], Awaitable[str]]
+    ) -> str:
+        stats = self.stats(provider)
+        timeout = self.provider_timeout()
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(timeout):
+                reply = await ask(provider)
+        except Exception as exc:  # CancelledError (lost hedge) is not a failure
+            elapsed = time.monotonic() - start
+            error = "timeout" if isinstance(exc, TimeoutError) else str(exc) or type(exc).__name__
+            opened = stats.record_failure(elapsed, error, time.monotonic())
+            _LOGGER.warning(
+                "[HACA AI] %s %s failed after %.1fs: %.120s → trying next%s",
+                provider.kind, provider.id, elapsed, error,
+                " (circuit opened)" if opened else "",
+            )
+            return ""
+        stats.record_success(time.monotonic() - start)
+        _LOGGER.info("[HACA AI] ✓ %s %s (%s)", provider.kind, provider.id, task_name)
+        return reply
+
+    async def _async_hedge(
+        self, task_name: str, pair: list[Provider], ask: Callable[[Provider], Awaitable[str]]
+    ) -> str:
+        """Race two providers; the first valid reply wins, the other is cancelled."""
+        self.hedged += 1
+        pending = {
+            asyncio.ensure_future(self._async_attempt(task_name, provider, ask))
+            for provider in pair
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    reply = task.result()
+                    if reply:
+                        return reply
+            return ""
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return counters and per-provider stats for diagnostics."""
+        now = time.monotonic()
+        return {
+            "providers": [p.id for p in self._providers or []],
+            "discoveries": self.discoveries,
+            "invalidations": self.invalidations,
+            "skipped": self.skipped,
+            "hedged": self.hedged,
+            "stats": {p.id: s.as_dict(now) for p, s in self._stats.items()},
+        }
+
+
+def get_ai_router(hass: HomeAssistant) -> AiProviderRouter:
+    """Return the shared provider router (created and started on first use)."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    router = domain_data.get(AI_ROUTER_KEY)
+    if router is None:
+        router = domain_data[AI_ROUTER_KEY] = AiProviderRouter(hass)
+        router.async_start()
+    return router
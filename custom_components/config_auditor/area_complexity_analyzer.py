@@ -7,22 +7,20 @@ Aggregates automation complexity scores by Home Assistant area and provides:
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 from collections import defaultdict
 from typing import Any
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import (
-    area_registry as ar,
-    entity_registry as er,
-    device_registry as dr,
-)
+
+from .registry_snapshot import RegistrySnapshot, async_build_registry_snapshot
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class AreaComplexityAnalyzer:
-    """Build area → complexity heatmap from automation configs + entity registry."""
+    """Build area → complexity heatmap from automation configs + registry snapshot."""
 
     def __init__(self, hass: HomeAssistant) -> None:
         self.hass = hass
@@ -35,20 +33,21 @@ class AreaComplexityAnalyzer:
         automation_configs: dict[str, dict],
         complexity_scores: list[dict],
         entity_area_map: dict[str, str] | None = None,
+        snapshot: RegistrySnapshot | None = None,
     ) -> dict[str, Any]:
         """Run full area complexity analysis."""
-        await self.hass.async_add_executor_job(self._build_registries)
+        snapshot = snapshot or async_build_registry_snapshot(self.hass)
 
         score_map = {s["entity_id"]: s for s in complexity_scores}
 
         # For each automation, determine which areas it touches
+        # (pure dict lookups on the snapshot — no registry access per entity)
         auto_areas: dict[str, set[str]] = {}  # entity_id → {area_ids}
 
-        for entity_id, cfg in automation_configs.items():
-            areas = await self.hass.async_add_executor_job(
-                self._extract_automation_areas, entity_id, cfg
-            )
-            auto_areas[entity_id] = areas
+        for idx, (entity_id, cfg) in enumerate(automation_configs.items()):
+            auto_areas[entity_id] = self._extract_automation_areas(entity_id, cfg, snapshot)
+            if idx % 50 == 0:
+                await asyncio.sleep(0)
 
         # Build area → automation list
         area_autos: dict[str, list[str]] = defaultdict(list)
@@ -61,13 +60,11 @@ class AreaComplexityAnalyzer:
                 area_autos["__no_area__"].append(eid)
 
         # Build area stats
-        area_reg = ar.async_get(self.hass)
         self.area_stats = []
         for area_id, auto_ids in area_autos.items():
             area_name = "__no_area__"
             if area_id != "__no_area__":
-                area = area_reg.async_get_area(area_id)
-                area_name = area.name if area else area_id
+                area_name = snapshot.area_names.get(area_id, area_id)
 
             scores_for_area = [score_map[eid]["score"] for eid in auto_ids if eid in score_map]
             total_score = sum(scores_for_area)
@@ -100,10 +97,7 @@ class AreaComplexityAnalyzer:
         self.cross_area_automations = []
         for eid, areas in auto_areas.items():
             if len(areas) >= 2:
-                area_names = []
-                for aid in areas:
-                    a = area_reg.async_get_area(aid)
-                    area_names.append(a.name if a else aid)
+                area_names = [snapshot.area_names.get(aid, aid) for aid in areas]
                 cscore = score_map.get(eid, {})
                 self.cross_area_automations.append({
                     "entity_id":  eid,
@@ -125,21 +119,17 @@ class AreaComplexityAnalyzer:
 
     # ── Internal ──────────────────────────────────────────────────────────
 
-    def _build_registries(self) -> None:
-        """Pre-warm registry caches (called in executor)."""
-        # Nothing to cache — we call async_get inline
-
-    def _extract_automation_areas(self, entity_id: str, cfg: dict) -> set[str]:
+    @staticmethod
+    def _extract_automation_areas(
+        entity_id: str, cfg: dict, snapshot: RegistrySnapshot
+    ) -> set[str]:
         """Extract all area_ids referenced in an automation config."""
         areas: set[str] = set()
-        ent_reg = er.async_get(self.hass)
-        dev_reg = dr.async_get(self.hass)
-        area_reg = ar.async_get(self.hass)
 
         # 1. Check if the automation entity itself has an area
-        entry = ent_reg.async_get(entity_id)
-        if entry and entry.area_id:
-            areas.add(entry.area_id)
+        own_area = snapshot.area_of(entity_id)
+        if own_area:
+            areas.add(own_area)
 
         # 2. Walk triggers + actions for entity_ids and area_ids
         all_targets: list[dict] = []
@@ -156,22 +146,16 @@ class AreaComplexityAnalyzer:
             for area_ref in _flatten(obj.get("area_id", [])):
                 if isinstance(area_ref, str) and "{{" not in area_ref:
                     # Resolve by name or id
-                    a = area_reg.async_get_area(area_ref) or area_reg.async_get_area_by_name(area_ref)
-                    if a:
-                        areas.add(a.id)
+                    a_id = snapshot.resolve_area(area_ref)
+                    if a_id:
+                        areas.add(a_id)
 
-            # entity_id in trigger / action → lookup entity area
+            # entity_id in trigger / action → effective entity area
             for eid_ref in _flatten(obj.get("entity_id", [])):
                 if isinstance(eid_ref, str) and "{{" not in eid_ref:
-                    ent = ent_reg.async_get(eid_ref)
-                    if ent:
-                        a_id = ent.area_id
-                        if not a_id and ent.device_id:
-                            dev = dev_reg.async_get(ent.device_id)
-                            if dev:
-                                a_id = dev.area_id
-                        if a_id:
-                            areas.add(a_id)
+                    a_id = snapshot.area_of(eid_ref)
+                    if a_id:
+                        areas.add(a_id)
 
         return areas
 
@@ -7,17 +7,18 @@ import json
 import logging
 import re
 from datetime import datetime, timedelta, timezone
+from functools import partial
 from pathlib import Path
 from typing import Any
 
-import yaml
-
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import area_registry as ar
 from homeassistant.util import slugify as ha_slugify
 
+from .const import CONFIG_SCAN_SCOPES, HEADLESS_STATE
+from .include_resolver import get_config_resolver
+from .registry_snapshot import RegistrySnapshot, async_build_registry_snapshot
 from .translation_utils import TranslationHelper
 
 _LOGGER = logging.getLogger(__name__)
@@ -44,6 +45,8 @@ class AutomationAnalyzer:
         self._registered_floor_ids: set[str] = set()
         self._registered_label_ids: set[str] = set()
         self._ignored_entity_ids: set[str] = set()
+        # Registry snapshot of the running scan (entity → unique_id joins)
+        self._snapshot: RegistrySnapshot | None = None
         # complexity_scores: one entry per automation, all of them (score 0 included)
         self.complexity_scores: list[dict] = []
         # script_complexity_scores: one entry per script
@@ -71,9 +74,16 @@ class AutomationAnalyzer:
         """Public view of loaded scene configurations."""
         return self._scene_configs
 
-    async def analyze_all(self) -> list[dict[str, Any]]:
-        """Analyze all automations."""
+    async def analyze_all(
+        self, snapshot: RegistrySnapshot | None = None
+    ) -> list[dict[str, Any]]:
+        """Analyze all automations.
+
+        ``snapshot`` is the per-scan registry snapshot built by the coordinator;
+        when omitted (standalone use), a fresh one is built here.
+        """
         self.issues = []
+        self._snapshot = snapshot or async_build_registry_snapshot(self.hass)
         self.complexity_scores = []
         self.script_complexity_scores = []
         self.scene_stats = []
@@ -85,8 +95,8 @@ class AutomationAnalyzer:
         
         # P0: pre-load registries for service / area / floor / label checks
         await self._load_registered_services()
-        await self._load_registered_areas_floors_labels()
-        await self._load_ignored_entities()
+        await self._load_registered_areas_floors_labels(self._snapshot)
+        await self._load_ignored_entities(self._snapshot)
         
         # Load configurations
         await self._load_automation_configs()
@@ -233,8 +243,15 @@ class AutomationAnalyzer:
         except Exception as e:
             _LOGGER.error("P0: error loading registered services: %s", e)
 
-    async def _load_registered_areas_floors_labels(self) -> None:
+    async def _load_registered_areas_floors_labels(
+        self, snapshot: RegistrySnapshot | None = None
+    ) -> None:
         """Cache registered area/floor/label IDs from HA registries (P0)."""
+        if snapshot is not None:
+            self._registered_area_ids = set(snapshot.area_ids)
+            self._registered_floor_ids = set(snapshot.floor_ids)
+            self._registered_label_ids = set(snapshot.label_ids)
+            return
         self._registered_area_ids = set()
         self._registered_floor_ids = set()
         self._registered_label_ids = set()
@@ -270,8 +287,13 @@ class AutomationAnalyzer:
             len(self._registered_label_ids),
         )
 
-    async def _load_ignored_entities(self) -> None:
+    async def _load_ignored_entities(
+        self, snapshot: RegistrySnapshot | None = None
+    ) -> None:
         """Cache entity_ids that have the haca_ignore label (entity or device level)."""
+        if snapshot is not None:
+            self._ignored_entity_ids = set(snapshot.ignored_entity_ids)
+            return
         from .translation_utils import async_get_haca_ignored_entity_ids
         self._ignored_entity_ids = await async_get_haca_ignored_entity_ids(self.hass)
 
@@ -281,16 +303,19 @@ class AutomationAnalyzer:
 
     async def _load_automation_configs(self) -> None:
         """Load automation configurations from all sources:
-        - automations.yaml (standard UI file)
+        - configuration.yaml, with every include directive and package
+          resolved (include_resolver) — covers automations.yaml,
+          !include_dir_* splits and homeassistant.packages
         - .storage/core.automation (UI automations in HA storage)
-        - packages/*.yaml (homeassistant.packages)
-        - Files referenced via !include_dir_merge_list in configuration.yaml
+        - automations.yaml / packages/*.yaml when configuration.yaml does
+          not reference them (legacy behaviour)
         Deduplicates by unique_id.
         """
         self._automation_configs = {}
         seen_unique_ids: set[str] = set()
         config_dir = Path(self.hass.config.config_dir)
-        entity_reg = er.async_get(self.hass)
+        snapshot = self._snapshot or async_build_registry_snapshot(self.hass)
+        resolver = get_config_resolver(self.hass)
 
         def _map_config_to_entity(config: dict, source_file: str) -> tuple[str | None, dict]:
             """Resolve the HA entity_id for a raw automation config dict."""
@@ -302,16 +327,13 @@ class AutomationAnalyzer:
 
             # 1. Primary: look up the entity_registry by unique_id (most reliable)
             if automation_id:
-                for entity in entity_reg.entities.values():
-                    if entity.platform == "automation" and entity.unique_id == str(automation_id):
-                        entity_id = entity.entity_id
-                        break
+                entity_id = snapshot.automation_entity_ids.get(str(automation_id))
 
             # 2. Fallback: derive from alias using the SAME slugify HA uses
             #    (must match HA's entity_id so that haca_ignore labels are found correctly)
             if not entity_id and alias:
                 candidate = f"automation.{ha_slugify(alias)}"
-                if any(e.entity_id == candidate for e in entity_reg.entities.values()):
+                if candidate in snapshot.entity_ids:
                     entity_id = candidate
 
             # 3. Last resort: synthetic key — will never match the entity_registry
@@ -330,24 +352,20 @@ class AutomationAnalyzer:
             entity_id, enriched = _map_config_to_entity(config, source)
             self._automation_configs[entity_id] = enriched
 
-        # ── 1. automations.yaml ───────────────────────────────────────────
-        automations_file = config_dir / "automations.yaml"
-        if automations_file.exists():
-            try:
-                def _read_yaml_list(path):
-                    with open(path, "r", encoding="utf-8") as f:
-                        content = yaml.safe_load(f)
-                    return content if isinstance(content, list) else []
-
-                automations = await self.hass.async_add_executor_job(
-                    _read_yaml_list, automations_file
+        # ── 1. configuration.yaml + includes + packages ───────────────────
+        try:
+            items = await self.hass.async_add_executor_job(
+                partial(
+                    resolver.collect_domain_items, config_dir, "automation",
+                    CONFIG_SCAN_SCOPES, default_file="automations.yaml",
                 )
-                for cfg in automations:
-                    if isinstance(cfg, dict):
-                        _register(cfg, "automations.yaml")
-                _LOGGER.debug("automations.yaml: loaded %d entries", len(automations))
-            except Exception as e:
-                _LOGGER.error("Error loading automations.yaml: %s", e, exc_info=True)
+            )
+            for source, cfg in items:
+                if isinstance(cfg, dict):
+                    _register(cfg, source)
+            _LOGGER.debug("YAML configuration: loaded %d automation entries", len(items))
+        except Exception as e:
+            _LOGGER.error("Error loading YAML automations: %s", e, exc_info=True)
 
         # ── 2. .storage/core.automation (UI automations) ──────────────────
         storage_file = config_dir / ".storage" / "core.automation"
@@ -366,85 +384,6 @@ class AutomationAnalyzer:
             except Exception as e:
                 _LOGGER.error("Error loading .storage/core.automation: %s", e, exc_info=True)
 
-        # ── 3. packages/*.yaml (homeassistant.packages) ───────────────────
-        packages_dir = config_dir / "packages"
-        if packages_dir.is_dir():
-            try:
-                def _read_packages(pkg_dir: Path) -> list[tuple[str, list]]:
-                    results = []
-                    for yaml_file in sorted(pkg_dir.rglob("*.yaml")):
-                        try:
-                            with open(yaml_file, "r", encoding="utf-8") as f:
-                                content = yaml.safe_load(f)
-                            if not isinstance(content, dict):
-                                continue
-                            # Support top-level 'automation:' or nested under 'homeassistant:'
-                            automations_raw = content.get("automation", [])
-                            if not automations_raw:
-                                automations_raw = content.get("homeassistant", {}).get("automation", [])
-                            if isinstance(automations_raw, dict):
-                                automations_raw = [automations_raw]
-                            if automations_raw:
-                                results.append((str(yaml_file.relative_to(pkg_dir.parent)), automations_raw))
-                        except Exception:
-                            pass
-                    return results
-
-                pkg_results = await self.hass.async_add_executor_job(_read_packages, packages_dir)
-                for source_rel, pkg_automations in pkg_results:
-                    for cfg in pkg_automations:
-                        if isinstance(cfg, dict):
-                            _register(cfg, f"packages/{source_rel}")
-                _LOGGER.debug("packages/: loaded automations from %d files", len(pkg_results))
-            except Exception as e:
-                _LOGGER.error("Error loading packages/*.yaml: %s", e, exc_info=True)
-
-        # ── 4. configuration.yaml — !include_dir_merge_list ───────────────
-        config_yaml_path = config_dir / "configuration.yaml"
-        if config_yaml_path.exists():
-            try:
-                def _scan_config_includes(cfg_path: Path, cfg_dir: Path) -> list[tuple[str, list]]:
-                    """Detect and resolve !include_dir_merge_list automation directories."""
-                    results = []
-                    try:
-                        with open(cfg_path, "r", encoding="utf-8") as f:
-                            raw = f.read()
-                        # Detect: automation: !include_dir_merge_list <dir>
-                        import re as _re
-                        matches = _re.findall(
-                            r"^automation\s*:\s*!include_dir_merge_list\s+(\S+)",
-                            raw, _re.MULTILINE
-                        )
-                        for rel_dir in matches:
-                            target = cfg_dir / rel_dir
-                            if target.is_dir():
-                                for yaml_file in sorted(target.rglob("*.yaml")):
-                                    try:
-                                        with open(yaml_file, "r", encoding="utf-8") as f:
-                                            content = yaml.safe_load(f)
-                                        if isinstance(content, list):
-                                            rel = str(yaml_file.relative_to(cfg_dir))
-                                            results.append((rel, content))
-                                        elif isinstance(content, dict):
-                                            rel = str(yaml_file.relative_to(cfg_dir))
-                                            results.append((rel, [content]))
-                                    except Exception:
-                                        pass
-                    except Exception:
-                        pass
-                    return results
-
-                include_results = await self.hass.async_add_executor_job(
-                    _scan_config_includes, config_yaml_path, config_dir
-                )
-                for source_rel, inc_automations in include_results:
-                    for cfg in inc_automations:
-                        if isinstance(cfg, dict):
-                            _register(cfg, source_rel)
-                _LOGGER.debug("configuration.yaml includes: loaded automations from %d files", len(include_results))
-            except Exception as e:
-                _LOGGER.error("Error scanning configuration.yaml includes: %s", e, exc_info=True)
-
         _LOGGER.info(
             "Total automation configs loaded: %d (from %d unique sources)",
             len(self._automation_configs),
@@ -452,7 +391,7 @@ class AutomationAnalyzer:
         )
 
     async def _load_script_configs(self) -> None:
-        """Load script configurations from scripts.yaml.
+        """Load script configurations (scripts.yaml, includes and packages).
         
         Uses the entity registry to resolve the ACTUAL entity_id for each script,
         because users may have renamed the entity_id via Settings → Entities.
@@ -460,42 +399,31 @@ class AutomationAnalyzer:
         """
         self._script_configs.clear()  # Clear stale data from previous scans
         config_dir = Path(self.hass.config.config_dir)
-        scripts_file = config_dir / "scripts.yaml"
-        if not scripts_file.exists(): return
+        resolver = get_config_resolver(self.hass)
         
         try:
-            def read_scripts():
-                with open(scripts_file, "r", encoding="utf-8") as f:
-                    content = yaml.safe_load(f)
-                    return content if content is not None else {}
-            
-            scripts = await self.hass.async_add_executor_job(read_scripts)
+            items = await self.hass.async_add_executor_job(
+                partial(
+                    resolver.collect_domain_items, config_dir, "script",
+                    CONFIG_SCAN_SCOPES, named=True, default_file="scripts.yaml",
+                )
+            )
 
-            # Build a map from original object_id to actual entity_id
+            # Map: YAML key / original object_id → actual entity_id
             # (handles renamed scripts via entity registry)
-            from homeassistant.helpers import entity_registry as er
-            ent_reg = er.async_get(self.hass)
-            # Map: original_object_id → actual entity_id
-            registry_map: dict[str, str] = {}
-            for entry in ent_reg.entities.values():
-                if entry.domain == "script":
-                    # entry.unique_id is typically the YAML key
-                    registry_map[entry.unique_id] = entry.entity_id
-                    # Also map by original object_id if different
-                    original_oid = entry.entity_id.split(".", 1)[1] if "." in entry.entity_id else ""
-                    if original_oid:
-                        registry_map[original_oid] = entry.entity_id
-
-            for slug, config in scripts.items():
+            snapshot = self._snapshot or async_build_registry_snapshot(self.hass)
+            registry_map = snapshot.script_entity_ids
+
+            for _source, (slug, config) in items:
                 # Use registry entity_id if available (handles renames),
                 # fallback to script.{slug}
                 actual_eid = registry_map.get(slug, f"script.{slug}")
                 self._script_configs[actual_eid] = config
         except Exception as e:
-            _LOGGER.error("Error loading scripts.yaml: %s", e)
+            _LOGGER.error("Error loading scripts: %s", e)
 
     async def _load_scene_configs(self) -> None:
-        """Load scene configurations from scenes.yaml.
+        """Load scene configurations (scenes.yaml, includes and packages).
 
         HA derives the entity_id from the scene *name* using slugify():
             scene.{slugify(name)}
@@ -503,18 +431,16 @@ class AutomationAnalyzer:
         """
         self._scene_configs.clear()  # Clear stale data from previous scans
         config_dir = Path(self.hass.config.config_dir)
-        scenes_file = config_dir / "scenes.yaml"
-        if not scenes_file.exists():
-            return
+        resolver = get_config_resolver(self.hass)
 
         try:
-            def read_scenes():
-                with open(scenes_file, "r", encoding="utf-8") as f:
-                    content = yaml.safe_load(f)
-                    return content if content is not None else []
-
-            scenes = await self.hass.async_add_executor_job(read_scenes)
-            for config in scenes:
+            items = await self.hass.async_add_executor_job(
+                partial(
+                    resolver.collect_domain_items, config_dir, "scene",
+                    CONFIG_SCAN_SCOPES, default_file="scenes.yaml",
+                )
+            )
+            for _source, config in items:
                 if not isinstance(config, dict):
                     continue
                 if "id" not in config and "name" not in config:
@@ -525,7 +451,7 @@ class AutomationAnalyzer:
                 entity_id = f"scene.{ha_slugify(str(name_or_id))}"
                 self._scene_configs[entity_id] = config
         except Exception as e:
-            _LOGGER.error("Error loading scenes.yaml: %s", e)
+            _LOGGER.error("Error loading scenes: %s", e)
 
     # ═══════════════════════════════════════════════════════════════════════
     # v1.3.0 — Script graph analysis (a/)
@@ -1444,8 +1370,9 @@ class AutomationAnalyzer:
             if self._is_ignored(entity_id):
                 continue
 
-            # Skip disabled automations
-            if state.state == "off":
+            # Skip disabled automations (and headless placeholders: no
+            # trigger history without a running instance)
+            if state.state in ("off", HEADLESS_STATE):
                 continue
 
             alias         = state.attributes.get("friendly_name", entity_id)
@@ -17,7 +17,7 @@ import yaml
 
 from homeassistant.core import HomeAssistant
 
-from .const import BACKUP_DIR
+from .backup_store import async_backup
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,8 +44,6 @@ class AutomationOptimizer:
         self.hass = hass
         self._automations_file = Path(hass.config.config_dir) / "automations.yaml"
         self._scripts_file = Path(hass.config.config_dir) / "scripts.yaml"
-        self._backup_dir = Path(hass.config.config_dir) / BACKUP_DIR
-        self._backup_dir.mkdir(exist_ok=True)
 
     # ── Public API ─────────────────────────────────────────────────────────────
 
@@ -109,8 +107,18 @@ class AutomationOptimizer:
             blueprints=available_blueprints,
         )
 
-        # ── 5. Call AI ────────────────────────────────────────────────────────
-        raw_reply = await self._call_ai(prompt)
+        # ── 5. Call AI (cached per config, issues, patterns and blueprints) ───
+        raw_reply = await self._call_ai(
+            prompt,
+            entity_id=entity_id,
+            config=original_yaml,
+            params={
+                "score": score,
+                "issues": issues_found,
+                "patterns": detected_patterns,
+                "blueprints": [bp["path"] for bp in available_blueprints],
+            },
+        )
 
         # ── 6. Parse structured response ──────────────────────────────────────
         parsed = self._parse_reply(raw_reply)
@@ -177,7 +185,7 @@ class AutomationOptimizer:
                     ),
                 }
 
-        backup_path = await self._create_backup()
+        backup_path = await self._create_backup(entity_id)
 
         try:
             result = await self.hass.async_add_executor_job(
@@ -186,7 +194,7 @@ class AutomationOptimizer:
             return {
                 "success":     True,
                 "message":     f"{len(docs)} automation(s) écrite(s).",
-                "backup_path": str(backup_path),
+                "backup_path": backup_path,
                 "count":       len(docs),
             }
         except Exception as e:
@@ -290,10 +298,20 @@ class AutomationOptimizer:
             _ap = {}
         _tmpl = _ap.get("optimizer_system", "Optimise this automation:\n\n{content}")
         return _tmpl.format(content=self._build_content(automations, blueprints))
-    async def _call_ai(self, prompt: str) -> str:
-        """Call AI with automatic provider fallback via shared _async_call_ai."""
-        from .conversation import _async_call_ai
-        return await _async_call_ai(self.hass, prompt, "HACA Automation Optimizer")
+    async def _call_ai(
+        self,
+        prompt: str,
+        entity_id: str = "",
+        config: str = "",
+        params: dict[str, Any] | None = None,
+    ) -> str:
+        """Call AI with automatic provider fallback and the persistent reply cache."""
+        from .conversation import _async_call_ai_cached
+        _lang = self.hass.data.get("config_auditor", {}).get("user_language") or self.hass.config.language or "en"
+        return await _async_call_ai_cached(
+            self.hass, prompt, "HACA Automation Optimizer", "optimize", _lang,
+            entity_id=entity_id, config=config, params=params,
+        )
 
     def _parse_reply(self, reply: str) -> dict[str, Any]:
         """Extract the 4 structured blocks from the AI reply."""
@@ -368,15 +386,9 @@ class AutomationOptimizer:
             yaml.dump(filtered, f, allow_unicode=True, default_flow_style=False,
                       sort_keys=False)
 
-    async def _create_backup(self) -> Path:
-        """Backup automations.yaml before any write."""
-        from datetime import datetime
-        import shutil
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = self._backup_dir / f"automations_optim_{timestamp}.yaml"
-
-        def _do():
-            shutil.copy2(self._automations_file, backup_file)
-
-        await self.hass.async_add_executor_job(_do)
-        return backup_file
+    async def _create_backup(self, entity_id: str) -> str | None:
+        """Backup automations.yaml before any write; return the backup id."""
+        entries = await async_backup(
+            self.hass, [self._automations_file], "optimizer", [entity_id]
+        )
+        return entries[0]["id"] if entries else None
@@ -0,0 +1,340 @@
+"""H.A.C.A — Content-addressed store for automations.yaml / scripts.yaml backups.
+
+Backups are taken before every fix and deduplicated by content.  The store
+keeps:
+
+  • ``objects/<sha256>.yaml.gz`` — one gzip blob per distinct content;
+    backing up content that is already stored writes nothing but a manifest
+    line, and backing up a file unchanged since its last backup writes
+    nothing at all;
+  • ``manifest.json`` — one entry per backup: file, blob hash, sizes,
+    reason (fix, optimizer, manual, pre_restore…), issue ids, timestamp.
+
+Retention is by size: once the blobs exceed ``BACKUP_MAX_BYTES`` the oldest
+entries go, but the newest backup of each file is always kept.
+``item_diffs`` compares two versions item by item (automation / script) for
+restore previews.  Backups of the former layout (``automations_<ts>.yaml``
+copies) are imported on first use.
+
+Everything here is blocking I/O: callers go through the executor.
+"""
+from __future__ import annotations
+
+import difflib
+from datetime import datetime
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Any, Iterable
+
+import yaml
+
+from homeassistant.core import HomeAssistant
+
+from .const import BACKUP_DIR, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKUP_STORE_KEY = "backup_store"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+OBJECTS_DIR = "objects"
+
+# Compressed size of all blobs kept before the oldest backups are dropped
+BACKUP_MAX_BYTES = 20 * 1024 * 1024
+
+# Full copies written by earlier versions: <stem>_<YYYYmmdd_HHMMSS>.yaml
+_LEGACY_NAME = re.compile(r"^(automations|scripts)(_optim)?_(\d{8}_\d{6})\.yaml$")
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class BackupStore:
+    """Deduplicated, compressed backups of config files under one directory."""
+
+    def __init__(self, root: Path, max_bytes: int = BACKUP_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._objects = self.root / OBJECTS_DIR
+        self._manifest_path = self.root / MANIFEST_FILE
+        self._lock = threading.Lock()
+        self._entries: list[dict[str, Any]] | None = None
+
+    # ── Manifest ──────────────────────────────────────────────────────────
+
+    def _load(self) -> list[dict[str, Any]]:
+        if self._entries is None:
+            entries: list[dict[str, Any]] = []
+            try:
+                doc = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+                if isinstance(doc, dict) and doc.get("version") == MANIFEST_VERSION:
+                    entries = [e for e in doc.get("entries", []) if isinstance(e, dict)]
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as err:
+                _LOGGER.warning("[HACA Backups] Unreadable manifest, starting empty: %s", err)
+            self._entries = entries
+            self._import_legacy()
+        return self._entries
+
+    def _save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        doc = {"version": MANIFEST_VERSION, "entries": self._entries or []}
+        _atomic_write_bytes(
+            self._manifest_path, json.dumps(doc, indent=1, ensure_ascii=False).encode("utf-8")
+        )
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._objects / f"{digest}.yaml.gz"
+
+    # ── Writing ───────────────────────────────────────────────────────────
+
+    def snapshot(
+        self,
+        path: Path,
+        reason: str,
+        issue_ids: Iterable[str] = (),
+        created: datetime | None = None,
+    ) -> dict[str, Any]:
+        """Back up ``path``; return its manifest entry (the last one if unchanged)."""
+        path = Path(path)
+        data = path.read_bytes()
+        with self._lock:
+            entries = self._load()
+            count = len(entries)
+            entry = self._add(path.name, data, reason, issue_ids, created)
+            if len(entries) > count:
+                self._prune()
+                self._save()
+            return dict(entry)
+
+    def _add(
+        self,
+        file_name: str,
+        data: bytes,
+        reason: str,
+        issue_ids: Iterable[str],
+        created: datetime | None,
+    ) -> dict[str, Any]:
+        entries = self._entries
+        digest = hashlib.sha256(data).hexdigest()
+        latest = next((e for e in reversed(entries) if e["file"] == file_name), None)
+        if latest is not None and latest["hash"] == digest:
+            return latest
+
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            self._objects.mkdir(parents=True, exist_ok=True)
+            _atomic_write_bytes(blob, gzip.compress(data, compresslevel=6))
+
+        created = created or datetime.now()
+        base = f"{Path(file_name).stem}_{created.strftime('%Y%m%d_%H%M%S')}_{digest[:8]}"
+        entry_id, n = base, 2
+        taken = {e["id"] for e in entries}
+        while entry_id in taken:
+            entry_id, n = f"{base}_{n}", n + 1
+        entry = {
+            "id": entry_id,
+            "file": file_name,
+            "hash": digest,
+            "size": len(data),
+            "stored_size": blob.stat().st_size,
+            "created": created.isoformat(timespec="seconds"),
+            "reason": reason,
+            "issue_ids": [str(i) for i in issue_ids if i],
+        }
+        entries.append(entry)
+        return entry
+
+    def _prune(self) -> None:
+        """Drop the oldest entries until the blobs fit in ``max_bytes``."""
+        entries = self._entries
+        newest = {e["file"]: e for e in entries}   # last entry per file wins
+        while self._stored_bytes() > self.max_bytes:
+            victim = next((e for e in entries if newest[e["file"]] is not e), None)
+            if victim is None:
+                break
+            entries.remove(victim)
+            self._collect(victim["hash"])
+
+    def _stored_bytes(self) -> int:
+        return sum({e["hash"]: e["stored_size"] for e in self._entries}.values())
+
+    def _collect(self, digest: str) -> None:
+        """Delete a blob no entry references anymore."""
+        if any(e["hash"] == digest for e in self._entries):
+            return
+        try:
+            self._blob_path(digest).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _import_legacy(self) -> None:
+        """Move full copies of the former backup layout into the store."""
+        if not self.root.is_dir():
+            return
+        legacy = sorted(
+            (p for p in self.root.iterdir() if p.is_file() and _LEGACY_NAME.match(p.name)),
+            key=lambda p: _LEGACY_NAME.match(p.name).group(3),
+        )
+        if not legacy:
+            return
+        imported: list[Path] = []
+        for path in legacy:
+            match = _LEGACY_NAME.match(path.name)
+            try:
+                created = datetime.strptime(match.group(3), "%Y%m%d_%H%M%S")
+                self._add(
+                    f"{match.group(1)}.yaml", path.read_bytes(),
+                    "optimizer" if match.group(2) else "legacy", (), created,
+                )
+                imported.append(path)
+            except (OSError, ValueError) as err:
+                _LOGGER.warning("[HACA Backups] Cannot import %s: %s", path.name, err)
+        self._entries.sort(key=lambda e: e["created"])
+        self._prune()
+        # The originals go only once the manifest referencing their blobs is saved
+        self._save()
+        for path in imported:
+            try:
+                path.unlink()
+            except OSError as err:
+                _LOGGER.warning("[HACA Backups] Cannot remove %s: %s", path.name, err)
+        _LOGGER.info("[HACA Backups] Imported %d legacy backup(s)", len(imported))
+
+    # ── Reading ───────────────────────────────────────────────────────────
+
+    def entries(self) -> list[dict[str, Any]]:
+        """All backups, newest first."""
+        with self._lock:
+            return [dict(e) for e in reversed(self._load())]
+
+    def get(self, entry_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = next((e for e in self._load() if e["id"] == entry_id), None)
+            return dict(entry) if entry else None
+
+    def read(self, entry_id: str) -> str:
+        """Content of a backup; KeyError when unknown."""
+        entry = self.get(entry_id)
+        if entry is None:
+            raise KeyError(entry_id)
+        return gzip.decompress(self._blob_path(entry["hash"]).read_bytes()).decode("utf-8")
+
+    def delete(self, entry_id: str) -> bool:
+        with self._lock:
+            entries = self._load()
+            entry = next((e for e in entries if e["id"] == entry_id), None)
+            if entry is None:
+                return False
+            entries.remove(entry)
+            self._collect(entry["hash"])
+            self._save()
+            return True
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = self._load()
+            return {
+                "entries": len(entries),
+                "blobs": len({e["hash"] for e in entries}),
+                "stored_bytes": self._stored_bytes(),
+                "original_bytes": sum(e["size"] for e in entries),
+                "max_bytes": self.max_bytes,
+            }
+
+
+def _items(document: Any) -> dict[str, Any]:
+    """Automations (list) keyed by id/alias, scripts (mapping) by key."""
+    if isinstance(document, dict):
+        return {str(k): v for k, v in document.items()}
+    items: dict[str, Any] = {}
+    for index, item in enumerate(document if isinstance(document, list) else []):
+        key = f"#{index}"
+        if isinstance(item, dict) and (item.get("id") or item.get("alias")):
+            key = str(item.get("id") or item.get("alias"))
+        items[key] = item
+    return items
+
+
+def _label(item: Any, key: str) -> str:
+    if isinstance(item, dict) and item.get("alias"):
+        return str(item["alias"])
+    return key
+
+
+def _dump_lines(item: Any) -> list[str]:
+    if item is None:
+        return []
+    return yaml.dump(
+        item, default_flow_style=False, allow_unicode=True, sort_keys=False
+    ).splitlines(keepends=True)
+
+
+def item_diffs(old_text: str, new_text: str) -> list[dict[str, Any]]:
+    """Per-item unified diffs going from ``old_text`` to ``new_text``.
+
+    Returns ``[{"key", "alias", "status": added|removed|changed, "diff"}]``
+    for the automations / scripts that differ.
+    """
+    old = _items(yaml.safe_load(old_text) if old_text else None)
+    new = _items(yaml.safe_load(new_text) if new_text else None)
+    changes = []
+    for key in [*old, *(k for k in new if k not in old)]:
+        before, after = old.get(key), new.get(key)
+        if before == after:
+            continue
+        status = "added" if key not in old else "removed" if key not in new else "changed"
+        changes.append({
+            "key": key,
+            "alias": _label(after if after is not None else before, key),
+            "status": status,
+            "diff": "".join(difflib.unified_diff(
+                _dump_lines(before), _dump_lines(after),
+                fromfile=f"current/{key}", tofile=f"backup/{key}",
+            )),
+        })
+    return changes
+
+
+def get_backup_store(hass: HomeAssistant) -> BackupStore:
+    """Return the shared backup store (created on first use)."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    store = domain_data.get(BACKUP_STORE_KEY)
+    if store is None:
+        store = domain_data[BACKUP_STORE_KEY] = BackupStore(
+            Path(hass.config.config_dir) / BACKUP_DIR
+        )
+    return store
+
+
+async def async_backup(
+    hass: HomeAssistant,
+    paths: Iterable[Path],
+    reason: str,
+    issue_ids: Iterable[str] = (),
+) -> list[dict[str, Any]]:
+    """Back up each existing file of ``paths``; return their manifest entries."""
+    store = get_backup_store(hass)
+    issue_ids = list(issue_ids)
+
+    def _snapshot_all() -> list[dict[str, Any]]:
+        return [
+            store.snapshot(path, reason, issue_ids)
+            for path in paths if Path(path).exists()
+        ]
+
+    return await hass.async_add_executor_job(_snapshot_all)
@@ -0,0 +1,251 @@
+"""Batched battery trend analytics (Module 18).
+
+Fits the discharge trend of many batteries in one pass.  For each series of
+(epoch seconds, level) samples:
+
+* **replacement jumps** — a sample ``REPLACEMENT_JUMP`` points or more above
+  each of the ``JUMP_LOOKBACK`` samples before it means the battery was
+  replaced or recharged (a single bogus low reading followed by the normal
+  level is not a jump); only the samples after the last jump are fitted;
+* **robust slope** — Theil–Sen estimator (median of the pairwise slopes),
+  insensitive to the odd bogus reading that drags a least-squares line,
+  with Sen's rank-based 95 % confidence interval; long series are thinned
+  to ``THEIL_SEN_MAX_POINTS`` evenly spaced samples for the pairwise step;
+* **level** — median of ``y − slope·x``, i.e. the robust line evaluated at
+  the reference time ``at``;
+* least-squares slope and R² of the same segment, kept as a goodness of
+  fit indicator.
+
+When NumPy is importable (it ships with Home Assistant) every series is
+padded into one matrix and all fits are computed with array operations,
+pairwise slopes in row blocks of bounded size.  Otherwise the pure-Python
+implementation below gives the same results series by series.  NumPy is
+imported on first use, never when the integration loads.  Both paths are
+CPU-bound and must run in the executor.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+import math
+from typing import Any, NamedTuple
+
+SECONDS_PER_DAY = 86400.0
+REPLACEMENT_JUMP = 20.0         # level rise (points) treated as a new battery
+JUMP_LOOKBACK = 3               # … over the max of that many previous samples
+THEIL_SEN_MAX_POINTS = 200      # samples used for the pairwise slopes
+CI_Z = 1.959964                 # two-sided 95 % normal quantile
+_PAIR_BLOCK = 2_000_000         # pairwise slopes held in memory at once
+
+_numpy: Any = None              # module once imported, False if unavailable
+
+
+class TrendFit(NamedTuple):
+    """Trend of one battery series (slopes in points per day)."""
+
+    slope: float                # Theil–Sen slope
+    level: float                # robust fitted level at the reference time
+    slope_low: float            # 95 % confidence interval of ``slope``
+    slope_high: float
+    ols_slope: float
+    r2: float                   # R² of the least-squares line
+    n: int                      # samples after the last replacement jump
+    jump_at: float | None       # time of the first sample after that jump
+
+
+Series = tuple[Sequence[float], Sequence[float]]      # (times, levels)
+
+
+def numpy_available() -> bool:
+    """Import NumPy on first call; return whether the batched path is usable."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy is not False
+
+
+def fit_trends(
+    series: Sequence[Series], at: float, *, use_numpy: bool | None = None
+) -> list[TrendFit]:
+    """Fit every (times, levels) series; x is measured in days from ``at``.
+
+    Times must be non-decreasing within a series.  ``use_numpy`` forces a
+    path (``None``: NumPy when available).
+    """
+    if not series:
+        return []
+    if use_numpy is None:
+        use_numpy = numpy_available()
+    elif use_numpy and not numpy_available():
+        raise RuntimeError("NumPy is not available")
+    if use_numpy:
+        return _fit_numpy(series, at)
+    return [_fit_python(times, levels, at) for times, levels in series]
+
+
+def _ci_ranks(pairs: int, points: int) -> tuple[int, int]:
+    """Sen's confidence interval as 0-based ranks among the sorted slopes."""
+    c = CI_Z * math.sqrt(points * (points - 1) * (2 * points + 5) / 18.0)
+    low = max(0, math.floor((pairs - c) / 2))
+    high = min(pairs - 1, math.ceil((pairs + c) / 2))
+    return low, high
+
+
+# ── Pure-Python path ──────────────────────────────────────────────────────────
+
+def _median_sorted(values: list[float]) -> float:
+    n = len(values)
+    return (values[(n - 1) // 2] + values[n // 2]) / 2
+
+
+def is_replacement(previous: Sequence[float], level: float) -> bool:
+    """Whether ``level`` follows ``previous`` (the last samples) as a new battery."""
+    recent = previous[-JUMP_LOOKBACK:]
+    return bool(recent) and level - max(recent) >= REPLACEMENT_JUMP
+
+
+def _fit_python(times: Sequence[float], levels: Sequence[float], at: float) -> TrendFit:
+    start = 0
+    for i in range(1, len(levels)):
+        if is_replacement(levels[max(0, i - JUMP_LOOKBACK):i], levels[i]):
+            start = i
+    jump_at = float(times[start]) if start else None
+    xs = [(t - at) / SECONDS_PER_DAY for t in times[start:]]
+    ys = [float(y) for y in levels[start:]]
+    n = len(ys)
+    if n == 0:
+        return TrendFit(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, jump_at)
+    if n == 1:
+        return TrendFit(0.0, ys[0], 0.0, 0.0, 0.0, 0.0, 1, jump_at)
+
+    # Least squares on centred values
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    ss_xx = ss_xy = ss_yy = 0.0
+    for x, y in zip(xs, ys):
+        dx, dy = x - mean_x, y - mean_y
+        ss_xx += dx * dx
+        ss_xy += dx * dy
+        ss_yy += dy * dy
+    ols_slope = ss_xy / ss_xx if ss_xx > 0 else 0.0
+    r2 = (ss_xy * ss_xy) / (ss_xx * ss_yy) if ss_xx > 0 and ss_yy > 0 else 0.0
+
+    # Theil–Sen on (at most) THEIL_SEN_MAX_POINTS samples
+    m = min(n, THEIL_SEN_MAX_POINTS)
+    idx = [(k * n) // m for k in range(m)]
+    slopes = sorted(
+        (ys[j] - ys[i]) / (xs[j] - xs[i])
+        for a, i in enumerate(idx)
+        for j in idx[a + 1:]
+        if xs[j] != xs[i]
+    )
+    if slopes:
+        slope = _median_sorted(slopes)
+        low, high = _ci_ranks(len(slopes), m)
+        slope_low, slope_high = slopes[low], slopes[high]
+    else:
+        slope = slope_low = slope_high = 0.0
+    level = _median_sorted(sorted(y - slope * x for x, y in zip(xs, ys)))
+    return TrendFit(
+        slope, level, slope_low, slope_high, ols_slope, max(0.0, min(1.0, r2)), n, jump_at
+    )
+
+
+# ── NumPy path ────────────────────────────────────────────────────────────────
+
+def _fit_numpy(series: Sequence[Series], at: float) -> list[TrendFit]:
+    np = _numpy
+    rows = len(series)
+    width = max(len(levels) for _, levels in series)
+    t = np.zeros((rows, width))
+    y = np.full((rows, width), np.nan)
+    for r, (times, levels) in enumerate(series):
+        t[r, :len(times)] = times
+        y[r, :len(levels)] = levels
+    x = (t - at) / SECONDS_PER_DAY
+    cols = np.arange(width)
+
+    # Replacement jumps: keep the samples after the last one (rows are left-packed)
+    recent = np.full((rows, width), np.nan)
+    for lag in range(1, min(JUMP_LOOKBACK, width - 1) + 1):
+        recent[:, lag:] = np.fmax(recent[:, lag:], y[:, :-lag])
+    with np.errstate(invalid="ignore"):
+        jumps = y - recent >= REPLACEMENT_JUMP
+    has_jump = jumps.any(axis=1)
+    start = np.where(has_jump, (width - 1) - np.argmax(jumps[:, ::-1], axis=1), 0)
+    mask = ~np.isnan(y) & (cols >= start[:, None])
+    n = mask.sum(axis=1)
+    safe_n = np.maximum(n, 1)
+
+    # Least squares on centred values
+    xm = np.where(mask, x, 0.0)
+    ym = np.where(mask, y, 0.0)
+    dx = np.where(mask, x - (xm.sum(axis=1) / safe_n)[:, None], 0.0)
+    dy = np.where(mask, y - (ym.sum(axis=1) / safe_n)[:, None], 0.0)
+    ss_xx = (dx * dx).sum(axis=1)
+    ss_xy = (dx * dy).sum(axis=1)
+    ss_yy = (dy * dy).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ols_slope = np.where(ss_xx > 0, ss_xy / ss_xx, 0.0)
+        r2 = np.where((ss_xx > 0) & (ss_yy > 0), ss_xy * ss_xy / (ss_xx * ss_yy), 0.0)
+    r2 = np.clip(r2, 0.0, 1.0)
+
+    # Theil–Sen: gather the thinned samples, then pairwise slopes by row blocks
+    points = min(width, THEIL_SEN_MAX_POINTS)
+    m = np.minimum(n, points)
+    k = np.arange(points)
+    pos = start[:, None] + (k[None, :] * n[:, None]) // np.maximum(m, 1)[:, None]
+    pos = np.minimum(pos, width - 1)
+    used = k[None, :] < m[:, None]
+    xs = np.where(used, np.take_along_axis(x, pos, axis=1), np.nan)
+    ys = np.where(used, np.take_along_axis(y, pos, axis=1), np.nan)
+    first, second = np.triu_indices(points, 1)
+
+    slope = np.zeros(rows)
+    slope_low = np.zeros(rows)
+    slope_high = np.zeros(rows)
+    block = max(1, _PAIR_BLOCK // max(1, len(first)))
+    for lo in range(0, rows if len(first) else 0, block):
+        hi = min(rows, lo + block)
+        pdx = xs[lo:hi, second] - xs[lo:hi, first]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pairs = (ys[lo:hi, second] - ys[lo:hi, first]) / pdx
+        pairs[pdx == 0] = np.nan             # equal times
+        pairs.sort(axis=1)                   # NaN (padding) last
+        count = (~np.isnan(pairs)).sum(axis=1)
+        last = np.maximum(count - 1, 0)
+        slope[lo:hi] = (
+            np.take_along_axis(pairs, (last // 2)[:, None], axis=1)[:, 0]
+            + np.take_along_axis(pairs, ((last + 1) // 2)[:, None], axis=1)[:, 0]
+        ) / 2
+        mb = m[lo:hi]
+        c = CI_Z * np.sqrt(mb * (mb - 1) * (2 * mb + 5) / 18.0)
+        low = np.clip(np.floor((count - c) / 2), 0, last).astype(int)
+        high = np.clip(np.ceil((count + c) / 2), 0, last).astype(int)
+        slope_low[lo:hi] = np.take_along_axis(pairs, low[:, None], axis=1)[:, 0]
+        slope_high[lo:hi] = np.take_along_axis(pairs, high[:, None], axis=1)[:, 0]
+        empty = count == 0
+        slope[lo:hi][empty] = slope_low[lo:hi][empty] = slope_high[lo:hi][empty] = 0.0
+
+    # Robust level: median residual of every sample of the segment
+    resid = np.where(mask, y - slope[:, None] * x, np.nan)
+    resid.sort(axis=1)
+    safe = np.maximum(n - 1, 0)
+    level = (
+        np.take_along_axis(resid, (safe // 2)[:, None], axis=1)[:, 0]
+        + np.take_along_axis(resid, ((safe + 1) // 2)[:, None], axis=1)[:, 0]
+    ) / 2
+    level = np.where(n > 0, level, 0.0)
+
+    jump_at = np.take_along_axis(t, start[:, None], axis=1)[:, 0]
+    return [
+        TrendFit(
+            float(slope[r]), float(level[r]), float(slope_low[r]), float(slope_high[r]),
+            float(ols_slope[r]), float(r2[r]), int(n[r]),
+            float(jump_at[r]) if has_jump[r] else None,
+        )
+        for r in range(rows)
+    ]
@@ -8,6 +8,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers import device_registry as dr
 
+from .registry_snapshot import RegistrySnapshot
 from .translation_utils import TranslationHelper
 
 _LOGGER = logging.getLogger(__name__)
@@ -42,6 +43,7 @@ class BatteryMonitor:
         critical: int | None = None,
         low: int | None = None,
         warning: int | None = None,
+        snapshot: RegistrySnapshot | None = None,
     ) -> list[dict[str, Any]]:
         """Return sorted battery list and fire persistent notifications for low batteries.
 
@@ -59,8 +61,11 @@ class BatteryMonitor:
         await self._translator.async_load_language(language)
 
         # Load haca_ignore label (entity + device level)
-        from .translation_utils import async_get_haca_ignored_entity_ids
-        _ignored = await async_get_haca_ignored_entity_ids(self.hass)
+        if snapshot is not None:
+            _ignored = snapshot.ignored_entity_ids
+        else:
+            from .translation_utils import async_get_haca_ignored_entity_ids
+            _ignored = await async_get_haca_ignored_entity_ids(self.hass)
 
         for state in self.hass.states.async_all():
             entity_id = state.entity_id
@@ -1,50 +1,74 @@
 """H.A.C.A — Battery Failure Predictor (Module 18).
 
-Reads per-entity battery levels stored by HistoryManager across scans,
-performs a linear regression on the last 30 days and predicts:
-  • slope (% per day)
-  • predicted date when level hits critical threshold
+Keeps per-entity battery levels across scans, fits the discharge trend of
+the last 30 days (since the last battery replacement) and predicts:
+  • slope (% per day) with its 95 % confidence interval
+  • predicted date when level hits critical threshold (and its range)
   • J-7 alert flag (discharge within 7 days)
   • trend confidence (R²)
 
-Battery snapshots are stored separately in .haca_battery_history/ as daily
-JSON files (one per scan date, keyed by entity_id).
+Samples live in compact per-entity series files in .haca_battery_history/
+(see battery_series.py).  Each scan updates the least-squares slope and R²
+of a changed battery in O(1) from the running sums of its ``RunningFit``.
+The robust Theil–Sen slope and its confidence interval (battery_analytics.py)
+are refined in one batch, only for the batteries whose last refinement is
+older than ``ROBUST_REFIT_SECONDS``, whose window restarted after a
+replacement, or whose least-squares slope moved by more than half that
+interval (at least ``MIN_SLOPE_DRIFT``) since.
 """
 from __future__ import annotations
 
-import json
+from datetime import date, datetime, timezone, timedelta
 import logging
-import math
-import os
-from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Any
+import time
+from typing import Any, NamedTuple
 
 from homeassistant.core import HomeAssistant
 
+from .battery_analytics import TrendFit, fit_trends
+from .battery_series import SECONDS_PER_DAY, BatterySeriesStore, RunningFit
+
 _LOGGER = logging.getLogger(__name__)
 
 BATTERY_HISTORY_DIR = ".haca_battery_history"
 PREDICTION_WINDOW_DAYS = 30
 ALERT_HORIZON_DAYS = 7
 MIN_DATAPOINTS = 3          # minimum points for reliable regression
+MIN_SPAN_DAYS = 1.0         # … spread over at least one day
 CRITICAL_THRESHOLD = 10     # % below which we consider recharge needed
+ROBUST_REFIT_SECONDS = 6 * 3600   # Theil–Sen refined at least every 6 h
+MIN_SLOPE_DRIFT = 0.05            # % per day, for near-perfect lines (narrow CI)
+
+
+class _CachedTrend(NamedTuple):
+    version: int                # RunningFit version the trend reflects
+    at: float                   # reference time of the Theil–Sen fit
+    replaced_at: float | None   # window start it was fitted on
+    ols_slope: float            # least-squares slope at that fit
+    trend: TrendFit
 
 
 class BatteryPredictor:
-    """Predict battery depletion dates using linear regression on scan history."""
+    """Predict battery depletion dates from robust discharge trends of the level history."""
 
     def __init__(self, hass: HomeAssistant, critical_threshold: int = CRITICAL_THRESHOLD) -> None:
         self.hass = hass
+        # Created by the store on first load, not here: constructing the
+        # predictor must not write to the config dir (headless audits)
         self._dir = Path(hass.config.config_dir) / BATTERY_HISTORY_DIR
-        self._dir.mkdir(exist_ok=True)
         self._critical = critical_threshold
+        self._store = BatterySeriesStore(self._dir, PREDICTION_WINDOW_DAYS)
+        # entity_id → ((fit version, day), sparkline points)
+        self._points_cache: dict[str, tuple[tuple[int, date], list[dict[str, Any]]]] = {}
+        # entity_id → latest trend
+        self._trend_cache: dict[str, _CachedTrend] = {}
         self.predictions: list[dict[str, Any]] = []
 
     # ── Public API ────────────────────────────────────────────────────────
 
     async def async_save_battery_snapshot(self, battery_list: list[dict[str, Any]]) -> None:
-        """Persist today's battery levels (called after each scan)."""
+        """Record the current battery levels (called after each scan)."""
         if not battery_list:
             return
         snapshot: dict[str, float] = {
@@ -52,75 +76,20 @@ class BatteryPredictor:
             for b in battery_list
             if b.get("level") is not None
         }
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        await self.hass.async_add_executor_job(self._write_snapshot, today, snapshot)
+        await self.hass.async_add_executor_job(self._store.record, snapshot)
 
     async def async_compute_predictions(
         self,
         battery_list: list[dict[str, Any]],
     ) -> list[dict[str, Any]]:
-        """Run regression on stored history and return prediction list."""
-        history = await self.hass.async_add_executor_job(self._load_history)
-        self.predictions = []
-
-        # Build {entity_id: [(day_offset, level), ...]} from history
-        now_date = datetime.now(timezone.utc).date()
-        series: dict[str, list[tuple[float, float]]] = {}
-
-        for day_str, levels in sorted(history.items()):
-            try:
-                d = datetime.strptime(day_str, "%Y-%m-%d").date()
-            except ValueError:
-                continue
-            offset = (d - now_date).days   # negative = past
-            if offset < -PREDICTION_WINDOW_DAYS:
-                continue
-            for eid, lvl in levels.items():
-                series.setdefault(eid, []).append((float(offset), float(lvl)))
-
+        """Read the running fits and return the prediction list."""
         # Build friendly name map from current battery_list
         fname_map = {b["entity_id"]: b.get("friendly_name", b["entity_id"]) for b in battery_list}
         sev_map   = {b["entity_id"]: b.get("severity") for b in battery_list}
 
-        for eid, points in series.items():
-            if len(points) < MIN_DATAPOINTS:
-                continue
-
-            slope, intercept, r2 = _linear_regression(points)
-
-            # Current estimated level (at day offset 0)
-            current_level = intercept   # = value at offset 0
-
-            # If slope >= 0, battery is not discharging — skip
-            if slope >= 0:
-                days_to_critical = None
-                predicted_date = None
-                alert_7d = False
-            else:
-                # days until level hits critical threshold
-                if current_level <= self._critical:
-                    days_to_critical = 0
-                else:
-                    days_to_critical = (current_level - self._critical) / abs(slope)
-                predicted_date = (now_date + timedelta(days=days_to_critical)).isoformat()
-                alert_7d = days_to_critical <= ALERT_HORIZON_DAYS
-
-            self.predictions.append({
-                "entity_id":      eid,
-                "friendly_name":  fname_map.get(eid, eid),
-                "current_level":  round(current_level, 1),
-                "severity":       sev_map.get(eid),
-                "slope_per_day":  round(slope, 3),   # negative = draining
-                "r2":             round(r2, 3),
-                "days_to_critical": round(days_to_critical, 1) if days_to_critical is not None else None,
-                "predicted_date": predicted_date,
-                "alert_7d":       alert_7d,
-                # Sparkline data: sorted points for the graph
-                "history_points": [
-                    {"day": int(p[0]), "level": round(p[1], 1)}
-                    for p in sorted(points, key=lambda x: x[0])
-                ],
-            })
+        self.predictions = await self.hass.async_add_executor_job(
+            self._compute, fname_map, sev_map, time.time()
+        )
 
         # Sort: alerts first, then by days_to_critical ascending
         self.predictions.sort(key=lambda p: (
@@ -137,75 +106,138 @@ class BatteryPredictor:
 
     async def async_export_csv(self) -> str:
         """Return CSV string of full battery discharge history."""
-        history = await self.hass.async_add_executor_job(self._load_history)
-        if not history:
-            return "date,entity_id,level\n"
-
-        rows: list[str] = ["date,entity_id,level"]
-        for day_str, levels in sorted(history.items()):
-            for eid, lvl in sorted(levels.items()):
-                rows.append(f"{day_str},{eid},{lvl}")
-        return "\n".join(rows)
-
-    # ── File I/O (executor) ───────────────────────────────────────────────
-
-    def _write_snapshot(self, day: str, snapshot: dict[str, float]) -> None:
-        path = self._dir / f"{day}.json"
-        try:
-            # Merge with any existing data for that day (multiple scans same day)
-            existing: dict = {}
-            if path.exists():
-                existing = json.loads(path.read_text(encoding="utf-8"))
-            existing.update(snapshot)
-            path.write_text(json.dumps(existing, ensure_ascii=False), encoding="utf-8")
-        except OSError as exc:
-            _LOGGER.warning("BatteryPredictor: write failed for %s: %s", day, exc)
-
-        # Prune files older than PREDICTION_WINDOW_DAYS + 5 buffer
-        cutoff = (datetime.now(timezone.utc).date() - timedelta(days=PREDICTION_WINDOW_DAYS + 5)).strftime("%Y-%m-%d")
-        for p in sorted(self._dir.glob("*.json")):
-            if p.stem < cutoff:
-                p.unlink(missing_ok=True)
-
-    def _load_history(self) -> dict[str, dict[str, float]]:
-        """Return {date_str: {entity_id: level}} for last PREDICTION_WINDOW_DAYS days."""
-        result: dict[str, dict[str, float]] = {}
-        for path in sorted(self._dir.glob("*.json")):
-            try:
-                data = json.loads(path.read_text(encoding="utf-8"))
-                result[path.stem] = data
-            except Exception:
-                pass
-        return result
-
-
-# ── Math helpers ──────────────────────────────────────────────────────────────
-
-def _linear_regression(points: list[tuple[float, float]]) -> tuple[float, float, float]:
-    """Return (slope, intercept, R²) for a list of (x, y) points."""
-    n = len(points)
-    if n < 2:
-        return 0.0, points[0][1] if points else 0.0, 0.0
-
-    xs = [p[0] for p in points]
-    ys = [p[1] for p in points]
-
-    mean_x = sum(xs) / n
-    mean_y = sum(ys) / n
-
-    ss_xy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
-    ss_xx = sum((x - mean_x) ** 2 for x in xs)
-
-    if ss_xx == 0:
-        return 0.0, mean_y, 0.0
-
-    slope     = ss_xy / ss_xx
-    intercept = mean_y - slope * mean_x
-
-    # R² (coefficient of determination)
-    y_pred    = [slope * x + intercept for x in xs]
-    ss_res    = sum((y - yp) ** 2 for y, yp in zip(ys, y_pred))
-    ss_tot    = sum((y - mean_y) ** 2 for y in ys)
-    r2        = 1.0 - (ss_res / ss_tot) if ss_tot > 0 else 0.0
-
-    return slope, intercept, max(0.0, min(1.0, r2))
+        return await self.hass.async_add_executor_job(
+            lambda: "".join(self._store.iter_csv())
+        )
+
+    # ── Computation (executor) ────────────────────────────────────────────
+
+    def _compute(
+        self, fname_map: dict[str, str], sev_map: dict[str, Any], now: float
+    ) -> list[dict[str, Any]]:
+        now_date = datetime.fromtimestamp(now, timezone.utc).date()
+        predictions: list[dict[str, Any]] = []
+
+        with self._store.lock:
+            self._store.refresh(now)
+            fits = {
+                eid: fit for eid, fit in self._store.fits.items()
+                if fit.n >= MIN_DATAPOINTS and fit.span_days >= MIN_SPAN_DAYS
+            }
+            self._update_trends(fits, now)
+
+            for eid, fit in fits.items():
+                _, at, _, _, trend = self._trend_cache[eid]
+                slope = trend.slope
+                current_level = trend.level + slope * (now - at) / SECONDS_PER_DAY
+
+                # If slope >= 0, battery is not discharging — skip
+                if slope >= 0:
+                    days_to_critical = None
+                    predicted_date = None
+                    date_range = None
+                    alert_7d = False
+                else:
+                    # days until level hits critical threshold
+                    days_to_critical = self._days_to_critical(current_level, slope)
+                    predicted_date = (now_date + timedelta(days=days_to_critical)).isoformat()
+                    alert_7d = days_to_critical <= ALERT_HORIZON_DAYS
+                    # Fastest plausible discharge → earliest date; a flat upper
+                    # bound leaves the latest date open
+                    latest = (
+                        self._days_to_critical(current_level, trend.slope_high)
+                        if trend.slope_high < 0 else None
+                    )
+                    earliest = self._days_to_critical(current_level, min(trend.slope_low, slope))
+                    date_range = [
+                        (now_date + timedelta(days=earliest)).isoformat(),
+                        (now_date + timedelta(days=latest)).isoformat() if latest is not None else None,
+                    ]
+
+                predictions.append({
+                    "entity_id":      eid,
+                    "friendly_name":  fname_map.get(eid, eid),
+                    "current_level":  round(current_level, 1),
+                    "severity":       sev_map.get(eid),
+                    "slope_per_day":  round(slope, 3),   # negative = draining
+                    "slope_ci95":     [round(trend.slope_low, 3), round(trend.slope_high, 3)],
+                    "r2":             round(trend.r2, 3),
+                    "days_to_critical": round(days_to_critical, 1) if days_to_critical is not None else None,
+                    "predicted_date": predicted_date,
+                    "predicted_date_range": date_range,
+                    "alert_7d":       alert_7d,
+                    "replaced_at": (
+                        datetime.fromtimestamp(fit.replaced_at, timezone.utc).isoformat()
+                        if fit.replaced_at is not None else None
+                    ),
+                    # Sparkline data: one point per day (last level of the day)
+                    "history_points": self._history_points(eid, fit, now_date),
+                })
+
+            # Forget batteries that left the store
+            for cache in (self._points_cache, self._trend_cache):
+                for eid in cache.keys() - self._store.fits.keys():
+                    del cache[eid]
+
+        return predictions
+
+    def _update_trends(self, fits: dict[str, RunningFit], now: float) -> None:
+        """Update the trends of the batteries whose samples changed.
+
+        The least-squares part comes from the running sums; the Theil–Sen
+        part is refitted in one batch only where it is due.
+        """
+        refit: list[str] = []
+        for eid, fit in fits.items():
+            cached = self._trend_cache.get(eid)
+            if cached is not None and cached.version == fit.version:
+                continue
+            ols_slope, _, r2 = fit.fit(now)
+            if cached is None or self._needs_refit(cached, fit, ols_slope, now):
+                refit.append(eid)
+                continue
+            self._trend_cache[eid] = cached._replace(
+                version=fit.version,
+                trend=cached.trend._replace(ols_slope=ols_slope, r2=r2, n=fit.n),
+            )
+        if not refit:
+            return
+        series = [
+            ([t for t, _ in fits[eid].samples], [y for _, y in fits[eid].samples])
+            for eid in refit
+        ]
+        for eid, trend in zip(refit, fit_trends(series, now)):
+            fit = fits[eid]
+            self._trend_cache[eid] = _CachedTrend(
+                fit.version, now, fit.replaced_at, trend.ols_slope, trend
+            )
+
+    @staticmethod
+    def _needs_refit(
+        cached: _CachedTrend, fit: RunningFit, ols_slope: float, now: float
+    ) -> bool:
+        """Theil–Sen is due after a replacement, when stale, or when the trend moved."""
+        if fit.replaced_at != cached.replaced_at or now - cached.at >= ROBUST_REFIT_SECONDS:
+            return True
+        half_width = (cached.trend.slope_high - cached.trend.slope_low) / 2
+        return abs(ols_slope - cached.ols_slope) > max(half_width, MIN_SLOPE_DRIFT)
+
+    def _days_to_critical(self, level: float, slope: float) -> float:
+        if level <= self._critical:
+            return 0
+        return (level - self._critical) / abs(slope)
+
+    def _history_points(
+        self, entity_id: str, fit: RunningFit, today: date
+    ) -> list[dict[str, Any]]:
+        key = (fit.version, today)
+        cached = self._points_cache.get(entity_id)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        daily: dict[int, float] = {}
+        for t, level in fit.samples:
+            offset = (datetime.fromtimestamp(t, timezone.utc).date() - today).days
+            daily[offset] = level
+        points = [{"day": day, "level": round(level, 1)} for day, level in daily.items()]
+        self._points_cache[entity_id] = (key, points)
+        return points
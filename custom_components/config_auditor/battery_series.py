@@ -0,0 +1,342 @@
+"""Compact battery time series with running regression sums (Module 18).
+
+Each battery gets one append-only binary file in ``.haca_battery_history/``
+(``<entity_id>.bin``: a 4-byte magic followed by 8-byte little-endian
+records — uint32 epoch seconds, float32 level).  Compared with the former
+one-JSON-file-per-day layout:
+
+* a scan appends a few bytes per battery instead of re-reading and
+  re-writing the day's file and globbing the directory to prune;
+* samples keep their time of day (a changed level is recorded at most
+  every ``MIN_SAMPLE_INTERVAL``, an unchanged one every
+  ``HEARTBEAT_INTERVAL``), so a battery draining within a day is visible;
+* each entity keeps a ``RunningFit``: Σx, Σy, Σxy, Σx², Σy² over the
+  prediction window, updated when a sample is added or ages out, so the
+  least-squares slope and R² cost O(1) per battery instead of a refit of
+  every point (battery_predictor.py refines them with Theil–Sen when due);
+* a replacement jump (new or recharged battery, see battery_analytics.py)
+  restarts the window, so the fit only covers the current discharge;
+* files are rewritten only when their oldest sample falls out of the
+  retention period (about once a day per battery);
+* CSV export merges the per-entity files in time order and yields rows one
+  by one without building the whole history in memory.
+
+Legacy daily JSON files are migrated on first load.  Every method doing
+file I/O must run in the executor; ``lock`` guards the in-memory fits.
+"""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from datetime import datetime, timezone
+import heapq
+from itertools import islice
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import struct
+import threading
+import time
+
+from .battery_analytics import JUMP_LOOKBACK, is_replacement
+
+_LOGGER = logging.getLogger(__name__)
+
+SERIES_SUFFIX = ".bin"
+SECONDS_PER_DAY = 86400.0
+MIN_SAMPLE_INTERVAL = 15 * 60       # changed level: at most one sample / 15 min
+HEARTBEAT_INTERVAL = 6 * 3600       # unchanged level: one sample / 6 h
+RETENTION_EXTRA_DAYS = 5            # kept on disk beyond the prediction window
+
+_MAGIC = b"HBS1"
+_SAMPLE = struct.Struct("<If")
+_READ_CHUNK = _SAMPLE.size * 1024
+_ENTITY_RE = re.compile(r"^[a-z0-9_]+\.[a-z0-9_]+$")
+_LEGACY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}\.json$")
+
+CSV_HEADER = "date,entity_id,level\n"
+
+
+class RunningFit:
+    """Least-squares line over a sliding time window, updated in O(1).
+
+    x is the sample time in days relative to ``origin`` (the oldest sample
+    when the sums were last rebuilt), which keeps the sums well conditioned.
+    Removing samples by subtraction accumulates rounding error, so the sums
+    are rebuilt exactly once as many samples have been evicted as remain.
+    """
+
+    __slots__ = (
+        "window", "samples", "origin", "n", "sx", "sy", "sxy", "sxx", "syy",
+        "_evicted", "version", "replaced_at",
+    )
+
+    def __init__(self, window_seconds: float) -> None:
+        self.window = window_seconds
+        self.samples: deque[tuple[float, float]] = deque()
+        self.origin = 0.0
+        self.version = 0          # bumped on every change (cache key)
+        self.replaced_at: float | None = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.n = 0
+        self.sx = self.sy = self.sxy = self.sxx = self.syy = 0.0
+        self._evicted = 0
+
+    def _accumulate(self, t: float, y: float, sign: int) -> None:
+        x = (t - self.origin) / SECONDS_PER_DAY
+        self.n += sign
+        self.sx += sign * x
+        self.sy += sign * y
+        self.sxy += sign * x * y
+        self.sxx += sign * x * x
+        self.syy += sign * y * y
+
+    def add(self, t: float, y: float) -> None:
+        """Append a sample (times must be non-decreasing)."""
+        recent = [level for _, level in islice(reversed(self.samples), JUMP_LOOKBACK)]
+        if is_replacement(recent, y):
+            # Battery replaced: the previous discharge says nothing about this one
+            self.samples.clear()
+            self.replaced_at = t
+        if not self.samples:
+            self._reset()
+            self.origin = t
+        self.samples.append((t, y))
+        self._accumulate(t, y, 1)
+        self.version += 1
+
+    def evict_before(self, t_min: float) -> int:
+        """Drop samples older than ``t_min``; return how many were dropped."""
+        removed = 0
+        samples = self.samples
+        while samples and samples[0][0] < t_min:
+            t, y = samples.popleft()
+            self._accumulate(t, y, -1)
+            removed += 1
+        if removed:
+            self.version += 1
+            self._evicted += removed
+            if self._evicted >= len(samples):
+                self._rebuild()
+        return removed
+
+    def _rebuild(self) -> None:
+        self._reset()
+        if self.samples:
+            self.origin = self.samples[0][0]
+        for t, y in self.samples:
+            self._accumulate(t, y, 1)
+
+    @property
+    def span_days(self) -> float:
+        if not self.samples:
+            return 0.0
+        return (self.samples[-1][0] - self.samples[0][0]) / SECONDS_PER_DAY
+
+    def fit(self, at: float) -> tuple[float, float, float]:
+        """Return (slope per day, fitted level at time ``at``, R²)."""
+        n = self.n
+        if n == 0:
+            return 0.0, 0.0, 0.0
+        mean_x = self.sx / n
+        mean_y = self.sy / n
+        ss_xx = self.sxx - self.sx * mean_x
+        if n < 2 or ss_xx <= 1e-12:
+            return 0.0, mean_y, 0.0
+        ss_xy = self.sxy - self.sx * mean_y
+        ss_yy = self.syy - self.sy * mean_y
+        slope = ss_xy / ss_xx
+        level = mean_y + slope * ((at - self.origin) / SECONDS_PER_DAY - mean_x)
+        r2 = (ss_xy * ss_xy) / (ss_xx * ss_yy) if ss_yy > 1e-12 else 0.0
+        return slope, level, max(0.0, min(1.0, r2))
+
+
+def _read_samples(path: Path) -> Iterator[tuple[int, float]]:
+    """Yield (epoch seconds, level) records of a series file."""
+    with open(path, "rb") as fh:
+        if fh.read(len(_MAGIC)) != _MAGIC:
+            _LOGGER.warning("[HACA Battery] Ignoring unknown series file %s", path.name)
+            return
+        while chunk := fh.read(_READ_CHUNK):
+            # A record being appended concurrently may be incomplete
+            usable = len(chunk) - len(chunk) % _SAMPLE.size
+            yield from _SAMPLE.iter_unpack(chunk[:usable])
+
+
+def _write_samples(path: Path, samples: list[tuple[int, float]]) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(_MAGIC)
+        fh.write(b"".join(_SAMPLE.pack(t, y) for t, y in samples))
+    os.replace(tmp_path, path)
+
+
+class BatterySeriesStore:
+    """Per-entity battery series on disk plus their running fits in memory."""
+
+    def __init__(self, directory: Path, window_days: int) -> None:
+        self._dir = directory
+        self._window = window_days * SECONDS_PER_DAY
+        self._retention = (window_days + RETENTION_EXTRA_DAYS) * SECONDS_PER_DAY
+        self.lock = threading.Lock()
+        self.fits: dict[str, RunningFit] = {}
+        self._last: dict[str, tuple[int, float]] = {}     # newest stored sample
+        self._oldest: dict[str, int] = {}                 # oldest sample on disk
+        self._loaded = False
+
+    def _path(self, entity_id: str) -> Path:
+        return self._dir / f"{entity_id}{SERIES_SUFFIX}"
+
+    # ── Loading ───────────────────────────────────────────────────────────
+
+    def load(self, now: float | None = None) -> None:
+        """Load every series (and migrate legacy JSON files) once."""
+        with self.lock:
+            self._ensure_loaded(now)
+
+    def _ensure_loaded(self, now: float | None = None) -> None:
+        if self._loaded:
+            return
+        self._dir.mkdir(exist_ok=True)
+        self._migrate_legacy()
+        cutoff = (time.time() if now is None else now) - self._window
+        for path in self._dir.glob(f"*{SERIES_SUFFIX}"):
+            entity_id = path.stem
+            if not _ENTITY_RE.match(entity_id):
+                continue
+            fit = RunningFit(self._window)
+            try:
+                for t, y in _read_samples(path):
+                    self._oldest.setdefault(entity_id, t)
+                    self._last[entity_id] = (t, y)
+                    if t >= cutoff:
+                        fit.add(t, y)
+            except OSError as err:
+                _LOGGER.warning("[HACA Battery] Cannot read %s: %s", path.name, err)
+                continue
+            self.fits[entity_id] = fit
+        self._loaded = True
+        _LOGGER.debug("[HACA Battery] Loaded %d battery series", len(self.fits))
+
+    def _migrate_legacy(self) -> None:
+        """Fold the former ``YYYY-MM-DD.json`` daily snapshots into series files."""
+        legacy = sorted(p for p in self._dir.glob("*.json") if _LEGACY_RE.match(p.name))
+        if not legacy:
+            return
+        per_entity: dict[str, list[tuple[int, float]]] = {}
+        for path in legacy:
+            try:
+                day = datetime.strptime(path.stem, "%Y-%m-%d").replace(
+                    hour=12, tzinfo=timezone.utc
+                )
+                levels = json.loads(path.read_text(encoding="utf-8"))
+                for entity_id, level in levels.items():
+                    per_entity.setdefault(entity_id, []).append(
+                        (int(day.timestamp()), float(level))
+                    )
+            except (OSError, ValueError, TypeError, AttributeError) as err:
+                _LOGGER.debug("[HACA Battery] Skipping legacy file %s: %s", path.name, err)
+        for entity_id, samples in per_entity.items():
+            if not _ENTITY_RE.match(entity_id):
+                continue
+            path = self._path(entity_id)
+            if path.exists():
+                samples = samples + list(_read_samples(path))
+            _write_samples(path, sorted(samples))
+        for path in legacy:
+            path.unlink(missing_ok=True)
+        _LOGGER.info(
+            "[HACA Battery] Migrated %d daily snapshots of %d batteries to series files",
+            len(legacy), len(per_entity),
+        )
+
+    # ── Recording ─────────────────────────────────────────────────────────
+
+    def record(self, levels: dict[str, float], now: float | None = None) -> int:
+        """Append the levels worth keeping; return the number of samples written."""
+        now = time.time() if now is None else now
+        written = 0
+        with self.lock:
+            self._ensure_loaded(now)
+            for entity_id, level in levels.items():
+                if not _ENTITY_RE.match(entity_id):
+                    continue
+                last = self._last.get(entity_id)
+                if last is not None:
+                    elapsed = now - last[0]
+                    if elapsed < MIN_SAMPLE_INTERVAL:
+                        continue
+                    if elapsed < HEARTBEAT_INTERVAL and abs(float(level) - last[1]) < 0.05:
+                        continue
+                try:
+                    self._append(entity_id, int(now), float(level))
+                    written += 1
+                except OSError as err:
+                    _LOGGER.warning("[HACA Battery] Write failed for %s: %s", entity_id, err)
+            self._expire(now)
+        return written
+
+    def _append(self, entity_id: str, t: int, level: float) -> None:
+        record = _SAMPLE.pack(t, level)
+        path = self._path(entity_id)
+        new_file = entity_id not in self._last and not path.exists()
+        with open(path, "ab") as fh:
+            fh.write(_MAGIC + record if new_file else record)
+        t, level = _SAMPLE.unpack(record)       # keep float32 precision in memory too
+        self._last[entity_id] = (t, level)
+        self._oldest.setdefault(entity_id, t)
+        self.fits.setdefault(entity_id, RunningFit(self._window)).add(t, level)
+
+    def _expire(self, now: float) -> None:
+        """Slide the windows and trim files whose oldest day left the retention."""
+        window_start = now - self._window
+        for fit in self.fits.values():
+            fit.evict_before(window_start)
+        keep_from = now - self._retention
+        for entity_id, oldest in list(self._oldest.items()):
+            if oldest >= keep_from - SECONDS_PER_DAY:
+                continue        # trimmed at most once a day
+            path = self._path(entity_id)
+            try:
+                kept = [(t, y) for t, y in _read_samples(path) if t >= keep_from]
+                if kept:
+                    _write_samples(path, kept)
+                    self._oldest[entity_id] = kept[0][0]
+                    continue
+                path.unlink(missing_ok=True)
+            except OSError as err:
+                _LOGGER.debug("[HACA Battery] Trim failed for %s: %s", entity_id, err)
+                continue
+            # Nothing left within retention: the battery is gone
+            self._oldest.pop(entity_id, None)
+            self._last.pop(entity_id, None)
+            self.fits.pop(entity_id, None)
+
+    def refresh(self, now: float) -> None:
+        """Slide the windows to ``now`` (call with ``lock`` held)."""
+        self._ensure_loaded(now)
+        self._expire(now)
+
+    # ── Export ────────────────────────────────────────────────────────────
+
+    def iter_csv(self) -> Iterator[str]:
+        """Yield CSV lines (header first) of every stored sample, in time order."""
+        yield CSV_HEADER
+        paths = sorted(
+            p for p in self._dir.glob(f"*{SERIES_SUFFIX}") if _ENTITY_RE.match(p.stem)
+        )
+
+        def _rows(path: Path) -> Iterator[tuple[int, str, float]]:
+            try:
+                for t, y in _read_samples(path):
+                    yield t, path.stem, y
+            except OSError as err:
+                _LOGGER.warning("[HACA Battery] Cannot read %s: %s", path.name, err)
+
+        for t, entity_id, level in heapq.merge(*(_rows(p) for p in paths)):
+            stamp = datetime.fromtimestamp(t, timezone.utc).isoformat(timespec="seconds")
+            yield f"{stamp},{entity_id},{level:.7g}\n"
@@ -0,0 +1,230 @@
+"""H.A.C.A — Command-line auditor for configuration directories.
+
+Runs the analyzers that only need configuration files and registries (see
+headless.py) on one or many Home Assistant configuration directories,
+without a running instance — e.g. in a pre-deploy pipeline or over a batch
+of customer config repositories::
+
+    python -m custom_components.config_auditor.cli /srv/configs/* \\
+        --jobs 8 --output-dir reports/ --fail-on high
+
+Each directory is audited in its own worker process and produces the same
+JSON document as the "json" report of the integration.  With one directory
+and no ``--output-dir`` the document is printed to stdout; with several,
+stdout gets ``{config_dir: document}``.  One summary line per directory is
+printed to stderr.
+
+``.storage/core.*_registry`` files are optional: without an entity
+registry, dashboards are not checked (every card entity would look missing)
+and entity-based compliance checks have nothing to inspect.
+
+Exit status: 0 — success, 1 — an issue at or above ``--fail-on`` was found,
+2 — at least one directory could not be audited.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections.abc import Iterator
+import json
+import logging
+import os
+from pathlib import Path
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from .headless import HEADLESS_SCOPES, HeadlessHass
+
+_LOGGER = logging.getLogger(__name__)
+
+SEVERITY_LEVELS = ("low", "medium", "high")
+
+EXIT_OK = 0
+EXIT_ISSUES = 1
+EXIT_ERROR = 2
+
+
+async def async_audit_directory(
+    config_dir: str | Path,
+    *,
+    storage_dir: str | Path | None = None,
+    language: str = "en",
+    options: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Audit one configuration directory and return the JSON report document.
+
+    ``options`` takes the entry options of the integration
+    (``excluded_categories``, ``excluded_issue_types``).
+    """
+    from .report_generator import ReportGenerator
+    from .report_jobs import build_report_inputs
+    from .scan_pipeline import ScanPipeline
+    from .scan_scheduler import ScanScheduler
+
+    hass = HeadlessHass(config_dir, storage_dir=storage_dir, language=language)
+    entry = SimpleNamespace(entry_id="haca_headless", options=dict(options or {}))
+    pipeline = ScanPipeline(hass, entry, ScanScheduler(entry))
+    data = await pipeline.async_scan(hass.scan_scopes)
+
+    summary, automation_issues, entity_issues, extra = build_report_inputs(data)
+    generator = ReportGenerator.for_export(language)
+    return generator.build_json_document(summary, automation_issues, entity_issues, **extra)
+
+
+def audit_directory(
+    config_dir: str,
+    storage_dir: str | None = None,
+    language: str = "en",
+    options: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Worker entry point: audit one directory, never raise.
+
+    Returns ``{"config_dir", "seconds", "report"}`` or ``{"config_dir", "error"}``.
+    """
+    start = time.perf_counter()
+    try:
+        report = asyncio.run(async_audit_directory(
+            config_dir, storage_dir=storage_dir, language=language, options=options,
+        ))
+    except Exception as err:  # one broken directory must not stop the batch
+        _LOGGER.debug("Audit of %s failed", config_dir, exc_info=True)
+        return {"config_dir": config_dir, "error": f"{type(err).__name__}: {err}"}
+    return {
+        "config_dir": config_dir,
+        "seconds": round(time.perf_counter() - start, 3),
+        "report": report,
+    }
+
+
+def _init_worker(log_level: int) -> None:
+    logging.basicConfig(level=log_level, format="%(levelname)s %(name)s: %(message)s")
+
+
+def run_audits(
+    config_dirs: list[str],
+    *,
+    jobs: int = 1,
+    storage_dir: str | None = None,
+    language: str = "en",
+    options: dict[str, Any] | None = None,
+    log_level: int = logging.ERROR,
+) -> Iterator[dict[str, Any]]:
+    """Audit every directory, yielding results as they complete.
+
+    Directories are spread over ``jobs`` worker processes: the analyzers are
+    CPU bound, so processes (not threads) are what scales.  A single job
+    runs in this process.
+    """
+    if jobs <= 1 or len(config_dirs) == 1:
+        for config_dir in config_dirs:
+            yield audit_directory(config_dir, storage_dir, language, options)
+        return
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(config_dirs)),
+        initializer=_init_worker,
+        initargs=(log_level,),
+    ) as executor:
+        futures = [
+            executor.submit(audit_directory, config_dir, storage_dir, language, options)
+            for config_dir in config_dirs
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def count_at_or_above(report: dict[str, Any], severity: str) -> int:
+    """Number of issues of the report at ``severity`` or worse."""
+    by_severity = report.get("statistics", {}).get("by_severity", {})
+    levels = SEVERITY_LEVELS[SEVERITY_LEVELS.index(severity):]
+    return sum(by_severity.get(level, 0) for level in levels)
+
+
+def _report_filename(config_dir: str, taken: set[str]) -> str:
+    """``<dir name>.json``, suffixed when two directories share a name."""
+    base = Path(config_dir).resolve().name or "config"
+    name, index = f"{base}.json", 2
+    while name in taken:
+        name, index = f"{base}_{index}.json", index + 1
+    taken.add(name)
+    return name
+
+
+def _summary_line(result: dict[str, Any]) -> str:
+    if "error" in result:
+        return f"{result['config_dir']}: ERROR {result['error']}"
+    report = result["report"]
+    by_severity = report["statistics"]["by_severity"]
+    counts = ", ".join(f"{by_severity.get(level, 0)} {level}" for level in reversed(SEVERITY_LEVELS))
+    return (
+        f"{result['config_dir']}: health {report['summary'].get('health_score', 0)}%, "
+        f"{report['summary'].get('total_issues', 0)} issues ({counts}) "
+        f"in {result['seconds']:.2f}s"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m custom_components.config_auditor.cli",
+        description="Audit Home Assistant configuration directories without a running instance",
+    )
+    parser.add_argument("config_dirs", nargs="+", help="configuration directories to audit")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output-dir", type=Path,
+                        help="write one <dir name>.json report per directory here")
+    parser.add_argument("--storage", help="registry directory (default: <config_dir>/.storage); "
+                        "only with a single config directory")
+    parser.add_argument("--language", default="en", help="report and message language")
+    parser.add_argument("--exclude", action="append", default=[], choices=sorted(HEADLESS_SCOPES),
+                        help="skip an analyzer category (repeatable)")
+    parser.add_argument("--exclude-type", action="append", default=[], metavar="ISSUE_TYPE",
+                        help="drop an issue type from the results (repeatable)")
+    parser.add_argument("--fail-on", choices=SEVERITY_LEVELS,
+                        help="exit with status 1 when an issue of this severity or worse is found")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log analyzer progress")
+    args = parser.parse_args(argv)
+    if args.storage and len(args.config_dirs) > 1:
+        parser.error("--storage only applies to a single config directory")
+
+    log_level = logging.INFO if args.verbose else logging.ERROR
+    _init_worker(log_level)
+    options = {
+        "excluded_categories": args.exclude,
+        "excluded_issue_types": args.exclude_type,
+    }
+    if args.output_dir:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    results: dict[str, dict[str, Any]] = {}
+    for result in run_audits(
+        args.config_dirs, jobs=args.jobs, storage_dir=args.storage,
+        language=args.language, options=options, log_level=log_level,
+    ):
+        results[result["config_dir"]] = result
+        print(_summary_line(result), file=sys.stderr)
+
+    ordered = [results[config_dir] for config_dir in args.config_dirs]
+    reports = {r["config_dir"]: r["report"] for r in ordered if "report" in r}
+    if args.output_dir:
+        taken: set[str] = set()
+        for config_dir, report in reports.items():
+            path = args.output_dir / _report_filename(config_dir, taken)
+            path.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    elif len(args.config_dirs) == 1:
+        if reports:
+            print(json.dumps(next(iter(reports.values())), indent=2, default=str))
+    else:
+        print(json.dumps(reports, indent=2, default=str))
+
+    if len(reports) < len(ordered):
+        return EXIT_ERROR
+    if args.fail_on and any(count_at_or_above(r, args.fail_on) for r in reports.values()):
+        return EXIT_ISSUES
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,9 +23,9 @@ from typing import Any
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import area_registry as ar, label_registry as lr
 from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers import device_registry as dr
 
 from .const import DOMAIN
+from .registry_snapshot import RegistrySnapshot, async_build_registry_snapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -56,33 +56,30 @@ class ComplianceAnalyzer:
         self._hass = hass
         self._issues: list[dict[str, Any]] = []
         self._ignored_entity_ids: set[str] = set()
+        self._snapshot: RegistrySnapshot = RegistrySnapshot()
 
     # ── Interface publique ──────────────────────────────────────────────────
 
-    async def async_analyze(self) -> list[dict[str, Any]]:
-        """Lance tous les checks de conformité et retourne les issues."""
+    async def async_analyze(
+        self, snapshot: RegistrySnapshot | None = None
+    ) -> list[dict[str, Any]]:
+        """Lance tous les checks de conformité et retourne les issues.
+
+        ``snapshot`` : snapshot des registres partagé par le scan en cours
+        (construit ici si absent, ex. appel hors coordinator).
+        """
         self._issues.clear()
+        self._snapshot = snapshot or async_build_registry_snapshot(self._hass)
 
-        # Charger les entités ignorées via le label haca_ignore (entity + device level)
-        try:
-            from .translation_utils import async_get_haca_ignored_entity_ids
-            self._ignored_entity_ids = await async_get_haca_ignored_entity_ids(self._hass)
-        except Exception as exc:
-            _LOGGER.debug("[HACA Compliance] Could not load ignored entities: %s", exc)
-            self._ignored_entity_ids = set()
+        # Entités ignorées via le label haca_ignore (entity + device level)
+        self._ignored_entity_ids = set(self._snapshot.ignored_entity_ids)
 
         # Index unique_ids des automations ignorées (pour matcher avec le champ YAML 'id')
-        try:
-            entity_reg = er.async_get(self._hass)
-            self._ignored_auto_unique_ids: set[str] = {
-                entry.unique_id
-                for entry in entity_reg.entities.values()
-                if entry.domain == "automation"
-                and entry.entity_id in self._ignored_entity_ids
-                and entry.unique_id
-            }
-        except Exception:
-            self._ignored_auto_unique_ids = set()
+        self._ignored_auto_unique_ids: set[str] = {
+            unique_id
+            for unique_id, entity_id in self._snapshot.automation_entity_ids.items()
+            if entity_id in self._ignored_entity_ids
+        }
 
         await self._check_entity_names()
         await self._check_areas_icons()
@@ -204,14 +201,9 @@ class ComplianceAnalyzer:
         ont le label haca_ignore, l'area est ignorée.
         """
         try:
-            area_reg    = ar.async_get(self._hass)
-            entity_reg  = er.async_get(self._hass)
-
-            # Construire un mapping area_id → entity_ids
-            area_entities: dict[str, set[str]] = {}
-            for entry in entity_reg.entities.values():
-                if entry.area_id:
-                    area_entities.setdefault(entry.area_id, set()).add(entry.entity_id)
+            area_reg = ar.async_get(self._hass)
+            # Mapping area_id → entity_ids (area effective, device incluse)
+            area_entities = self._snapshot.entities_by_area
 
             for area in area_reg.async_list_areas():
                 icon = getattr(area, "icon", None)
@@ -219,7 +211,7 @@ class ComplianceAnalyzer:
                     continue
 
                 # Si TOUTES les entités de l'area ont haca_ignore → skip
-                entities_in_area = area_entities.get(area.id, set())
+                entities_in_area = area_entities.get(area.id, frozenset())
                 if entities_in_area and entities_in_area.issubset(self._ignored_entity_ids):
                     _LOGGER.debug(
                         "[HACA Compliance] Area '%s' ignorée (toutes les entités ont haca_ignore)",
@@ -249,38 +241,10 @@ class ComplianceAnalyzer:
         """Détecte les labels HA créés mais non assignés à des entités, devices ou automations."""
         try:
             label_reg = lr.async_get(self._hass)
-            entity_reg = er.async_get(self._hass)
-            device_reg = dr.async_get(self._hass)
-
-            # Collecter tous les labels utilisés across ALL registries
-            used_label_ids: set[str] = set()
 
-            # 1. Entity labels
-            for entry in entity_reg.entities.values():
-                for label_id in (entry.labels or set()):
-                    used_label_ids.add(label_id)
-
-            # 2. Device labels
-            for device in device_reg.devices.values():
-                for label_id in (getattr(device, "labels", None) or set()):
-                    used_label_ids.add(label_id)
-
-            # 3. Area labels
-            try:
-                area_reg = ar.async_get(self._hass)
-                for area in area_reg.async_list_areas():
-                    for label_id in (getattr(area, "labels", None) or set()):
-                        used_label_ids.add(label_id)
-            except Exception:
-                pass
-
-            # 4. Automation / script labels (stored in HA state attributes)
-            for state in self._hass.states.async_all():
-                if state.entity_id.startswith(("automation.", "script.")):
-                    entry = entity_reg.async_get(state.entity_id)
-                    if entry:
-                        for label_id in (entry.labels or set()):
-                            used_label_ids.add(label_id)
+            # Labels utilisés sur les entités (automations/scripts inclus),
+            # devices et areas — précalculés dans le snapshot
+            used_label_ids = self._snapshot.used_label_ids
 
             for label in label_reg.async_list_labels():
                 # Ne pas flaguer haca_ignore lui-même
@@ -550,12 +514,7 @@ class ComplianceAnalyzer:
                 )
 
             # Check area (directly on entry, or inherited from device)
-            has_area = bool(entry.area_id)
-            if not has_area and entry.device_id:
-                dev_reg = dr.async_get(self._hass)
-                device  = dev_reg.async_get(entry.device_id)
-                has_area = bool(device and device.area_id)
-            if not has_area:
+            if not self._snapshot.area_of(entry.entity_id):
                 self._add_issue(
                     issue_id=f"compliance_helper_no_area_{entry.entity_id}",
                     issue_type="compliance_helper_no_area",
@@ -0,0 +1,322 @@
+"""H.A.C.A — Transactional edits of automations.yaml / scripts.yaml.
+
+Applying fixes one service call at a time re-reads, re-parses, backs up,
+rewrites and reloads the whole file for every single issue: fixing 300
+device_id issues meant 300 full cycles.  A ``ConfigTransaction`` collects
+the edits first and commits them together:
+
+  • edits are grouped by target file, each file is read and parsed once
+    and every edit runs in memory on a copy of its item — an edit that
+    fails or finds nothing to change leaves the document untouched;
+  • one backup is taken of the files that actually change, each of them
+    is written once, atomically (temp file + rename);
+  • each affected domain is reloaded once (scripts before automations,
+    which may call them), through the coalescing reload scheduler;
+  • if a reload fails, every file is restored to its original content
+    and the domains reloaded so far are reloaded again.
+
+``async_commit`` returns one result per edit.  Commits are serialized per
+hass instance so two batches never interleave their read-modify-write.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import copy
+from dataclasses import dataclass
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .reload_scheduler import async_reload
+
+_LOGGER = logging.getLogger(__name__)
+
+TRANSACTION_LOCK_KEY = "config_transaction_lock"
+
+# Reload order: scripts first, automations may call them
+DOMAIN_ORDER = ("script", "automation")
+
+STATUS_APPLIED = "applied"
+STATUS_PLANNED = "planned"          # dry run: would be applied
+STATUS_UNCHANGED = "unchanged"
+STATUS_NOT_FOUND = "not_found"
+STATUS_ERROR = "error"
+STATUS_ROLLED_BACK = "rolled_back"
+
+# edit(config) mutates the item in place and returns its change list ([] → nothing to do)
+EditFunc = Callable[[dict[str, Any]], Awaitable[list[dict[str, Any]]]]
+# locate(document, target) → list index / dict key of the item, None when absent
+Locator = Callable[[Any, str], Any]
+# backup(paths) → backup location, taken once before the first write
+BackupFunc = Callable[[list[Path]], Awaitable[Any]]
+
+
+@dataclass(eq=False)
+class ConfigEdit:
+    """One edit of one automation or script."""
+
+    edit_id: str
+    domain: str
+    target: str
+    apply: EditFunc
+
+
+def _empty_document(domain: str) -> list | dict:
+    return [] if domain == "automation" else {}
+
+
+def _read_texts(paths: list[Path]) -> dict[Path, str | None]:
+    return {
+        path: path.read_text(encoding="utf-8") if path.exists() else None
+        for path in paths
+    }
+
+
+def _parse(text: str | None) -> Any:
+    """Parsed document (None when empty), or the YAMLError raised by the parser."""
+    try:
+        return yaml.safe_load(text) if text else None
+    except yaml.YAMLError as err:
+        return err
+
+
+def _read_documents(paths: list[Path]) -> dict[Path, tuple[str | None, Any]]:
+    """(original text, parsed document or YAMLError) per file — executor."""
+    return {path: (text, _parse(text)) for path, text in _read_texts(paths).items()}
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    tmp = path.with_name(f".{path.name}.haca_tmp")
+    try:
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _write_all(documents: dict[Path, Any], originals: dict[Path, str | None]) -> None:
+    """Dump and write every document; on failure restore the files already written."""
+    written: list[Path] = []
+    try:
+        for path, document in documents.items():
+            _atomic_write(path, _dump(document))
+            written.append(path)
+    except BaseException:
+        _restore(originals, written)
+        raise
+
+
+def _restore(originals: dict[Path, str | None], paths: list[Path]) -> None:
+    for path in paths:
+        original = originals.get(path)
+        try:
+            if original is None:
+                path.unlink(missing_ok=True)
+            else:
+                _atomic_write(path, original)
+        except OSError as err:
+            _LOGGER.error("[HACA Transaction] Cannot restore %s: %s", path, err)
+
+
+def _dump(document: Any) -> str:
+    return yaml.dump(document, default_flow_style=False, allow_unicode=True)
+
+
+def get_transaction_lock(hass: HomeAssistant) -> asyncio.Lock:
+    """Return the lock serializing config transactions (created on first use)."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    lock = domain_data.get(TRANSACTION_LOCK_KEY)
+    if lock is None:
+        lock = domain_data[TRANSACTION_LOCK_KEY] = asyncio.Lock()
+    return lock
+
+
+class ConfigTransaction:
+    """A batch of edits committed with one parse, write and reload per file/domain."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        files: dict[str, Path],
+        locators: dict[str, Locator],
+        backup: BackupFunc | None = None,
+    ) -> None:
+        self.hass = hass
+        self._files = files
+        self._locators = locators
+        self._backup = backup
+        self._edits: list[ConfigEdit] = []
+
+    def add(self, edit: ConfigEdit) -> None:
+        self._edits.append(edit)
+
+    def __len__(self) -> int:
+        return len(self._edits)
+
+    async def async_commit(self, dry_run: bool = False) -> dict[str, Any]:
+        """Apply every edit; return per-edit results and what was written/reloaded."""
+        async with get_transaction_lock(self.hass):
+            return await self._async_commit(dry_run)
+
+    async def _async_commit(self, dry_run: bool) -> dict[str, Any]:
+        results: dict[ConfigEdit, dict[str, Any]] = {}
+        by_domain: dict[str, list[ConfigEdit]] = {}
+        for edit in self._edits:
+            if edit.domain in self._files:
+                by_domain.setdefault(edit.domain, []).append(edit)
+            else:
+                results[edit] = self._result(
+                    edit, STATUS_ERROR, error=f"Unsupported domain '{edit.domain}'"
+                )
+
+        paths = [self._files[domain] for domain in by_domain]
+        loaded = await self.hass.async_add_executor_job(_read_documents, paths)
+        originals = {path: text for path, (text, _doc) in loaded.items()}
+
+        # ── One parse per file, every edit in memory ─────────────────────
+        documents: dict[str, Any] = {}
+        for domain, edits in by_domain.items():
+            document = loaded[self._files[domain]][1]
+            if isinstance(document, yaml.YAMLError):
+                for edit in edits:
+                    results[edit] = self._result(
+                        edit, STATUS_ERROR, error=f"{self._files[domain].name}: {document}"
+                    )
+                continue
+            documents[domain] = document or _empty_document(domain)
+            for edit in edits:
+                results[edit] = await self._apply(edit, documents[domain], dry_run)
+
+        changed = [
+            domain for domain in DOMAIN_ORDER
+            if domain in documents and any(
+                results[e]["status"] in (STATUS_APPLIED, STATUS_PLANNED)
+                for e in by_domain[domain]
+            )
+        ]
+        outcome: dict[str, Any] = {
+            "success": True,
+            "dry_run": dry_run,
+            "files": [self._files[domain].name for domain in changed],
+            "reloaded": [],
+            "backup_path": None,
+            "rolled_back": False,
+        }
+        if dry_run or not changed:
+            return self._finish(outcome, results)
+
+        # ── One backup, one atomic write per file ────────────────────────
+        changed_paths = [self._files[domain] for domain in changed]
+        if self._backup is not None:
+            backup = await self._backup(changed_paths)
+            outcome["backup_path"] = str(backup) if backup else None
+        try:
+            await self.hass.async_add_executor_job(
+                _write_all, {self._files[d]: documents[d] for d in changed}, originals
+            )
+        except (OSError, yaml.YAMLError) as err:
+            _LOGGER.error("[HACA Transaction] Write failed, nothing changed: %s", err)
+            return self._fail(outcome, results, f"Write failed: {err}", STATUS_ERROR)
+
+        # ── One reload per domain, rollback on failure ───────────────────
+        for domain in changed:
+            targets = [e.target for e in by_domain[domain] if results[e]["status"] == STATUS_APPLIED]
+            try:
+                await async_reload(self.hass, domain, targets, [self._files[domain]])
+            except Exception as err:
+                _LOGGER.error(
+                    "[HACA Transaction] %s.reload failed, restoring %s: %s",
+                    domain, ", ".join(outcome["files"]), err,
+                )
+                await self.hass.async_add_executor_job(_restore, originals, changed_paths)
+                for reloaded in [*outcome["reloaded"], domain]:
+                    try:
+                        await async_reload(
+                            self.hass, reloaded, paths=[self._files[reloaded]], rescan=False
+                        )
+                    except Exception:
+                        pass  # best-effort: the files are restored either way
+                outcome["rolled_back"] = True
+                return self._fail(
+                    outcome, results, f"{domain}.reload failed: {err}", STATUS_ROLLED_BACK
+                )
+            outcome["reloaded"].append(domain)
+
+        _LOGGER.info(
+            "[HACA Transaction] %d edit(s) written to %s, reloaded %s",
+            sum(1 for r in results.values() if r["status"] == STATUS_APPLIED),
+            ", ".join(outcome["files"]), ", ".join(outcome["reloaded"]),
+        )
+        return self._finish(outcome, results)
+
+    async def _apply(self, edit: ConfigEdit, document: Any, dry_run: bool) -> dict[str, Any]:
+        try:
+            key = self._locators[edit.domain](document, edit.target)
+        except Exception as err:
+            return self._result(edit, STATUS_ERROR, error=str(err))
+        if key is None:
+            return self._result(edit, STATUS_NOT_FOUND, error=f"{edit.target} not found")
+        item = document[key]
+        if not isinstance(item, dict):
+            return self._result(edit, STATUS_ERROR, error=f"{edit.target} is not a mapping")
+
+        # Edits run on a copy: a failing edit leaves the document untouched
+        candidate = copy.deepcopy(item)
+        try:
+            changes = await edit.apply(candidate)
+        except Exception as err:
+            _LOGGER.warning("[HACA Transaction] Edit %s failed: %s", edit.edit_id, err)
+            return self._result(edit, STATUS_ERROR, error=str(err))
+        if not changes:
+            return self._result(edit, STATUS_UNCHANGED)
+        document[key] = candidate
+        return self._result(
+            edit, STATUS_PLANNED if dry_run else STATUS_APPLIED, changes=changes
+        )
+
+    @staticmethod
+    def _result(
+        edit: ConfigEdit,
+        status: str,
+        *,
+        changes: list[dict[str, Any]] | None = None,
+        error: str | None = None,
+    ) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "id": edit.edit_id,
+            "domain": edit.domain,
+            "target": edit.target,
+            "status": status,
+            "changes": changes or [],
+        }
+        if error:
+            result["error"] = error
+        return result
+
+    def _fail(
+        self, outcome: dict[str, Any], results: dict[ConfigEdit, dict[str, Any]], error: str, status: str
+    ) -> dict[str, Any]:
+        for result in results.values():
+            if result["status"] == STATUS_APPLIED:
+                result["status"] = status
+                result["error"] = error
+        outcome.update(success=False, error=error)
+        return self._finish(outcome, results)
+
+    def _finish(
+        self, outcome: dict[str, Any], results: dict[ConfigEdit, dict[str, Any]]
+    ) -> dict[str, Any]:
+        ordered = [results[edit] for edit in self._edits]
+        outcome["results"] = ordered
+        outcome["applied"] = sum(
+            1 for r in ordered if r["status"] in (STATUS_APPLIED, STATUS_PLANNED)
+        )
+        return outcome
@@ -0,0 +1,479 @@
+"""Filesystem watcher for out-of-band YAML edits (Module 10).
+
+Home Assistant only fires events for changes made through its own UI and
+services.  Edits made in an editor, over Samba or by a ``git pull`` are
+invisible to the event monitor until the next periodic scan.  This module
+closes that gap:
+
+  • ``ParsedConfigCache`` — every YAML file read by HACA's loaders goes
+    through it.  Parsed content is cached by (mtime, size) and the cache
+    remembers which scan scopes each file feeds (automations, dashboards…).
+  • ``ConfigFileWatcher`` — watches exactly the files (and include
+    directories) the loaders resolved.  Uses inotify on Linux, polling
+    elsewhere.  Changes are coalesced over the event debounce window, the
+    cache entries of the changed paths are dropped and a partial rescan of
+    the affected scopes is scheduled via the coordinator's ``async_rescan``.
+
+The watched set is refreshed after every scan (coordinator listener), so
+files that appear in an include directory are picked up automatically.
+Files still exactly as HACA's own writers left them are skipped: their
+reload already rescanned them (see reload_scheduler.py).
+"""
+from __future__ import annotations
+
+import copy as _copy
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import threading
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Iterable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import ALL_SCAN_SCOPES, DOMAIN, DEFAULT_EVENT_DEBOUNCE_SECONDS
+from .include_resolver import parse_yaml
+from .reload_scheduler import RELOAD_SCHEDULER_KEY
+
+_LOGGER = logging.getLogger(__name__)
+
+PARSED_CONFIG_CACHE_KEY = "parsed_config_cache"
+CONFIG_WATCHER_KEY = "config_watcher"
+
+# Polling fallback interval (stat() of every watched path)
+POLL_INTERVAL = timedelta(seconds=30)
+
+YAML_SUFFIXES = (".yaml", ".yml")
+
+# ── inotify constants (linux/inotify.h) ───────────────────────────────────
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ONLYDIR = 0x01000000
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Parsed-config cache
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+class ParsedConfigCache:
+    """Thread-safe cache of parsed YAML files, keyed by path and (mtime, size).
+
+    ``load`` is called from executor jobs; every returned value is a deep
+    copy so analyzers can never mutate the cached parse tree.  Files are
+    parsed with ``HacaYamlLoader``: HA tags never make a file unreadable,
+    include directives come back as ``IncludeTag`` markers (expanded by
+    ``include_resolver.ConfigResolver``).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[tuple[int, int], Any]] = {}
+        # path → scan scopes fed by that file / include directory
+        self._file_scopes: dict[str, set[str]] = {}
+        self._dir_scopes: dict[str, set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def load(self, path: str | Path, scopes: Iterable[str], copy: bool = True) -> Any:
+        """Return the parsed content of ``path``, re-parsing only if it changed.
+
+        Raises like ``open``/``yaml.load`` would; errors are not cached.
+        ``copy=False`` returns the cached tree itself — callers must not
+        mutate it.
+        """
+        key = os.path.abspath(str(path))
+        st = os.stat(key)
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            self._file_scopes.setdefault(key, set()).update(scopes)
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == signature:
+                self.hits += 1
+                return _copy.deepcopy(cached[1]) if copy else cached[1]
+            self.misses += 1
+        with open(key, "r", encoding="utf-8") as f:
+            content = parse_yaml(f)
+        with self._lock:
+            self._entries[key] = (signature, content)
+        return _copy.deepcopy(content) if copy else content
+
+    def add_scopes(self, path: str | Path, scopes: Iterable[str]) -> None:
+        """Record that an already resolved file also feeds ``scopes``."""
+        key = os.path.abspath(str(path))
+        with self._lock:
+            self._file_scopes.setdefault(key, set()).update(scopes)
+
+    def track_dir(self, path: str | Path, scopes: Iterable[str]) -> None:
+        """Record an include directory whose new YAML files feed ``scopes``."""
+        key = os.path.abspath(str(path))
+        with self._lock:
+            self._dir_scopes.setdefault(key, set()).update(scopes)
+
+    def invalidate(self, paths: Iterable[str] | None = None) -> None:
+        """Drop cached content for ``paths`` (every entry when None)."""
+        with self._lock:
+            if paths is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                return
+            for path in paths:
+                if self._entries.pop(path, None) is not None:
+                    self.invalidations += 1
+
+    def watched_files(self) -> frozenset[str]:
+        """Return every file resolved by a loader so far."""
+        with self._lock:
+            return frozenset(self._file_scopes)
+
+    def watched_dirs(self) -> frozenset[str]:
+        """Return every include directory tracked by a loader so far."""
+        with self._lock:
+            return frozenset(self._dir_scopes)
+
+    def is_relevant(self, path: str) -> bool:
+        """Return True if a change to ``path`` can affect a scan result."""
+        return bool(self.scopes_for([path]))
+
+    def scopes_for(self, paths: Iterable[str]) -> frozenset[str]:
+        """Return the union of scan scopes fed by the given paths."""
+        scopes: set[str] = set()
+        with self._lock:
+            for path in paths:
+                if path in self._file_scopes:
+                    scopes |= self._file_scopes[path]
+                    continue
+                if path in self._dir_scopes:
+                    # Directory listing changed (polling backend)
+                    scopes |= self._dir_scopes[path]
+                    continue
+                if not path.endswith(YAML_SUFFIXES):
+                    continue
+                for dir_path, dir_scopes in self._dir_scopes.items():
+                    if path.startswith(dir_path + os.sep):
+                        scopes |= dir_scopes
+        return frozenset(scopes)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return cache statistics for diagnostics."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "files": len(self._file_scopes),
+            "dirs": len(self._dir_scopes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+def get_parsed_config_cache(hass: HomeAssistant) -> ParsedConfigCache:
+    """Return the shared parsed-config cache (created on first use).
+
+    Must be called from the event loop, before handing work to an executor.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    cache = domain_data.get(PARSED_CONFIG_CACHE_KEY)
+    if cache is None:
+        cache = ParsedConfigCache()
+        domain_data[PARSED_CONFIG_CACHE_KEY] = cache
+    return cache
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# inotify backend
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+class _Inotify:
+    """Minimal non-blocking inotify wrapper (directory watches only)."""
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd: int = fd
+        self._wd_to_dir: dict[int, str] = {}
+        self._dir_to_wd: dict[str, int] = {}
+
+    @property
+    def directories(self) -> frozenset[str]:
+        return frozenset(self._dir_to_wd)
+
+    def add(self, directory: str) -> None:
+        if directory in self._dir_to_wd:
+            return
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), directory)
+        self._wd_to_dir[wd] = directory
+        self._dir_to_wd[directory] = wd
+
+    def remove(self, directory: str) -> None:
+        wd = self._dir_to_wd.pop(directory, None)
+        if wd is not None:
+            self._wd_to_dir.pop(wd, None)
+            self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self) -> tuple[list[str], bool]:
+        """Return (changed paths, overflowed) for all queued events."""
+        paths: list[str] = []
+        overflow = False
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                name = buf[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                directory = self._wd_to_dir.get(wd)
+                if directory and name:
+                    paths.append(os.path.join(directory, os.fsdecode(name)))
+        return paths, overflow
+
+    def close(self) -> None:
+        self._wd_to_dir.clear()
+        self._dir_to_wd.clear()
+        os.close(self.fd)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Watcher
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+def _stat_signatures(paths: Iterable[str]) -> dict[str, tuple[int, int] | None]:
+    """stat() every path — executor job for the polling backend."""
+    result: dict[str, tuple[int, int] | None] = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            result[path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            result[path] = None
+    return result
+
+
+class ConfigFileWatcher:
+    """Watch the files resolved by the loaders and trigger targeted rescans."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        cache: ParsedConfigCache,
+        debounce_seconds: float,
+    ) -> None:
+        self.hass = hass
+        self.entry = entry
+        self.cache = cache
+        self.debounce_seconds = debounce_seconds
+        self.backend: str | None = None
+        self._inotify: _Inotify | None = None
+        self._unsub_poll = None
+        self._poll_signatures: dict[str, tuple[int, int] | None] = {}
+        self._pending_paths: set[str] = set()
+        self._pending_full = False
+        self._flush_handle = None
+        self.changes_detected = 0
+        self.rescans_scheduled = 0
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────
+
+    @callback
+    def async_start(self) -> None:
+        """Start the inotify backend, falling back to polling."""
+        try:
+            self._inotify = _Inotify()
+            self.hass.loop.add_reader(self._inotify.fd, self._on_inotify_readable)
+            self.backend = "inotify"
+        except (OSError, AttributeError, NotImplementedError) as err:
+            _LOGGER.debug("[HACA Watcher] inotify unavailable (%s) — polling", err)
+            self._inotify = None
+            self._start_polling()
+        self.async_sync()
+
+    def _start_polling(self) -> None:
+        self.backend = "polling"
+        self._unsub_poll = async_track_time_interval(
+            self.hass, self._async_poll, POLL_INTERVAL
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop watching and cancel any pending rescan."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._inotify is not None:
+            try:
+                self.hass.loop.remove_reader(self._inotify.fd)
+            finally:
+                self._inotify.close()
+                self._inotify = None
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+
+    @callback
+    def async_sync(self) -> None:
+        """Align inotify watches with the paths resolved by the last scan."""
+        if self._inotify is None:
+            return
+        wanted = {os.path.dirname(p) for p in self.cache.watched_files()}
+        wanted |= self.cache.watched_dirs()
+        for directory in self._inotify.directories - wanted:
+            self._inotify.remove(directory)
+        for directory in wanted - self._inotify.directories:
+            try:
+                self._inotify.add(directory)
+            except OSError as err:
+                # Watch limit reached (fs.inotify.max_user_watches) or
+                # unsupported filesystem — keep detecting changes by polling.
+                _LOGGER.warning(
+                    "[HACA Watcher] cannot watch %s (%s) — switching to polling",
+                    directory, err,
+                )
+                self.hass.loop.remove_reader(self._inotify.fd)
+                self._inotify.close()
+                self._inotify = None
+                self._start_polling()
+                return
+
+    # ── Change detection ──────────────────────────────────────────────────
+
+    @callback
+    def _on_inotify_readable(self) -> None:
+        if self._inotify is None:
+            return
+        paths, overflow = self._inotify.read()
+        if overflow:
+            self._pending_full = True
+        self._queue([p for p in paths if self.cache.is_relevant(p)], force=overflow)
+
+    async def _async_poll(self, _now=None) -> None:
+        files = self.cache.watched_files()
+        # Directory mtimes change when a file is added to / removed from them
+        paths = files | self.cache.watched_dirs()
+        signatures = await self.hass.async_add_executor_job(_stat_signatures, paths)
+        changed: list[str] = []
+        for path, sig in signatures.items():
+            previous = self._poll_signatures.get(path, sig)
+            if previous != sig:
+                changed.append(path)
+        self._poll_signatures = signatures
+        self._queue(changed)
+
+    @callback
+    def _queue(self, paths: list[str], force: bool = False) -> None:
+        """Coalesce changed paths over the debounce window."""
+        if not paths and not force:
+            return
+        self.changes_detected += len(paths)
+        self._pending_paths.update(paths)
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = self.hass.loop.call_later(self.debounce_seconds, self._flush)
+
+    @callback
+    def _flush(self) -> None:
+        self._flush_handle = None
+        paths, self._pending_paths = self._pending_paths, set()
+        full, self._pending_full = self._pending_full, False
+
+        reloads = self.hass.data.get(DOMAIN, {}).get(RELOAD_SCHEDULER_KEY)
+        if reloads is not None and not full:
+            paths = {p for p in paths if not reloads.is_own_write(p)}
+
+        if full:
+            self.cache.invalidate()
+            scopes = ALL_SCAN_SCOPES
+        else:
+            self.cache.invalidate(paths)
+            scopes = self.cache.scopes_for(paths)
+        if not scopes:
+            return
+
+        domain_data = self.hass.data.get(DOMAIN, {}).get(self.entry.entry_id, {})
+        rescan = domain_data.get("async_rescan")
+        coord = domain_data.get("coordinator")
+        self.rescans_scheduled += 1
+        _LOGGER.info(
+            "[HACA Watcher] %d config file(s) changed on disk — rescanning %s",
+            len(paths), ", ".join(sorted(scopes)),
+        )
+        if rescan is not None and scopes != ALL_SCAN_SCOPES:
+            self.hass.async_create_task(rescan(scopes))
+        elif coord is not None:
+            scheduler = domain_data.get("scan_scheduler")
+            if scheduler is not None:
+                scheduler.request_full()
+            self.hass.async_create_task(coord.async_refresh())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return watcher state for diagnostics."""
+        return {
+            "backend": self.backend,
+            "watched_files": len(self.cache.watched_files()),
+            "watched_dirs": len(self._inotify.directories) if self._inotify else 0,
+            "changes_detected": self.changes_detected,
+            "rescans_scheduled": self.rescans_scheduled,
+            "cache": self.cache.as_dict(),
+        }
+
+
+def async_setup_config_watcher(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Start the config file watcher for ``entry``.
+
+    Follows the ``event_monitoring_enabled`` / ``event_debounce_seconds``
+    options, like the event monitor.  Cleanup goes through
+    ``entry.async_on_unload``.
+    """
+    if not entry.options.get("event_monitoring_enabled", True):
+        _LOGGER.info("[HACA Watcher] File watching disabled with event monitoring")
+        return
+
+    debounce_seconds = float(
+        entry.options.get("event_debounce_seconds", DEFAULT_EVENT_DEBOUNCE_SECONDS)
+    )
+    watcher = ConfigFileWatcher(hass, entry, get_parsed_config_cache(hass), debounce_seconds)
+    watcher.async_start()
+
+    domain_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if isinstance(domain_data, dict):
+        domain_data[CONFIG_WATCHER_KEY] = watcher
+        coord = domain_data.get("coordinator")
+        if coord is not None:
+            # Resolved file set may change after each scan
+            entry.async_on_unload(coord.async_add_listener(watcher.async_sync))
+
+    entry.async_on_unload(watcher.async_stop)
+    _LOGGER.info("[HACA Watcher] Watching config files (%s backend)", watcher.backend)
@@ -10,6 +10,19 @@ DEFAULT_EVENT_DEBOUNCE_SECONDS = 30
 MIN_SCAN_INTERVAL = 5
 MAX_SCAN_INTERVAL = 1440
 
+# Scan scopes — one per analyzer group (same keys as "excluded_categories").
+# Event-driven partial rescans rerun only a subset of these.
+ALL_SCAN_SCOPES = frozenset({
+    "automations", "entities", "performance", "security",
+    "dashboards", "batteries", "recorder", "compliance",
+})
+# Scopes fed by automation / script / scene YAML (reload or file edit)
+CONFIG_SCAN_SCOPES = frozenset({
+    "automations", "entities", "performance", "security", "compliance",
+})
+# A debounced event window touching more items than this triggers a full scan
+EVENT_FULL_SCAN_THRESHOLD = 25
+
 # Services
 SERVICE_SCAN_ALL = "scan_all"
 SERVICE_SCAN_AUTOMATIONS = "scan_automations"
@@ -32,6 +45,7 @@ SERVICE_FUZZY_SUGGESTIONS = "get_fuzzy_suggestions"
 SERVICE_PURGE_RECORDER_ORPHANS = "purge_recorder_orphans"
 SERVICE_FIX_DESCRIPTION = "fix_description"
 SERVICE_SUGGEST_DESCRIPTION = "suggest_description_ai"
+SERVICE_CAPTURE_SCAN_INPUTS = "capture_scan_inputs"
 
 # Module Status
 MODULE_1_AUTOMATION_SCANNER = True  
@@ -108,9 +122,14 @@ ISSUE_TEMPLATE_MISSING_AVAILABILITY = "template_missing_availability"
 # Paths
 BACKUP_DIR = ".haca_backups"
 REPORTS_DIR = "haca_reports"
+CAPTURES_DIR = ".haca_captures"
 # HISTORY_FILE kept for backwards compatibility; new code uses .haca_history/ directory
 HISTORY_FILE = ".haca_history.json"
 
+# State value of the placeholder states of a headless audit (headless.py):
+# the entity is registered but no runtime state (triggers, history) is known
+HEADLESS_STATE = "headless"
+
 # Thresholds
 STALE_ENTITY_DAYS = 7
 HIGH_FREQUENCY_TRIGGERS_PER_HOUR = 50
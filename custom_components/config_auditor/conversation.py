@@ -7,18 +7,17 @@ from typing import Any
 
 from homeassistant.core import HomeAssistant, Context
 
+from .ai_router import ProviderError, get_ai_router
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
-# Clé pour le cache des explications IA dans hass.data[DOMAIN][entry_id]
-_AI_CACHE_KEY = "ai_explanation_cache"
-
 async def async_setup_conversation(hass: HomeAssistant, entry: Any) -> None:
     """No-op stub — HACA does not register its own conversation agent.
 
     HACA uses ai_task.generate_data or conversation.async_converse.
-    This function is kept to avoid breaking __init__.py imports.
+    No longer called at setup — this module is imported on the first AI
+    call (see lazy.py); kept for backward compatibility.
     """
     _LOGGER.debug("[HACA] Conversation setup skipped — using ai_task or conversation agent.")
 
@@ -191,14 +190,12 @@ async def _async_find_all_conversation_agents(hass: HomeAssistant) -> list[str]:
 async def _async_find_ai_task_entity(hass: HomeAssistant) -> str | None:
     """Return the best available AI provider ID, or None if nothing configured.
 
-    Checks ai_task first, then conversation agents (e.g. Mistral via OpenRouter).
+    Checks ai_task first, then conversation agents (e.g. Mistral via OpenRouter),
+    from the router's cached discovery.
     Used by websocket.py for a quick availability check before starting chat.
     """
-    entities = await _async_find_all_ai_task_entities(hass)
-    if entities:
-        return entities[0]
-    agents = await _async_find_all_conversation_agents(hass)
-    return agents[0] if agents else None
+    providers = await get_ai_router(hass).async_providers()
+    return providers[0].id if providers else None
 
 
 # ─── AI call with full fallback chain ─────────────────────────────────────────
@@ -280,117 +277,204 @@ def _is_llm_error_reply(text: str) -> bool:
     return any(normalized.startswith(p) for p in _LLM_ERROR_PREFIXES)
 
 
+async def _async_ask_ai_task(hass: HomeAssistant, entity_id: str, prompt: str, task_name: str) -> str:
+    """ai_task.generate_data on one entity; full prompt sent as LLM instructions."""
+    _LOGGER.debug("[HACA AI] ai_task → %s", entity_id)
+    result = await hass.services.async_call(
+        "ai_task",
+        "generate_data",
+        {
+            "entity_id":    entity_id,
+            "task_name":    task_name,
+            "instructions": prompt,
+        },
+        blocking=True,
+        return_response=True,
+    )
+    if not result:
+        raise ProviderError("empty result")
+    if entity_id in result and isinstance(result[entity_id], dict):
+        return str(result[entity_id].get("data", "") or "")
+    return str(result.get("data", "") or "")
+
+
+async def _async_ask_conversation(hass: HomeAssistant, agent_id: str, prompt: str) -> str:
+    """conversation.async_converse on one agent.
+
+    Les outils HACA sont injectés nativement via le LLM API HACA
+    (Settings → Voice Assistants → [agent] → LLM API → HACA).
+    """
+    _LOGGER.debug("[HACA AI] conversation → %s", agent_id)
+    from homeassistant.components.conversation import async_converse
+    import inspect as _inspect
+    _kwargs: dict = {
+        "hass": hass,
+        "text": prompt,
+        "conversation_id": None,
+        "context": Context(),
+        "agent_id": agent_id,
+    }
+    _params = set(_inspect.signature(async_converse).parameters)
+    if "language" in _params:
+        _kwargs["language"] = hass.config.language or "en"
+    if "device_id" in _params:
+        _kwargs["device_id"] = None
+    result = await async_converse(**_kwargs)
+    reply = ""
+    if result and result.response:
+        speech = result.response.speech
+        if isinstance(speech, dict):
+            reply = (
+                speech.get("plain", {}).get("speech", "")
+                or next(
+                    (v.get("speech", "") for v in speech.values()
+                     if isinstance(v, dict)),
+                    ""
+                )
+            )
+    return reply
+
+
+async def _async_ask_provider(hass: HomeAssistant, provider, prompt: str, task_name: str) -> str:
+    """One provider's reply; ProviderError when it is empty or a backend error."""
+    if provider.kind == "ai_task":
+        reply = await _async_ask_ai_task(hass, provider.id, prompt, task_name)
+    else:
+        reply = await _async_ask_conversation(hass, provider.id, prompt)
+    if not reply:
+        raise ProviderError("empty reply")
+    if _is_llm_error_reply(reply):
+        raise ProviderError(reply)
+    return reply
+
+
 async def _async_call_ai(hass: HomeAssistant, prompt: str, task_name: str = "HACA") -> str:
     """Send a prompt to the best available AI provider, with automatic fallback.
 
-    Phase 1 — ai_task.generate_data : preferred ai_task entity first, then others.
-               Full prompt sent as LLM instructions. Best path for the agentic loop.
-    Phase 2 — conversation.async_converse : tous les agents disponibles.
-               Les outils HACA sont injectés nativement via le LLM API HACA.
-               Mistral/OpenRouter utilisent ce chemin quand pas d'ai_task entity.
+    Providers are ai_task entities (preferred one first, ai_task.generate_data)
+    then conversation agents (conversation.async_converse — Mistral /
+    OpenRouter use this path when there is no ai_task entity).  Discovery,
+    circuit breakers, timeouts and optional hedging: see ai_router.py.
 
     Returns empty string when every provider has failed.
     """
-    last_error: str = ""
+    router = get_ai_router(hass)
+    reply = await router.async_call(
+        task_name, lambda provider: _async_ask_provider(hass, provider, prompt, task_name)
+    )
+    if not reply:
+        _LOGGER.warning("[HACA AI] All providers failed or skipped for %s", task_name)
+    return reply
+
+
+async def _async_call_ai_cached(
+    hass: HomeAssistant,
+    prompt: str,
+    task_name: str,
+    kind: str,
+    language: str,
+    *,
+    entity_id: str = "",
+    config: Any = None,
+    params: dict[str, Any] | None = None,
+) -> str:
+    """``_async_call_ai`` through the persistent reply cache (see ai_cache.py).
+
+    ``config`` is the automation/script the prompt is about (parsed or YAML
+    text); ``params`` every other input of the prompt.  Without any AI
+    provider nothing is looked up and nothing is stored.
+    """
+    slot = await _async_ai_cache_slot(
+        hass, kind, language, entity_id=entity_id, config=config, params=params
+    )
+    if slot is None:
+        return await _async_call_ai(hass, prompt, task_name)
+    cached = slot.cache.get(slot.key)
+    if cached is not None:
+        _LOGGER.debug("[HACA AI] %s: cached reply (%s)", task_name, entity_id or kind)
+        return cached
+
+    reply = await _async_call_ai(hass, prompt, task_name)
+    if reply:
+        slot.store(reply)
+        await _async_save_ai_cache(hass)
+    return reply
 
-    # ── Phase 1 : ai_task.generate_data ───────────────────────────────────
-    for entity_id in await _async_find_all_ai_task_entities(hass):
-        try:
-            _LOGGER.debug("[HACA AI] ai_task → %s", entity_id)
-            result = await hass.services.async_call(
-                "ai_task",
-                "generate_data",
-                {
-                    "entity_id":    entity_id,
-                    "task_name":    task_name,
-                    "instructions": prompt,
-                },
-                blocking=True,
-                return_response=True,
-            )
-            if not result:
-                _LOGGER.warning("[HACA AI] ai_task %s: empty result", entity_id)
-                continue
-            if entity_id in result and isinstance(result[entity_id], dict):
-                reply = str(result[entity_id].get("data", "") or "")
-            else:
-                reply = str(result.get("data", "") or "")
-            if reply:
-                if _is_llm_error_reply(reply):
-                    _LOGGER.warning(
-                        "[HACA AI] ai_task %s error: %.120s → trying next",
-                        entity_id, reply,
-                    )
-                    last_error = reply
-                    continue
-                _LOGGER.info("[HACA AI] ✓ ai_task %s", entity_id)
-                return reply
-            _LOGGER.warning("[HACA AI] ai_task %s: empty data", entity_id)
-        except Exception as exc:
-            last_error = str(exc)
-            _LOGGER.warning("[HACA AI] ai_task %s failed: %s → trying next", entity_id, exc)
-
-    # ── Phase 2 : conversation.async_converse ─────────────────────────────
-    # Les outils HACA sont désormais injectés nativement via le LLM API HACA
-    # (Settings → Voice Assistants → [agent] → LLM API → HACA).
-    # Plus besoin de tronquer/sanitiser le prompt.
-    for agent_id in await _async_find_all_conversation_agents(hass):
-        try:
-            _LOGGER.debug("[HACA AI] conversation → %s", agent_id)
-            from homeassistant.components.conversation import async_converse
-            import inspect as _inspect
-            _kwargs: dict = {
-                "hass": hass,
-                "text": prompt,
-                "conversation_id": None,
-                "context": Context(),
-                "agent_id": agent_id,
-            }
-            _params = set(_inspect.signature(async_converse).parameters)
-            if "language" in _params:
-                _kwargs["language"] = hass.config.language or "en"
-            if "device_id" in _params:
-                _kwargs["device_id"] = None
-            result = await async_converse(**_kwargs)
-            reply = ""
-            if result and result.response:
-                speech = result.response.speech
-                if isinstance(speech, dict):
-                    reply = (
-                        speech.get("plain", {}).get("speech", "")
-                        or next(
-                            (v.get("speech", "") for v in speech.values()
-                             if isinstance(v, dict)),
-                            ""
-                        )
-                    )
-            if reply:
-                if _is_llm_error_reply(reply):
-                    _LOGGER.warning(
-                        "[HACA AI] conversation %s error: %.120s → trying next",
-                        agent_id, reply,
-                    )
-                    last_error = reply
-                    continue
-                _LOGGER.info("[HACA AI] ✓ conversation %s", agent_id)
-                return reply
-            _LOGGER.warning("[HACA AI] conversation %s: empty speech", agent_id)
-        except Exception as exc:
-            last_error = str(exc)
-            _LOGGER.warning("[HACA AI] conversation %s failed: %s → trying next", agent_id, exc)
 
-    _LOGGER.warning("[HACA AI] All providers failed. Last error: %s", last_error or "none")
-    return ""
+class _AiCacheSlot:
+    """Where the reply to one prompt lives in the AI cache."""
+
+    def __init__(self, cache, key: str, kind: str, entity_id: str, cfg_hash: str) -> None:
+        self.cache = cache
+        self.key = key
+        self.kind = kind
+        self.entity_id = entity_id
+        self.cfg_hash = cfg_hash
+
+    def store(self, reply: str) -> None:
+        self.cache.put(
+            self.key, reply, kind=self.kind, entity_id=self.entity_id, cfg_hash=self.cfg_hash
+        )
+
+
+async def _async_ai_cache_slot(
+    hass: HomeAssistant,
+    kind: str,
+    language: str,
+    *,
+    entity_id: str = "",
+    config: Any = None,
+    params: dict[str, Any] | None = None,
+) -> _AiCacheSlot | None:
+    """Cache slot of a prompt (see ``_async_call_ai_cached``); None without AI provider."""
+    from .ai_cache import async_entity_config_hash, cache_key, config_hash, get_ai_cache
+
+    provider = await _async_find_ai_task_entity(hass)
+    if provider is None:
+        return None
+
+    cache = get_ai_cache(hass)
+    if not cache.loaded:
+        await hass.async_add_executor_job(cache.load)
+    if config is not None:
+        cfg_hash = config_hash(config)
+    else:
+        cfg_hash = await async_entity_config_hash(hass, entity_id) if entity_id else ""
+    key = cache_key(kind, language, cfg_hash, params or {}, provider)
+    return _AiCacheSlot(cache, key, kind, entity_id, cfg_hash)
+
+
+async def _async_save_ai_cache(hass: HomeAssistant) -> None:
+    from .ai_cache import get_ai_cache
+
+    try:
+        await hass.async_add_executor_job(get_ai_cache(hass).save)
+    except OSError as exc:
+        _LOGGER.warning("[HACA AI] Could not save the AI cache: %s", exc)
 
 
 # ─── Issue explanation ────────────────────────────────────────────────────────
 
 async def explain_issue_ai(hass: HomeAssistant, issue_data: dict[str, Any]) -> str:
     """Explain a HACA issue using the best available AI provider."""
-    import json as _json
     _lang = hass.data.get("config_auditor", {}).get("user_language") or hass.config.language or "en"
+    prompt, params = await _async_explain_prompt(hass, issue_data, _lang)
+    reply = await _async_call_ai_cached(
+        hass, prompt, "HACA Issue Explanation", "explain", _lang,
+        entity_id=issue_data.get("entity_id") or "",
+        params=params,
+    )
+    if reply:
+        return reply
+    return _get_local_fallback_explanation(hass, issue_data)
+
+
+async def _async_explain_prompt(
+    hass: HomeAssistant, issue_data: dict[str, Any], language: str
+) -> tuple[str, dict[str, Any]]:
+    """(prompt, cache params) explaining one issue — shared with bulk AI jobs."""
     _th = TranslationHelper(hass)
-    await _th.async_load_language_section(_lang, "ai_prompts")
+    await _th.async_load_language_section(language, "ai_prompts")
     prompt = _th.t("explain_issue_system").format(
         message=issue_data.get("message", ""),
         type=issue_data.get("type", ""),
@@ -398,11 +482,11 @@ async def explain_issue_ai(hass: HomeAssistant, issue_data: dict[str, Any]) -> s
         entity=issue_data.get("entity_id") or issue_data.get("alias", ""),
         recommendation=issue_data.get("recommendation", ""),
     )
-
-    reply = await _async_call_ai(hass, prompt, "HACA Issue Explanation")
-    if reply:
-        return reply
-    return _get_local_fallback_explanation(hass, issue_data)
+    params = {
+        key: issue_data.get(key, "")
+        for key in ("type", "severity", "message", "recommendation", "alias")
+    }
+    return prompt, params
 
 
 def _get_local_fallback_explanation(hass: HomeAssistant, issue_data: dict) -> str:
@@ -506,7 +590,14 @@ async def analyze_complexity_ai(hass: HomeAssistant, row: dict) -> dict:
     explanation  = ""
     split_proposal = ""
     try:
-        reply = await _async_call_ai(hass, prompt, "HACA Complexity Analysis")
+        reply = await _async_call_ai_cached(
+            hass, prompt, "HACA Complexity Analysis", "complexity", _cplx_lang,
+            entity_id=entity_id, config=yaml_config,
+            params={
+                "alias": alias, "score": score, "triggers": n_triggers,
+                "conditions": n_conds, "actions": n_actions, "templates": n_tpl,
+            },
+        )
         if reply:
             exp_m = _re.search(r"```explanation\s*(.*?)\s*```", reply, _re.DOTALL)
             yml_m = _re.search(r"```yaml_proposal\s*(.*?)\s*```", reply, _re.DOTALL)
@@ -27,6 +27,8 @@ from homeassistant.helpers import device_registry as dr
 # Lovelace shows "Entity not found" when the entity has no state in hass.states,
 # regardless of whether it exists in the registry (disabled, ghost entries, etc.).
 
+from .include_resolver import get_config_resolver
+from .registry_snapshot import RegistrySnapshot
 from .translation_utils import TranslationHelper
 _LOGGER = logging.getLogger(__name__)
 
@@ -69,16 +71,22 @@ class DashboardAnalyzer:
         self.hass = hass
         self.issues: list[dict[str, Any]] = []
         self._translator = TranslationHelper(hass)
+        self._config_resolver = None
 
     # ── Public API ────────────────────────────────────────────────────────
 
-    async def analyze_all(self) -> list[dict[str, Any]]:
+    async def analyze_all(
+        self, snapshot: RegistrySnapshot | None = None
+    ) -> list[dict[str, Any]]:
         self.issues = []
         language = self.hass.data.get("config_auditor", {}).get("user_language") or self.hass.config.language or "en"
         await self._translator.async_load_language(language)
         # Load haca_ignore label (entity + device level)
-        from .translation_utils import async_get_haca_ignored_entity_ids
-        self._haca_ignored = await async_get_haca_ignored_entity_ids(self.hass)
+        if snapshot is not None:
+            self._haca_ignored = set(snapshot.ignored_entity_ids)
+        else:
+            from .translation_utils import async_get_haca_ignored_entity_ids
+            self._haca_ignored = await async_get_haca_ignored_entity_ids(self.hass)
 
         known = await self._build_known_entities()
         _LOGGER.warning(
@@ -171,6 +179,7 @@ class DashboardAnalyzer:
         except Exception as exc:
             _LOGGER.warning("[HACA Dashboard] HA API failed: %s", exc)
 
+        self._config_resolver = get_config_resolver(self.hass)
         yaml_results = await self.hass.async_add_executor_job(self._find_yaml_dashboards)
         _LOGGER.warning(
             "[HACA Dashboard] YAML results: %d — %s",
@@ -293,8 +302,12 @@ class DashboardAnalyzer:
 
     def _safe_load_yaml(self, path: Path) -> dict | None:
         try:
-            with open(path, encoding="utf-8") as f:
-                c = yaml.safe_load(f)
+            if self._config_resolver is not None:
+                # Views / cards split with !include are expanded
+                c = self._config_resolver.resolve(path, ("dashboards",)).data
+            else:
+                with open(path, encoding="utf-8") as f:
+                    c = yaml.safe_load(f)
             return c if isinstance(c, dict) else None
         except Exception:
             return None
@@ -14,6 +14,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
 from .const import DOMAIN, VERSION
+from .translation_utils import HACA_IGNORE_CACHE_KEY
 
 TO_REDACT = {
     "mcp_ha_token",
@@ -85,6 +86,34 @@ async def async_get_config_entry_diagnostics(
         "predictions_count": cdata.get("battery_predictions_count", 0),
     }
 
+    # haca_ignore cache effectiveness
+    ignore_cache = hass.data.get(DOMAIN, {}).get(HACA_IGNORE_CACHE_KEY)
+    ignore_cache_info = ignore_cache.as_dict() if ignore_cache is not None else {}
+    router_stats = domain_data.get("event_router_stats")
+    router_info = router_stats.as_dict() if router_stats is not None else {}
+    watcher = domain_data.get("config_watcher")
+    watcher_info = watcher.as_dict() if watcher is not None else {}
+    reloads = hass.data.get(DOMAIN, {}).get("reload_scheduler")
+    reloads_info = reloads.as_dict() if reloads is not None else {}
+    backups = hass.data.get(DOMAIN, {}).get("backup_store")
+    backups_info = await hass.async_add_executor_job(backups.stats) if backups is not None else {}
+    ai_cache = hass.data.get(DOMAIN, {}).get("ai_response_cache")
+    ai_cache_info = ai_cache.as_dict() if ai_cache is not None else {}
+    ai_router = hass.data.get(DOMAIN, {}).get("ai_router")
+    ai_router_info = ai_router.as_dict() if ai_router is not None else {}
+    resolver = hass.data.get(DOMAIN, {}).get("config_resolver")
+    resolver_info = resolver.as_dict() if resolver is not None else {}
+    telemetry = hass.data.get(DOMAIN, {}).get("trigger_telemetry")
+    telemetry_info = telemetry.as_dict() if telemetry is not None else {}
+    rate_monitor = hass.data.get(DOMAIN, {}).get("state_rate_monitor")
+    rate_monitor_info = rate_monitor.as_dict() if rate_monitor is not None else {}
+    health_index = hass.data.get(DOMAIN, {}).get("entity_health")
+    health_index_info = health_index.as_dict() if health_index is not None else {}
+    scheduler = domain_data.get("scan_scheduler")
+    scheduler_info = scheduler.as_dict() if scheduler is not None else {}
+    orchestrator = domain_data.get("scan_orchestrator")
+    orchestrator_info = orchestrator.as_dict() if orchestrator is not None else {}
+
     # Build the full diagnostics payload
     diag = {
         "haca_version": VERSION,
@@ -105,8 +134,21 @@ async def async_get_config_entry_diagnostics(
         },
         "area_complexity_zones": len(cdata.get("area_complexity", {}).get("areas", [])),
         "redundancy_groups": len(cdata.get("redundancy", {}).get("groups", [])),
+        "haca_ignore_cache": ignore_cache_info,
         "scan_interval_minutes": entry.options.get("scan_interval", 60),
         "event_monitoring_enabled": entry.options.get("event_monitoring_enabled", True),
+        "event_router": router_info,
+        "config_watcher": watcher_info,
+        "reload_scheduler": reloads_info,
+        "backup_store": backups_info,
+        "ai_response_cache": ai_cache_info,
+        "ai_router": ai_router_info,
+        "config_includes": resolver_info,
+        "trigger_telemetry": telemetry_info,
+        "state_rate_monitor": rate_monitor_info,
+        "entity_health": health_index_info,
+        "analyzer_schedule": scheduler_info,
+        "scan_orchestrator": orchestrator_info,
         "total_entities": len(hass.states.async_all()),
         "total_automations": len(hass.states.async_entity_ids("automation")),
         "total_scripts": len(hass.states.async_entity_ids("script")),
@@ -1,7 +1,8 @@
 import asyncio
 from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
+import time
 from typing import Any
 
 from homeassistant.core import HomeAssistant
@@ -11,6 +12,8 @@ from homeassistant.helpers import (
     area_registry as ar,
 )
 
+from .entity_health import EntityHealthIndex, get_entity_health
+from .registry_snapshot import RegistrySnapshot
 from .translation_utils import TranslationHelper
 
 _LOGGER = logging.getLogger(__name__)
@@ -56,6 +59,8 @@ class EntityAnalyzer:
         # Maps automation/script entity_id → human-readable alias
         self._automation_alias_map: dict[str, str] = {}
         self._translator = TranslationHelper(hass)
+        # Registry snapshot of the running scan (None → query registries live)
+        self._snapshot: RegistrySnapshot | None = None
 
     @property
     def entity_references(self) -> dict[str, list[str]]:
@@ -71,9 +76,11 @@ class EntityAnalyzer:
         self,
         automation_configs: dict[str, dict] = None,
         script_configs: dict[str, dict] = None,
+        snapshot: RegistrySnapshot | None = None,
     ) -> list[dict[str, Any]]:
         """Analyze all entities."""
         self.issues = []
+        self._snapshot = snapshot
         
         # Load language for translations
         language = self.hass.data.get("config_auditor", {}).get("user_language") or self.hass.config.language or "en"
@@ -234,7 +241,16 @@ class EntityAnalyzer:
                 if idx % 10 == 0: await asyncio.sleep(0)
 
     async def _analyze_entity_states(self) -> None:
-        """Analyze entity states."""
+        """Analyze entity states.
+
+        Reads the incrementally maintained health index when it is running;
+        the full state-machine walk below is only the fallback.
+        """
+        index = get_entity_health(self.hass)
+        if index is not None:
+            self._analyze_entity_health(index)
+            return
+
         all_entities = self.hass.states.async_all()
         t = self._translator.t
         
@@ -302,8 +318,73 @@ class EntityAnalyzer:
             
             if idx % 50 == 0: await asyncio.sleep(0)
 
+    def _analyze_entity_health(self, index: EntityHealthIndex) -> None:
+        """Build state issues from the entity health index (O(unhealthy))."""
+        t = self._translator.t
+        now = time.time()
+
+        def _skip(entity_id: str) -> bool:
+            return (
+                entity_id in self._ignored_entity_ids
+                or entity_id.startswith("sensor.h_a_c_a_")
+                or entity_id.split(".")[0] in _ENTITY_SKIP_DOMAINS
+            )
+
+        for entity_id, since in sorted(index.unavailable.items()):
+            if _skip(entity_id):
+                continue
+            referencing_automations = self._entity_references.get(entity_id, [])
+            self.issues.append({
+                "entity_id": entity_id,
+                "type": "unavailable_entity",
+                "severity": "high" if referencing_automations else "medium",
+                "message": t("entity_unavailable_referenced", count=len(referencing_automations)) if referencing_automations else t("entity_unknown_state"),
+                "recommendation": t("verify_entity_updates"),
+                "unavailable_since": datetime.fromtimestamp(since, timezone.utc).isoformat(),
+            })
+
+        for entity_id in sorted(index.unknown):
+            if _skip(entity_id) or entity_id.split(".")[0] in _UNKNOWN_NORMAL_DOMAINS:
+                continue
+            referencing_automations = self._entity_references.get(entity_id, [])
+            if referencing_automations:
+                self.issues.append({
+                    "entity_id": entity_id,
+                    "type": "unknown_state",
+                    "severity": "medium",
+                    "message": t("entity_unknown_state_referenced", count=len(referencing_automations)),
+                    "recommendation": t("verify_entity_updates"),
+                })
+
+        for entity_id, last_updated in sorted(index.stale(now).items()):
+            if _skip(entity_id):
+                continue
+            referencing_automations = self._entity_references.get(entity_id, [])
+            self.issues.append({
+                "entity_id": entity_id,
+                "type": "stale_entity",
+                "severity": "medium" if referencing_automations else "low",
+                "message": t("entity_not_updated", days=int((now - last_updated) // 86400)),
+                "recommendation": t("entity_may_be_broken"),
+            })
+
+        for entity_id, transitions in sorted(index.flapping(now).items()):
+            if _skip(entity_id):
+                continue
+            referencing_automations = self._entity_references.get(entity_id, [])
+            self.issues.append({
+                "entity_id": entity_id,
+                "type": "flapping_entity",
+                "severity": "medium" if referencing_automations else "low",
+                "message": t("entity_flapping", count=transitions),
+                "recommendation": t("entity_flapping_recommendation"),
+            })
+
     async def _load_ignored_entity_ids(self) -> set:
         """Return entity_ids that carry the haca_ignore label (entity or device level)."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return set(snapshot.ignored_entity_ids)
         from .translation_utils import async_get_haca_ignored_entity_ids
         return await async_get_haca_ignored_entity_ids(self.hass)
 
@@ -411,7 +492,8 @@ class EntityAnalyzer:
         if not automation_configs:
             return
             
-        dev_reg = dr.async_get(self.hass)
+        snapshot = self._snapshot
+        dev_reg = dr.async_get(self.hass) if snapshot is None else None
         t = self._translator.t
         
         for idx, (automation_id, config) in enumerate(automation_configs.items()):
@@ -424,7 +506,11 @@ class EntityAnalyzer:
             device_ids = self._extract_field_recursively(config, "device_id")
             
             for device_id in device_ids:
-                if not dev_reg.async_get(device_id):
+                if dev_reg is not None:
+                    exists = dev_reg.async_get(device_id) is not None
+                else:
+                    exists = device_id in snapshot.device_ids
+                if not exists:
                     self.issues.append({
                         "entity_id": automation_id,
                         "device_id": device_id,
@@ -0,0 +1,218 @@
+"""Incrementally maintained entity health index.
+
+Keeps the unavailable, unknown and stale entity sets up to date from
+``state_changed`` events, so a scan only reads them:
+
+* ``unavailable`` / ``unknown`` map entity_id → timestamp the state was
+  entered (``last_changed``), giving exact "unavailable since" durations;
+* staleness (no update for ``STALE_AFTER``) is driven by a timer wheel of
+  one-hour slots: every update moves the entity to the slot of its new
+  deadline, and advancing the wheel only touches the slots that expired;
+* availability transitions are kept per entity (at most ``FLAP_THRESHOLD``
+  timestamps) to detect flapping entities.
+
+The index is seeded once from ``hass.states`` at setup; afterwards the work
+is O(changed entities).
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+ENTITY_HEALTH_KEY = "entity_health"
+
+STALE_AFTER = timedelta(days=7)
+WHEEL_SLOT_SECONDS = 3600
+FLAP_WINDOW_SECONDS = 3600
+FLAP_THRESHOLD = 6          # transitions to/from unavailable within the window
+
+
+def _ts(value: Any, default: float) -> float:
+    """Return a POSIX timestamp for a state datetime."""
+    try:
+        return value.timestamp()
+    except (AttributeError, TypeError, ValueError, OverflowError):
+        return default
+
+
+class EntityHealthIndex:
+    """Unavailable / unknown / stale / flapping entity sets."""
+
+    def __init__(self, stale_after: timedelta = STALE_AFTER) -> None:
+        self.stale_after = stale_after.total_seconds()
+        self.unavailable: dict[str, float] = {}
+        self.unknown: dict[str, float] = {}
+        self._last_updated: dict[str, float] = {}
+        self._stale: set[str] = set()
+        self._wheel: dict[int, set[str]] = {}
+        self._transitions: dict[str, deque[float]] = {}
+        self._cursor = 0
+        self.events_seen = 0
+
+    # ── Updates ───────────────────────────────────────────────────────────
+
+    def _schedule(self, entity_id: str, last_updated: float) -> None:
+        old = self._last_updated.get(entity_id)
+        if old is not None:
+            slot = self._wheel.get(int((old + self.stale_after) // WHEEL_SLOT_SECONDS))
+            if slot is not None:
+                slot.discard(entity_id)
+        self._stale.discard(entity_id)
+        self._last_updated[entity_id] = last_updated
+        slot_id = int((last_updated + self.stale_after) // WHEEL_SLOT_SECONDS)
+        if self._cursor and slot_id < self._cursor:
+            # Deadline already behind the wheel (e.g. an old restored state)
+            self._stale.add(entity_id)
+        else:
+            self._wheel.setdefault(slot_id, set()).add(entity_id)
+
+    def remove(self, entity_id: str) -> None:
+        """Forget a removed entity."""
+        old = self._last_updated.pop(entity_id, None)
+        if old is not None:
+            slot = self._wheel.get(int((old + self.stale_after) // WHEEL_SLOT_SECONDS))
+            if slot is not None:
+                slot.discard(entity_id)
+        self._stale.discard(entity_id)
+        self.unavailable.pop(entity_id, None)
+        self.unknown.pop(entity_id, None)
+        self._transitions.pop(entity_id, None)
+
+    def update(self, state: Any, now: float | None = None) -> None:
+        """Index the new state of an entity."""
+        now = time.time() if now is None else now
+        entity_id = state.entity_id
+        value = state.state
+        changed_at = _ts(getattr(state, "last_changed", None), now)
+
+        was_unavailable = entity_id in self.unavailable
+        if value == "unavailable":
+            if not was_unavailable:
+                self.unavailable[entity_id] = changed_at
+            self.unknown.pop(entity_id, None)
+        else:
+            self.unavailable.pop(entity_id, None)
+            if value == "unknown":
+                self.unknown.setdefault(entity_id, changed_at)
+            else:
+                self.unknown.pop(entity_id, None)
+
+        if was_unavailable != (value == "unavailable") and entity_id in self._last_updated:
+            self._transitions.setdefault(entity_id, deque(maxlen=FLAP_THRESHOLD)).append(now)
+
+        self._schedule(entity_id, _ts(getattr(state, "last_updated", None), now))
+
+    @callback
+    def async_handle_event(self, event) -> None:
+        """Apply one ``state_changed`` event."""
+        self.events_seen += 1
+        data = event.data
+        new_state = data.get("new_state")
+        if new_state is None:
+            self.remove(data.get("entity_id", ""))
+        else:
+            self.update(new_state)
+
+    def seed(self, states: list[Any], now: float | None = None) -> None:
+        """Index the current states once (setup)."""
+        now = time.time() if now is None else now
+        for state in states:
+            self.update(state, now)
+        self._transitions.clear()
+        self.advance(now)
+
+    def advance(self, now: float | None = None) -> None:
+        """Move entities whose staleness deadline has passed into the stale set."""
+        now = time.time() if now is None else now
+        current = int(now // WHEEL_SLOT_SECONDS)
+        # Slots strictly before the current one have fully expired
+        if not self._cursor or current - self._cursor > len(self._wheel):
+            due = [slot_id for slot_id in self._wheel if slot_id < current]
+        else:
+            due = range(self._cursor, current)
+        for slot_id in due:
+            expired = self._wheel.pop(slot_id, None)
+            if expired:
+                self._stale.update(expired)
+        self._cursor = current
+        # The current slot is checked entity by entity
+        for entity_id in list(self._wheel.get(current, ())):
+            if self._last_updated[entity_id] + self.stale_after <= now:
+                self._wheel[current].discard(entity_id)
+                self._stale.add(entity_id)
+
+    # ── Queries ───────────────────────────────────────────────────────────
+
+    def stale(self, now: float | None = None) -> dict[str, float]:
+        """Return stale entity_id → last_updated timestamp."""
+        self.advance(now)
+        return {eid: self._last_updated[eid] for eid in self._stale}
+
+    def flapping(self, now: float | None = None) -> dict[str, int]:
+        """Return entity_id → availability transitions within the flap window."""
+        now = time.time() if now is None else now
+        cutoff = now - FLAP_WINDOW_SECONDS
+        result = {}
+        for entity_id, stamps in list(self._transitions.items()):
+            recent = sum(1 for ts in stamps if ts >= cutoff)
+            if recent >= FLAP_THRESHOLD:
+                result[entity_id] = recent
+            elif not recent:
+                del self._transitions[entity_id]
+        return result
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return index sizes for diagnostics."""
+        return {
+            "tracked_entities": len(self._last_updated),
+            "unavailable": len(self.unavailable),
+            "unknown": len(self.unknown),
+            "stale": len(self._stale),
+            "wheel_slots": len(self._wheel),
+            "events_seen": self.events_seen,
+        }
+
+
+def get_entity_health(hass: HomeAssistant) -> EntityHealthIndex | None:
+    """Return the running index, if any."""
+    return hass.data.get(DOMAIN, {}).get(ENTITY_HEALTH_KEY)
+
+
+def async_setup_entity_health(hass: HomeAssistant, entry: ConfigEntry) -> EntityHealthIndex:
+    """Seed the index from the state machine and keep it current."""
+    index = EntityHealthIndex()
+    index.seed(hass.states.async_all())
+    hass.data.setdefault(DOMAIN, {})[ENTITY_HEALTH_KEY] = index
+
+    entry.async_on_unload(
+        hass.bus.async_listen(EVENT_STATE_CHANGED, index.async_handle_event)
+    )
+
+    @callback
+    def _tick(_now=None) -> None:
+        index.advance()
+
+    entry.async_on_unload(
+        async_track_time_interval(hass, _tick, timedelta(seconds=WHEEL_SLOT_SECONDS))
+    )
+
+    @callback
+    def _drop() -> None:
+        if hass.data.get(DOMAIN, {}).get(ENTITY_HEALTH_KEY) is index:
+            hass.data[DOMAIN].pop(ENTITY_HEALTH_KEY, None)
+
+    entry.async_on_unload(_drop)
+    _LOGGER.debug("[HACA EntityHealth] Index seeded with %d entities", len(index._last_updated))
+    return index
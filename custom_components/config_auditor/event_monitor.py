@@ -15,6 +15,21 @@ Monitored events
 - scene_reloaded           — scene saved/reloaded
 - config_entry_loaded      — integration added
 - config_entry_unloaded    — integration removed
+
+Event routing
+-------------
+Most events only affect a few analyzers: a reloaded automation file cannot
+change battery levels, a firmware version bump on a device cannot create a
+new issue at all.  ``route_event`` maps each event (type + payload) to the
+minimal set of scan scopes to rerun.  Scopes accumulated during the debounce
+window are merged and handed to the coordinator's ``async_rescan``, which
+reruns only those analyzers and merges their results into the existing
+coordinator data.  A full refresh is still used when an event cannot be
+scoped (label changes, renamed entity_ids) or when the window touched too
+many items for a partial rescan to be worth it.
+
+Reload events caused by HACA's own reloads (see reload_scheduler.py) are
+dropped: the scheduler already rescans the scopes of the files it wrote.
 """
 from __future__ import annotations
 
@@ -25,7 +40,14 @@ from typing import Any
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 
-from .const import DOMAIN, DEFAULT_EVENT_DEBOUNCE_SECONDS
+from .const import (
+    ALL_SCAN_SCOPES,
+    CONFIG_SCAN_SCOPES,
+    DOMAIN,
+    DEFAULT_EVENT_DEBOUNCE_SECONDS,
+    EVENT_FULL_SCAN_THRESHOLD,
+)
+from .reload_scheduler import RELOAD_SCHEDULER_KEY
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,6 +61,115 @@ MONITORED_EVENTS = [
     "config_entry_unloaded",
 ]
 
+EVENT_ROUTER_STATS_KEY = "event_router_stats"
+
+# ── Routing tables ────────────────────────────────────────────────────────
+# Automation / script / scene YAML changed: everything that reads configs.
+_RELOAD_SCOPES = CONFIG_SCAN_SCOPES
+# Entity appeared or disappeared: reference checks, dashboards, compliance.
+_ENTITY_LIFECYCLE_SCOPES = frozenset({
+    "entities", "automations", "dashboards", "compliance",
+})
+# Entity/device (en|dis)abled: same as lifecycle, battery list may change too.
+_DISABLED_SCOPES = _ENTITY_LIFECYCLE_SCOPES | {"batteries"}
+# Metadata-only change (name, icon, area…): entity and compliance checks.
+_METADATA_SCOPES = frozenset({"entities", "compliance"})
+# Integration loaded/unloaded: its entities come and go as unavailable.
+_CONFIG_ENTRY_SCOPES = frozenset({
+    "entities", "automations", "batteries", "compliance",
+})
+_RELOAD_EVENTS = frozenset({"automation_reloaded", "script_reloaded", "scene_reloaded"})
+
+# Changes that invalidate registry-wide joins (haca_ignore set, references
+# by entity_id) — only a full scan is safe.
+_FULL_SCAN_CHANGES = frozenset({"labels", "entity_id"})
+# Device registry fields no analyzer reads.
+_IRRELEVANT_DEVICE_CHANGES = frozenset({
+    "sw_version", "hw_version", "connections", "identifiers",
+    "configuration_url", "modified_at", "model", "model_id", "manufacturer",
+    "via_device_id", "config_entries", "config_entries_subentries",
+    "primary_config_entry", "serial_number",
+})
+
+
+def route_event(event_type: str, data: Any) -> frozenset[str] | None:
+    """Return the scan scopes affected by an event.
+
+    Returns ``None`` when only a full scan is safe and an empty set when the
+    event cannot affect any analyzer result.
+    """
+    if not isinstance(data, dict):
+        data = {}
+    action = data.get("action")
+    changes = data.get("changes")
+    changed = set(changes) if isinstance(changes, dict) else set()
+
+    if event_type in _RELOAD_EVENTS:
+        return _RELOAD_SCOPES
+
+    if event_type == "entity_registry_updated":
+        if action == "update":
+            if changed & _FULL_SCAN_CHANGES:
+                return None
+            if "disabled_by" in changed:
+                return _DISABLED_SCOPES
+            return _METADATA_SCOPES
+        scopes = set(_ENTITY_LIFECYCLE_SCOPES)
+        if str(data.get("entity_id", "")).startswith("sensor."):
+            scopes.add("batteries")
+        if action == "remove":
+            scopes.add("recorder")
+        return frozenset(scopes)
+
+    if event_type == "device_registry_updated":
+        if action == "update":
+            if "labels" in changed:
+                return None
+            if changed and changed <= _IRRELEVANT_DEVICE_CHANGES:
+                return frozenset()
+            if "disabled_by" in changed:
+                return _DISABLED_SCOPES
+        return _METADATA_SCOPES
+
+    if event_type in ("config_entry_loaded", "config_entry_unloaded"):
+        return _CONFIG_ENTRY_SCOPES
+
+    return None
+
+
+def _event_item(event_type: str, data: Any) -> str:
+    """Identify the item an event is about (used to size the debounce window)."""
+    if isinstance(data, dict):
+        for key in ("entity_id", "device_id", "entry_id", "domain"):
+            if data.get(key):
+                return f"{key}:{data[key]}"
+    return event_type
+
+
+class EventRouterStats:
+    """Counters describing how events were turned into scans."""
+
+    def __init__(self) -> None:
+        self.events_received = 0
+        self.events_ignored = 0
+        self.events_self_triggered = 0
+        self.partial_scans = 0
+        self.full_scans = 0
+        self.events_coalesced = 0     # merged into an already pending scan
+        self.last_scope: list[str] = []
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return counters for diagnostics."""
+        return {
+            "events_received": self.events_received,
+            "events_ignored": self.events_ignored,
+            "events_self_triggered": self.events_self_triggered,
+            "partial_scans": self.partial_scans,
+            "full_scans": self.full_scans,
+            "events_coalesced": self.events_coalesced,
+            "last_scope": list(self.last_scope),
+        }
+
 
 def async_setup_event_monitor(
     hass: HomeAssistant,
@@ -55,16 +186,46 @@ def async_setup_event_monitor(
     )
 
     _pending_scan_handle: asyncio.TimerHandle | None = None
+    # Accumulated over the debounce window: merged scopes (None = full scan)
+    # and the distinct items touched.
+    _pending_scopes: set[str] | None = set()
+    _pending_items: set[str] = set()
+
+    stats = EventRouterStats()
+    domain_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if isinstance(domain_data, dict):
+        domain_data[EVENT_ROUTER_STATS_KEY] = stats
 
     @callback
     def _schedule_debounced_scan(event_name: str, event=None) -> None:
-        """Cancel any pending scan and schedule a new one after debounce_seconds."""
-        nonlocal _pending_scan_handle
+        """Merge the event scope and (re)schedule a scan after debounce_seconds."""
+        nonlocal _pending_scan_handle, _pending_scopes
 
         if not monitoring_enabled:
             return
 
+        stats.events_received += 1
+        if event_name in _RELOAD_EVENTS:
+            reloads = hass.data.get(DOMAIN, {}).get(RELOAD_SCHEDULER_KEY)
+            if reloads is not None and reloads.is_self_reload(event_name):
+                stats.events_self_triggered += 1
+                _LOGGER.debug("[HACA Monitor] '%s' caused by HACA — rescan already scheduled", event_name)
+                return
+        data = getattr(event, "data", None)
+        scopes = route_event(event_name, data)
+        if scopes is not None and not scopes:
+            stats.events_ignored += 1
+            _LOGGER.debug("[HACA Monitor] Event '%s' does not affect any analyzer", event_name)
+            return
+
+        if scopes is None or _pending_scopes is None:
+            _pending_scopes = None
+        else:
+            _pending_scopes |= scopes
+        _pending_items.add(_event_item(event_name, data))
+
         if _pending_scan_handle is not None:
+            stats.events_coalesced += 1
             _pending_scan_handle.cancel()
             _pending_scan_handle = None
 
@@ -74,15 +235,42 @@ def async_setup_event_monitor(
         )
 
         def _fire_scan() -> None:
-            nonlocal _pending_scan_handle
+            nonlocal _pending_scan_handle, _pending_scopes
             _pending_scan_handle = None
+            scopes = _pending_scopes
+            items = len(_pending_items)
+            _pending_scopes = set()
+            _pending_items.clear()
+
             domain_data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
             coord = domain_data.get("coordinator")
-            if coord:
+            if not coord:
+                return
+            rescan = domain_data.get("async_rescan")
+            if (
+                rescan is not None
+                and scopes is not None
+                and items <= EVENT_FULL_SCAN_THRESHOLD
+                and not ALL_SCAN_SCOPES <= scopes
+            ):
+                stats.partial_scans += 1
+                stats.last_scope = sorted(scopes)
                 _LOGGER.info(
-                    "[HACA Monitor] Debounced scan triggered by event '%s'", event_name
+                    "[HACA Monitor] Debounced partial scan triggered by event '%s' — %s",
+                    event_name, ", ".join(stats.last_scope),
                 )
-                hass.async_create_task(coord.async_refresh())
+                hass.async_create_task(rescan(frozenset(scopes)))
+                return
+
+            stats.full_scans += 1
+            stats.last_scope = sorted(ALL_SCAN_SCOPES)
+            _LOGGER.info(
+                "[HACA Monitor] Debounced scan triggered by event '%s'", event_name
+            )
+            scheduler = domain_data.get("scan_scheduler")
+            if scheduler is not None:
+                scheduler.request_full()
+            hass.async_create_task(coord.async_refresh())
 
         _pending_scan_handle = hass.loop.call_later(debounce_seconds, _fire_scan)
 
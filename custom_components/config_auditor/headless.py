@@ -0,0 +1,358 @@
+"""H.A.C.A — Headless audits: a HomeAssistant stand-in built from files.
+
+Every analyzer takes a live ``HomeAssistant`` object, yet most of them only
+read configuration files and registries.  ``HeadlessHass`` provides just
+what those analyzers touch, from a configuration directory and (optionally)
+the ``.storage`` registries next to it:
+
+  • ``config`` — config_dir, language, ``path()``;
+  • the entity, device, area, floor and label registries loaded from
+    ``core.*_registry`` and installed where the ``er/dr/ar/fr/lr`` helpers
+    look them up, plus the config entries of ``core.config_entries``;
+  • ``states`` — one placeholder state per enabled registry entity, with
+    the attributes the registry knows (friendly_name, device_class,
+    unit, capabilities such as ``state_class``) so existence and naming
+    checks behave as on the live instance.  The state value itself is
+    ``HEADLESS_STATE``, never "unavailable"/"unknown";
+  • executor jobs run inline, background tasks are dropped, no event is
+    ever fired and no service is registered (service checks are skipped).
+
+Analyzers that need live data — entity availability, battery levels, the
+recorder database — have nothing to work on here; ``HEADLESS_SCOPES`` lists
+the scan scopes that do not.  The CLI (cli.py) drives a ``ScanPipeline``
+over this object.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import importlib
+import json
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from .const import DOMAIN, HEADLESS_STATE
+
+_LOGGER = logging.getLogger(__name__)
+
+# Scan scopes answered from configuration files and registries alone
+HEADLESS_SCOPES = frozenset({
+    "automations", "performance", "security", "dashboards", "compliance",
+})
+# ... of which these compare references against known entities: without an
+# entity registry every reference would look missing
+REGISTRY_SCOPES = frozenset({"dashboards"})
+
+# Fields absent from older .storage schema versions
+_ENTITY_DEFAULTS: dict[str, Any] = {
+    "platform": "unknown", "unique_id": None, "device_id": None, "area_id": None,
+    "config_entry_id": None, "disabled_by": None, "hidden_by": None,
+    "entity_category": None, "icon": None, "name": None, "original_name": None,
+    "device_class": None, "original_device_class": None, "unit_of_measurement": None,
+    "capabilities": None, "options": {}, "aliases": [],
+}
+_DEVICE_DEFAULTS: dict[str, Any] = {
+    "area_id": None, "name": None, "name_by_user": None, "manufacturer": None,
+    "model": None, "sw_version": None, "disabled_by": None, "via_device_id": None,
+    "config_entries": [],
+}
+_AREA_DEFAULTS: dict[str, Any] = {"floor_id": None, "icon": None, "aliases": []}
+_FLOOR_DEFAULTS: dict[str, Any] = {"level": None, "icon": None, "aliases": []}
+_LABEL_DEFAULTS: dict[str, Any] = {"color": None, "icon": None, "description": None}
+
+
+def _load_storage(storage_dir: Path | None, key: str) -> dict[str, Any]:
+    """Return the ``data`` section of a ``.storage`` file ({} when absent)."""
+    if storage_dir is None:
+        return {}
+    path = storage_dir / key
+    if not path.is_file():
+        return {}
+    try:
+        content = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as err:
+        _LOGGER.warning("[HACA Headless] Cannot read %s: %s", path, err)
+        return {}
+    data = content.get("data") if isinstance(content, dict) else None
+    return data if isinstance(data, dict) else {}
+
+
+def _record(item: dict[str, Any], defaults: dict[str, Any]) -> SimpleNamespace:
+    """Registry entry object: stored fields over defaults, labels as a set."""
+    fields = {**defaults, **item}
+    if "labels" in fields:
+        fields["labels"] = set(fields.get("labels") or ())
+    return SimpleNamespace(**fields)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Registries
+# ═══════════════════════════════════════════════════════════════════════════
+
+class _EntityItems(dict):
+    """entity_id → entry, with the lookup helpers of HA's EntityRegistryItems."""
+
+    def get_entries_for_device_id(self, device_id: str, include_disabled: bool = False) -> list:
+        return [
+            e for e in self.values()
+            if e.device_id == device_id and (include_disabled or not e.disabled_by)
+        ]
+
+    def get_entries_for_config_entry_id(self, config_entry_id: str) -> list:
+        return [e for e in self.values() if e.config_entry_id == config_entry_id]
+
+
+class HeadlessEntityRegistry:
+    """Read-only entity registry loaded from ``core.entity_registry``."""
+
+    def __init__(self, items: Iterable[dict[str, Any]] = ()) -> None:
+        self.entities = _EntityItems()
+        for item in items:
+            if not isinstance(item, dict) or "entity_id" not in item:
+                continue
+            entry = _record({"labels": (), **item}, _ENTITY_DEFAULTS)
+            entry.domain = entry.entity_id.split(".", 1)[0]
+            self.entities[entry.entity_id] = entry
+
+    def async_get(self, entity_id: str) -> SimpleNamespace | None:
+        return self.entities.get(entity_id)
+
+    def async_get_entity_id(self, domain: str, platform: str, unique_id: str) -> str | None:
+        for entry in self.entities.values():
+            if entry.domain == domain and entry.platform == platform and entry.unique_id == unique_id:
+                return entry.entity_id
+        return None
+
+
+class HeadlessDeviceRegistry:
+    """Read-only device registry loaded from ``core.device_registry``."""
+
+    def __init__(self, items: Iterable[dict[str, Any]] = ()) -> None:
+        self.devices: dict[str, SimpleNamespace] = {
+            item["id"]: _record({"labels": (), **item}, _DEVICE_DEFAULTS)
+            for item in items
+            if isinstance(item, dict) and "id" in item
+        }
+
+    def async_get(self, device_id: str) -> SimpleNamespace | None:
+        return self.devices.get(device_id)
+
+
+class HeadlessListRegistry:
+    """Area / floor / label registry (``async_list_*`` + ``async_get_*``)."""
+
+    def __init__(
+        self, items: Iterable[dict[str, Any]], key_attr: str, defaults: dict[str, Any]
+    ) -> None:
+        self.items: dict[str, SimpleNamespace] = {}
+        for item in items:
+            if isinstance(item, dict) and key_attr in item:
+                entry = _record({"name": item[key_attr], **item}, defaults)
+                self.items[getattr(entry, key_attr)] = entry
+
+    def _list(self) -> list:
+        return list(self.items.values())
+
+    def _get(self, item_id: str) -> SimpleNamespace | None:
+        return self.items.get(item_id)
+
+    async_list_areas = async_list_floors = async_list_labels = _list
+    async_get_area = async_get_floor = async_get_label = _get
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# States, config entries, services
+# ═══════════════════════════════════════════════════════════════════════════
+
+class HeadlessState:
+    """Placeholder state of a registered entity."""
+
+    __slots__ = ("entity_id", "domain", "object_id", "state", "attributes",
+                 "last_changed", "last_updated")
+
+    def __init__(self, entity_id: str, attributes: dict[str, Any]) -> None:
+        self.entity_id = entity_id
+        self.domain, _, self.object_id = entity_id.partition(".")
+        self.state = HEADLESS_STATE
+        self.attributes = attributes
+        # No history offline: nothing is ever stale
+        self.last_changed = self.last_updated = None
+
+
+def _state_attributes(entry: SimpleNamespace) -> dict[str, Any]:
+    """Attributes HA derives from the registry alone."""
+    attributes: dict[str, Any] = dict(entry.capabilities or {})
+    name = entry.name or entry.original_name
+    if name:
+        attributes["friendly_name"] = name
+    device_class = entry.device_class or entry.original_device_class
+    if device_class:
+        attributes["device_class"] = device_class
+    if entry.unit_of_measurement:
+        attributes["unit_of_measurement"] = entry.unit_of_measurement
+    if entry.icon:
+        attributes["icon"] = entry.icon
+    return attributes
+
+
+class HeadlessStates:
+    """``hass.states`` subset: get / async_all / async_entity_ids."""
+
+    def __init__(self, registry: HeadlessEntityRegistry) -> None:
+        # HA never creates a state for a disabled entity
+        self._states: dict[str, HeadlessState] = {
+            entry.entity_id: HeadlessState(entry.entity_id, _state_attributes(entry))
+            for entry in registry.entities.values()
+            if not entry.disabled_by
+        }
+
+    def get(self, entity_id: str) -> HeadlessState | None:
+        return self._states.get(entity_id)
+
+    def async_all(self, domain_filter: str | Iterable[str] | None = None) -> list[HeadlessState]:
+        if domain_filter is None:
+            return list(self._states.values())
+        domains = {domain_filter} if isinstance(domain_filter, str) else set(domain_filter)
+        return [s for s in self._states.values() if s.domain in domains]
+
+    def async_entity_ids(self, domain_filter: str | Iterable[str] | None = None) -> list[str]:
+        return [s.entity_id for s in self.async_all(domain_filter)]
+
+    def async_entity_ids_count(self, domain_filter: str | None = None) -> int:
+        return len(self.async_all(domain_filter))
+
+
+class HeadlessConfigEntries:
+    """Config entries of ``core.config_entries`` (never loaded)."""
+
+    def __init__(self, items: Iterable[dict[str, Any]] = ()) -> None:
+        self._entries: dict[str, SimpleNamespace] = {}
+        for item in items:
+            if not isinstance(item, dict) or "entry_id" not in item:
+                continue
+            # Entry ``data`` holds credentials and is not needed by any analyzer
+            self._entries[item["entry_id"]] = SimpleNamespace(
+                entry_id=item["entry_id"],
+                domain=item.get("domain"),
+                title=item.get("title"),
+                source=item.get("source"),
+                disabled_by=item.get("disabled_by"),
+                options=dict(item.get("options") or {}),
+                state=SimpleNamespace(value="not_loaded", recoverable=True),
+            )
+
+    def async_get_entry(self, entry_id: str) -> SimpleNamespace | None:
+        return self._entries.get(entry_id)
+
+    def async_entries(self, domain: str | None = None, **_kwargs: Any) -> list[SimpleNamespace]:
+        return [e for e in self._entries.values() if domain is None or e.domain == domain]
+
+
+class HeadlessServices:
+    """No integration is loaded, so no service is registered."""
+
+    def async_services(self) -> dict[str, dict[str, Any]]:
+        return {}
+
+    def has_service(self, domain: str, service: str) -> bool:
+        return False
+
+    async def async_call(self, *args: Any, **kwargs: Any) -> None:
+        raise RuntimeError("service calls are not available in a headless audit")
+
+
+class _HeadlessBus:
+    def async_fire(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
+    def async_listen(self, *args: Any, **kwargs: Any) -> Callable[[], None]:
+        return lambda: None
+
+
+class HeadlessConfig:
+    """``hass.config`` subset."""
+
+    def __init__(self, config_dir: Path, language: str) -> None:
+        self.config_dir = str(config_dir)
+        self.language = language
+        self.time_zone = "UTC"
+        self.components: set[str] = set()
+
+    def path(self, *parts: str) -> str:
+        return str(Path(self.config_dir, *parts))
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# HeadlessHass
+# ═══════════════════════════════════════════════════════════════════════════
+
+class HeadlessHass:
+    """Lightweight HomeAssistant stand-in for config-only audits."""
+
+    def __init__(
+        self,
+        config_dir: str | Path,
+        *,
+        storage_dir: str | Path | None = None,
+        language: str = "en",
+    ) -> None:
+        root = Path(config_dir).resolve()
+        if not (root / "configuration.yaml").is_file():
+            raise ValueError(f"{root} has no configuration.yaml")
+        storage = Path(storage_dir).resolve() if storage_dir else root / ".storage"
+        self.storage_dir: Path | None = storage if storage.is_dir() else None
+
+        self.config = HeadlessConfig(root, language)
+        self.bus = _HeadlessBus()
+        self.services = HeadlessServices()
+        self.loop = None
+
+        entities = _load_storage(self.storage_dir, "core.entity_registry")
+        self.entity_registry = HeadlessEntityRegistry(entities.get("entities", []))
+        self.device_registry = HeadlessDeviceRegistry(
+            _load_storage(self.storage_dir, "core.device_registry").get("devices", [])
+        )
+        self.has_entity_registry = bool(entities)
+        self.states = HeadlessStates(self.entity_registry)
+        self.config_entries = HeadlessConfigEntries(
+            _load_storage(self.storage_dir, "core.config_entries").get("entries", [])
+        )
+
+        self.data: dict[Any, Any] = {DOMAIN: {}}
+        for module, registry in (
+            ("entity_registry", self.entity_registry),
+            ("device_registry", self.device_registry),
+            ("area_registry", HeadlessListRegistry(
+                _load_storage(self.storage_dir, "core.area_registry").get("areas", []),
+                "id", _AREA_DEFAULTS,
+            )),
+            ("floor_registry", HeadlessListRegistry(
+                _load_storage(self.storage_dir, "core.floor_registry").get("floors", []),
+                "floor_id", _FLOOR_DEFAULTS,
+            )),
+            ("label_registry", HeadlessListRegistry(
+                _load_storage(self.storage_dir, "core.label_registry").get("labels", []),
+                "label_id", _LABEL_DEFAULTS,
+            )),
+        ):
+            key = importlib.import_module(f"homeassistant.helpers.{module}").DATA_REGISTRY
+            self.data[key] = registry
+
+    @property
+    def scan_scopes(self) -> frozenset[str]:
+        """Scopes this instance can answer (see ``HEADLESS_SCOPES``)."""
+        if self.has_entity_registry:
+            return HEADLESS_SCOPES
+        return HEADLESS_SCOPES - REGISTRY_SCOPES
+
+    async def async_add_executor_job(self, func: Callable[..., Any], *args: Any) -> Any:
+        # One audit per process: blocking here costs nothing
+        return func(*args)
+
+    def async_create_task(self, coro: Any, *args: Any, **kwargs: Any) -> None:
+        # Background work (backups, notifications…) has no place offline
+        coro.close()
+
+    def async_create_background_task(self, coro: Any, *args: Any, **kwargs: Any) -> None:
+        coro.close()
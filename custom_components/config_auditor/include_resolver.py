@@ -0,0 +1,420 @@
+"""H.A.C.A — Include-directive resolver for split YAML configurations.
+
+Home Assistant configurations are commonly split with ``!include``,
+``!include_dir_list``, ``!include_dir_named``, ``!include_dir_merge_list``,
+``!include_dir_merge_named`` and ``!secret``, nested to any depth, and
+``homeassistant: packages:`` pulls in whole directories.  ``yaml.safe_load``
+rejects all of these tags.
+
+``ConfigResolver`` parses configuration.yaml the way Home Assistant does:
+
+  • each file is parsed once with ``HacaYamlLoader`` (include tags become
+    ``IncludeTag`` markers) through the shared ``ParsedConfigCache``;
+  • markers are then expanded recursively, which yields the full
+    configuration plus the file → included-files graph;
+  • the composed result is cached by the mtimes of every file and
+    directory it depends on, so an unchanged split config costs one
+    ``stat()`` per file on the next scan;
+  • every file in the graph is registered with the cache, so the config
+    watcher follows exactly those files.
+
+``!secret`` values are deliberately NOT expanded: audit results are
+displayed, exported in reports and sent to AI providers.  The value is
+replaced by the ``"!secret <name>"`` placeholder.
+
+All public methods block on file I/O — run them in an executor job.
+"""
+from __future__ import annotations
+
+import copy
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+import yaml
+
+_LOGGER = logging.getLogger(__name__)
+
+CONFIG_RESOLVER_KEY = "config_resolver"
+
+SECRET_YAML = "secrets.yaml"
+
+INCLUDE_TAGS = (
+    "!include",
+    "!include_dir_list",
+    "!include_dir_named",
+    "!include_dir_merge_list",
+    "!include_dir_merge_named",
+)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# YAML loader
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+@dataclass(frozen=True)
+class IncludeTag:
+    """Unexpanded include directive found in a parsed file."""
+
+    tag: str
+    target: str
+
+
+class HacaYamlLoader(yaml.SafeLoader):
+    """SafeLoader that understands Home Assistant's custom tags."""
+
+
+def _construct_include(loader: HacaYamlLoader, node: yaml.Node) -> IncludeTag:
+    return IncludeTag(node.tag, str(loader.construct_scalar(node)).strip())
+
+
+def _construct_placeholder(loader: HacaYamlLoader, node: yaml.Node) -> str:
+    # !secret / !env_var / !input — keep the reference, never the value
+    return f"{node.tag} {loader.construct_scalar(node)}".strip()
+
+
+def _construct_unknown(loader: HacaYamlLoader, tag_suffix: str, node: yaml.Node) -> Any:
+    if isinstance(node, yaml.MappingNode):
+        return loader.construct_mapping(node, deep=True)
+    if isinstance(node, yaml.SequenceNode):
+        return loader.construct_sequence(node, deep=True)
+    return loader.construct_scalar(node)
+
+
+for _tag in INCLUDE_TAGS:
+    HacaYamlLoader.add_constructor(_tag, _construct_include)
+for _tag in ("!secret", "!env_var", "!input"):
+    HacaYamlLoader.add_constructor(_tag, _construct_placeholder)
+HacaYamlLoader.add_multi_constructor("!", _construct_unknown)
+
+
+def parse_yaml(stream: Any) -> Any:
+    """Parse a YAML stream with ``HacaYamlLoader``."""
+    return yaml.load(stream, Loader=HacaYamlLoader)  # noqa: S506 — SafeLoader subclass
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Resolution
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class ResolvedConfig:
+    """Fully expanded YAML tree plus the files it was built from."""
+
+    root: str
+    data: Any
+    # every file / include directory read while expanding ``root``
+    files: frozenset[str] = frozenset()
+    dirs: frozenset[str] = frozenset()
+    # file → files and directories it includes directly
+    graph: dict[str, frozenset[str]] = field(default_factory=dict)
+    # id(dict) → (the dict, absolute path of the file it was read from); the
+    # dict is kept alive so its id is never reused by another object
+    _sources: dict[int, tuple[Any, str]] = field(default_factory=dict, repr=False)
+
+    def source_of(self, obj: Any) -> str | None:
+        """Return the file a top-level item of an included file came from."""
+        entry = self._sources.get(id(obj))
+        return entry[1] if entry is not None and entry[0] is obj else None
+
+    def copy(self) -> "ResolvedConfig":
+        """Deep copy that keeps ``source_of`` working on the copied objects."""
+        memo: dict[int, Any] = {}
+        data = copy.deepcopy(self.data, memo)
+        sources = {
+            id(memo[oid]): (memo[oid], src)
+            for oid, (_obj, src) in self._sources.items() if oid in memo
+        }
+        return ResolvedConfig(
+            self.root, data, self.files, self.dirs, self.graph, sources
+        )
+
+
+def _walk_yaml_files(directory: str) -> tuple[list[str], list[str]]:
+    """Return (yaml files, directories walked) the way HA's loader finds them."""
+    files: list[str] = []
+    dirs: list[str] = []
+    for root, subdirs, names in os.walk(directory):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith("."))
+        dirs.append(root)
+        for name in sorted(names):
+            if name.startswith(".") or name == SECRET_YAML:
+                continue
+            if name.endswith(".yaml"):
+                files.append(os.path.join(root, name))
+    return files, dirs
+
+
+def _signature(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class _Composer:
+    """Expands the include markers of one root file (single use)."""
+
+    def __init__(self, resolver: "ConfigResolver", scopes: frozenset[str]) -> None:
+        self._resolver = resolver
+        self._scopes = scopes
+        self.files: set[str] = set()
+        self.dirs: set[str] = set()
+        self.graph: dict[str, set[str]] = {}
+        self.sources: dict[int, tuple[Any, str]] = {}
+        self._stack: list[str] = []
+
+    def load_file(self, path: str) -> Any:
+        path = os.path.abspath(path)
+        if path in self._stack:
+            _LOGGER.warning(
+                "[HACA Includes] circular include ignored: %s",
+                " → ".join(self._stack + [path]),
+            )
+            return None
+        self.files.add(path)
+        self.graph.setdefault(path, set())
+        try:
+            raw = self._resolver.cache.load(path, self._scopes, copy=False)
+        except FileNotFoundError:
+            _LOGGER.debug("[HACA Includes] missing include: %s", path)
+            return None
+        except Exception as err:
+            _LOGGER.warning("[HACA Includes] cannot parse %s: %s", path, err)
+            return None
+        self._stack.append(path)
+        try:
+            content = self._expand(raw, path)
+        finally:
+            self._stack.pop()
+        self._register_sources(content, path)
+        return content
+
+    def _register_sources(self, content: Any, path: str) -> None:
+        if isinstance(content, dict):
+            self.sources.setdefault(id(content), (content, path))
+            items: Iterable[Any] = content.values()
+        elif isinstance(content, list):
+            items = content
+        else:
+            return
+        for item in items:
+            if isinstance(item, dict):
+                self.sources.setdefault(id(item), (item, path))
+
+    def _expand(self, node: Any, current: str) -> Any:
+        # Containers are always rebuilt: cached parse trees are never mutated
+        if isinstance(node, IncludeTag):
+            return self._include(node, current)
+        if isinstance(node, dict):
+            return {k: self._expand(v, current) for k, v in node.items()}
+        if isinstance(node, list):
+            return [self._expand(v, current) for v in node]
+        return node
+
+    def _include(self, tag: IncludeTag, current: str) -> Any:
+        target = os.path.normpath(os.path.join(os.path.dirname(current), tag.target))
+        self.graph[current].add(target)
+
+        if tag.tag == "!include":
+            return self.load_file(target)
+
+        if not os.path.isdir(target):
+            _LOGGER.debug("[HACA Includes] missing include directory: %s", target)
+            return [] if tag.tag in ("!include_dir_list", "!include_dir_merge_list") else {}
+        self._resolver.cache.track_dir(target, self._scopes)
+        files, walked = _walk_yaml_files(target)
+        self.dirs.update(walked)
+
+        if tag.tag == "!include_dir_list":
+            return [self.load_file(f) for f in files]
+        if tag.tag == "!include_dir_named":
+            return {Path(f).stem: self.load_file(f) for f in files}
+        if tag.tag == "!include_dir_merge_list":
+            merged: list = []
+            for f in files:
+                loaded = self.load_file(f)
+                if isinstance(loaded, list):
+                    merged.extend(loaded)
+            return merged
+        # !include_dir_merge_named
+        mapping: dict = {}
+        for f in files:
+            loaded = self.load_file(f)
+            if isinstance(loaded, dict):
+                mapping.update(loaded)
+        return mapping
+
+
+class ConfigResolver:
+    """Resolve HA include directives, caching results by dependency mtimes."""
+
+    def __init__(self, cache: Any) -> None:
+        # ParsedConfigCache (config_watcher) — typed loosely to avoid a cycle
+        self.cache = cache
+        self._lock = threading.Lock()
+        # root → (signature of every dependency, resolved config)
+        self._resolved: dict[str, tuple[dict[str, Any], ResolvedConfig]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, path: str | Path, scopes: Iterable[str]) -> ResolvedConfig:
+        """Return the fully expanded content of ``path`` (a private copy).
+
+        Raises FileNotFoundError if ``path`` itself does not exist; broken
+        includes below it are logged and resolve to empty values.
+        """
+        return self._resolve_shared(path, scopes).copy()
+
+    def _resolve_shared(self, path: str | Path, scopes: Iterable[str]) -> ResolvedConfig:
+        """Like ``resolve`` but return the cached tree itself — never mutate it."""
+        root = os.path.abspath(str(path))
+        scopes = frozenset(scopes)
+        if not os.path.isfile(root):
+            raise FileNotFoundError(root)
+
+        with self._lock:
+            cached = self._resolved.get(root)
+        if cached is not None:
+            deps, resolved = cached
+            if all(_signature(p) == sig for p, sig in deps.items()):
+                self.hits += 1
+                # Keep the dependencies registered for the requested scopes
+                for f in resolved.files:
+                    self.cache.add_scopes(f, scopes)
+                for d in resolved.dirs:
+                    self.cache.track_dir(d, scopes)
+                return resolved
+
+        self.misses += 1
+        composer = _Composer(self, scopes)
+        data = composer.load_file(root)
+        resolved = ResolvedConfig(
+            root=root,
+            data=data,
+            files=frozenset(composer.files),
+            dirs=frozenset(composer.dirs),
+            graph={f: frozenset(inc) for f, inc in composer.graph.items()},
+            _sources=composer.sources,
+        )
+        deps = {p: _signature(p) for p in (*resolved.files, *resolved.dirs)}
+        with self._lock:
+            self._resolved[root] = (deps, resolved)
+        _LOGGER.debug(
+            "[HACA Includes] %s resolved — %d files, %d directories",
+            os.path.basename(root), len(resolved.files), len(resolved.dirs),
+        )
+        return resolved
+
+    def collect_domain_items(
+        self,
+        config_dir: str | Path,
+        domain: str,
+        scopes: Iterable[str],
+        *,
+        named: bool = False,
+        default_file: str | None = None,
+    ) -> list[tuple[str, Any]]:
+        """Return ``(source_file, item)`` for every ``domain`` entry of the config.
+
+        Covers configuration.yaml (``domain:`` and ``domain <label>:`` keys)
+        and every package.  For list domains (automation, scene, sensor…)
+        each item is one config; with ``named=True`` (script…) items are
+        ``(key, config)`` pairs.
+
+        Legacy fallbacks, for configs that do not reference them:
+        ``default_file`` (e.g. automations.yaml) and ``packages/*.yaml``.
+
+        Only the returned items are copied, not the whole resolved config.
+        """
+        config_dir = os.path.abspath(str(config_dir))
+        results: list[tuple[str, Any]] = []
+        resolved_files: frozenset[str] = frozenset()
+
+        def _src(resolved: ResolvedConfig, obj: Any, default: str) -> str:
+            path = resolved.source_of(obj)
+            return os.path.relpath(path, config_dir) if path else default
+
+        def _add(resolved: ResolvedConfig, block: Any, default_src: str) -> None:
+            if not isinstance(block, dict):
+                return
+            block_src = _src(resolved, block, default_src)
+            for key, value in block.items():
+                if key != domain and not str(key).startswith(f"{domain} "):
+                    continue
+                section_src = _src(resolved, value, block_src)
+                if named:
+                    if isinstance(value, dict):
+                        for name, cfg in value.items():
+                            results.append((_src(resolved, cfg, section_src), (name, cfg)))
+                    continue
+                items = [value] if isinstance(value, dict) else value
+                if isinstance(items, list):
+                    for item in items:
+                        results.append((_src(resolved, item, section_src), item))
+
+        config_yaml = os.path.join(config_dir, "configuration.yaml")
+        has_packages = False
+        if os.path.isfile(config_yaml):
+            resolved = self._resolve_shared(config_yaml, scopes)
+            resolved_files = resolved.files
+            _add(resolved, resolved.data, "configuration.yaml")
+            core = resolved.data.get("homeassistant") if isinstance(resolved.data, dict) else None
+            packages = core.get("packages") if isinstance(core, dict) else None
+            if isinstance(packages, dict) and packages:
+                has_packages = True
+                for pkg in packages.values():
+                    _add(resolved, pkg, _src(resolved, pkg, "configuration.yaml"))
+
+        if default_file:
+            default_path = os.path.join(config_dir, default_file)
+            if default_path not in resolved_files and os.path.isfile(default_path):
+                resolved = self._resolve_shared(default_path, scopes)
+                _add(resolved, {domain: resolved.data}, default_file)
+
+        packages_dir = os.path.join(config_dir, "packages")
+        if not has_packages and os.path.isdir(packages_dir):
+            self.cache.track_dir(packages_dir, scopes)
+            files, _dirs = _walk_yaml_files(packages_dir)
+            for f in files:
+                if f in resolved_files:
+                    continue
+                resolved = self._resolve_shared(f, scopes)
+                rel = os.path.relpath(f, config_dir)
+                _add(resolved, resolved.data, rel)
+                # Older HACA versions also accepted homeassistant: automation:
+                core = resolved.data.get("homeassistant") if isinstance(resolved.data, dict) else None
+                _add(resolved, core, rel)
+
+        return copy.deepcopy(results)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return resolver statistics for diagnostics."""
+        return {
+            "roots": len(self._resolved),
+            "files": len({f for _, r in self._resolved.values() for f in r.files}),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def get_config_resolver(hass: Any) -> ConfigResolver:
+    """Return the shared include resolver (created on first use).
+
+    Must be called from the event loop, before handing work to an executor.
+    """
+    from .config_watcher import get_parsed_config_cache
+    from .const import DOMAIN
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    resolver = domain_data.get(CONFIG_RESOLVER_KEY)
+    if resolver is None:
+        resolver = ConfigResolver(get_parsed_config_cache(hass))
+        domain_data[CONFIG_RESOLVER_KEY] = resolver
+    return resolver
@@ -19,9 +19,10 @@ from pathlib import Path
 from typing import Any
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import entity_registry as er
 from homeassistant.loader import async_get_integrations, Integration
 
+from .registry_snapshot import RegistrySnapshot, async_build_registry_snapshot
+
 _LOGGER = logging.getLogger(__name__)
 
 # Integration types
@@ -50,22 +51,16 @@ class IntegrationAnalyzer:
     def __init__(self, hass: HomeAssistant) -> None:
         self.hass = hass
 
-    async def async_analyze(self) -> dict[str, Any]:
+    async def async_analyze(
+        self, snapshot: RegistrySnapshot | None = None
+    ) -> dict[str, Any]:
         """Run the full integration analysis."""
         hass = self.hass
         results: list[dict[str, Any]] = []
 
-        # ── 1. Gather entity counts per config_entry ──────────────────────
-        entity_reg = er.async_get(hass)
-        entities_by_domain: dict[str, int] = {}
-        entities_by_entry: dict[str, int] = {}
-        for entry in entity_reg.entities.values():
-            domain = entry.platform or ""
-            entities_by_domain[domain] = entities_by_domain.get(domain, 0) + 1
-            if entry.config_entry_id:
-                entities_by_entry[entry.config_entry_id] = (
-                    entities_by_entry.get(entry.config_entry_id, 0) + 1
-                )
+        # ── 1. Entity counts per platform (precomputed in the snapshot) ───
+        snapshot = snapshot or async_build_registry_snapshot(hass)
+        entities_by_domain = snapshot.entity_count_by_platform
 
         # ── 2. Config entries — track active and disabled separately ─────
         config_entries = hass.config_entries.async_entries()
@@ -0,0 +1,99 @@
+"""Background job queues — the part shared by report and AI jobs.
+
+``JobQueue`` keeps the jobs of one config entry, runs them one at a time
+behind a lock, keeps the last ``MAX_FINISHED_JOBS`` finished ones for the
+status calls and cancels the others on unload.  Subclasses implement
+``_async_run`` (the work of one job) and ``_fire`` (its progress event).
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Generic, Protocol, TypeVar
+import uuid
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+MAX_FINISHED_JOBS = 10      # finished jobs kept for the status calls
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+
+class Job(Protocol):
+    """Attributes the queue relies on (the job classes are dataclasses)."""
+
+    job_id: str
+    status: str
+    created: float
+    finished: float | None
+    task: asyncio.Task | None
+
+
+J = TypeVar("J", bound=Job)
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class JobQueue(Generic[J]):
+    """Run the jobs of one config entry in the background, one at a time."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._lock = asyncio.Lock()
+        self._jobs: dict[str, J] = {}
+
+    def _default_language(self) -> str:
+        return (
+            self.hass.data.get(DOMAIN, {}).get("user_language")
+            or self.hass.config.language
+            or "en"
+        )
+
+    @callback
+    def _start(self, job: J) -> None:
+        self._jobs[job.job_id] = job
+        self._prune()
+        job.task = self.hass.loop.create_task(self._async_run(job))
+        self._fire(job)
+
+    def get(self, job_id: str) -> J | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[J]:
+        """Return known jobs, newest first."""
+        return sorted(self._jobs.values(), key=lambda j: j.created, reverse=True)
+
+    async def async_wait(self, job: J) -> J:
+        """Wait for ``job`` to finish (its failure is recorded, not raised)."""
+        if job.task is not None:
+            await asyncio.shield(job.task)
+        return job
+
+    async def async_cancel(self) -> None:
+        """Cancel queued and running jobs (entry unload)."""
+        tasks = [j.task for j in self._jobs.values() if j.task and not j.task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.status in FINISHED_STATUSES]
+        finished.sort(key=lambda j: j.finished or 0.0)
+        for job in finished[:-MAX_FINISHED_JOBS]:
+            del self._jobs[job.job_id]
+
+    async def _async_run(self, job: J) -> None:
+        raise NotImplementedError
+
+    @callback
+    def _fire(self, job: J, *args: Any) -> None:
+        raise NotImplementedError
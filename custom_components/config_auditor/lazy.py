@@ -0,0 +1,86 @@
+"""Deferred loading of optional subsystems.
+
+The MCP server, the report generator, the refactoring assistant, the
+automation optimizer and the AI helpers are large modules that many
+installations never use.  They are no longer imported with the integration:
+
+* ``async_import`` imports a sibling module in the executor on first use
+  (importing on the event loop would block it and trips HA's blocking-call
+  detector) and returns the cached module afterwards;
+* ``LazyInstance`` stands in for a per-entry subsystem object in
+  ``hass.data``: the module is imported and the object built the first
+  time it is needed.  Async callers use ``async_resolve`` so the import
+  happens in the executor; plain attribute access still works (it imports
+  synchronously) for the few synchronous call sites.
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import sys
+from types import ModuleType
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+_PACKAGE = __package__
+
+
+def _module_name(name: str) -> str:
+    return f"{_PACKAGE}.{name}"
+
+
+async def async_import(hass: HomeAssistant, name: str) -> ModuleType:
+    """Return sibling module ``name``, importing it in the executor if needed."""
+    full_name = _module_name(name)
+    module = sys.modules.get(full_name)
+    if module is None:
+        module = await hass.async_add_executor_job(importlib.import_module, full_name)
+        _LOGGER.debug("[HACA Lazy] Loaded %s on first use", name)
+    return module
+
+
+class LazyInstance:
+    """Build ``<module>.<factory>(hass)`` on first use."""
+
+    def __init__(self, hass: HomeAssistant, module: str, factory: str) -> None:
+        self._hass = hass
+        self._module = module
+        self._factory = factory
+        self._instance: Any = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> Any:
+        """Return the instance, importing its module synchronously if needed."""
+        if self._instance is None:
+            module = importlib.import_module(_module_name(self._module))
+            self._instance = getattr(module, self._factory)(self._hass)
+        return self._instance
+
+    async def async_get(self) -> Any:
+        """Return the instance, importing its module in the executor if needed."""
+        if self._instance is None:
+            await async_import(self._hass, self._module)
+        return self.get()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes LazyInstance itself does not define
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyInstance {self._module}.{self._factory} ({state})>"
+
+
+async def async_resolve(obj: Any) -> Any:
+    """Return the object behind a ``LazyInstance`` (other values unchanged)."""
+    if isinstance(obj, LazyInstance):
+        return await obj.async_get()
+    return obj
@@ -6,9 +6,22 @@ Configuration utilisateur (une seule fois) :
 Ensuite, chaque appel à async_converse sur cet agent injecte automatiquement
 les outils HACA. L'agent fait ses tool_calls nativement, HA route vers
 HacaTool.async_call → TOOL_HANDLERS → exécution réelle.
+
+``async_get_api_instance`` runs on every conversation turn, so it does as
+little work as possible:
+
+  • the system prompt is cached per language and rebuilt only when the
+    coordinator publishes new data (or the automation / script counts or
+    the tool set change);
+  • the ``HacaTool`` wrappers are built once, on the first turn;
+  • with the ``llm_tool_set`` option set to "essentials", agents only see
+    the HACA audit tools plus the few HA tools they need around them (and
+    the prompt drops the dashboard / script workflows) — far fewer prompt
+    tokens for voice assistants.
 """
 from __future__ import annotations
 
+import heapq
 import logging
 from typing import Any
 
@@ -20,12 +33,24 @@ from homeassistant.helpers import llm
 from homeassistant.util.json import JsonObjectType
 
 from .const import DOMAIN
+from .lazy import async_import
 
 _LOGGER = logging.getLogger(__name__)
 
 HACA_LLM_API_ID   = "haca"
 HACA_LLM_API_NAME = "HACA"
 
+CONF_LLM_TOOL_SET  = "llm_tool_set"     # "all" (default) | "essentials"
+TOOL_SET_ALL        = "all"
+TOOL_SET_ESSENTIALS = "essentials"
+
+# Exposed with every haca_* tool in the "essentials" set
+ESSENTIAL_HA_TOOLS = frozenset({
+    "ha_get_entities", "ha_get_entity_detail", "ha_call_service",
+    "ha_get_automation_traces", "ha_get_script", "ha_backup_create",
+    "ha_check_config", "ha_get_history", "ha_deep_search",
+})
+
 
 # ─── JSON Schema → voluptuous ──────────────────────────────────────────────────
 
@@ -111,15 +136,21 @@ class HacaLLMAPI(llm.API):
 
     def __init__(self, hass: HomeAssistant) -> None:
         super().__init__(hass=hass, id=HACA_LLM_API_ID, name=HACA_LLM_API_NAME)
+        self._tools: list[HacaTool] | None = None
+        # language → (version, prompt); see _prompt_version
+        self._prompts: dict[str, tuple[tuple, str]] = {}
+        self.prompt_builds = 0
 
     async def async_get_api_instance(
         self, llm_context: llm.LLMContext
     ) -> llm.APIInstance:
-        """Construit l'instance avec le contexte HA courant et les 67 outils."""
-        from .mcp_server import MCP_TOOLS
+        """Construit l'instance avec le contexte HA courant et les outils HACA."""
+        tools = await self._async_tools()
+        tool_set = self._tool_set()
+        if tool_set == TOOL_SET_ESSENTIALS:
+            tools = [t for t in tools if t.name.startswith("haca_") or t.name in ESSENTIAL_HA_TOOLS]
 
-        api_prompt = await self._build_api_prompt()
-        tools      = [HacaTool(t) for t in MCP_TOOLS]
+        api_prompt = await self._async_api_prompt(tool_set)
 
         _LOGGER.debug("[HACA LLM] API instance: %d tools", len(tools))
         return llm.APIInstance(
@@ -129,23 +160,62 @@ class HacaLLMAPI(llm.API):
             tools=tools,
         )
 
-    async def _build_api_prompt(self) -> str:
+    async def _async_tools(self) -> list[HacaTool]:
+        """Every HACA tool, wrapped once (MCP_TOOLS is a static list)."""
+        if self._tools is None:
+            mcp = await async_import(self.hass, "mcp_server")
+            self._tools = [HacaTool(t) for t in mcp.MCP_TOOLS]
+        return self._tools
+
+    def _entry(self) -> Any:
+        entries = self.hass.config_entries.async_entries(DOMAIN)
+        return entries[0] if entries else None
+
+    def _tool_set(self) -> str:
+        entry = self._entry()
+        return entry.options.get(CONF_LLM_TOOL_SET, TOOL_SET_ALL) if entry else TOOL_SET_ALL
+
+    def _coordinator_data(self) -> dict | None:
+        entry = self._entry()
+        if entry is None:
+            return None
+        coordinator = self.hass.data.get(DOMAIN, {}).get(entry.entry_id, {}).get("coordinator")
+        return coordinator.data if coordinator else None
+
+    async def _async_api_prompt(self, tool_set: str) -> str:
+        lang = self.hass.data.get(DOMAIN, {}).get("user_language") or self.hass.config.language or "en"
+        version = self._prompt_version(tool_set)
+        cached = self._prompts.get(lang)
+        # Each refresh publishes a new data dict: identity is its version
+        if cached is not None and cached[0][0] is version[0] and cached[0][1:] == version[1:]:
+            return cached[1]
+        prompt = await self._build_api_prompt(lang, tool_set)
+        self._prompts[lang] = (version, prompt)
+        self.prompt_builds += 1
+        return prompt
+
+    def _prompt_version(self, tool_set: str) -> tuple:
+        """What the prompt depends on besides the language."""
+        return (
+            self._coordinator_data(),
+            len(self.hass.states.async_entity_ids("automation")),
+            len(self.hass.states.async_entity_ids("script")),
+            tool_set,
+        )
+
+    async def _build_api_prompt(self, lang: str, tool_set: str = TOOL_SET_ALL) -> str:
         """Contexte HACA injecté dans le system prompt de l'agent — multilingue."""
         hass = self.hass
 
         # ── Load prompt translations ─────────────────────────────────────
         from .translation_utils import TranslationHelper
         th = TranslationHelper(hass)
-        lang = hass.data.get(DOMAIN, {}).get("user_language") or hass.config.language or "en"
         await th.async_load_language_section(lang, "llm_prompt")
         p = th.t  # shortcut
 
         # ── Gather HA context ────────────────────────────────────────────
         try:
-            entries    = hass.config_entries.async_entries(DOMAIN)
-            cdata_raw  = hass.data.get(DOMAIN, {}).get(entries[0].entry_id, {}) if entries else {}
-            coordinator = cdata_raw.get("coordinator")
-            cdata       = coordinator.data if coordinator and coordinator.data else {}
+            cdata = self._coordinator_data() or {}
 
             score        = cdata.get("health_score", "?")
             total_issues = cdata.get("total_issues", 0)
@@ -155,10 +225,11 @@ class HacaLLMAPI(llm.API):
                 + list(cdata.get("security_issue_list", []))
             )
             sev_order = {"high": 0, "medium": 1, "low": 2}
-            top5 = sorted(
-                all_issues,
-                key=lambda i: sev_order.get(i.get("severity", "low"), 2)
-            )[:5]
+            # nsmallest == sorted()[:5], without sorting every issue
+            top5 = heapq.nsmallest(
+                5, all_issues,
+                key=lambda i: sev_order.get(i.get("severity", "low"), 2),
+            )
             top5_txt = "\n".join(
                 f"  - [{i.get('severity','?').upper()}] "
                 f"{i.get('alias') or i.get('entity_id','?')}: "
@@ -173,7 +244,7 @@ class HacaLLMAPI(llm.API):
         auto_count   = len(hass.states.async_entity_ids("automation"))
         script_count = len(hass.states.async_entity_ids("script"))
 
-        return (
+        prompt = (
             f"{p('system_role')}\n"
             f"{p('health_score', score=score)}\n"
             f"{p('issues_detected', total=total_issues, auto=auto_count, scripts=script_count)}\n"
@@ -186,6 +257,11 @@ class HacaLLMAPI(llm.API):
             f"- {p('rule_use_haca_id')}\n"
             f"- {p('rule_proactive')}\n\n"
             f"{p('workflow_fix_title')}\n{p('workflow_fix')}\n\n"
+        )
+        if tool_set == TOOL_SET_ESSENTIALS:
+            # No dashboard / automation / script editing tools to describe
+            return prompt
+        return prompt + (
             f"{p('workflow_lovelace_title')}\n{p('workflow_lovelace')}\n\n"
             f"{p('workflow_auto_title')}\n{p('workflow_auto')}\n\n"
             f"{p('workflow_scripts_title')}\n{p('workflow_scripts')}\n"
@@ -5,10 +5,8 @@ compatible (Claude Code, Cursor, Copilot, etc.) via HTTP + JSON-RPC 2.0.
 
 Authentification : Bearer token = Long-Lived Access Token HA.
 
-Routes enregistrées :
-  POST /api/haca_mcp          — endpoint principal JSON-RPC 2.0
-  GET  /api/haca_mcp          — SSE endpoint (keepalive + server events)
-  GET  /api/haca_mcp/info     — endpoint informatif (non authentifié)
+Les routes HTTP (/api/haca_mcp, /api/haca_mcp/info) sont dans mcp_views.py,
+qui n'importe ce module qu'à la première requête MCP.
 
 Outils MCP exposés :
   haca_get_issues(severity?, type?)   → liste d'issues filtrée
@@ -23,16 +21,15 @@ MCP spec : https://modelcontextprotocol.io/specification (2024-11-05)
 """
 from __future__ import annotations
 
-import asyncio
 import json
 import logging
 from typing import Any
 
 from aiohttp import web
 from homeassistant.core import HomeAssistant
-from homeassistant.components.http import HomeAssistantView
 
 from .const import DOMAIN
+from .reload_scheduler import async_reload
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -169,6 +166,27 @@ MCP_TOOLS: list[dict[str, Any]] = [
             },
         },
     },
+    {
+        "name": "haca_get_trigger_rates",
+        "description": (
+            "Returns the automations and scripts triggered most often, measured live "
+            "over the last minute / hour / day, and flags suspected runaway loops."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of entities to return (default 10)",
+                },
+                "window": {
+                    "type": "string",
+                    "enum": ["minute", "hour", "day"],
+                    "description": "Window used for ranking (default hour)",
+                },
+            },
+        },
+    },
     {
         "name": "haca_explain_issue",
         "description": "Get an AI-generated explanation of a specific HACA issue. Provide the full issue object from haca_get_issues.",
@@ -258,6 +276,28 @@ def _get_coordinator_data(hass: HomeAssistant) -> dict[str, Any]:
         return {}
 
 
+async def _get_refactoring_assistant(hass: HomeAssistant):
+    """RefactoringAssistant of the first config entry (None when not set up)."""
+    from .lazy import async_resolve
+
+    entries = hass.config_entries.async_entries(DOMAIN)
+    if not entries:
+        return None
+    data = hass.data.get(DOMAIN, {}).get(entries[0].entry_id, {})
+    if "refactoring_assistant" not in data:
+        return None
+    return await async_resolve(data["refactoring_assistant"])
+
+
+def _fix_request(issue: dict, issue_id: str) -> dict:
+    """Issue → fix dict for RefactoringAssistant.apply_fixes."""
+    return {
+        "id": issue_id,
+        "type": issue.get("type", ""),
+        "automation_id": issue.get("automation_id") or issue.get("entity_id", ""),
+    }
+
+
 # ─── Issue ID system ──────────────────────────────────────────────────────
 
 import hashlib as _hashlib
@@ -646,28 +686,23 @@ async def _tool_apply_fix(hass: HomeAssistant, params: dict) -> dict:
             "preview": issue.get("recommendation", ""),
         }
 
-    # Appliquer via le service HA
+    # Appliquer via une transaction (une écriture, un reload)
     try:
-        fix_type = issue.get("type", "")
+        refactoring = await _get_refactoring_assistant(hass)
+        if refactoring is None:
+            return {"error": "HACA is not set up"}
         entity_id = issue.get("entity_id", "")
-
-        if fix_type in ("device_id_in_trigger", "device_id_in_action"):
-            service = "fix_device_id"
-        elif fix_type == "incorrect_mode_for_pattern":
-            service = "fix_mode"
-        elif fix_type in ("template_simple_state", "template_numeric_comparison"):
-            service = "fix_template"
-        else:
-            return {"error": f"No fix service for issue type '{fix_type}'"}
-
-        await hass.services.async_call(
-            DOMAIN, service, {"entity_id": entity_id}, blocking=True
-        )
+        outcome = await refactoring.apply_fixes([_fix_request(issue, issue_id)])
+        result = outcome["results"][0]
+        if result["status"] != "applied":
+            return {"error": f"Error applying fix: {outcome.get('error') or result.get('error')}"}
         return {
             "dry_run": False,
             "issue_id": issue_id,
             "entity_id": entity_id,
             "status": "applied",
+            "backup_path": outcome["backup_path"],
+            "reloaded": outcome["reloaded"],
             "message": f"Fix applied for {entity_id}",
         }
     except Exception as exc:
@@ -724,6 +759,7 @@ async def _tool_list_issue_catalog(hass: HomeAssistant, params: dict) -> dict:
             {"type": "unavailable_entity",         "severity": "high",   "fixable": False, "description": "Entity is unavailable"},
             {"type": "unknown_state",              "severity": "medium", "fixable": False, "description": "Entity has unknown state and is used by automations/scripts"},
             {"type": "stale_entity",               "severity": "low",    "fixable": False, "description": "Entity has not updated in a long time"},
+            {"type": "flapping_entity",            "severity": "medium", "fixable": False, "description": "Entity keeps switching to/from unavailable"},
             {"type": "zombie_entity",              "severity": "medium", "fixable": False, "description": "Entity exists in registry but has no state"},
             {"type": "ghost_registry_entry",       "severity": "medium", "fixable": False, "description": "Registry entry with no matching entity"},
             {"type": "disabled_but_referenced",    "severity": "medium", "fixable": False, "description": "Disabled entity is still referenced"},
@@ -866,7 +902,9 @@ async def _tool_fix_batch(hass: HomeAssistant, params: dict) -> dict:
     # ── Map fix_type → HA service ─────────────────────────────────────────
     _FIX_SERVICE_MAP = {
         "device_id_in_trigger": "fix_device_id",
+        "device_id_in_condition": "fix_device_id",
         "device_id_in_action": "fix_device_id",
+        "device_id_in_target": "fix_device_id",
         "incorrect_mode_for_pattern": "fix_mode",
         "incorrect_mode_motion_single": "fix_mode",
         "template_simple_state": "fix_template",
@@ -898,28 +936,35 @@ async def _tool_fix_batch(hass: HomeAssistant, params: dict) -> dict:
             ),
         }
 
-    # ── Apply mode ────────────────────────────────────────────────────────
-    applied = []
+    # ── Apply mode: one transaction, each file written and reloaded once ──
     errors = []
+    requests = []
     for issue, cat_code in fixable:
         fix_type = issue.get("type", "")
-        entity_id = issue.get("entity_id", "")
-        service = _FIX_SERVICE_MAP.get(fix_type)
-        if not service:
-            errors.append({"entity_id": entity_id, "type": fix_type, "error": f"No fix service for '{fix_type}'"})
+        if fix_type not in _FIX_SERVICE_MAP:
+            errors.append({
+                "entity_id": issue.get("entity_id", ""), "type": fix_type,
+                "error": f"No fix service for '{fix_type}'",
+            })
             continue
-        try:
-            await hass.services.async_call(
-                DOMAIN, service, {"entity_id": entity_id}, blocking=True,
-            )
-            applied.append({
-                "id": _issue_stable_id(issue, cat_code),
-                "entity_id": entity_id,
-                "type": fix_type,
-                "status": "applied",
+        requests.append((issue, _fix_request(issue, _issue_stable_id(issue, cat_code))))
+
+    applied = []
+    outcome = {"reloaded": [], "backup_path": None, "rolled_back": False, "results": []}
+    if requests:
+        refactoring = await _get_refactoring_assistant(hass)
+        if refactoring is None:
+            return {"error": "HACA is not set up"}
+        outcome = await refactoring.apply_fixes([fix for _issue, fix in requests])
+    for (issue, fix), result in zip(requests, outcome["results"]):
+        entry = {"entity_id": issue.get("entity_id", ""), "type": fix["type"]}
+        if result["status"] == "applied":
+            applied.append({"id": fix["id"], **entry, "status": "applied"})
+        else:
+            errors.append({
+                **entry, "status": result["status"],
+                "error": result.get("error") or "No changes to apply",
             })
-        except Exception as exc:
-            errors.append({"entity_id": entity_id, "type": fix_type, "error": str(exc)})
 
     return {
         "dry_run": False,
@@ -930,6 +975,9 @@ async def _tool_fix_batch(hass: HomeAssistant, params: dict) -> dict:
         "results": applied,
         "error_details": errors if errors else None,
         "not_fixable_types": list({i.get("type", "") for i, _ in not_fixable}) if not_fixable else None,
+        "reloaded": outcome["reloaded"],
+        "backup_path": outcome["backup_path"],
+        "rolled_back": outcome["rolled_back"],
     }
 
 
@@ -956,6 +1004,32 @@ async def _tool_get_batteries(hass: HomeAssistant, params: dict) -> dict:
     }
 
 
+async def _tool_get_trigger_rates(hass: HomeAssistant, params: dict) -> dict:
+    from .trigger_telemetry import get_trigger_telemetry
+    telemetry = get_trigger_telemetry(hass)
+    if telemetry is None:
+        return {"error": "Trigger telemetry not available"}
+    window = params.get("window", "hour")
+    if window not in ("minute", "hour", "day"):
+        return {"error": "window must be minute, hour or day"}
+    try:
+        limit = max(1, min(int(params.get("limit", 10)), 500))
+    except (TypeError, ValueError):
+        return {"error": "limit must be an integer"}
+    top = telemetry.top(limit, window)
+    for row in top:
+        state = hass.states.get(row["entity_id"])
+        row["friendly_name"] = (
+            state.attributes.get("friendly_name", row["entity_id"]) if state else row["entity_id"]
+        )
+    return {
+        "window": window,
+        "observed_seconds": int(telemetry.observed_seconds),
+        "total": len(top),
+        "top": top,
+    }
+
+
 async def _tool_explain_issue(hass: HomeAssistant, params: dict) -> dict:
     issue_id = params.get("issue_id", "")
     if not issue_id:
@@ -966,13 +1040,8 @@ async def _tool_explain_issue(hass: HomeAssistant, params: dict) -> dict:
     if not issue:
         return {"error": f"Issue '{issue_id}' not found"}
 
-    # Utiliser le cache AI si disponible
-    from .conversation import _async_call_ai, _AI_CACHE_KEY
-    cache = hass.data.get(DOMAIN, {}).get(_AI_CACHE_KEY, {})
-    cache_key = f"explain_{issue_id}"
-
-    if cache_key in cache:
-        return {"explanation": cache[cache_key], "cached": True}
+    from .ai_cache import get_ai_cache
+    from .conversation import _async_call_ai_cached
 
     prompt = (
         f"[H.A.C.A Audit] Issue détectée dans la configuration Home Assistant.\n"
@@ -983,23 +1052,19 @@ async def _tool_explain_issue(hass: HomeAssistant, params: dict) -> dict:
         f"Explique cette issue en 2-3 phrases claires et propose une correction concrète."
     )
 
-    explanation = await _async_call_ai(hass, prompt, "HACA MCP Explain")
-
-    if explanation:
-        # Mettre en cache
-        if DOMAIN in hass.data:
-            entries = hass.config_entries.async_entries(DOMAIN)
-            if entries:
-                entry_data = hass.data[DOMAIN].get(entries[0].entry_id, {})
-                ai_cache = entry_data.get(_AI_CACHE_KEY, {})
-                ai_cache[cache_key] = explanation
-                entry_data[_AI_CACHE_KEY] = ai_cache
+    # Cache persistant (ai_cache.py) : même issue, même config → réponse instantanée
+    hits = get_ai_cache(hass).hits
+    explanation = await _async_call_ai_cached(
+        hass, prompt, "HACA MCP Explain", "explain_mcp", "fr",
+        entity_id=issue.get("entity_id", ""),
+        params={key: issue.get(key, "") for key in ("type", "severity", "message", "alias")},
+    )
 
     return {
         "issue_id": issue_id,
         "entity_id": issue.get("entity_id", ""),
         "explanation": explanation or "Aucun service IA disponible.",
-        "cached": False,
+        "cached": get_ai_cache(hass).hits > hits,
     }
 
 
@@ -1211,14 +1276,11 @@ async def _tool_ha_get_entities(hass: HomeAssistant, params: dict) -> dict:
     limit = int(params.get("limit", 50))
 
     try:
-        from homeassistant.helpers import area_registry as ar, entity_registry as er, device_registry as dr
-
-        area_reg = ar.async_get(hass)
-        entity_reg = er.async_get(hass)
-        device_reg = dr.async_get(hass)
+        from .registry_snapshot import async_build_registry_snapshot
 
-        # Build area_id → area_name map
-        area_map: dict[str, str] = {a.id: a.name for a in area_reg.async_list_areas()}
+        # One registry pass: effective area (entity → device fallback) + names
+        snapshot = async_build_registry_snapshot(hass)
+        area_map = snapshot.area_names
 
         results = []
         for state in hass.states.async_all():
@@ -1231,13 +1293,7 @@ async def _tool_ha_get_entities(hass: HomeAssistant, params: dict) -> dict:
                 continue
 
             # Find area
-            entry = entity_reg.entities.get(eid)
-            entity_area_id = entry.area_id if entry else None
-            device_area_id = None
-            if entry and entry.device_id:
-                device = device_reg.async_get(entry.device_id)
-                device_area_id = device.area_id if device else None
-            area_id = entity_area_id or device_area_id
+            area_id = snapshot.area_of(eid)
             area_name = area_map.get(area_id, "") if area_id else ""
 
             if area_filter and area_filter not in area_name.lower():
@@ -1349,7 +1405,7 @@ async def _tool_ha_create_automation(hass: HomeAssistant, params: dict) -> dict:
         )
 
         # Recharger les automations
-        await hass.services.async_call("automation", "reload", blocking=True)
+        await async_reload(hass, "automation", [new_auto.get("alias", "")], [auto_file])
 
         return {
             "success": True,
@@ -1449,7 +1505,7 @@ async def _tool_ha_update_automation(hass: HomeAssistant, params: dict) -> dict:
 
         automations[target_idx] = auto
         new_yaml = yaml.dump(automations, allow_unicode=True, default_flow_style=False, sort_keys=False)
-        await _safe_write_and_reload(hass, auto_file, new_yaml, "automation")
+        await _safe_write_and_reload(hass, auto_file, new_yaml, "automation", auto.get("alias", ""))
 
         return {
             "success": True,
@@ -1681,7 +1737,7 @@ async def _tool_ha_create_script(hass: HomeAssistant, params: dict) -> dict:
         action = "updated" if script_id in existing else "created"
         existing[script_id] = script_def
         new_yaml = yaml.dump(existing, allow_unicode=True, default_flow_style=False, sort_keys=False)
-        await _safe_write_and_reload(hass, scripts_file, new_yaml, "script")
+        await _safe_write_and_reload(hass, scripts_file, new_yaml, "script", f"script.{script_id}")
 
         return {
             "success": True,
@@ -1705,6 +1761,7 @@ TOOL_HANDLERS = {
     "haca_fix_suggestion":    _tool_fix_suggestion,
     "haca_apply_fix":         _tool_apply_fix,
     "haca_get_batteries":     _tool_get_batteries,
+    "haca_get_trigger_rates": _tool_get_trigger_rates,
     "haca_explain_issue":     _tool_explain_issue,
     "haca_list_issue_catalog": _tool_list_issue_catalog,
     "haca_fix_batch":         _tool_fix_batch,
@@ -1839,169 +1896,6 @@ async def _handle_jsonrpc(hass: HomeAssistant, body: dict) -> dict:
         return _err(-32603, f"Internal error: {exc}")
 
 
-# ─── aiohttp Views ────────────────────────────────────────────────────────
-
-class HacaMcpView(HomeAssistantView):
-    """Vue HTTP principale MCP — POST (JSON-RPC) + GET (SSE keepalive).
-    
-    Uses requires_auth=True so HA handles Bearer token validation natively.
-    This supports Long-Lived Access Tokens, OAuth tokens, and trusted networks.
-    """
-
-    url = "/api/haca_mcp"
-    extra_urls = ["/api/haca_mcp/sse"]
-    name = "api:haca_mcp"
-    requires_auth = True  # HA handles Bearer token validation
-    cors_allowed = True
-
-    def __init__(self, hass: HomeAssistant) -> None:
-        self._hass = hass
-
-    async def post(self, request: web.Request) -> web.Response:
-        """Reçoit et traite les messages JSON-RPC 2.0."""
-        user = request.get("hass_user")
-        _LOGGER.debug(
-            "[HACA MCP] POST — IP=%s user=%s",
-            request.remote, user.id if user else "?",
-        )
-
-        try:
-            body = await request.json()
-        except Exception as parse_exc:
-            _LOGGER.warning("[HACA MCP] JSON parse error: %s", parse_exc)
-            return web.Response(
-                status=400,
-                text=json.dumps({
-                    "jsonrpc": "2.0", "id": None,
-                    "error": {"code": -32700, "message": "Parse error — invalid JSON"}
-                }),
-                content_type="application/json",
-            )
-
-        # Batch requests (tableau de requêtes)
-        if isinstance(body, list):
-            _LOGGER.debug("[HACA MCP] Batch request — %d messages", len(body))
-            responses = []
-            for msg in body:
-                resp = await _handle_jsonrpc(self._hass, msg)
-                if resp:
-                    responses.append(resp)
-            return web.Response(
-                text=json.dumps(responses, ensure_ascii=False),
-                content_type="application/json",
-            )
-
-        # Single request
-        method = body.get("method", "?")
-        _LOGGER.debug("[HACA MCP] method=%s user=%s", method, user.id if user else "?")
-        result = await _handle_jsonrpc(self._hass, body)
-        if not result:
-            return web.Response(status=204)
-
-        return web.Response(
-            text=json.dumps(result, ensure_ascii=False),
-            content_type="application/json",
-        )
-
-    async def get(self, request: web.Request) -> web.Response:
-        """SSE endpoint — keepalive pour clients MCP compatibles SSE."""
-        response = web.StreamResponse(
-            headers={
-                "Content-Type": "text/event-stream",
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",
-            }
-        )
-        await response.prepare(request)
-
-        # Envoyer l'événement endpoint pour les clients MCP
-        await response.write(
-            f"event: endpoint\ndata: {json.dumps({'url': str(request.url)})}\n\n".encode()
-        )
-
-        # Keepalive toutes les 15 secondes
-        try:
-            while True:
-                await asyncio.sleep(15)
-                if request.transport and not request.transport.is_closing():
-                    await response.write(b": keepalive\n\n")
-                else:
-                    break
-        except (asyncio.CancelledError, ConnectionResetError):
-            pass
-
-        return response
-
-
-class HacaMcpInfoView(HomeAssistantView):
-    """Vue d'information publique — pas d'auth requise."""
-
-    url = "/api/haca_mcp/info"
-    name = "api:haca_mcp_info"
-    requires_auth = False
-    cors_allowed = True
-
-    def __init__(self, hass: HomeAssistant) -> None:
-        self._hass = hass
-
-    async def get(self, request: web.Request) -> web.Response:
-        cdata = _get_coordinator_data(self._hass)
-        info = {
-            "name": MCP_SERVER_NAME,
-            "version": MCP_SERVER_VERSION,
-            "protocol_version": MCP_PROTOCOL_VERSION,
-            "description": "H.A.C.A — Home Assistant Config Auditor MCP Server",
-            "endpoint": "/api/haca_mcp",
-            "auth": "Bearer <HA Long-Lived Access Token>",
-            "tools_count": len(MCP_TOOLS),
-            "tools": [t["name"] for t in MCP_TOOLS],
-            "health_score": cdata.get("health_score"),
-            "total_issues": cdata.get("total_issues"),
-            "claude_code_config": {
-                "example": {
-                    "mcpServers": {
-                        "haca": {
-                            "command": "npx",
-                            "args": ["-y", "@modelcontextprotocol/server-proxy"],
-                            "env": {
-                                "MCP_SERVER_URL": "<HA_URL>/api/haca_mcp",
-                                "MCP_AUTH_HEADER": "Authorization: Bearer <TOKEN>",
-                            },
-                        }
-                    }
-                }
-            },
-        }
-        return web.Response(
-            text=json.dumps(info, ensure_ascii=False, indent=2),
-            content_type="application/json",
-        )
-
-
-# ─── Setup ────────────────────────────────────────────────────────────────
-
-_MCP_VIEWS_KEY = f"{DOMAIN}_mcp_views_registered"
-
-
-async def async_setup_mcp_server(hass: HomeAssistant) -> None:
-    """Enregistre les vues HTTP MCP (une seule fois par process HA)."""
-    if hass.data.get(_MCP_VIEWS_KEY):
-        _LOGGER.debug("[HACA MCP] Views already registered — skipping")
-        return
-
-    try:
-        hass.http.register_view(HacaMcpView(hass))
-        hass.http.register_view(HacaMcpInfoView(hass))
-        hass.data[_MCP_VIEWS_KEY] = True
-        _LOGGER.info(
-            "[HACA MCP] Server registered at /api/haca_mcp "
-            "(auth: Bearer <HA Long-Lived Access Token>)"
-        )
-    except Exception as exc:
-        _LOGGER.error("[HACA MCP] Registration error: %s", exc)
-
-
 # ═══════════════════════════════════════════════════════════════════════════════
 #  v1.5.0 — 5 NEW TOOLS: backup_create · check_config · remove_automation
 #                         eval_template · rename_entity
@@ -2161,26 +2055,28 @@ async def _safe_write_and_reload(
     path,
     new_yaml: str,
     reload_domain: str,
+    item: str = "",
 ) -> None:
     """Écriture atomique + reload avec rollback automatique si le reload échoue.
 
     1. Sauvegarde le contenu original en mémoire
     2. Écrit new_yaml de façon atomique
-    3. Lance automation/script/scene reload
+    3. Lance automation/script/scene reload (regroupé, voir reload_scheduler.py)
     4. Si le reload lève une exception → restaure l'original et relance
     """
+
     original_content = await hass.async_add_executor_job(
         lambda: open(str(path), encoding="utf-8").read() if __import__("os").path.exists(str(path)) else ""
     )
     await hass.async_add_executor_job(_atomic_write, path, new_yaml)
     try:
-        await hass.services.async_call(reload_domain, "reload", blocking=True)
+        await async_reload(hass, reload_domain, [item], [path])
     except Exception as reload_exc:
         # Rollback
         if original_content:
             await hass.async_add_executor_job(_atomic_write, path, original_content)
             try:
-                await hass.services.async_call(reload_domain, "reload", blocking=True)
+                await async_reload(hass, reload_domain, paths=[path], rescan=False)
             except Exception:
                 pass  # Best-effort rollback reload
         raise RuntimeError(
@@ -2486,7 +2382,7 @@ async def _tool_ha_remove_automation(hass: HomeAssistant, params: dict) -> dict:
         # Remove it
         removed = automations.pop(found_idx)
         new_yaml = yaml.dump(automations, allow_unicode=True, default_flow_style=False, sort_keys=False)
-        await _safe_write_and_reload(hass, auto_file, new_yaml, "automation")
+        await _safe_write_and_reload(hass, auto_file, new_yaml, "automation", found_alias)
 
         return {
             "success": True,
@@ -3851,7 +3747,7 @@ async def _tool_ha_create_blueprint(hass: HomeAssistant, params: dict) -> dict:
 
     # ── Step 5: reload blueprints ─────────────────────────────────────────────
     try:
-        await hass.services.async_call("blueprint", "reload", blocking=True)
+        await async_reload(hass, "blueprint", paths=[bp_path])
     except Exception:
         pass  # non-fatal — blueprints reload on next HA restart anyway
 
@@ -3976,7 +3872,7 @@ async def _tool_ha_update_script(hass: HomeAssistant, params: dict) -> dict:
         return {"error": f"Failed to write scripts.yaml: {exc}"}
 
     try:
-        await hass.services.async_call("script", "reload", blocking=True)
+        await async_reload(hass, "script", paths=[scripts_path])
     except Exception:
         pass
 
@@ -4017,7 +3913,7 @@ async def _tool_ha_remove_script(hass: HomeAssistant, params: dict) -> dict:
         return {"error": f"Failed to write scripts.yaml: {exc}"}
 
     try:
-        await hass.services.async_call("script", "reload", blocking=True)
+        await async_reload(hass, "script", paths=[scripts_path])
     except Exception:
         pass
 
@@ -4106,7 +4002,7 @@ async def _tool_ha_create_scene(hass: HomeAssistant, params: dict) -> dict:
         return {"error": f"Failed to write scenes.yaml: {exc}"}
 
     try:
-        await hass.services.async_call("scene", "reload", blocking=True)
+        await async_reload(hass, "scene", paths=[scenes_path])
     except Exception:
         pass
 
@@ -4164,7 +4060,7 @@ async def _tool_ha_update_scene(hass: HomeAssistant, params: dict) -> dict:
         return {"error": f"Failed to write scenes.yaml: {exc}"}
 
     try:
-        await hass.services.async_call("scene", "reload", blocking=True)
+        await async_reload(hass, "scene", paths=[scenes_path])
     except Exception:
         pass
 
@@ -4216,7 +4112,7 @@ async def _tool_ha_remove_scene(hass: HomeAssistant, params: dict) -> dict:
         return {"error": f"Failed to write scenes.yaml: {exc}"}
 
     try:
-        await hass.services.async_call("scene", "reload", blocking=True)
+        await async_reload(hass, "scene", paths=[scenes_path])
     except Exception:
         pass
 
@@ -4357,7 +4253,7 @@ async def _tool_ha_update_blueprint(hass: HomeAssistant, params: dict) -> dict:
         return {"error": f"Failed to write blueprint: {exc}"}
 
     try:
-        await hass.services.async_call("blueprint", "reload", blocking=True)
+        await async_reload(hass, "blueprint", paths=[str(fpath)])
     except Exception:
         pass
 
@@ -4398,7 +4294,7 @@ async def _tool_ha_remove_blueprint(hass: HomeAssistant, params: dict) -> dict:
         return {"error": f"Failed to delete blueprint: {exc}"}
 
     try:
-        await hass.services.async_call("blueprint", "reload", blocking=True)
+        await async_reload(hass, "blueprint", paths=[str(fpath)])
     except Exception:
         pass
 
@@ -4453,7 +4349,7 @@ async def _tool_ha_import_blueprint(hass: HomeAssistant, params: dict) -> dict:
         return {"error": f"Failed to write blueprint: {exc}"}
 
     try:
-        await hass.services.async_call("blueprint", "reload", blocking=True)
+        await async_reload(hass, "blueprint", paths=[out_path])
     except Exception:
         pass
 
@@ -4789,7 +4685,7 @@ async def _tool_ha_update_helper(hass: HomeAssistant, params: dict) -> dict:
     if svc_data:
         svc_data["entity_id"] = entity_id
         try:
-            await hass.services.async_call(domain, "reload", blocking=True)
+            await async_reload(hass, domain, [entity_id], rescan=False)
             updated_fields.extend(list(svc_data.keys()) - {"entity_id"})
         except Exception:
             pass
@@ -0,0 +1,191 @@
+"""H.A.C.A — HTTP views of the MCP server.
+
+Registered at setup, but kept out of ``mcp_server.py`` so that the tool
+handlers (≈ 5,000 lines) are only imported — in the executor — by the first
+MCP request instead of with the integration.
+
+Routes :
+  POST /api/haca_mcp          — endpoint principal JSON-RPC 2.0
+  GET  /api/haca_mcp          — SSE endpoint (keepalive + server events)
+  GET  /api/haca_mcp/info     — endpoint informatif (non authentifié)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+from homeassistant.components.http import HomeAssistantView
+
+from .const import DOMAIN
+from .lazy import async_import
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# ─── aiohttp Views ────────────────────────────────────────────────────────
+
+class HacaMcpView(HomeAssistantView):
+    """Vue HTTP principale MCP — POST (JSON-RPC) + GET (SSE keepalive).
+    
+    Uses requires_auth=True so HA handles Bearer token validation natively.
+    This supports Long-Lived Access Tokens, OAuth tokens, and trusted networks.
+    """
+
+    url = "/api/haca_mcp"
+    extra_urls = ["/api/haca_mcp/sse"]
+    name = "api:haca_mcp"
+    requires_auth = True  # HA handles Bearer token validation
+    cors_allowed = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+
+    async def post(self, request: web.Request) -> web.Response:
+        """Reçoit et traite les messages JSON-RPC 2.0."""
+        user = request.get("hass_user")
+        _LOGGER.debug(
+            "[HACA MCP] POST — IP=%s user=%s",
+            request.remote, user.id if user else "?",
+        )
+
+        try:
+            body = await request.json()
+        except Exception as parse_exc:
+            _LOGGER.warning("[HACA MCP] JSON parse error: %s", parse_exc)
+            return web.Response(
+                status=400,
+                text=json.dumps({
+                    "jsonrpc": "2.0", "id": None,
+                    "error": {"code": -32700, "message": "Parse error — invalid JSON"}
+                }),
+                content_type="application/json",
+            )
+
+        mcp = await async_import(self._hass, "mcp_server")
+
+        # Batch requests (tableau de requêtes)
+        if isinstance(body, list):
+            _LOGGER.debug("[HACA MCP] Batch request — %d messages", len(body))
+            responses = []
+            for msg in body:
+                resp = await mcp._handle_jsonrpc(self._hass, msg)
+                if resp:
+                    responses.append(resp)
+            return web.Response(
+                text=json.dumps(responses, ensure_ascii=False),
+                content_type="application/json",
+            )
+
+        # Single request
+        method = body.get("method", "?")
+        _LOGGER.debug("[HACA MCP] method=%s user=%s", method, user.id if user else "?")
+        result = await mcp._handle_jsonrpc(self._hass, body)
+        if not result:
+            return web.Response(status=204)
+
+        return web.Response(
+            text=json.dumps(result, ensure_ascii=False),
+            content_type="application/json",
+        )
+
+    async def get(self, request: web.Request) -> web.Response:
+        """SSE endpoint — keepalive pour clients MCP compatibles SSE."""
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": "text/event-stream",
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "X-Accel-Buffering": "no",
+            }
+        )
+        await response.prepare(request)
+
+        # Envoyer l'événement endpoint pour les clients MCP
+        await response.write(
+            f"event: endpoint\ndata: {json.dumps({'url': str(request.url)})}\n\n".encode()
+        )
+
+        # Keepalive toutes les 15 secondes
+        try:
+            while True:
+                await asyncio.sleep(15)
+                if request.transport and not request.transport.is_closing():
+                    await response.write(b": keepalive\n\n")
+                else:
+                    break
+        except (asyncio.CancelledError, ConnectionResetError):
+            pass
+
+        return response
+
+
+class HacaMcpInfoView(HomeAssistantView):
+    """Vue d'information publique — pas d'auth requise."""
+
+    url = "/api/haca_mcp/info"
+    name = "api:haca_mcp_info"
+    requires_auth = False
+    cors_allowed = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+
+    async def get(self, request: web.Request) -> web.Response:
+        mcp = await async_import(self._hass, "mcp_server")
+        cdata = mcp._get_coordinator_data(self._hass)
+        info = {
+            "name": mcp.MCP_SERVER_NAME,
+            "version": mcp.MCP_SERVER_VERSION,
+            "protocol_version": mcp.MCP_PROTOCOL_VERSION,
+            "description": "H.A.C.A — Home Assistant Config Auditor MCP Server",
+            "endpoint": "/api/haca_mcp",
+            "auth": "Bearer <HA Long-Lived Access Token>",
+            "tools_count": len(mcp.MCP_TOOLS),
+            "tools": [t["name"] for t in mcp.MCP_TOOLS],
+            "health_score": cdata.get("health_score"),
+            "total_issues": cdata.get("total_issues"),
+            "claude_code_config": {
+                "example": {
+                    "mcpServers": {
+                        "haca": {
+                            "command": "npx",
+                            "args": ["-y", "@modelcontextprotocol/server-proxy"],
+                            "env": {
+                                "MCP_SERVER_URL": "<HA_URL>/api/haca_mcp",
+                                "MCP_AUTH_HEADER": "Authorization: Bearer <TOKEN>",
+                            },
+                        }
+                    }
+                }
+            },
+        }
+        return web.Response(
+            text=json.dumps(info, ensure_ascii=False, indent=2),
+            content_type="application/json",
+        )
+
+
+# ─── Setup ────────────────────────────────────────────────────────────────
+
+_MCP_VIEWS_KEY = f"{DOMAIN}_mcp_views_registered"
+
+
+async def async_setup_mcp_server(hass: HomeAssistant) -> None:
+    """Enregistre les vues HTTP MCP (une seule fois par process HA)."""
+    if hass.data.get(_MCP_VIEWS_KEY):
+        _LOGGER.debug("[HACA MCP] Views already registered — skipping")
+        return
+
+    try:
+        hass.http.register_view(HacaMcpView(hass))
+        hass.http.register_view(HacaMcpInfoView(hass))
+        hass.data[_MCP_VIEWS_KEY] = True
+        _LOGGER.info(
+            "[HACA MCP] Server registered at /api/haca_mcp "
+            "(auth: Bearer <HA Long-Lived Access Token>)"
+        )
+    except Exception as exc:
+        _LOGGER.error("[HACA MCP] Registration error: %s", exc)
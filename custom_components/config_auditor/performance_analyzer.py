@@ -18,10 +18,29 @@ from .const import (
     BURST_TRIGGERS_IN_MINUTES,
     BURST_WINDOW_MINUTES,
 )
+from .include_resolver import get_config_resolver
+from .registry_snapshot import RegistrySnapshot
+from .state_rate_monitor import get_state_rate_monitor
+from .trigger_telemetry import get_trigger_telemetry
 from .translation_utils import TranslationHelper
 
 _LOGGER = logging.getLogger(__name__)
 
+# Domains where high update frequency is expected and not actionable
+_NOISY_SKIP_DOMAINS = frozenset({
+    "automation", "script", "scene", "zone", "person",
+    "sun", "weather", "input_boolean", "input_number",
+    "input_select", "input_text", "input_datetime",
+    "input_button", "counter", "timer", "button", "event",
+    "persistent_notification", "conversation", "tts", "stt",
+    "update", "calendar", "notify",
+})
+
+NOISY_THRESHOLD_HIGH = 500      # >500 changes/day = medium severity
+NOISY_THRESHOLD_MEDIUM = 200    # >200 changes/day = low severity
+NOISY_QUERY_LIMIT = 50
+
+
 class PerformanceAnalyzer:
     """Analyze automation performance and trigger patterns."""
 
@@ -32,7 +51,11 @@ class PerformanceAnalyzer:
         self._translator = TranslationHelper(hass)
         _LOGGER.debug("PerformanceAnalyzer initialized")
 
-    async def analyze_all(self, automation_configs: dict[str, dict[str, Any]] = None) -> list[dict[str, Any]]:
+    async def analyze_all(
+        self,
+        automation_configs: dict[str, dict[str, Any]] = None,
+        snapshot: RegistrySnapshot | None = None,
+    ) -> list[dict[str, Any]]:
         """Analyze performance of all automations."""
         self.issues = []
         
@@ -41,8 +64,11 @@ class PerformanceAnalyzer:
         await self._translator.async_load_language(language)
 
         # Load haca_ignore label (entity + device level)
-        from .translation_utils import async_get_haca_ignored_entity_ids
-        _ignored = await async_get_haca_ignored_entity_ids(self.hass)
+        if snapshot is not None:
+            _ignored = snapshot.ignored_entity_ids
+        else:
+            from .translation_utils import async_get_haca_ignored_entity_ids
+            _ignored = await async_get_haca_ignored_entity_ids(self.hass)
         
         automation_configs = automation_configs or {}
         
@@ -54,7 +80,7 @@ class PerformanceAnalyzer:
                 continue
             alias = state.attributes.get("friendly_name", entity_id)
             
-            # Check for high frequency based on last_triggered
+            # Check for high frequency using measured trigger rates
             await self._analyze_trigger_rate(state, alias)
             
             # Check complexity if config is available
@@ -73,6 +99,13 @@ class PerformanceAnalyzer:
             else:
                 _LOGGER.debug("No config found for %s, skipping complexity check", entity_id)
 
+        # Scripts have no complexity check here, only measured trigger rates
+        for state in self.hass.states.async_all("script"):
+            if state.entity_id not in _ignored:
+                await self._analyze_trigger_rate(
+                    state, state.attributes.get("friendly_name", state.entity_id)
+                )
+
         # 2. Analyze Noisy Entities (Database Impact)
         await self._detect_noisy_entities()
 
@@ -88,21 +121,51 @@ class PerformanceAnalyzer:
         return self.issues
 
     async def _analyze_trigger_rate(self, state: Any, alias: str) -> None:
-        """Trigger rate analysis placeholder.
-        
-        Previously checked if last_triggered was recent and flagged it as
-        "high frequency / possible loop". This was flawed: a single timestamp
-        snapshot doesn't measure frequency. An automation triggered 16 seconds
-        ago simply means it ran recently — that's normal.
-        
-        Real frequency detection would require counting triggers over a period
-        via the recorder history, which is expensive. The structural loop
-        detection in _detect_potential_loops is the correct approach for
-        identifying automations that risk looping.
-        
-        This method is kept as a no-op for forward compatibility.
+        """Flag automations/scripts whose measured trigger rate is too high.
+
+        Rates come from ``TriggerTelemetry`` (ring buffers fed by
+        ``automation_triggered`` / ``script_started``), never from the
+        ``last_triggered`` snapshot: a single timestamp says nothing about
+        frequency.  Without telemetry (module disabled) this is a no-op and
+        ``_detect_potential_loops`` remains the only loop check.
         """
-        pass
+        telemetry = get_trigger_telemetry(self.hass)
+        if telemetry is None:
+            return
+        t = self._translator.t
+        entity_id = state.entity_id
+        rates = telemetry.rates(entity_id)
+
+        if rates["runaway"] or rates["hour"] >= VERY_HIGH_FREQUENCY_TRIGGERS_PER_HOUR:
+            issue_type = ISSUE_VERY_HIGH_FREQUENCY
+            severity = "high"
+            if rates["runaway"]:
+                message = t("trigger_rate_runaway", count=rates["minute"])
+            else:
+                message = t("trigger_rate_very_high", count=rates["hour"])
+        elif rates["hour"] >= HIGH_FREQUENCY_TRIGGERS_PER_HOUR:
+            issue_type = ISSUE_HIGH_FREQUENCY
+            severity = "medium"
+            message = t("trigger_rate_very_high", count=rates["hour"])
+        else:
+            burst = telemetry.count_in_last_minutes(entity_id, BURST_WINDOW_MINUTES)
+            if burst < BURST_TRIGGERS_IN_MINUTES:
+                return
+            issue_type = ISSUE_BURST_PATTERN
+            severity = "low"
+            message = t("trigger_rate_burst", count=burst, minutes=BURST_WINDOW_MINUTES)
+
+        self.issues.append({
+            "entity_id": entity_id,
+            "alias": alias,
+            "type": issue_type,
+            "severity": severity,
+            "message": message,
+            "location": "trigger",
+            "recommendation": t("trigger_rate_recommendation"),
+            "fix_available": False,
+            "trigger_rates": {k: rates[k] for k in ("minute", "hour", "day")},
+        })
 
     def _analyze_complexity(self, entity_id: str, alias: str, config: dict[str, Any]) -> None:
         """Analyze automation complexity."""
@@ -228,38 +291,42 @@ class PerformanceAnalyzer:
                                 "fix_available": False,
                             })
 
-        # ── Noisy entity detection via Recorder DB ────────────────────────
-        await self._detect_noisy_entities_from_db()
+        # ── Noisy entity detection ────────────────────────────────────────
+        # Answered from the live state_changed monitor; the 24h recorder
+        # query only runs as a cold-start backfill (or when the monitor is off).
+        monitor = get_state_rate_monitor(self.hass)
+        if monitor is not None and not monitor.needs_backfill:
+            noisy_results = monitor.top(NOISY_QUERY_LIMIT, NOISY_THRESHOLD_MEDIUM)
+        else:
+            rows = await self._detect_noisy_entities_from_db()
+            if rows is None:
+                if monitor is None:
+                    return
+                noisy_results = monitor.top(NOISY_QUERY_LIMIT, NOISY_THRESHOLD_MEDIUM)
+            else:
+                if monitor is not None:
+                    monitor.backfill(rows)
+                noisy_results = [(entity_id, count, None) for entity_id, count in rows]
 
-    async def _detect_noisy_entities_from_db(self) -> None:
-        """Query the recorder DB to find entities with excessive state changes."""
-        t = self._translator.t
+        self._report_noisy_entities(noisy_results)
+
+    async def _detect_noisy_entities_from_db(self) -> list[tuple[str, int]] | None:
+        """Query the recorder DB for entities with excessive state changes (last 24h).
 
+        Returns None when the recorder is not available.
+        """
         try:
             from homeassistant.helpers.recorder import get_instance
         except ImportError:
             _LOGGER.debug("Recorder helper not available, skipping noisy detection")
-            return
+            return None
 
         try:
             instance = get_instance(self.hass)
             if not instance or not hasattr(instance, "engine") or not instance.engine:
-                return
+                return None
         except Exception:
-            return
-
-        # Domains where high update frequency is expected and not actionable
-        _NOISY_SKIP_DOMAINS = frozenset({
-            "automation", "script", "scene", "zone", "person",
-            "sun", "weather", "input_boolean", "input_number",
-            "input_select", "input_text", "input_datetime",
-            "input_button", "counter", "timer", "button", "event",
-            "persistent_notification", "conversation", "tts", "stt",
-            "update", "calendar", "notify",
-        })
-
-        THRESHOLD_HIGH = 500      # >500 changes/day = high severity
-        THRESHOLD_MEDIUM = 200    # >200 changes/day = medium severity
+            return None
 
         def _query_noisy(inst):
             """Synchronous DB query for state change frequency (last 24h)."""
@@ -287,7 +354,7 @@ class PerformanceAnalyzer:
                             "HAVING cnt > :threshold "
                             "ORDER BY cnt DESC "
                             "LIMIT 50"
-                        ), {"cutoff": cutoff_ts, "threshold": THRESHOLD_MEDIUM}).fetchall()
+                        ), {"cutoff": cutoff_ts, "threshold": NOISY_THRESHOLD_MEDIUM}).fetchall()
                         noisy = [(row[0], int(row[1])) for row in rows]
                     except Exception:
                         try:
@@ -300,7 +367,7 @@ class PerformanceAnalyzer:
                                 "HAVING cnt > :threshold "
                                 "ORDER BY cnt DESC "
                                 "LIMIT 50"
-                            ), {"cutoff": cutoff_ts, "threshold": THRESHOLD_MEDIUM}).fetchall()
+                            ), {"cutoff": cutoff_ts, "threshold": NOISY_THRESHOLD_MEDIUM}).fetchall()
                             noisy = [(row[0], int(row[1])) for row in rows]
                         except Exception as exc2:
                             _LOGGER.debug("Noisy entity query failed (legacy): %s", exc2)
@@ -316,10 +383,14 @@ class PerformanceAnalyzer:
             return noisy
 
         try:
-            noisy_results = await self.hass.async_add_executor_job(_query_noisy, instance)
+            return await self.hass.async_add_executor_job(_query_noisy, instance)
         except Exception as exc:
             _LOGGER.debug("Noisy entity detection error: %s", exc)
-            return
+            return None
+
+    def _report_noisy_entities(self, noisy_results: list[tuple[str, int, int | None]]) -> None:
+        """Turn ``(entity_id, changes_24h, attribute_only_24h)`` rows into issues."""
+        t = self._translator.t
 
         # Check recorder exclusion filter
         try:
@@ -328,7 +399,7 @@ class PerformanceAnalyzer:
         except ImportError:
             _has_recorder_filter = False
 
-        for entity_id, count in noisy_results:
+        for entity_id, count, attr_only in noisy_results:
             domain = entity_id.split(".")[0]
             if domain in _NOISY_SKIP_DOMAINS:
                 continue
@@ -343,19 +414,28 @@ class PerformanceAnalyzer:
                 except Exception:
                     pass
 
-            if count >= THRESHOLD_HIGH:
+            if count >= NOISY_THRESHOLD_HIGH:
                 severity = "medium"
             else:
                 severity = "low"
 
-            self.issues.append({
+            # Mostly attribute-only updates: the fix is an attribute filter
+            if attr_only is not None and attr_only * 2 >= count:
+                recommendation = t("noisy_entity_attributes_recommendation", count=attr_only)
+            else:
+                recommendation = t("noisy_entity_recommendation")
+
+            issue = {
                 "entity_id": entity_id,
                 "type": "noisy_entity",
                 "severity": severity,
                 "message": t("noisy_entity", count=count),
-                "recommendation": t("noisy_entity_recommendation"),
+                "recommendation": recommendation,
                 "fix_available": False,
-            })
+            }
+            if attr_only is not None:
+                issue["attribute_only_changes"] = attr_only
+            self.issues.append(issue)
 
     async def _detect_expensive_templates(self, automation_configs: dict[str, dict[str, Any]]) -> None:
         """Detect automation templates that re-evaluate on every single state change.
@@ -466,57 +546,28 @@ class PerformanceAnalyzer:
         config_dir_path = None
         try:
             from pathlib import Path as _Path
-            import yaml as _yaml
             config_dir_path = _Path(self.hass.config.config_dir)
         except Exception:
             pass
 
         # Build a map of template configs from YAML sources
+        # (configuration.yaml with includes resolved, packages)
         template_configs: dict[str, dict] = {}
         if config_dir_path:
+            resolver = get_config_resolver(self.hass)
+
             def _load_template_yaml(cfg_dir):
                 """Load template: platform entries from configuration.yaml and packages."""
                 results = {}
-                # configuration.yaml
-                cfg_yaml = cfg_dir / "configuration.yaml"
-                if cfg_yaml.exists():
-                    try:
-                        with open(cfg_yaml, "r", encoding="utf-8") as f:
-                            content = _yaml.safe_load(f)
-                        if isinstance(content, dict):
-                            for section in ("sensor", "binary_sensor"):
-                                items = content.get(section, [])
-                                if isinstance(items, dict):
-                                    items = [items]
-                                for item in (items if isinstance(items, list) else []):
-                                    if isinstance(item, dict) and item.get("platform") == "template":
-                                        for tpl in item.get("sensors", {}).values():
-                                            if isinstance(tpl, dict):
-                                                uid = tpl.get("unique_id", tpl.get("friendly_name", ""))
-                                                results[f"template_cfg_{uid}"] = tpl
-                    except Exception:
-                        pass
-                # packages/
-                pkgs = cfg_dir / "packages"
-                if pkgs.is_dir():
-                    for yf in sorted(pkgs.rglob("*.yaml")):
-                        try:
-                            with open(yf, "r", encoding="utf-8") as f:
-                                content = _yaml.safe_load(f)
-                            if not isinstance(content, dict):
-                                continue
-                            for section in ("sensor", "binary_sensor"):
-                                items = content.get(section, [])
-                                if isinstance(items, dict):
-                                    items = [items]
-                                for item in (items if isinstance(items, list) else []):
-                                    if isinstance(item, dict) and item.get("platform") == "template":
-                                        for tpl in item.get("sensors", {}).values():
-                                            if isinstance(tpl, dict):
-                                                uid = tpl.get("unique_id", tpl.get("friendly_name", ""))
-                                                results[f"template_cfg_{uid}"] = tpl
-                        except Exception:
-                            pass
+                for section in ("sensor", "binary_sensor"):
+                    items = resolver.collect_domain_items(cfg_dir, section, ("performance",))
+                    for _source, item in items:
+                        if isinstance(item, dict) and item.get("platform") == "template":
+                            sensors = item.get("sensors", {})
+                            for tpl in (sensors.values() if isinstance(sensors, dict) else []):
+                                if isinstance(tpl, dict):
+                                    uid = tpl.get("unique_id", tpl.get("friendly_name", ""))
+                                    results[f"template_cfg_{uid}"] = tpl
                 return results
 
             try:
@@ -10,6 +10,7 @@ Agent en arrière-plan qui :
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
 import logging
 from datetime import datetime, timedelta, timezone
@@ -21,6 +22,7 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.event import async_track_time_interval
 
 from .const import DOMAIN
+from .report_catalog import get_report_catalog
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,10 +36,10 @@ _WEEKLY_REPORT_KEY = "last_weekly_report"
 # (hundreds/minute on large setups) but the agent only counts occurrences
 # without acting on them, causing unnecessary CPU/memory overhead.
 # Replaced with more targeted registry events for config change detection.
+# automation_triggered / script_started are counted per entity by
+# trigger_telemetry.py, which also detects runaway loops.
 MONITORED_HA_EVENTS = [
     "homeassistant_started",
-    "automation_triggered",
-    "script_started",
     "automation_reloaded",
     "scene_reloaded",
 ]
@@ -325,14 +327,6 @@ class ProactiveAgent:
         event_type = event.event_type
         self._event_counts[event_type] = self._event_counts.get(event_type, 0) + 1
 
-        # Détecter des patterns anormaux (ex: automation_triggered > 100x/heure)
-        if event_type == "automation_triggered" and self._event_counts.get("automation_triggered", 0) > 100:
-            _LOGGER.warning(
-                "[HACA ProactiveAgent] Unusual automation activity: %d triggers recorded",
-                self._event_counts["automation_triggered"]
-            )
-            self._event_counts["automation_triggered"] = 0  # reset
-
     # ── Rapport hebdomadaire ────────────────────────────────────────────────
 
     @callback
@@ -417,6 +411,21 @@ class ProactiveAgent:
             await self._hass.async_add_executor_job(
                 report_path.write_text, report_body, "utf-8"
             )
+            catalog = get_report_catalog(self._hass)
+            await self._hass.async_add_executor_job(
+                functools.partial(
+                    catalog.add_session,
+                    f"agent_{ts}",
+                    {"md": report_path},
+                    report_type="agent",
+                    health_score=cdata.get("health_score"),
+                    summary={
+                        k: cdata.get(k, 0)
+                        for k in ("health_score", "total_issues", "automation_issues",
+                                  "entity_issues", "security_issues", "performance_issues")
+                    },
+                )
+            )
             _LOGGER.debug("[HACA ProactiveAgent] Report saved to %s", report_path)
             return report_path
         except Exception as exc:
@@ -17,9 +17,10 @@ import logging
 from typing import Any
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.recorder import get_instance
 
+from .registry_snapshot import RegistrySnapshot, async_build_registry_snapshot
+
 _LOGGER = logging.getLogger(__name__)
 
 # Estimated bytes per state row (state_id, entity_id ref, state value, timestamps)
@@ -45,7 +46,9 @@ class RecorderAnalyzer:
 
     # ── Public API ────────────────────────────────────────────────────────
 
-    async def analyze_all(self) -> list[dict[str, Any]]:
+    async def analyze_all(
+        self, snapshot: RegistrySnapshot | None = None
+    ) -> list[dict[str, Any]]:
         """Query the Recorder DB and return orphaned entity list."""
         self.orphans = []
         self.total_wasted_mb = 0.0
@@ -69,14 +72,22 @@ class RecorderAnalyzer:
                 len(self._purged_cache), list(self._purged_cache.keys()),
             )
 
+        # Known entity_ids from HA's perspective: states + entity registry.
+        # Built here in the event loop — neither is safe to read from the
+        # recorder thread.
+        snapshot = snapshot or async_build_registry_snapshot(self.hass)
+        known: set[str] = {s.entity_id for s in self.hass.states.async_all()}
+        known.update(snapshot.entity_ids)
+
         try:
-            result = await instance.async_add_executor_job(
-                self._query_orphans, instance
+            states_by_entity, stats_by_entity = await instance.async_add_executor_job(
+                self._query_row_counts, instance
             )
         except Exception as exc:
             _LOGGER.warning("Recorder orphan analysis failed: %s", exc)
             return []
 
+        result = self._find_orphans(states_by_entity, stats_by_entity, known)
         self.db_available = True
         # Filter out recently-purged entities (WAL checkpoint may not be done yet)
         raw_orphans = result["orphans"]
@@ -113,8 +124,10 @@ class RecorderAnalyzer:
 
     # ── DB query (runs in recorder executor thread) ───────────────────────
 
-    def _query_orphans(self, instance) -> dict[str, Any]:
-        """Run synchronous DB queries in the recorder executor thread.
+    def _query_row_counts(self, instance) -> tuple[dict[str, int], dict[str, int]]:
+        """Return state and statistics row counts per entity_id.
+
+        Runs synchronous DB queries in the recorder executor thread.
 
         Uses a fresh engine connection with BEGIN IMMEDIATE to guarantee we
         read the latest committed data from the WAL file, not a stale pool
@@ -140,15 +153,7 @@ class RecorderAnalyzer:
                 pass
 
             try:
-                # ── 1. Build set of known entity_ids ─────────────────────
-                # From HA's perspective: states + entity registry
-                known: set[str] = {
-                    s.entity_id for s in self.hass.states.async_all()
-                }
-                entity_reg = er.async_get(self.hass)
-                known.update(e.entity_id for e in entity_reg.entities.values())
-
-                # ── 2. Query states_meta (modern HA ≥ 2023.3) ────────────
+                # ── 1. Query states_meta (modern HA ≥ 2023.3) ────────────
                 # states_meta stores one row per entity_id; states table
                 # references it via metadata_id.
                 states_by_entity: dict[str, int] = {}
@@ -178,7 +183,7 @@ class RecorderAnalyzer:
                     except Exception as exc:
                         _LOGGER.debug("Could not query states table: %s", exc)
 
-                # ── 3. Query statistics_meta ──────────────────────────────
+                # ── 2. Query statistics_meta ──────────────────────────────
                 stats_by_entity: dict[str, int] = {}
                 try:
                     rows = conn.execute(
@@ -196,42 +201,7 @@ class RecorderAnalyzer:
                 except Exception as exc:
                     _LOGGER.debug("Could not query statistics_meta: %s", exc)
 
-                # ── 4. Find orphans ───────────────────────────────────────
-                all_db_entities = set(states_by_entity) | set(stats_by_entity)
-                orphan_ids = all_db_entities - known
-
-                orphans: list[dict[str, Any]] = []
-                total_bytes = 0
-
-                for entity_id in sorted(orphan_ids):
-                    state_rows = states_by_entity.get(entity_id, 0)
-                    stat_rows = stats_by_entity.get(entity_id, 0)
-                    total_rows = state_rows + stat_rows
-
-                    if total_rows < _MIN_ROWS_TO_REPORT:
-                        continue
-
-                    est_bytes = (
-                        state_rows * _BYTES_PER_STATE_ROW
-                        + stat_rows * _BYTES_PER_STAT_ROW
-                    )
-                    total_bytes += est_bytes
-
-                    orphans.append({
-                        "entity_id":  entity_id,
-                        "state_rows": state_rows,
-                        "stat_rows":  stat_rows,
-                        "total_rows": total_rows,
-                        "est_bytes":  est_bytes,
-                        "est_mb":     round(est_bytes / 1_048_576, 3),
-                        "has_stats":  stat_rows > 0,
-                        "has_states": state_rows > 0,
-                    })
-
-                return {
-                    "orphans":  orphans,
-                    "total_mb": round(total_bytes / 1_048_576, 2),
-                }
+                return states_by_entity, stats_by_entity
 
             finally:
                 # Rollback the read transaction (no writes were done here)
@@ -239,3 +209,46 @@ class RecorderAnalyzer:
                     conn.execute(text("ROLLBACK"))
                 except Exception:
                     pass
+
+    @staticmethod
+    def _find_orphans(
+        states_by_entity: dict[str, int],
+        stats_by_entity: dict[str, int],
+        known: set[str],
+    ) -> dict[str, Any]:
+        """Entities with recorder rows but unknown to HA, with their size estimate."""
+        all_db_entities = set(states_by_entity) | set(stats_by_entity)
+        orphan_ids = all_db_entities - known
+
+        orphans: list[dict[str, Any]] = []
+        total_bytes = 0
+
+        for entity_id in sorted(orphan_ids):
+            state_rows = states_by_entity.get(entity_id, 0)
+            stat_rows = stats_by_entity.get(entity_id, 0)
+            total_rows = state_rows + stat_rows
+
+            if total_rows < _MIN_ROWS_TO_REPORT:
+                continue
+
+            est_bytes = (
+                state_rows * _BYTES_PER_STATE_ROW
+                + stat_rows * _BYTES_PER_STAT_ROW
+            )
+            total_bytes += est_bytes
+
+            orphans.append({
+                "entity_id":  entity_id,
+                "state_rows": state_rows,
+                "stat_rows":  stat_rows,
+                "total_rows": total_rows,
+                "est_bytes":  est_bytes,
+                "est_mb":     round(est_bytes / 1_048_576, 3),
+                "has_stats":  stat_rows > 0,
+                "has_states": state_rows > 0,
+            })
+
+        return {
+            "orphans":  orphans,
+            "total_mb": round(total_bytes / 1_048_576, 2),
+        }
@@ -1,8 +1,9 @@
 """H.A.C.A — Refactoring Assistant — Module 5."""
 from __future__ import annotations
 
-from datetime import datetime
 import difflib
+import json
+from functools import partial
 import logging
 import re
 from pathlib import Path
@@ -12,10 +13,36 @@ import yaml
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry as er
 
-from .const import BACKUP_DIR
+from .backup_store import async_backup, get_backup_store, item_diffs
+from .config_transaction import (
+    STATUS_APPLIED,
+    STATUS_NOT_FOUND,
+    STATUS_PLANNED,
+    STATUS_UNCHANGED,
+    ConfigEdit,
+    ConfigTransaction,
+    _atomic_write,
+)
+from .reload_scheduler import async_reload
 
 _LOGGER = logging.getLogger(__name__)
 
+STATUS_NOT_FIXABLE = "not_fixable"
+
+VALID_MODES = ["single", "restart", "queued", "parallel"]
+
+# Issue type → fix kind handled by apply_fixes
+FIX_KINDS = {
+    "device_id_in_trigger": "device_id",
+    "device_id_in_condition": "device_id",
+    "device_id_in_action": "device_id",
+    "device_id_in_target": "device_id",
+    "incorrect_mode_motion_single": "mode",
+    "incorrect_mode_for_pattern": "mode",
+    "template_simple_state": "template",
+    "template_numeric_comparison": "template",
+}
+
 
 def _build_description_fallback(alias: str, config: dict, is_script: bool) -> str:
     """Generate a rule-based description when AI is unavailable.
@@ -118,8 +145,7 @@ class RefactoringAssistant:
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize refactoring assistant."""
         self.hass = hass
-        self._backup_dir = Path(hass.config.config_dir) / BACKUP_DIR
-        self._backup_dir.mkdir(exist_ok=True)
+        self._store = get_backup_store(hass)
         self._automations_file = Path(hass.config.config_dir) / "automations.yaml"
         self._scripts_file = Path(hass.config.config_dir) / "scripts.yaml"
 
@@ -135,6 +161,27 @@ class RefactoringAssistant:
                 "error": f"Automation {automation_id} not found"
             }
         
+        changes = await self._device_id_changes(automation_config)
+
+        # --- Generate YAML previews ---
+        import copy
+        current_yaml = yaml.dump(automation_config, default_flow_style=False, allow_unicode=True)
+        new_config = copy.deepcopy(automation_config)
+        self._apply_section_changes(new_config, changes)
+        new_yaml = yaml.dump(new_config, default_flow_style=False, allow_unicode=True)
+        
+        return {
+            "success": True,
+            "automation_id": automation_id,
+            "alias": automation_config.get("alias", ""),
+            "changes": changes,
+            "changes_count": len(changes),
+            "current_yaml": current_yaml,
+            "new_yaml": new_yaml
+        }
+
+    async def _device_id_changes(self, automation_config: dict) -> list[dict[str, Any]]:
+        """device_id → entity_id replacements for one automation (section, index, to)."""
         changes = []
         
         # --- TRIGGERS ---
@@ -319,47 +366,34 @@ class RefactoringAssistant:
                 else:
                     _LOGGER.warning("Cannot resolve entity for action %d target (device_id=%s)", idx, device_id)
         
-        # --- Generate YAML previews ---
-        import copy
-        current_yaml = yaml.dump(automation_config, default_flow_style=False, allow_unicode=True)
-        
-        new_config = copy.deepcopy(automation_config)
-        
-        # Apply all changes to the deep copy
+        return changes
+
+    @staticmethod
+    def _apply_section_changes(config: dict, changes: list[dict[str, Any]]) -> None:
+        """Replace ``config[section][index]`` by ``change["to"]`` for each change."""
         for change in changes:
             section = change["section"]
             idx = change["index"]
-            
+
+            # Detect correct key for each section
             if section == "trigger":
-                key = trigger_key
+                key = "triggers" if "triggers" in config else "trigger"
             elif section == "condition":
-                key = condition_key
+                key = "conditions" if "conditions" in config else "condition"
             elif section == "action":
-                key = action_key
+                key = "actions" if "actions" in config else "action"
             else:
                 continue
-            
-            items = new_config.get(key, [])
+
+            items = config.get(key, [])
             if not isinstance(items, list):
                 items = [items] if items else []
             if idx < len(items):
                 items[idx] = change["to"]
-            new_config[key] = items
-        
-        new_yaml = yaml.dump(new_config, default_flow_style=False, allow_unicode=True)
-        
-        return {
-            "success": True,
-            "automation_id": automation_id,
-            "alias": automation_config.get("alias", ""),
-            "changes": changes,
-            "changes_count": len(changes),
-            "current_yaml": current_yaml,
-            "new_yaml": new_yaml
-        }
+            config[key] = items
 
     async def apply_device_id_fix(self, automation_id: str, preview: dict = None, dry_run: bool = False) -> dict[str, Any]:
-        """Apply device_id to entity_id conversion with backup."""
+        """Apply device_id to entity_id conversion with backup and reload."""
         
         # Get preview if not provided
         if not preview:
@@ -383,77 +417,27 @@ class RefactoringAssistant:
                 "preview": preview,
                 "message": "Dry run complete. No changes applied."
             }
-        
-        # Create backup
-        backup_path = await self._create_backup()
-        
-        try:
-            # Load all automations
-            def read_automations():
-                with open(self._automations_file, "r", encoding="utf-8") as f:
-                    return yaml.safe_load(f) or []
-            
-            automations = await self.hass.async_add_executor_job(read_automations)
-            
-            # Find and modify the automation
-            for automation in automations:
-                if automation.get("id") == automation_id:
-                    
-                    # Apply changes per section
-                    for change in preview["changes"]:
-                        section = change["section"]
-                        idx = change["index"]
-                        
-                        # Detect correct key for each section
-                        if section == "trigger":
-                            key = "triggers" if "triggers" in automation else "trigger"
-                        elif section == "condition":
-                            key = "conditions" if "conditions" in automation else "condition"
-                        elif section == "action":
-                            key = "actions" if "actions" in automation else "action"
-                        else:
-                            continue
-                        
-                        items = automation.get(key, [])
-                        if not isinstance(items, list):
-                            items = [items] if items else []
-                        if idx < len(items):
-                            items[idx] = change["to"]
-                        automation[key] = items
-                    
-                    break
-            
-            # Save modified automations
-            def write_automations():
-                with open(self._automations_file, "w", encoding="utf-8") as f:
-                    yaml.dump(automations, f, default_flow_style=False, allow_unicode=True)
-            
-            await self.hass.async_add_executor_job(write_automations)
-            
-            return {
-                "success": True,
-                "automation_id": automation_id,
-                "changes_applied": len(preview["changes"]),
-                "backup_path": str(backup_path),
-                "message": "Changes applied successfully. Restart Home Assistant to apply."
-            }
-            
-        except Exception as e:
-            _LOGGER.error("Error applying fixes: %s", e)
-            return {
-                "success": False,
-                "error": str(e),
-                "backup_path": str(backup_path)
-            }
+
+        changes = preview["changes"]
+
+        async def edit(config: dict) -> list[dict[str, Any]]:
+            self._apply_section_changes(config, changes)
+            return changes
+
+        transaction = self.transaction("device_id_fix", [automation_id])
+        transaction.add(ConfigEdit(automation_id, "automation", automation_id, edit))
+        return self._single_fix_result(
+            await transaction.async_commit(), automation_id,
+            changes_applied=len(changes),
+        )
 
     async def preview_mode_fix(self, automation_id: str, new_mode: str) -> dict[str, Any]:
         """Preview automation mode change."""
         
-        valid_modes = ["single", "restart", "queued", "parallel"]
-        if new_mode not in valid_modes:
+        if new_mode not in VALID_MODES:
             return {
                 "success": False,
-                "error": f"Invalid mode. Must be one of: {valid_modes}"
+                "error": f"Invalid mode. Must be one of: {VALID_MODES}"
             }
         
         automation_config = await self._load_automation_by_id(automation_id)
@@ -464,37 +448,13 @@ class RefactoringAssistant:
                 "error": f"Automation {automation_id} not found"
             }
         
-        current_mode = automation_config.get("mode", "single")
-        
-        changes = [{
-            "field": "mode",
-            "from": current_mode,
-            "to": new_mode,
-            "description": f"Change mode from '{current_mode}' to '{new_mode}'"
-        }]
-        
-        # Add max parameter for queued/parallel
-        if new_mode in ["queued", "parallel"]:
-            if "max" not in automation_config:
-                changes.append({
-                    "field": "max",
-                    "from": None,
-                    "to": 10,
-                    "description": "Add max parameter (default: 10)"
-                })
-        
         # Generate YAML previews
         import copy
         current_yaml = yaml.dump(automation_config, default_flow_style=False, allow_unicode=True)
         
         # Create a deep copy to apply changes for preview
         new_config = copy.deepcopy(automation_config)
-        new_config["mode"] = new_mode
-        
-        if new_mode in ["queued", "parallel"]:
-            if "max" not in new_config:
-                new_config["max"] = 10
-                
+        changes = self._apply_mode(new_config, new_mode)
         new_yaml = yaml.dump(new_config, default_flow_style=False, allow_unicode=True)
         
         return {
@@ -507,15 +467,38 @@ class RefactoringAssistant:
             "new_yaml": new_yaml
         }
 
-    async def apply_mode_fix(self, automation_id: str, new_mode: str, dry_run: bool = False) -> dict[str, Any]:
-        """Apply automation mode change with backup."""
-        
-        preview = await self.preview_mode_fix(automation_id, new_mode)
+    @staticmethod
+    def _apply_mode(config: dict, new_mode: str) -> list[dict[str, Any]]:
+        """Set ``mode`` (and a default ``max`` for queued/parallel); return the changes."""
+        changes = []
+        current_mode = config.get("mode", "single")
+        if current_mode != new_mode:
+            changes.append({
+                "field": "mode",
+                "from": current_mode,
+                "to": new_mode,
+                "description": f"Change mode from '{current_mode}' to '{new_mode}'"
+            })
+            config["mode"] = new_mode
         
-        if not preview.get("success"):
-            return preview
+        # Add max parameter for queued/parallel
+        if new_mode in ["queued", "parallel"] and "max" not in config:
+            changes.append({
+                "field": "max",
+                "from": None,
+                "to": 10,
+                "description": "Add max parameter (default: 10)"
+            })
+            config["max"] = 10
+        return changes
 
+    async def apply_mode_fix(self, automation_id: str, new_mode: str, dry_run: bool = False) -> dict[str, Any]:
+        """Apply automation mode change with backup and reload."""
+        
         if dry_run:
+            preview = await self.preview_mode_fix(automation_id, new_mode)
+            if not preview.get("success"):
+                return preview
             return {
                 "success": True,
                 "automation_id": automation_id,
@@ -524,47 +507,24 @@ class RefactoringAssistant:
                 "preview": preview,
                 "message": "Dry run complete. No changes applied."
             }
-        
-        backup_path = await self._create_backup()
-        
-        try:
-            def read_automations():
-                with open(self._automations_file, "r", encoding="utf-8") as f:
-                    return yaml.safe_load(f) or []
-            
-            automations = await self.hass.async_add_executor_job(read_automations)
-            
-            for automation in automations:
-                if automation.get("id") == automation_id:
-                    automation["mode"] = new_mode
-                    
-                    if new_mode in ["queued", "parallel"]:
-                        if "max" not in automation:
-                            automation["max"] = 10
-                    
-                    break
-            
-            def write_automations():
-                with open(self._automations_file, "w", encoding="utf-8") as f:
-                    yaml.dump(automations, f, default_flow_style=False, allow_unicode=True)
-            
-            await self.hass.async_add_executor_job(write_automations)
-            
+
+        if new_mode not in VALID_MODES:
+            return {
+                "success": False,
+                "error": f"Invalid mode. Must be one of: {VALID_MODES}"
+            }
+
+        transaction = self.transaction("mode_fix", [automation_id])
+        transaction.add(ConfigEdit(automation_id, "automation", automation_id, self._mode_edit(new_mode)))
+        outcome = await transaction.async_commit()
+        if outcome["results"][0]["status"] == STATUS_UNCHANGED:
             return {
                 "success": True,
                 "automation_id": automation_id,
                 "new_mode": new_mode,
-                "backup_path": str(backup_path),
-                "message": "Mode changed successfully. Restart Home Assistant to apply."
-            }
-            
-        except Exception as e:
-            _LOGGER.error("Error changing mode: %s", e)
-            return {
-                "success": False,
-                "error": str(e),
-                "backup_path": str(backup_path)
+                "message": f"Mode is already '{new_mode}'."
             }
+        return self._single_fix_result(outcome, automation_id, new_mode=new_mode)
 
     async def preview_template_fix(self, automation_id: str) -> dict[str, Any]:
         """Preview template to native condition conversion."""
@@ -573,6 +533,30 @@ class RefactoringAssistant:
         if not automation_config:
             return {"success": False, "error": f"Automation {automation_id} not found"}
             
+        changes = self._template_changes(automation_config)
+
+        if not changes:
+            return {"success": False, "error": "No simple template conditions found to fix"}
+
+        # Generate YAML previews
+        import copy
+        current_yaml = yaml.dump(automation_config, default_flow_style=False, allow_unicode=True)
+        new_config = copy.deepcopy(automation_config)
+        self._apply_section_changes(new_config, changes)
+        new_yaml = yaml.dump(new_config, default_flow_style=False, allow_unicode=True)
+        
+        return {
+            "success": True,
+            "automation_id": automation_id,
+            "alias": automation_config.get("alias", ""),
+            "changes": changes,
+            "changes_count": len(changes),
+            "current_yaml": current_yaml,
+            "new_yaml": new_yaml
+        }
+
+    def _template_changes(self, automation_config: dict) -> list[dict[str, Any]]:
+        """is_state() template conditions → native state conditions."""
         changes = []
         
         # Check conditions
@@ -601,40 +585,14 @@ class RefactoringAssistant:
                     "to": new_condition,
                     "description": f"Condition {idx}: Template → state condition ({parsed['entity_id']} is {parsed['state']})"
                 })
-
-        if not changes:
-            return {"success": False, "error": "No simple template conditions found to fix"}
-
-        # Generate YAML previews
-        import copy
-        current_yaml = yaml.dump(automation_config, default_flow_style=False, allow_unicode=True)
-        new_config = copy.deepcopy(automation_config)
-        
-        for change in changes:
-            idx = change["index"]
-            items = new_config.get(condition_key, [])
-            if idx < len(items):
-                items[idx] = change["to"]
-                
-        new_yaml = yaml.dump(new_config, default_flow_style=False, allow_unicode=True)
-        
-        return {
-            "success": True,
-            "automation_id": automation_id,
-            "alias": automation_config.get("alias", ""),
-            "changes": changes,
-            "changes_count": len(changes),
-            "current_yaml": current_yaml,
-            "new_yaml": new_yaml
-        }
+        return changes
 
     async def apply_template_fix(self, automation_id: str, dry_run: bool = False) -> dict[str, Any]:
-        """Apply template fix with backup."""
-        preview = await self.preview_template_fix(automation_id)
-        if not preview.get("success"):
-            return preview
-
+        """Apply template fix with backup and reload."""
         if dry_run:
+            preview = await self.preview_template_fix(automation_id)
+            if not preview.get("success"):
+                return preview
             return {
                 "success": True,
                 "automation_id": automation_id,
@@ -642,46 +600,119 @@ class RefactoringAssistant:
                 "preview": preview,
                 "message": "Dry run complete."
             }
-            
-        backup_path = await self._create_backup()
-        
-        try:
-            def read_automations():
-                with open(self._automations_file, "r", encoding="utf-8") as f:
-                    return yaml.safe_load(f) or []
-            
-            automations = await self.hass.async_add_executor_job(read_automations)
-            
-            for automation in automations:
-                if automation.get("id") == automation_id:
-                    cond_key = "conditions" if "conditions" in automation else "condition"
-                    items = automation.get(cond_key, [])
-                    if not isinstance(items, list):
-                        items = [items] if items else []
-                        
-                    for change in preview["changes"]:
-                        idx = change["index"]
-                        if idx < len(items):
-                            items[idx] = change["to"]
-                    automation[cond_key] = items
-                    break
-            
-            def write_automations():
-                with open(self._automations_file, "w", encoding="utf-8") as f:
-                    yaml.dump(automations, f, default_flow_style=False, allow_unicode=True)
-            
-            await self.hass.async_add_executor_job(write_automations)
-            
+
+        transaction = self.transaction("template_fix", [automation_id])
+        transaction.add(ConfigEdit(automation_id, "automation", automation_id, self._template_edit))
+        outcome = await transaction.async_commit()
+        if outcome["results"][0]["status"] == STATUS_UNCHANGED:
+            return {"success": False, "error": "No simple template conditions found to fix"}
+        return self._single_fix_result(
+            outcome, automation_id,
+            changes_applied=len(outcome["results"][0]["changes"]),
+        )
+
+    # ── Batched fixes ─────────────────────────────────────────────────────
+
+    def transaction(self, reason: str = "fix", issue_ids: list[str] | None = None) -> ConfigTransaction:
+        """A transaction over automations.yaml / scripts.yaml with HACA backups.
+
+        ``reason`` and ``issue_ids`` are recorded in the backup manifest.
+        """
+        return ConfigTransaction(
+            self.hass,
+            {"automation": self._automations_file, "script": self._scripts_file},
+            {"automation": self._match_automation, "script": self._match_script},
+            backup=partial(self._create_backup, reason=reason, issue_ids=issue_ids or []),
+        )
+
+    async def _device_id_edit(self, config: dict) -> list[dict[str, Any]]:
+        changes = await self._device_id_changes(config)
+        self._apply_section_changes(config, changes)
+        return changes
+
+    async def _template_edit(self, config: dict) -> list[dict[str, Any]]:
+        changes = self._template_changes(config)
+        self._apply_section_changes(config, changes)
+        return changes
+
+    def _mode_edit(self, new_mode: str):
+        async def edit(config: dict) -> list[dict[str, Any]]:
+            return self._apply_mode(config, new_mode)
+        return edit
+
+    async def apply_fixes(self, fixes: list[dict[str, Any]], dry_run: bool = False) -> dict[str, Any]:
+        """Apply many automation fixes in one transaction.
+
+        ``fixes`` are issue-like dicts: ``{"id", "type", "automation_id"}``
+        plus an optional ``mode`` for mode fixes (default: restart).  Issues
+        hitting the same automation with the same kind of fix share one edit.
+        Returns the transaction outcome with one result per fix.
+        """
+        transaction = self.transaction(
+            "batch_fix", [str(fix.get("id") or fix.get("automation_id") or "") for fix in fixes]
+        )
+        edits: dict[tuple, ConfigEdit] = {}
+        planned: list[tuple[dict[str, Any], ConfigEdit | None]] = []
+        for fix in fixes:
+            kind = FIX_KINDS.get(fix.get("type", ""))
+            automation_id = fix.get("automation_id") or ""
+            if kind is None or not automation_id:
+                planned.append((fix, None))
+                continue
+            new_mode = fix.get("mode") or "restart"
+            key = (kind, automation_id, new_mode if kind == "mode" else None)
+            if key not in edits:
+                if kind == "device_id":
+                    apply = self._device_id_edit
+                elif kind == "template":
+                    apply = self._template_edit
+                else:
+                    apply = self._mode_edit(new_mode)
+                edits[key] = ConfigEdit(str(fix.get("id") or automation_id), "automation", automation_id, apply)
+                transaction.add(edits[key])
+            planned.append((fix, edits[key]))
+
+        outcome = await transaction.async_commit(dry_run=dry_run)
+        by_edit = dict(zip(edits.values(), outcome["results"]))
+        results = []
+        for fix, edit in planned:
+            if edit is None:
+                results.append({
+                    "id": fix.get("id"),
+                    "domain": "automation",
+                    "target": fix.get("automation_id"),
+                    "status": STATUS_NOT_FIXABLE,
+                    "changes": [],
+                    "error": f"No automatic fix for '{fix.get('type')}'"
+                    if fix.get("automation_id") else "Missing automation_id",
+                })
+            else:
+                results.append({**by_edit[edit], "id": fix.get("id") or edit.edit_id})
+        outcome["results"] = results
+        outcome["applied"] = sum(1 for r in results if r["status"] in (STATUS_APPLIED, STATUS_PLANNED))
+        return outcome
+
+    @staticmethod
+    def _single_fix_result(outcome: dict[str, Any], automation_id: str, **extra: Any) -> dict[str, Any]:
+        """Map a one-edit transaction outcome onto the apply_*_fix result shape."""
+        result = outcome["results"][0]
+        if result["status"] == STATUS_NOT_FOUND:
+            return {"success": False, "error": f"Automation {automation_id} not found"}
+        if result["status"] != STATUS_APPLIED:
             return {
-                "success": True,
-                "automation_id": automation_id,
-                "changes_applied": len(preview["changes"]),
-                "backup_path": str(backup_path),
-                "message": "Template fix applied successfully."
+                "success": False,
+                "error": outcome.get("error") or result.get("error") or "No changes to apply",
+                "rolled_back": outcome["rolled_back"],
+                "backup_path": outcome["backup_path"],
             }
-        except Exception as e:
-            _LOGGER.error("Error applying template fix: %s", e)
-            return {"success": False, "error": str(e), "backup_path": str(backup_path)}
+        return {
+            "success": True,
+            "automation_id": automation_id,
+            **extra,
+            "backup_path": outcome["backup_path"],
+            "reloaded": outcome["reloaded"],
+            "message": "Changes applied and automations reloaded."
+        }
 
     def _parse_is_state_template(self, template: str) -> dict[str, str] | None:
         """Parse is_state('entity', 'state') from template string."""
@@ -698,102 +729,94 @@ class RefactoringAssistant:
         return None
 
     async def list_backups(self) -> list[dict]:
-        """List available backups."""
-        
-        if not self._backup_dir.exists():
-            _LOGGER.debug("Backup directory does not exist: %s", self._backup_dir)
-            return []
-            
-        def _scan_backups():
-            results = []
-            try:
-                _LOGGER.debug("Scanning backups in: %s", self._backup_dir)
-                for entry in self._backup_dir.iterdir():
-                    if entry.is_file() and entry.name.startswith("automations_") and entry.name.endswith(".yaml"):
-                        try:
-                            stat = entry.stat()
-                            # Parser la date depuis le nom de fichier (automations_YYYYMMDD_HHMMSS.yaml)
-                            # Plus fiable que st_mtime qui reflète l'heure de copie/restauration
-                            created_iso = datetime.fromtimestamp(stat.st_mtime).isoformat()
-                            try:
-                                stem = entry.stem  # ex: automations_20260224_182358
-                                parts = stem.split("_", 1)
-                                if len(parts) == 2:
-                                    ts_str = parts[1].replace("_", "")  # 20260224182358
-                                    if len(ts_str) == 14:
-                                        parsed = datetime.strptime(ts_str, "%Y%m%d%H%M%S")
-                                        created_iso = parsed.isoformat()
-                            except Exception:
-                                pass  # garder st_mtime si parsing impossible
-                            results.append({
-                                "path": str(entry.absolute()),
-                                "name": entry.name,
-                                "size": stat.st_size,
-                                "created": created_iso,
-                            })
-                        except Exception as err:
-                            _LOGGER.warning("Error reading backup file %s: %s", entry.name, err)
-                            
-                # Sort by reverse chronological order (newest first) based on created timestamp
-                results.sort(key=lambda x: x["created"], reverse=True)
-                return results[:10]
-                
-            except Exception as err:
-                _LOGGER.error("Error scanning backup directory: %s", err)
-                return []
+        """List available backups, newest first.
 
+        ``path`` is the backup id to pass back to restore/delete/preview.
+        """
         try:
-            return await self.hass.async_add_executor_job(_scan_backups)
+            entries = await self.hass.async_add_executor_job(self._store.entries)
         except Exception as e:
             _LOGGER.error("Error listing backups: %s", e)
             return []
+        return [
+            {
+                "path": entry["id"],
+                "name": entry["id"],
+                "file": entry["file"],
+                "size": entry["size"],
+                "stored_size": entry["stored_size"],
+                "created": entry["created"],
+                "reason": entry["reason"],
+                "issue_ids": entry["issue_ids"],
+            }
+            for entry in entries
+        ]
 
-    async def restore_backup(self, backup_path: str) -> dict[str, Any]:
-        """Restore automations from backup.
+    def _backup_target(self, entry: dict[str, Any]) -> Path:
+        """Config file a backup restores to (scripts.yaml / automations.yaml)."""
+        return self._scripts_file if entry["file"] == self._scripts_file.name else self._automations_file
 
-        Security: backup_path is validated to be inside the designated backup
-        directory before any file operation, preventing path-traversal attacks.
-        """
-        backup_file = Path(backup_path)
+    async def _get_backup(self, backup_id: str) -> dict[str, Any] | None:
+        # Paths sent by older clients: only their name can match a backup id
+        return await self.hass.async_add_executor_job(self._store.get, Path(backup_id).name)
+
+    async def preview_restore(self, backup_id: str) -> dict[str, Any]:
+        """Per-automation/script diff between the current file and a backup."""
+        entry = await self._get_backup(backup_id)
+        if entry is None:
+            return {"success": False, "error": "Backup not found"}
+        target = self._backup_target(entry)
+
+        def _diff():
+            current = target.read_text(encoding="utf-8") if target.exists() else ""
+            return item_diffs(current, self._store.read(entry["id"]))
 
-        # ── Path-traversal guard ──────────────────────────────────────────────
-        # Resolve both paths to their canonical (symlink-free) absolute forms,
-        # then assert the backup file is inside _backup_dir.
         try:
-            backup_file.resolve().relative_to(self._backup_dir.resolve())
-        except ValueError:
-            _LOGGER.warning(
-                "restore_backup: rejected path outside backup dir: %s", backup_path
-            )
-            return {
-                "success": False,
-                "error": "Invalid backup path — file must be inside the HACA backup directory.",
-            }
+            changes = await self.hass.async_add_executor_job(_diff)
+        except (OSError, yaml.YAMLError) as e:
+            _LOGGER.error("Error previewing backup %s: %s", entry["id"], e)
+            return {"success": False, "error": str(e)}
+        return {
+            "success": True,
+            "backup_id": entry["id"],
+            "file": entry["file"],
+            "created": entry["created"],
+            "changes": changes,
+            "count": len(changes),
+        }
 
-        if not backup_file.exists():
+    async def restore_backup(self, backup_path: str) -> dict[str, Any]:
+        """Restore automations.yaml / scripts.yaml from a backup.
+
+        Security: ``backup_path`` is a backup id from ``list_backups``; only
+        ids listed in the manifest are accepted, no caller path is opened.
+        """
+        entry = await self._get_backup(backup_path)
+        if entry is None:
             return {
                 "success": False,
-                "error": "Backup file not found"
+                "error": "Backup not found"
             }
-        
+        target = self._backup_target(entry)
+
         try:
             # Create backup of current state before restore
-            pre_restore_backup = await self._create_backup()
-            
-            # Copy backup to automations.yaml
+            pre_restore_backup = await self._create_backup([target], reason="pre_restore")
+
             def restore():
-                import shutil
-                shutil.copy2(backup_file, self._automations_file)
-            
+                _atomic_write(target, self._store.read(entry["id"]))
+
             await self.hass.async_add_executor_job(restore)
-            
+            domain = "script" if target == self._scripts_file else "automation"
+            await async_reload(self.hass, domain, paths=[target])
+
             return {
                 "success": True,
-                "restored_from": str(backup_file),
-                "backup_before_restore": str(pre_restore_backup),
-                "message": "Backup restored. Restart Home Assistant to apply."
+                "restored_from": entry["id"],
+                "backup_before_restore": pre_restore_backup,
+                "message": f"Backup restored and {domain}s reloaded."
             }
-            
+
         except Exception as e:
             _LOGGER.error("Error restoring backup: %s", e)
             return {
@@ -802,13 +825,14 @@ class RefactoringAssistant:
             }
 
     async def create_backup(self) -> dict[str, Any]:
-        """Create a manual backup."""
+        """Create a manual backup of automations.yaml and scripts.yaml."""
         try:
-            backup_path = await self._create_backup()
+            sources = [p for p in (self._automations_file, self._scripts_file) if p.exists()]
+            backup_id = await self._create_backup(sources or None, reason="manual")
             return {
                 "success": True,
-                "backup_path": str(backup_path),
-                "message": f"Backup created: {backup_path.name}"
+                "backup_path": backup_id,
+                "message": f"Backup created: {backup_id}"
             }
         except Exception as e:
             _LOGGER.error("Error creating backup: %s", e)
@@ -818,72 +842,45 @@ class RefactoringAssistant:
             }
 
     async def delete_backup(self, backup_path: str) -> dict[str, Any]:
-        """Delete a specific backup file."""
-        backup_file = Path(backup_path)
-        
-        # Security check: ensure file is in backup directory
-        try:
-            backup_file.resolve().relative_to(self._backup_dir.resolve())
-        except ValueError:
-            return {
-                "success": False,
-                "error": "Invalid backup path - file must be in backup directory"
-            }
-        
-        if not backup_file.exists():
-            return {
-                "success": False,
-                "error": "Backup file not found"
-            }
-        
+        """Delete one backup (its blob goes once no other backup uses it)."""
+        backup_id = Path(backup_path).name
         try:
-            def delete_file():
-                backup_file.unlink()
-            
-            await self.hass.async_add_executor_job(delete_file)
-            
-            _LOGGER.info("Deleted backup: %s", backup_file)
-            return {
-                "success": True,
-                "deleted_file": backup_file.name,
-                "message": f"Backup deleted: {backup_file.name}"
-            }
+            deleted = await self.hass.async_add_executor_job(self._store.delete, backup_id)
         except Exception as e:
             _LOGGER.error("Error deleting backup: %s", e)
             return {
                 "success": False,
                 "error": str(e)
             }
+        if not deleted:
+            return {
+                "success": False,
+                "error": "Backup not found"
+            }
+        _LOGGER.info("Deleted backup: %s", backup_id)
+        return {
+            "success": True,
+            "deleted_file": backup_id,
+            "message": f"Backup deleted: {backup_id}"
+        }
 
-    async def _create_backup(self) -> Path:
-        """Create backup of automations.yaml."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = self._backup_dir / f"automations_{timestamp}.yaml"
-        
-        def create_backup():
-            import shutil
-            shutil.copy2(self._automations_file, backup_file)
-        
-        await self.hass.async_add_executor_job(create_backup)
-        
-        # Cleanup old backups (keep last 10)
-        await self._cleanup_old_backups()
-        
-        _LOGGER.info("Created backup: %s", backup_file)
-        return backup_file
-
-    async def _cleanup_old_backups(self):
-        """Keep only the last 10 backups (runs in executor to avoid blocking)."""
-        def _do_cleanup():
-            backups = sorted(self._backup_dir.glob("automations_*.yaml"), reverse=True)
-            for old_backup in backups[10:]:
-                try:
-                    old_backup.unlink()
-                    _LOGGER.debug("Deleted old backup: %s", old_backup)
-                except Exception as e:
-                    _LOGGER.warning("Failed to delete old backup %s: %s", old_backup, e)
-
-        await self.hass.async_add_executor_job(_do_cleanup)
+    async def _create_backup(
+        self,
+        sources: list[Path] | None = None,
+        reason: str = "manual",
+        issue_ids: list[str] | None = None,
+    ) -> str:
+        """Back up automations.yaml (or the given config files) into the store.
+
+        Returns the backup id of the first file.  A file identical to its
+        last backup is not stored again: that backup's id is returned.
+        """
+        sources = sources or [self._automations_file]
+        entries = await async_backup(self.hass, sources, reason, issue_ids or [])
+        if not entries:
+            raise FileNotFoundError(f"Nothing to back up: {', '.join(s.name for s in sources)}")
+        _LOGGER.info("Created backup: %s", ", ".join(e["id"] for e in entries))
+        return entries[0]["id"]
 
     async def _load_automation_by_id(self, automation_id: str) -> dict | None:
         """Load a specific automation configuration by ID, alias, or entity_id."""
@@ -894,80 +891,89 @@ class RefactoringAssistant:
         
         try:
             automations = await self.hass.async_add_executor_job(read_automations)
-            
-            # 1. Search by precise 'id'
-            for automation in automations:
-                if automation.get("id") == automation_id:
-                    return automation
-            
-            # 2. Search by 'alias' (common if 'id' is missing)
-            for automation in automations:
-                alias = automation.get("alias")
-                if alias and (alias == automation_id or alias.lower().replace(" ", "_").replace(".", "_") == automation_id):
-                    return automation
-            
-            # 3. Handle entity_id format (e.g., "automation.presence_entree_2")
-            # Extract the automation name from entity_id and search by alias
-            if automation_id.startswith("automation."):
-                automation_name = automation_id.replace("automation.", "")
-                
-                # Try to find by alias that matches the entity name
-                for automation in automations:
-                    alias = automation.get("alias")
-                    if alias:
-                        generated_alias = alias.lower().replace(' ', '_').replace('-', '_')
-                        if generated_alias == automation_name:
-                            return automation
-                
-                # Try to find by exact alias match
-                for automation in automations:
-                    alias = automation.get("alias")
-                    if alias and alias.lower() == automation_name.lower():
-                        return automation
-            
-            # 4. Handle "unknown" entity_id fallback (fix for the reported issue)
-            # If automation_id looks like "automation.unknown_123456", try to find by the original ID
-            if automation_id.startswith("automation.unknown_"):
-                # Extract the original ID or index from the unknown string
-                original_part = automation_id.replace("automation.unknown_", "")
-                
-                # Try to find automation by original ID
-                for automation in automations:
-                    if automation.get("id") == original_part:
-                        return automation
-                
-                # Try to find automation by alias that matches the original part
-                for automation in automations:
-                    alias = automation.get("alias")
-                    if alias:
-                        generated_alias = alias.lower().replace(' ', '_').replace('-', '_')
-                        if generated_alias == original_part:
-                            return automation
-                
-                # Try to parse as index (if it's a number)
-                try:
-                    index = int(original_part)
-                    if 0 <= index < len(automations):
-                        return automations[index]
-                except ValueError:
-                    pass
-            
-            # 5. Try to resolve via entity registry (if automation_id is an entity_id)
-            if automation_id.startswith("automation."):
-                entity_reg = er.async_get(self.hass)
-                entity_entry = entity_reg.async_get(automation_id)
-                if entity_entry and entity_entry.unique_id:
-                    # Search by unique_id (which should match the automation's id in YAML)
-                    for automation in automations:
-                        if automation.get("id") == entity_entry.unique_id:
-                            return automation
-            
-            return None
+            index = self._match_automation(automations, automation_id)
+            return None if index is None else automations[index]
             
         except Exception as e:
             _LOGGER.error("Error loading automation: %s", e)
             return None
 
+    def _match_automation(self, automations: list, automation_id: str) -> int | None:
+        """Index of the automation matching an ID, alias, or entity_id (None if absent)."""
+        if not isinstance(automations, list):
+            return None
+        # Non-mapping entries keep their position but never match
+        automations = [a if isinstance(a, dict) else {} for a in automations]
+
+        # 1. Search by precise 'id'
+        for index, automation in enumerate(automations):
+            if automation.get("id") == automation_id:
+                return index
+
+        # 2. Search by 'alias' (common if 'id' is missing)
+        for index, automation in enumerate(automations):
+            alias = automation.get("alias")
+            if alias and (alias == automation_id or alias.lower().replace(" ", "_").replace(".", "_") == automation_id):
+                return index
+
+        # 3. Handle entity_id format (e.g., "automation.presence_entree_2")
+        # Extract the automation name from entity_id and search by alias
+        if automation_id.startswith("automation."):
+            automation_name = automation_id.replace("automation.", "")
+
+            # Try to find by alias that matches the entity name
+            for index, automation in enumerate(automations):
+                alias = automation.get("alias")
+                if alias:
+                    generated_alias = alias.lower().replace(' ', '_').replace('-', '_')
+                    if generated_alias == automation_name:
+                        return index
+
+            # Try to find by exact alias match
+            for index, automation in enumerate(automations):
+                alias = automation.get("alias")
+                if alias and alias.lower() == automation_name.lower():
+                    return index
+
+        # 4. Handle "unknown" entity_id fallback (fix for the reported issue)
+        # If automation_id looks like "automation.unknown_123456", try to find by the original ID
+        if automation_id.startswith("automation.unknown_"):
+            # Extract the original ID or index from the unknown string
+            original_part = automation_id.replace("automation.unknown_", "")
+
+            # Try to find automation by original ID
+            for index, automation in enumerate(automations):
+                if automation.get("id") == original_part:
+                    return index
+
+            # Try to find automation by alias that matches the original part
+            for index, automation in enumerate(automations):
+                alias = automation.get("alias")
+                if alias:
+                    generated_alias = alias.lower().replace(' ', '_').replace('-', '_')
+                    if generated_alias == original_part:
+                        return index
+
+            # Try to parse as index (if it's a number)
+            try:
+                position = int(original_part)
+                if 0 <= position < len(automations):
+                    return position
+            except ValueError:
+                pass
+
+        # 5. Try to resolve via entity registry (if automation_id is an entity_id)
+        if automation_id.startswith("automation."):
+            entity_reg = er.async_get(self.hass)
+            entity_entry = entity_reg.async_get(automation_id)
+            if entity_entry and entity_entry.unique_id:
+                # Search by unique_id (which should match the automation's id in YAML)
+                for index, automation in enumerate(automations):
+                    if automation.get("id") == entity_entry.unique_id:
+                        return index
+
+        return None
+
     async def _load_script_by_entity_id(self, entity_id: str) -> dict | None:
         """Load a specific script configuration by entity_id (e.g. 'script.my_script')."""
         def read_scripts():
@@ -978,21 +984,30 @@ class RefactoringAssistant:
 
         try:
             scripts = await self.hass.async_add_executor_job(read_scripts)
-            # scripts.yaml is a dict keyed by script alias/id
-            script_key = entity_id.replace("script.", "")
-            if script_key in scripts:
-                config = scripts[script_key]
-                config["_script_key"] = script_key
-                return config
-            # Fallback: search by alias
-            for key, cfg in scripts.items():
-                if isinstance(cfg, dict) and cfg.get("alias", "").lower().replace(" ", "_") == script_key:
-                    cfg["_script_key"] = key
-                    return cfg
-            return None
+            key = self._match_script(scripts, entity_id)
+            if key is None:
+                return None
+            config = scripts[key]
+            config["_script_key"] = key
+            return config
         except Exception:
             return None
 
+    @staticmethod
+    def _match_script(scripts: dict, entity_id: str) -> str | None:
+        """Key of the script matching an entity_id, by key then by alias."""
+        if not isinstance(scripts, dict):
+            return None
+        # scripts.yaml is a dict keyed by script alias/id
+        script_key = entity_id.replace("script.", "")
+        if script_key in scripts:
+            return script_key
+        # Fallback: search by alias
+        for key, cfg in scripts.items():
+            if isinstance(cfg, dict) and cfg.get("alias", "").lower().replace(" ", "_") == script_key:
+                return key
+        return None
+
     async def _get_entities_for_device(self, device_id: str) -> list[str]:
         """Get entity IDs for a device."""
         entity_reg = er.async_get(self.hass)
@@ -1080,7 +1095,7 @@ class RefactoringAssistant:
             if not config:
                 return {"success": False, "error": f"Automation not found: {automation_id}"}
 
-            backup_path = await self._create_backup()
+            backup_path = await self._create_backup(reason="zombie_fix", issue_ids=[automation_id])
             _LOGGER.info("Backup created before zombie fix: %s", backup_path)
 
             changed = self._replace_entity_in_config(config, old_entity_id, new_entity_id)
@@ -1104,9 +1119,7 @@ class RefactoringAssistant:
             await self.hass.async_add_executor_job(read_and_write)
 
             # Reload automations so the change takes effect in HA
-            await self.hass.services.async_call(
-                "automation", "reload", blocking=True
-            )
+            await async_reload(self.hass, "automation", [automation_id], [self._automations_file])
 
             action = f"replaced with {new_entity_id}" if new_entity_id else "removed"
             return {
@@ -1181,65 +1194,25 @@ class RefactoringAssistant:
 
     async def suggest_description_ai(self, entity_id: str) -> dict[str, Any]:
         """Get an AI-suggested description for an automation or script."""
-        is_script = entity_id.startswith("script.")
-        
-        if is_script:
-            config = await self._load_script_by_entity_id(entity_id)
-        else:
-            # For automations, we need to resolve the entity_id to the YAML 'id'
-            registry = er.async_get(self.hass)
-            entry = registry.async_get(entity_id)
-            automation_id = None
-            
-            if entry and entry.unique_id:
-                automation_id = entry.unique_id
-            else:
-                automation_id = entity_id.replace("automation.", "")
-
-            config = await self._load_automation_by_id(automation_id)
-            
-            # Second attempt: if not found, try by alias mapping (as slug)
-            if not config:
-                config = await self._load_automation_by_id(entity_id.replace("automation.", ""))
-            
+        config = await self.load_description_target(entity_id)
         if not config:
             return {"success": False, "error": f"Configuration not found for {entity_id}"}
-            
-        alias = config.get("alias", entity_id)
-        
-        # Prepare content for prompt
-        if is_script:
-            triggers_part = "Actions (Script) :"
-            triggers_yaml = yaml.dump(config.get("sequence", []), default_flow_style=False, allow_unicode=True)
-            actions_part = ""
-            actions_yaml = ""
-        else:
-            triggers_part = "Déclencheurs (YAML) :"
-            triggers_yaml = yaml.dump(config.get("trigger", []) or config.get("triggers", []), default_flow_style=False, allow_unicode=True)
-            actions_part = "Actions (YAML) :"
-            actions_yaml = yaml.dump(config.get("action", []) or config.get("actions", []), default_flow_style=False, allow_unicode=True)
-
-        # Build the full YAML block from triggers + actions parts
-        yaml_block = (triggers_yaml + "\n" + actions_yaml).strip()[:4000] or "(YAML non disponible)"
 
+        alias = config.get("alias", entity_id)
         _lang = self.hass.data.get("config_auditor", {}).get("user_language") or self.hass.config.language or "en"
-        import json as _j; from pathlib import Path as _pp
-        try:
-            _ap = _j.loads((_pp(__file__).parent / "translations" / f"{_lang}.json").read_text(encoding="utf-8")).get("ai_prompts", {})
-        except Exception:
-            _ap = {}
-        prompt = _ap.get("description_suggest_system", "Suggest a short description for: {yaml}").format(yaml=yaml_block)
+        prompt = await self.hass.async_add_executor_job(
+            self.description_prompt, config, entity_id.startswith("script."), _lang
+        )
 
         # ── Call AI ────────────────────────────────────────────────────────────
         suggestion = ""
         try:
-            from .conversation import _async_call_ai
-            raw = await _async_call_ai(self.hass, prompt, "HACA Description Suggest")
-            if raw:
-                # Extract content from ```suggestion ... ``` block if present, else use raw
-                import re as _re
-                m = _re.search(r"```suggestion\s*(.*?)\s*```", raw, _re.DOTALL)
-                suggestion = m.group(1).strip() if m else raw.strip()
+            from .conversation import _async_call_ai_cached
+            raw = await _async_call_ai_cached(
+                self.hass, prompt, "HACA Description Suggest", "description", _lang,
+                entity_id=entity_id, config=config,
+            )
+            suggestion = self.parse_description(raw)
         except Exception as ai_err:
             _LOGGER.warning("suggest_description_ai AI call failed: %s", ai_err)
 
@@ -1253,6 +1226,90 @@ class RefactoringAssistant:
             "alias": alias,
             "suggestion": suggestion,
         }
+
+    async def load_description_target(self, entity_id: str) -> dict | None:
+        """Config of the automation / script whose description is suggested."""
+        if entity_id.startswith("script."):
+            return await self._load_script_by_entity_id(entity_id)
+        # For automations, we need to resolve the entity_id to the YAML 'id'
+        registry = er.async_get(self.hass)
+        entry = registry.async_get(entity_id)
+        if entry and entry.unique_id:
+            automation_id = entry.unique_id
+        else:
+            automation_id = entity_id.replace("automation.", "")
+
+        config = await self._load_automation_by_id(automation_id)
+        # Second attempt: if not found, try by alias mapping (as slug)
+        if not config:
+            config = await self._load_automation_by_id(entity_id.replace("automation.", ""))
+        return config
+
+    @staticmethod
+    def description_prompt(config: dict, is_script: bool, language: str) -> str:
+        """Description prompt for one config (executor: reads the translations)."""
+        if is_script:
+            triggers_yaml = yaml.dump(config.get("sequence", []), default_flow_style=False, allow_unicode=True)
+            actions_yaml = ""
+        else:
+            triggers_yaml = yaml.dump(config.get("trigger", []) or config.get("triggers", []), default_flow_style=False, allow_unicode=True)
+            actions_yaml = yaml.dump(config.get("action", []) or config.get("actions", []), default_flow_style=False, allow_unicode=True)
+
+        # Build the full YAML block from triggers + actions parts
+        yaml_block = (triggers_yaml + "\n" + actions_yaml).strip()[:4000] or "(YAML non disponible)"
+
+        try:
+            _ap = json.loads(
+                (Path(__file__).parent / "translations" / f"{language}.json").read_text(encoding="utf-8")
+            ).get("ai_prompts", {})
+        except Exception:
+            _ap = {}
+        return _ap.get("description_suggest_system", "Suggest a short description for: {yaml}").format(yaml=yaml_block)
+
+    @staticmethod
+    def parse_description(raw: str) -> str:
+        """Suggested description in an AI reply ("" when empty)."""
+        if not raw:
+            return ""
+        # Extract content from ```suggestion ... ``` block if present, else use raw
+        m = re.search(r"```suggestion\s*(.*?)\s*```", raw, re.DOTALL)
+        return m.group(1).strip() if m else raw.strip()
+
+    async def apply_descriptions(
+        self, descriptions: dict[str, str], reason: str = "description_batch"
+    ) -> dict[str, Any]:
+        """Write many descriptions in one transaction (one backup, one reload per domain).
+
+        ``descriptions`` maps automation / script entity_ids to their new
+        description.  Returns the transaction outcome, one result per entity.
+        """
+        registry = er.async_get(self.hass)
+        transaction = self.transaction(reason, list(descriptions))
+        for entity_id, description in descriptions.items():
+            domain = "script" if entity_id.startswith("script.") else "automation"
+            if domain == "script":
+                target = entity_id
+            else:
+                entry = registry.async_get(entity_id)
+                target = entry.unique_id if entry and entry.unique_id else entity_id.replace("automation.", "")
+            transaction.add(ConfigEdit(entity_id, domain, target, self._description_edit(description)))
+        return await transaction.async_commit()
+
+    @staticmethod
+    def _description_edit(description: str):
+        async def edit(config: dict) -> list[dict[str, Any]]:
+            old = config.get("description") or ""
+            if old == description:
+                return []
+            config["description"] = description
+            return [{
+                "field": "description",
+                "from": old or None,
+                "to": description,
+                "description": "Set description",
+            }]
+        return edit
+
     async def apply_description_fix(self, entity_id: str, description: str) -> dict[str, Any]:
         """Write a description field into an automation or script YAML config."""
         if not entity_id or not description:
@@ -1271,7 +1328,9 @@ class RefactoringAssistant:
             else:
                 target_id = entity_id.replace("automation.", "")
 
-        backup_path = await self._create_backup()
+        backup_path = await self._create_backup(
+            [self._scripts_file] if is_script else None, reason="description", issue_ids=[entity_id]
+        )
 
         try:
             if is_script:
@@ -0,0 +1,235 @@
+"""H.A.C.A — Per-scan registry snapshot.
+
+One immutable view of the entity, device, area, floor and label registries,
+built at the start of a scan with the joins the analyzers need precomputed
+(area lookups, haca_ignore set, entity → device → area fallbacks, unique_id
+resolution…).  The coordinator hands the same object to every analyzer.
+
+Benefits:
+  • Each registry is walked once per scan instead of once per analyzer
+  • Per-entity ``ent_reg.async_get`` + ``dev_reg.async_get`` chains become
+    plain dict lookups
+  • Every analyzer sees the exact same registry view, even if the user
+    edits an area or a label while the scan is running
+
+The snapshot must be built from the event loop (registries are not
+thread-safe); once built it is read-only and safe to pass to executor jobs.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+HACA_IGNORE_LABEL = "haca_ignore"
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """Immutable, precomputed view of the HA registries for a single scan."""
+
+    built_at: float = 0.0
+    # entity_ids present in the entity registry
+    entity_ids: frozenset[str] = frozenset()
+    # device_ids present in the device registry
+    device_ids: frozenset[str] = frozenset()
+    area_ids: frozenset[str] = frozenset()
+    floor_ids: frozenset[str] = frozenset()
+    label_ids: frozenset[str] = frozenset()
+    # area_id → area name / lowercase area name → area_id
+    area_names: Mapping[str, str] = field(default=_EMPTY)
+    area_ids_by_name: Mapping[str, str] = field(default=_EMPTY)
+    # area_id → floor_id (None when the area has no floor)
+    area_floor: Mapping[str, str | None] = field(default=_EMPTY)
+    # entity_id → effective area_id (entity area, falling back to device area)
+    entity_area: Mapping[str, str] = field(default=_EMPTY)
+    # area_id → entity_ids whose effective area is that area
+    entities_by_area: Mapping[str, frozenset[str]] = field(default=_EMPTY)
+    # entity_id → labels on the entity plus labels inherited from its device
+    entity_labels: Mapping[str, frozenset[str]] = field(default=_EMPTY)
+    # config_entry_id → entity_ids created by that entry
+    entities_by_config_entry: Mapping[str, tuple[str, ...]] = field(default=_EMPTY)
+    # integration platform → number of registered entities
+    entity_count_by_platform: Mapping[str, int] = field(default=_EMPTY)
+    # automation unique_id → entity_id (platform "automation")
+    automation_entity_ids: Mapping[str, str] = field(default=_EMPTY)
+    # script YAML key / object_id → entity_id (handles renamed scripts)
+    script_entity_ids: Mapping[str, str] = field(default=_EMPTY)
+    # entity_ids carrying haca_ignore (directly or through their device)
+    ignored_entity_ids: frozenset[str] = frozenset()
+    # every label_id assigned to an entity, device or area
+    used_label_ids: frozenset[str] = frozenset()
+
+    def area_of(self, entity_id: str) -> str | None:
+        """Return the effective area_id of an entity (entity → device fallback)."""
+        return self.entity_area.get(entity_id)
+
+    def floor_of(self, entity_id: str) -> str | None:
+        """Return the floor_id of an entity's effective area."""
+        area_id = self.entity_area.get(entity_id)
+        return self.area_floor.get(area_id) if area_id else None
+
+    def labels_of(self, entity_id: str) -> frozenset[str]:
+        """Return entity + device labels for an entity."""
+        return self.entity_labels.get(entity_id, frozenset())
+
+    def is_ignored(self, entity_id: str) -> bool:
+        """Return True if the entity carries the haca_ignore label."""
+        return entity_id in self.ignored_entity_ids
+
+    def resolve_area(self, ref: str) -> str | None:
+        """Resolve an area reference given either as area_id or area name."""
+        if ref in self.area_ids:
+            return ref
+        return self.area_ids_by_name.get(ref.lower())
+
+
+@callback
+def async_build_registry_snapshot(hass: HomeAssistant) -> RegistrySnapshot:
+    """Walk every registry once and return the precomputed snapshot.
+
+    Each registry is read defensively: a registry that is missing (older HA,
+    unit-test stubs) simply contributes empty data instead of failing the scan.
+    """
+    from homeassistant.helpers import (
+        area_registry as ar,
+        device_registry as dr,
+        entity_registry as er,
+    )
+
+    started = time.monotonic()
+
+    # ── Areas ─────────────────────────────────────────────────────────────
+    area_names: dict[str, str] = {}
+    area_ids_by_name: dict[str, str] = {}
+    area_floor: dict[str, str | None] = {}
+    used_labels: set[str] = set()
+    try:
+        for area in ar.async_get(hass).async_list_areas():
+            area_names[area.id] = area.name
+            area_ids_by_name[str(area.name).lower()] = area.id
+            area_floor[area.id] = getattr(area, "floor_id", None)
+            used_labels.update(getattr(area, "labels", None) or ())
+    except Exception as exc:
+        _LOGGER.debug("[HACA Snapshot] area registry not available: %s", exc)
+
+    # ── Floors (HA 2024.2+) ───────────────────────────────────────────────
+    floor_ids: set[str] = set()
+    try:
+        from homeassistant.helpers import floor_registry as fr
+        floor_ids = {f.floor_id for f in fr.async_get(hass).async_list_floors()}
+    except Exception as exc:
+        _LOGGER.debug("[HACA Snapshot] floor registry not available: %s", exc)
+
+    # ── Labels (HA 2024.4+) ───────────────────────────────────────────────
+    label_ids: set[str] = set()
+    try:
+        from homeassistant.helpers import label_registry as lr
+        label_ids = {l.label_id for l in lr.async_get(hass).async_list_labels()}
+    except Exception as exc:
+        _LOGGER.debug("[HACA Snapshot] label registry not available: %s", exc)
+
+    # ── Devices ───────────────────────────────────────────────────────────
+    device_area: dict[str, str | None] = {}
+    device_labels: dict[str, frozenset[str]] = {}
+    try:
+        for device in dr.async_get(hass).devices.values():
+            device_area[device.id] = getattr(device, "area_id", None)
+            labels = frozenset(getattr(device, "labels", None) or ())
+            device_labels[device.id] = labels
+            used_labels.update(labels)
+    except Exception as exc:
+        _LOGGER.debug("[HACA Snapshot] device registry not available: %s", exc)
+
+    # ── Entities (joined with devices) ────────────────────────────────────
+    entity_ids: set[str] = set()
+    entity_area: dict[str, str] = {}
+    entities_by_area: dict[str, set[str]] = {}
+    entity_labels: dict[str, frozenset[str]] = {}
+    by_entry: dict[str, list[str]] = {}
+    by_platform: dict[str, int] = {}
+    automation_ids: dict[str, str] = {}
+    script_ids: dict[str, str] = {}
+    ignored: set[str] = set()
+    try:
+        for entry in er.async_get(hass).entities.values():
+            eid = entry.entity_id
+            entity_ids.add(eid)
+            device_id = getattr(entry, "device_id", None)
+
+            area_id = getattr(entry, "area_id", None)
+            if not area_id and device_id:
+                area_id = device_area.get(device_id)
+            if area_id:
+                entity_area[eid] = area_id
+                entities_by_area.setdefault(area_id, set()).add(eid)
+
+            own_labels = frozenset(entry.labels or ())
+            used_labels.update(own_labels)
+            labels = own_labels
+            if device_id:
+                labels = labels | device_labels.get(device_id, frozenset())
+            if labels:
+                entity_labels[eid] = labels
+                if HACA_IGNORE_LABEL in labels:
+                    ignored.add(eid)
+
+            if entry.config_entry_id:
+                by_entry.setdefault(entry.config_entry_id, []).append(eid)
+            platform = entry.platform or ""
+            by_platform[platform] = by_platform.get(platform, 0) + 1
+
+            if entry.platform == "automation" and entry.unique_id:
+                automation_ids[str(entry.unique_id)] = eid
+            if entry.domain == "script":
+                # unique_id is typically the YAML key; also map the object_id
+                script_ids[str(entry.unique_id)] = eid
+                if "." in eid:
+                    script_ids[eid.split(".", 1)[1]] = eid
+    except Exception as exc:
+        _LOGGER.warning("[HACA Snapshot] error reading entity registry: %s", exc)
+
+    snapshot = RegistrySnapshot(
+        built_at=time.time(),
+        entity_ids=frozenset(entity_ids),
+        device_ids=frozenset(device_area),
+        area_ids=frozenset(area_names),
+        floor_ids=frozenset(floor_ids),
+        label_ids=frozenset(label_ids),
+        area_names=MappingProxyType(area_names),
+        area_ids_by_name=MappingProxyType(area_ids_by_name),
+        area_floor=MappingProxyType(area_floor),
+        entity_area=MappingProxyType(entity_area),
+        entities_by_area=MappingProxyType(
+            {a: frozenset(e) for a, e in entities_by_area.items()}
+        ),
+        entity_labels=MappingProxyType(entity_labels),
+        entities_by_config_entry=MappingProxyType(
+            {ce: tuple(e) for ce, e in by_entry.items()}
+        ),
+        entity_count_by_platform=MappingProxyType(by_platform),
+        automation_entity_ids=MappingProxyType(automation_ids),
+        script_entity_ids=MappingProxyType(script_ids),
+        ignored_entity_ids=frozenset(ignored),
+        used_label_ids=frozenset(used_labels),
+    )
+    # Seed the haca_ignore cache: the set was resolved for free during the walk
+    from .translation_utils import HACA_IGNORE_CACHE_KEY
+    ignore_cache = hass.data.get("config_auditor", {}).get(HACA_IGNORE_CACHE_KEY)
+    if ignore_cache is not None:
+        ignore_cache.set(ignored)
+
+    _LOGGER.debug(
+        "[HACA Snapshot] built in %.1f ms — %d entities, %d devices, %d areas, %d ignored",
+        (time.monotonic() - started) * 1000,
+        len(entity_ids), len(device_area), len(area_names), len(ignored),
+    )
+    return snapshot
@@ -0,0 +1,256 @@
+"""H.A.C.A — Coalescing reloads of automations / scripts / scenes / blueprints.
+
+``ReloadScheduler`` sits between the HACA write paths (MCP tools, fixes,
+websocket field fixes) and the ``<domain>.reload`` services:
+
+  • requests for the same domain arriving within ``RELOAD_COALESCE_SECONDS``
+    share one reload; every caller awaits the combined result and gets the
+    reload error, if any, so write-then-rollback logic keeps working;
+  • reloads of one domain never overlap;
+  • one ``<domain>_reloaded`` event per reload HACA issued (fired while it
+    runs or within a short grace period) and the watcher events of the files
+    it wrote are reported as self-triggered, so the event monitor and the
+    config watcher drop them — a reload started by the user meanwhile still
+    counts;
+  • instead, one partial rescan of the scopes fed by the written files runs
+    once the reload succeeded.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+import logging
+import os
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import CONFIG_SCAN_SCOPES, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+RELOAD_SCHEDULER_KEY = "reload_scheduler"
+
+# Requests for one domain arriving within this window share one reload
+RELOAD_COALESCE_SECONDS = 0.5
+# A HACA reload's <domain>_reloaded event is expected at most this long after it
+SELF_RELOAD_GRACE_SECONDS = 5.0
+
+
+def _signature(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _signatures(paths: Iterable[str]) -> dict[str, tuple[int, int] | None]:
+    return {path: _signature(path) for path in paths}
+
+
+@dataclass
+class _ReloadBatch:
+    """Reload requests of one domain collected during the coalescing window."""
+
+    future: asyncio.Future
+    requests: int = 0
+    items: set[str] = field(default_factory=set)
+    paths: set[str] = field(default_factory=set)
+    rescan: bool = False
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+
+class ReloadScheduler:
+    """Coalesce reload requests per domain and flag the reloads HACA caused."""
+
+    def __init__(self, hass: HomeAssistant, window: float = RELOAD_COALESCE_SECONDS) -> None:
+        self.hass = hass
+        self.window = window
+        self._pending: dict[str, _ReloadBatch] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._active: dict[str, int] = {}
+        # <domain>_reloaded events still expected from HACA reloads, and until when
+        self._expected: dict[str, int] = {}
+        self._expected_until: dict[str, float] = {}
+        # path → (mtime_ns, size) right after HACA wrote it
+        self._own_writes: dict[str, tuple[int, int] | None] = {}
+        self.requests = 0
+        self.reloads = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.events_suppressed = 0
+        self.writes_suppressed = 0
+        self.rescans = 0
+
+    async def async_reload(
+        self,
+        domain: str,
+        items: Iterable[str] = (),
+        paths: Iterable[str | os.PathLike] = (),
+        *,
+        rescan: bool = True,
+    ) -> None:
+        """Request a reload of ``domain`` and wait for the (shared) reload.
+
+        ``items`` name the automations/scripts/scenes touched (logging) and
+        ``paths`` the files written for them: their watcher events are
+        ignored and their scopes are rescanned once the reload succeeded.
+        Raises the reload error.
+        """
+        self.requests += 1
+        batch = self._pending.get(domain)
+        leader = batch is None
+        if leader:
+            batch = self._pending[domain] = _ReloadBatch(
+                asyncio.get_running_loop().create_future()
+            )
+        batch.requests += 1
+        batch.items.update(str(item) for item in items if item)
+        batch.paths.update(os.fspath(path) for path in paths)
+        batch.rescan = batch.rescan or rescan
+        if not leader:
+            # shield: a cancelled caller must not cancel the others' result
+            return await asyncio.shield(batch.future)
+
+        # The window and the reload run in their own task: cancelling the
+        # leader must not leave the other callers waiting forever
+        batch.task = asyncio.ensure_future(self._async_flush(domain, batch))
+        return await asyncio.shield(batch.future)
+
+    async def _async_flush(self, domain: str, batch: _ReloadBatch) -> None:
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            if self._pending.get(domain) is batch:
+                del self._pending[domain]
+        try:
+            await self._async_reload_batch(domain, batch)
+        except BaseException as err:
+            # Cancelled (shutdown) or a bug: release the waiters with the error
+            if not batch.future.done():
+                batch.future.set_exception(
+                    err if isinstance(err, Exception) else asyncio.CancelledError()
+                )
+                batch.future.exception()
+            raise
+
+    async def _async_reload_batch(self, domain: str, batch: _ReloadBatch) -> None:
+        lock = self._locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            self.reloads += 1
+            self.coalesced += batch.requests - 1
+            self._active[domain] = self._active.get(domain, 0) + 1
+            self._expected[domain] = self._expected.get(domain, 0) + 1
+            try:
+                await self.hass.services.async_call(domain, "reload", blocking=True)
+            except Exception as err:
+                self.failures += 1
+                # A failed reload fires no event: stop expecting it
+                self._expected[domain] = max(0, self._expected[domain] - 1)
+                _LOGGER.warning(
+                    "[HACA Reload] %s.reload failed (%d request(s)): %s",
+                    domain, batch.requests, err,
+                )
+                batch.future.set_exception(err)
+                batch.future.exception()  # retrieved: waiters may all be gone
+                return
+            finally:
+                self._active[domain] -= 1
+                self._expected_until[domain] = time.monotonic() + SELF_RELOAD_GRACE_SECONDS
+                if batch.paths:
+                    self._own_writes.update(
+                        await self.hass.async_add_executor_job(_signatures, sorted(batch.paths))
+                    )
+
+        _LOGGER.debug(
+            "[HACA Reload] %s reloaded once for %d request(s)%s",
+            domain, batch.requests,
+            f" — {', '.join(sorted(batch.items))}" if batch.items else "",
+        )
+        batch.future.set_result(None)
+        if batch.rescan:
+            self._schedule_rescan(domain, batch)
+
+    def _schedule_rescan(self, domain: str, batch: _ReloadBatch) -> None:
+        """One partial rescan, per config entry, of the scopes fed by the written files."""
+        from .config_watcher import PARSED_CONFIG_CACHE_KEY
+
+        scopes: set[str] = set()
+        cache = self.hass.data.get(DOMAIN, {}).get(PARSED_CONFIG_CACHE_KEY)
+        if cache is not None and batch.paths:
+            cache.invalidate(batch.paths)
+            scopes |= cache.scopes_for(batch.paths)
+        if not scopes:
+            scopes = set(CONFIG_SCAN_SCOPES)
+        for domain_data in list(self.hass.data.get(DOMAIN, {}).values()):
+            rescan = domain_data.get("async_rescan") if isinstance(domain_data, dict) else None
+            if rescan is None:
+                continue
+            self.rescans += 1
+            _LOGGER.info(
+                "[HACA Reload] %s reloaded by HACA — rescanning %s",
+                domain, ", ".join(sorted(scopes)),
+            )
+            self.hass.async_create_task(rescan(frozenset(scopes)))
+
+    # ── Self-triggered change detection ───────────────────────────────────
+
+    def is_self_reload(self, event_type: str) -> bool:
+        """True for a ``<domain>_reloaded`` event caused by a HACA reload.
+
+        Each HACA reload accounts for one event; any further event (a reload
+        the user started meanwhile) is a real change.
+        """
+        domain = event_type.removesuffix("_reloaded")
+        if not self._expected.get(domain):
+            return False
+        if self._active.get(domain, 0) == 0 and time.monotonic() >= self._expected_until.get(domain, 0.0):
+            # The expected events never came (e.g. no listener fired them)
+            self._expected[domain] = 0
+            return False
+        self._expected[domain] -= 1
+        self.events_suppressed += 1
+        return True
+
+    def is_own_write(self, path: str) -> bool:
+        """True when ``path`` is still exactly as HACA last wrote it."""
+        if path not in self._own_writes or self._own_writes[path] != _signature(path):
+            return False
+        self.writes_suppressed += 1
+        return True
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return counters for diagnostics."""
+        return {
+            "requests": self.requests,
+            "reloads": self.reloads,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "events_suppressed": self.events_suppressed,
+            "writes_suppressed": self.writes_suppressed,
+            "rescans": self.rescans,
+        }
+
+
+def get_reload_scheduler(hass: HomeAssistant) -> ReloadScheduler:
+    """Return the shared reload scheduler (created on first use)."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    scheduler = domain_data.get(RELOAD_SCHEDULER_KEY)
+    if scheduler is None:
+        scheduler = domain_data[RELOAD_SCHEDULER_KEY] = ReloadScheduler(hass)
+    return scheduler
+
+
+async def async_reload(
+    hass: HomeAssistant,
+    domain: str,
+    items: Iterable[str] = (),
+    paths: Iterable[str | os.PathLike] = (),
+    *,
+    rescan: bool = True,
+) -> None:
+    """Coalesced ``<domain>.reload`` (see ``ReloadScheduler.async_reload``)."""
+    await get_reload_scheduler(hass).async_reload(domain, items, paths, rescan=rescan)
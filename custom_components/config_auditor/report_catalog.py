@@ -0,0 +1,261 @@
+"""Report catalog — on-disk manifest of the report sessions in haca_reports/.
+
+``ReportCatalog`` keeps one small manifest, ``.haca_report_catalog.json``,
+next to the reports, so listing or deleting sessions does not inspect every
+file of the directory:
+
+* one entry per session — type (audit / agent), creation time, formats with
+  file names and sizes, health score and summary counts;
+* updated when reports are written (``add_session``) or deleted
+  (``remove_session``), always through a temp file + ``os.replace`` so a
+  crash never leaves a truncated manifest;
+* reconciled with the directory once per process and whenever the
+  directory's mtime changes (files copied or removed by hand): only new
+  sessions are inspected, and a missing or unreadable manifest is rebuilt
+  from the files (scores read back from the JSON reports).
+
+Listing is therefore a single ``stat()`` of the directory once the catalog
+is loaded, whatever the number of sessions kept.  All methods do file I/O
+and must run in the executor.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+import re
+import threading
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+REPORT_CATALOG_KEY = "report_catalog"
+CATALOG_FILENAME = ".haca_report_catalog.json"
+CATALOG_VERSION = 1
+
+_AUDIT_RE = re.compile(r"report_(\d{8}_\d{6})\.(\w+)$")
+_AGENT_RE = re.compile(r"agent_report_(\d{8}_\d{6})(?:_score(\d+))?[^/]*\.md$")
+
+
+def _sort_key(session: dict[str, Any]) -> str:
+    return session["session_id"].replace("agent_", "")
+
+
+class ReportCatalog:
+    """Manifest of report sessions, kept in memory and mirrored on disk."""
+
+    def __init__(self, reports_dir: Path) -> None:
+        self._dir = reports_dir
+        self._path = reports_dir / CATALOG_FILENAME
+        self._lock = threading.Lock()
+        self._sessions: dict[str, dict[str, Any]] | None = None
+        self._sorted: list[dict[str, Any]] | None = None
+        self._dir_mtime: int | None = None
+        self.resyncs = 0
+
+    # ── Queries ───────────────────────────────────────────────────────────
+
+    def sessions(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Return report sessions, newest first."""
+        with self._lock:
+            self._ensure_fresh()
+            if self._sorted is None:
+                self._sorted = sorted(self._sessions.values(), key=_sort_key, reverse=True)
+            result = self._sorted if limit is None else self._sorted[:limit]
+            return [_copy(s) for s in result]
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            self._ensure_fresh()
+            session = self._sessions.get(session_id)
+            return _copy(session) if session else None
+
+    # ── Updates ───────────────────────────────────────────────────────────
+
+    def add_session(
+        self,
+        session_id: str,
+        files: dict[str, str | Path],
+        *,
+        report_type: str = "audit",
+        health_score: Any = None,
+        summary: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Record the files of a new session (``{format: path}``) and persist."""
+        formats: dict[str, dict[str, Any]] = {}
+        created = None
+        for fmt, path in files.items():
+            if not path:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            formats[fmt] = {"name": Path(path).name, "size": st.st_size}
+            created = created or datetime.fromtimestamp(st.st_mtime).isoformat()
+        session = {
+            "session_id": session_id,
+            "report_type": report_type,
+            "created": created or datetime.now().isoformat(),
+            "formats": formats,
+            "health_score": health_score,
+            "summary": dict(summary or {}),
+        }
+        with self._lock:
+            self._ensure_fresh()
+            self._sessions[session_id] = session
+            self._changed()
+        return _copy(session)
+
+    def remove_session(self, session_id: str) -> dict[str, Any] | None:
+        """Forget a session (its files are deleted by the caller) and persist."""
+        with self._lock:
+            self._ensure_fresh()
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._changed()
+            return session
+
+    # ── Loading / reconciliation ──────────────────────────────────────────
+
+    def _dir_mtime_ns(self) -> int | None:
+        try:
+            return os.stat(self._dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _ensure_loaded(self) -> None:
+        if self._sessions is not None:
+            return
+        stored: dict[str, dict[str, Any]] = {}
+        try:
+            raw = json.loads(self._path.read_text(encoding="utf-8"))
+            if raw.get("version") == CATALOG_VERSION:
+                stored = {s["session_id"]: s for s in raw.get("sessions", [])}
+            else:
+                _LOGGER.info("[HACA Reports] Catalog format changed — rebuilding")
+        except FileNotFoundError:
+            _LOGGER.info("[HACA Reports] No report catalog yet — building it")
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as err:
+            _LOGGER.warning("[HACA Reports] Unreadable report catalog (%s) — rebuilding", err)
+        # Files may have been added or removed while HA was stopped
+        self._sessions = stored
+        self._reconcile()
+
+    def _ensure_fresh(self) -> None:
+        if self._sessions is None:
+            self._ensure_loaded()
+        elif self._dir_mtime_ns() != self._dir_mtime:
+            self._reconcile()
+
+    def _reconcile(self) -> None:
+        """Align the catalog with the files actually present."""
+        found = self._scan_directory()
+        known = self._sessions
+        changed = found.keys() != known.keys()
+        for session_id, session in found.items():
+            previous = known.get(session_id)
+            if previous is not None:
+                session["health_score"] = previous.get("health_score")
+                session["summary"] = previous.get("summary", {})
+                session["created"] = previous.get("created", session["created"])
+                changed = changed or session["formats"] != previous.get("formats")
+            else:
+                self._read_metadata(session)
+        self._sessions = found
+        self._sorted = None
+        if changed:
+            self.resyncs += 1
+            self._changed()
+        else:
+            self._dir_mtime = self._dir_mtime_ns()
+
+    def _scan_directory(self) -> dict[str, dict[str, Any]]:
+        sessions: dict[str, dict[str, Any]] = {}
+        try:
+            with os.scandir(self._dir) as it:
+                entries = list(it)
+        except FileNotFoundError:
+            return sessions
+        for entry in entries:
+            name = entry.name
+            if match := _AUDIT_RE.match(name):
+                session_id, fmt, report_type = match.group(1), match.group(2), "audit"
+            elif match := _AGENT_RE.match(name):
+                session_id, fmt, report_type = "agent_" + match.group(1), "md", "agent"
+            else:
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            session = sessions.setdefault(session_id, {
+                "session_id": session_id,
+                "report_type": report_type,
+                "created": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                "formats": {},
+                "health_score": None,
+                "summary": {},
+            })
+            session["formats"][fmt] = {"name": name, "size": st.st_size}
+        return sessions
+
+    def _read_metadata(self, session: dict[str, Any]) -> None:
+        """Recover score and counts of a session found on disk."""
+        formats = session["formats"]
+        if session["report_type"] == "agent":
+            match = _AGENT_RE.match(formats["md"]["name"])
+            if match and match.group(2):
+                session["health_score"] = int(match.group(2))
+            return
+        if "json" not in formats:
+            return
+        try:
+            with open(self._dir / formats["json"]["name"], encoding="utf-8") as fh:
+                summary = json.load(fh).get("summary") or {}
+        except (OSError, ValueError, AttributeError):
+            return
+        session["summary"] = summary
+        session["health_score"] = summary.get("health_score")
+
+    # ── Persistence ───────────────────────────────────────────────────────
+
+    def _changed(self) -> None:
+        self._sorted = None
+        self._save()
+
+    def _save(self) -> None:
+        payload = {
+            "version": CATALOG_VERSION,
+            "sessions": sorted(self._sessions.values(), key=_sort_key, reverse=True),
+        }
+        tmp_path = self._path.with_name(f"{self._path.name}.tmp")
+        try:
+            self._dir.mkdir(exist_ok=True)
+            tmp_path.write_text(json.dumps(payload, default=str), encoding="utf-8")
+            os.replace(tmp_path, self._path)
+        except OSError as err:
+            _LOGGER.warning("[HACA Reports] Could not write report catalog: %s", err)
+        self._dir_mtime = self._dir_mtime_ns()
+
+
+def _copy(session: dict[str, Any]) -> dict[str, Any]:
+    return {
+        **session,
+        "formats": {fmt: dict(info) for fmt, info in session["formats"].items()},
+        "summary": dict(session.get("summary") or {}),
+    }
+
+
+def get_report_catalog(hass: Any) -> ReportCatalog:
+    """Return the shared report catalog (created on first use, loaded lazily)."""
+    from .const import DOMAIN, REPORTS_DIR
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    catalog = domain_data.get(REPORT_CATALOG_KEY)
+    if catalog is None:
+        catalog = ReportCatalog(Path(hass.config.config_dir) / REPORTS_DIR)
+        domain_data[REPORT_CATALOG_KEY] = catalog
+    return catalog
@@ -1,15 +1,23 @@
 """H.A.C.A — Report Generator — Module 4."""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
 from datetime import datetime
+import functools
+import importlib.util
+from itertools import chain
 import json
 import logging
+import os
 from pathlib import Path
 from typing import Any
 
 from homeassistant.core import HomeAssistant
 
 from .const import REPORTS_DIR
+from .report_catalog import get_report_catalog
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,6 +43,129 @@ def _load_translations_from_json(language: str) -> dict:
         return {}
 
 
+_FONTS_DIR = _Path(__file__).parent / "fonts"
+
+
+# ── Font strategy ────────────────────────────────────────────────────────
+# Priority order for each font family:
+#
+# DejaVuSans (Latin + Latin-Extended + Cyrillic):
+#   1. matplotlib bundled fonts  → always present in HA
+#   2. Integration bundled fonts → fonts/ subdirectory
+#   3. System fonts              → /usr/share/fonts/truetype/dejavu/
+#
+# NotoSansCJK (CJK Unified + Hiragana + Katakana):
+#   1. Integration bundled TTF   → fonts/ (subsetted, TTF/glyf format)
+#   2. System TTC                → /usr/share/fonts/opentype/noto/ (Debian HA)
+#
+# For CJK languages (zh-Hans, ja) NotoSansCJK is used as the PRIMARY font
+# because fpdf2 computes line-break widths from the primary font metrics.
+# Using a Latin font as primary for CJK text produces blank/invisible output.
+#
+# The lookups walk the filesystem, so their result is cached per process.
+# Parsed font objects are NOT shared between documents: fpdf2 subsets them
+# in place when the PDF is written.
+# ─────────────────────────────────────────────────────────────────────────
+
+@functools.lru_cache(maxsize=1)
+def _find_dejavu() -> tuple[Path, Path, Path] | None:
+    """Return (regular, bold, italic) DejaVu TTF paths, or None."""
+    candidates = []
+    # 1. matplotlib (always in HA) — located without importing it
+    try:
+        spec = importlib.util.find_spec("matplotlib")
+    except (ImportError, ValueError):
+        spec = None
+    if spec is not None and spec.submodule_search_locations:
+        mpl_dir = Path(next(iter(spec.submodule_search_locations)))
+        candidates.append(mpl_dir / "mpl-data" / "fonts" / "ttf")
+    # 2. Integration bundled
+    candidates.append(_FONTS_DIR)
+    # 3. System
+    candidates += [
+        Path("/usr/share/fonts/truetype/dejavu"),
+        Path("/usr/share/fonts/dejavu"),
+    ]
+    for d in candidates:
+        r = d / "DejaVuSans.ttf"
+        b = d / "DejaVuSans-Bold.ttf"
+        i = d / ("DejaVuSans-Oblique.ttf" if (d / "DejaVuSans-Oblique.ttf").exists()
+                 else "DejaVuSans-BoldOblique.ttf")
+        if r.exists() and b.exists():
+            return r, b, (i if i.exists() else r)
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _find_noto_cjk() -> tuple[Path, Path] | None:
+    """Return (regular, bold) NotoSansCJK font paths (TTF), or None."""
+    # 1. Integration bundled TTF (proper glyf outlines, browser-compatible)
+    r = _FONTS_DIR / "NotoSansCJK-SC-Regular.ttf"
+    b = _FONTS_DIR / "NotoSansCJK-SC-Bold.ttf"
+    if r.exists():
+        return r, (b if b.exists() else r)
+    # 2. System TTC (Debian / HA Docker) – fallback if bundled OTF is absent
+    system_ttc = [
+        Path("/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc"),
+        Path("/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc"),
+        Path("/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc"),
+    ]
+    for r in system_ttc:
+        b = r.parent / r.name.replace("Regular", "Bold")
+        if r.exists():
+            return r, (b if b.exists() else r)
+    return None
+
+
+def _write_chunks(filepath: Path, chunks: Iterable[str]) -> None:
+    """Write ``chunks`` to a hidden temp file, then move it into place.
+
+    Reports are streamed instead of being assembled in memory, and a
+    listing never sees a half-written file.
+    """
+    tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(chunks)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+@dataclass(frozen=True, slots=True)
+class _ReportContext:
+    """Inputs shared by the three renderers of one report session."""
+
+    summary: dict[str, Any]
+    automation_issues: list[dict]
+    entity_issues: list[dict]
+    timestamp: datetime
+    timestamp_str: str
+    script_issues: list[dict] = field(default_factory=list)
+    scene_issues: list[dict] = field(default_factory=list)
+    blueprint_issues: list[dict] = field(default_factory=list)
+    performance_issues: list[dict] = field(default_factory=list)
+    security_issues: list[dict] = field(default_factory=list)
+    dashboard_issues: list[dict] = field(default_factory=list)
+
+    @classmethod
+    def build(
+        cls,
+        summary: dict[str, Any],
+        automation_issues: list[dict],
+        entity_issues: list[dict],
+        timestamp: datetime,
+        timestamp_str: str,
+        **extra_issues: list[dict] | None,
+    ) -> _ReportContext:
+        """Normalise the optional issue lists (None → [])."""
+        return cls(
+            summary, list(automation_issues), list(entity_issues), timestamp, timestamp_str,
+            **{key: list(value or []) for key, value in extra_issues.items()},
+        )
+
+
 class ReportGenerator:
     """Generate comprehensive reports from audit data."""
 
@@ -44,6 +175,21 @@ class ReportGenerator:
         self._reports_dir = Path(hass.config.config_dir) / REPORTS_DIR
         self._reports_dir.mkdir(exist_ok=True)
         self._translations: dict = {}
+        self._catalog = get_report_catalog(hass)
+
+    @classmethod
+    def for_export(cls, language: str = "en") -> ReportGenerator:
+        """Generator for in-memory documents only: no hass, no reports directory.
+
+        Headless audits (cli.py) run against directories that are not a live
+        instance and must not get a reports directory or catalog written.
+        """
+        generator = cls.__new__(cls)
+        generator.hass = None
+        generator._reports_dir = None
+        generator._catalog = None
+        generator._translations = _load_translations_from_json(language)
+        return generator
 
     def _load_translations(self, language: str) -> dict:
         """Load translations from JSON for the specified language."""
@@ -66,64 +212,77 @@ class ReportGenerator:
         performance_issues: list[dict] | None = None,
         security_issues: list[dict] | None = None,
         dashboard_issues: list[dict] | None = None,
+        progress: Callable[[str], None] | None = None,
     ) -> dict[str, str]:
-        """Generate all report formats with the same timestamp."""
-        # Load translations
-        self._translations = self._load_translations(language)
-
-        # Normalize optional lists once
-        _extra = dict(
-            script_issues=list(script_issues or []),
-            scene_issues=list(scene_issues or []),
-            blueprint_issues=list(blueprint_issues or []),
-            performance_issues=list(performance_issues or []),
-            security_issues=list(security_issues or []),
-            dashboard_issues=list(dashboard_issues or []),
+        """Generate all report formats with the same timestamp.
+
+        Markdown, JSON and PDF are rendered concurrently in executor threads.
+        ``progress(fmt)`` is called on the event loop as each file is written.
+        """
+        # Load translations (file I/O — keep it off the event loop)
+        self._translations = await self.hass.async_add_executor_job(
+            self._load_translations, language
         )
 
         # Generate a single timestamp for all reports
         timestamp = datetime.now()
-        timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
-
-        # Generate all reports with the same timestamp
-        md_path = await self._generate_markdown_with_timestamp(
-            summary, automation_issues, entity_issues, timestamp, timestamp_str, **_extra
+        ctx = _ReportContext.build(
+            summary, automation_issues, entity_issues, timestamp,
+            timestamp.strftime("%Y%m%d_%H%M%S"),
+            script_issues=script_issues,
+            scene_issues=scene_issues,
+            blueprint_issues=blueprint_issues,
+            performance_issues=performance_issues,
+            security_issues=security_issues,
+            dashboard_issues=dashboard_issues,
         )
-        json_path = await self._generate_json_with_timestamp(
-            summary, automation_issues, entity_issues, timestamp, timestamp_str, **_extra
+
+        async def _render(fmt: str, renderer: Callable[[_ReportContext], str]) -> str:
+            path = await self.hass.async_add_executor_job(renderer, ctx)
+            if progress is not None:
+                progress(fmt)
+            return path
+
+        md_path, json_path, pdf_path = await asyncio.gather(
+            _render("markdown", self._render_markdown),
+            _render("json", self._render_json),
+            _render("pdf", self._render_pdf),
         )
-        pdf_path = await self._generate_pdf_with_timestamp(
-            summary, automation_issues, entity_issues, timestamp, timestamp_str, **_extra
+        await self.hass.async_add_executor_job(
+            functools.partial(
+                self._catalog.add_session,
+                ctx.timestamp_str,
+                {"md": md_path, "json": json_path, "pdf": pdf_path},
+                health_score=summary.get("health_score"),
+                summary=summary,
+            )
         )
 
         return {
             "markdown": md_path,
             "json": json_path,
             "pdf": pdf_path,
-            "timestamp": timestamp_str
+            "timestamp": ctx.timestamp_str
         }
 
-    async def _generate_markdown_with_timestamp(
-        self,
-        summary: dict[str, Any],
-        automation_issues: list[dict],
-        entity_issues: list[dict],
-        timestamp: datetime,
-        timestamp_str: str,
-        *,
-        script_issues: list[dict] | None = None,
-        scene_issues: list[dict] | None = None,
-        blueprint_issues: list[dict] | None = None,
-        performance_issues: list[dict] | None = None,
-        security_issues: list[dict] | None = None,
-        dashboard_issues: list[dict] | None = None,
-    ) -> str:
-        """Generate Markdown report with provided timestamp."""
-        
+    # ── Renderers (executor threads) ─────────────────────────────────────
+
+    def _render_markdown(self, ctx: _ReportContext) -> str:
+        """Stream the Markdown report to disk and return its path."""
+        filepath = self._reports_dir / f"report_{ctx.timestamp_str}.md"
+        _write_chunks(filepath, self._iter_markdown(ctx))
+        _LOGGER.info("Generated Markdown report: %s", filepath)
+        return str(filepath)
+
+    def _iter_markdown(self, ctx: _ReportContext) -> Iterator[str]:
+        """Yield the Markdown report section by section."""
+        summary = ctx.summary
+        automation_issues = ctx.automation_issues
+        entity_issues = ctx.entity_issues
         health_score = summary.get("health_score", 0)
-        timestamp_display = timestamp.strftime("%Y-%m-%d %H:%M:%S")
-        
-        report = f"""# 📊 {self._t("title")}
+        timestamp_display = ctx.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+
+        yield f"""# 📊 {self._t("title")}
 
 **{self._t("generated")}:** {timestamp_display}  
 **{self._t("health_score")}:** {health_score}% {self._get_status_emoji(health_score)}
@@ -151,171 +310,127 @@ class ReportGenerator:
 ## 🤖 {self._t("automation_issues")} ({len(automation_issues)})
 
 """
-        
+
         if automation_issues:
             # Group by severity
             high = [i for i in automation_issues if i.get('severity') == 'high']
             medium = [i for i in automation_issues if i.get('severity') == 'medium']
-            low = [i for i in automation_issues if i.get('severity') == 'low']
-            
+            low_count = sum(1 for i in automation_issues if i.get('severity') == 'low')
+
             if high:
-                report += f"### 🔴 {self._t('high_severity')} ({len(high)})\n\n"
+                yield f"### 🔴 {self._t('high_severity')} ({len(high)})\n\n"
                 for issue in high[:10]:
-                    report += self._format_issue(issue)
-            
+                    yield self._format_issue(issue)
+
             if medium:
-                report += f"\n### 🟠 {self._t('medium_severity')} ({len(medium)})\n\n"
+                yield f"\n### 🟠 {self._t('medium_severity')} ({len(medium)})\n\n"
                 for issue in medium[:10]:
-                    report += self._format_issue(issue)
-            
-            if low:
-                report += f"\n### 🟡 {self._t('low_severity')} ({len(low)})\n\n"
-                report += f"*{len(low)} {self._t('low_severity_issues_found')}*\n\n"
+                    yield self._format_issue(issue)
+
+            if low_count:
+                yield f"\n### 🟡 {self._t('low_severity')} ({low_count})\n\n"
+                yield f"*{low_count} {self._t('low_severity_issues_found')}*\n\n"
         else:
-            report += f"✅ **{self._t('no_automation_issues')}**\n\n"
-        
-        report += "---\n\n"
-        
+            yield f"✅ **{self._t('no_automation_issues')}**\n\n"
+
+        yield "---\n\n"
+
         # Entity issues
-        report += f"## 📍 {self._t('entity_issues')} ({len(entity_issues)})\n\n"
-        
+        yield f"## 📍 {self._t('entity_issues')} ({len(entity_issues)})\n\n"
+
         if entity_issues:
             zombies = [i for i in entity_issues if i.get('type') == 'zombie_entity']
-            unavailable = [i for i in entity_issues if i.get('type') == 'unavailable']
-            
             if zombies:
-                report += f"### 👻 {self._t('zombie_entities')} ({len(zombies)})\n\n"
+                yield f"### 👻 {self._t('zombie_entities')} ({len(zombies)})\n\n"
                 for issue in zombies[:5]:
-                    report += f"- **{issue.get('entity_id')}**: {issue.get('message')}\n"
-                report += "\n"
-            
+                    yield f"- **{issue.get('entity_id')}**: {issue.get('message')}\n"
+                yield "\n"
+
+            unavailable = [i for i in entity_issues if i.get('type') == 'unavailable']
             if unavailable:
-                report += f"### ❌ {self._t('unavailable')} ({len(unavailable)})\n\n"
+                yield f"### ❌ {self._t('unavailable')} ({len(unavailable)})\n\n"
                 for issue in unavailable[:5]:
-                    report += f"- {issue.get('entity_id')}\n"
-                report += "\n"
-                
+                    yield f"- {issue.get('entity_id')}\n"
+                yield "\n"
+
             ghosts = [i for i in entity_issues if i.get('type') == 'ghost_registry_entry']
             if ghosts:
-                report += f"### 👻 {self._t('ghost_entities')} ({len(ghosts)})\n\n"
+                yield f"### 👻 {self._t('ghost_entities')} ({len(ghosts)})\n\n"
                 for issue in ghosts[:5]:
-                    report += f"- **{issue.get('entity_id')}**: {issue.get('message')}\n"
-                report += "\n"
-                
+                    yield f"- **{issue.get('entity_id')}**: {issue.get('message')}\n"
+                yield "\n"
+
             broken_devices = [i for i in entity_issues if i.get('type') == 'broken_device_reference']
             if broken_devices:
-                report += f"### 📱 {self._t('broken_device_references')} ({len(broken_devices)})\n\n"
+                yield f"### 📱 {self._t('broken_device_references')} ({len(broken_devices)})\n\n"
                 for issue in broken_devices[:5]:
-                    report += f"- **{issue.get('entity_id')}**: {self._t('references_nonexistent_device')} {issue.get('device_id')}\n"
-                report += "\n"
+                    yield f"- **{issue.get('entity_id')}**: {self._t('references_nonexistent_device')} {issue.get('device_id')}\n"
+                yield "\n"
         else:
-            report += f"✅ **{self._t('no_entity_issues')}**\n\n"
-        
-        report += "---\n\n"
-        
-        # Recommendations
-        report += f"## 💡 {self._t('recommendations')}\n\n"
-        report += self._generate_recommendations(health_score, automation_issues, entity_issues)
-        
-        report += f"\n\n---\n\n*{self._t('report_generated_by')} v1.3.0 - {timestamp_display}*\n"
-        
-        # Save report with provided timestamp
-        filename = f"report_{timestamp_str}.md"
-        filepath = self._reports_dir / filename
-        
-        def write_report():
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(report)
-        
-        await self.hass.async_add_executor_job(write_report)
-        
-        _LOGGER.info("Generated Markdown report: %s", filepath)
-        return str(filepath)
+            yield f"✅ **{self._t('no_entity_issues')}**\n\n"
 
-    async def _generate_json_with_timestamp(
-        self,
-        summary: dict[str, Any],
-        automation_issues: list[dict],
-        entity_issues: list[dict],
-        timestamp: datetime,
-        timestamp_str: str,
-        *,
-        script_issues: list[dict] | None = None,
-        scene_issues: list[dict] | None = None,
-        blueprint_issues: list[dict] | None = None,
-        performance_issues: list[dict] | None = None,
-        security_issues: list[dict] | None = None,
-        dashboard_issues: list[dict] | None = None,
-    ) -> str:
-        """Generate JSON report with provided timestamp."""
-        script_issues      = list(script_issues or [])
-        scene_issues       = list(scene_issues or [])
-        blueprint_issues   = list(blueprint_issues or [])
-        performance_issues = list(performance_issues or [])
-        security_issues    = list(security_issues or [])
-        dashboard_issues   = list(dashboard_issues or [])
-
-        all_issues = (
-            automation_issues + entity_issues + script_issues + scene_issues
-            + blueprint_issues + performance_issues + security_issues + dashboard_issues
-        )
+        yield "---\n\n"
 
-        report_data = {
-            "timestamp": timestamp.isoformat(),
+        # Recommendations
+        yield f"## 💡 {self._t('recommendations')}\n\n"
+        yield self._generate_recommendations(health_score, automation_issues, entity_issues)
+
+        yield f"\n\n---\n\n*{self._t('report_generated_by')} v1.3.0 - {timestamp_display}*\n"
+
+    def _build_json_report(self, ctx: _ReportContext) -> dict[str, Any]:
+        """Return the JSON report document (also used by headless exports)."""
+        all_issues = list(chain(
+            ctx.automation_issues, ctx.entity_issues, ctx.script_issues, ctx.scene_issues,
+            ctx.blueprint_issues, ctx.performance_issues, ctx.security_issues,
+            ctx.dashboard_issues,
+        ))
+        return {
+            "timestamp": ctx.timestamp.isoformat(),
             "version": "1.2.0",
             "language": self._translations.get("title", "H.A.C.A Configuration Report"),
-            "summary": summary,
+            "summary": ctx.summary,
             "issues": {
-                "automation":  automation_issues,
-                "entity":      entity_issues,
-                "script":      script_issues,
-                "scene":       scene_issues,
-                "blueprint":   blueprint_issues,
-                "performance": performance_issues,
-                "security":    security_issues,
-                "dashboard":   dashboard_issues,
+                "automation":  ctx.automation_issues,
+                "entity":      ctx.entity_issues,
+                "script":      ctx.script_issues,
+                "scene":       ctx.scene_issues,
+                "blueprint":   ctx.blueprint_issues,
+                "performance": ctx.performance_issues,
+                "security":    ctx.security_issues,
+                "dashboard":   ctx.dashboard_issues,
             },
             "statistics": {
                 "by_severity": self._count_by_severity(all_issues),
                 "by_type":     self._count_by_type(all_issues),
             }
         }
-        
-        filename = f"report_{timestamp_str}.json"
-        filepath = self._reports_dir / filename
-        
-        def write_json():
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(report_data, f, indent=2, default=str)
-        
-        await self.hass.async_add_executor_job(write_json)
-        
-        _LOGGER.info("Generated JSON report: %s", filepath)
-        return str(filepath)
 
-    async def _generate_pdf_with_timestamp(
+    def build_json_document(
         self,
         summary: dict[str, Any],
         automation_issues: list[dict],
         entity_issues: list[dict],
-        timestamp: datetime,
-        timestamp_str: str,
-        *,
-        script_issues: list[dict] | None = None,
-        scene_issues: list[dict] | None = None,
-        blueprint_issues: list[dict] | None = None,
-        performance_issues: list[dict] | None = None,
-        security_issues: list[dict] | None = None,
-        dashboard_issues: list[dict] | None = None,
-    ) -> str:
-        """Generate PDF report with provided timestamp."""
-        script_issues      = list(script_issues or [])
-        scene_issues       = list(scene_issues or [])
-        blueprint_issues   = list(blueprint_issues or [])
-        performance_issues = list(performance_issues or [])
-        security_issues    = list(security_issues or [])
-        dashboard_issues   = list(dashboard_issues or [])
+        timestamp: datetime | None = None,
+        **extra_issues: list[dict] | None,
+    ) -> dict[str, Any]:
+        """Return the JSON report document without writing it to disk."""
+        timestamp = timestamp or datetime.now()
+        ctx = _ReportContext.build(
+            summary, automation_issues, entity_issues, timestamp,
+            timestamp.strftime("%Y%m%d_%H%M%S"), **extra_issues,
+        )
+        return self._build_json_report(ctx)
 
+    def _render_json(self, ctx: _ReportContext) -> str:
+        """Stream the JSON report to disk and return its path."""
+        filepath = self._reports_dir / f"report_{ctx.timestamp_str}.json"
+        encoder = json.JSONEncoder(indent=2, default=str)
+        _write_chunks(filepath, encoder.iterencode(self._build_json_report(ctx)))
+        _LOGGER.info("Generated JSON report: %s", filepath)
+        return str(filepath)
+
+    def _render_pdf(self, ctx: _ReportContext) -> str:
+        """Lay out and write the PDF report; return its path ("" without fpdf2)."""
         try:
             from fpdf import FPDF
         except ImportError:
@@ -323,72 +438,13 @@ class ReportGenerator:
             return ""
 
         t = self._t  # Shortcut
-        timestamp_display = timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        summary = ctx.summary
+        automation_issues = ctx.automation_issues
+        entity_issues = ctx.entity_issues
+        timestamp_display = ctx.timestamp.strftime("%Y-%m-%d %H:%M:%S")
         health_score = summary.get("health_score", 0)
 
-        # ── Font strategy ────────────────────────────────────────────────────────
-        # Priority order for each font family:
-        #
-        # DejaVuSans (Latin + Latin-Extended + Cyrillic):
-        #   1. matplotlib bundled fonts  → always present in HA
-        #   2. Integration bundled fonts → fonts/ subdirectory
-        #   3. System fonts              → /usr/share/fonts/truetype/dejavu/
-        #
-        # NotoSansCJK (CJK Unified + Hiragana + Katakana):
-        #   1. System TTC                → /usr/share/fonts/opentype/noto/ (Debian HA)
-        #   2. Integration bundled TTF   → fonts/ (subsetted, TTF/glyf format)
-        #
-        # For CJK languages (zh-Hans, ja) NotoSansCJK is used as the PRIMARY font
-        # because fpdf2 computes line-break widths from the primary font metrics.
-        # Using a Latin font as primary for CJK text produces blank/invisible output.
-        # ─────────────────────────────────────────────────────────────────────────
-        _integration_fonts = Path(__file__).parent / "fonts"
-
-        def _find_dejavu() -> tuple[Path, Path, Path] | None:
-            """Return (regular, bold, italic) DejaVu TTF paths, or None."""
-            candidates = []
-            # 1. matplotlib (always in HA)
-            try:
-                import matplotlib as _mpl
-                _mpl_fonts = Path(_mpl.__file__).parent / "mpl-data" / "fonts" / "ttf"
-                candidates.append(_mpl_fonts)
-            except ImportError:
-                pass
-            # 2. Integration bundled
-            candidates.append(_integration_fonts)
-            # 3. System
-            candidates += [
-                Path("/usr/share/fonts/truetype/dejavu"),
-                Path("/usr/share/fonts/dejavu"),
-            ]
-            for d in candidates:
-                r = d / "DejaVuSans.ttf"
-                b = d / "DejaVuSans-Bold.ttf"
-                i = d / ("DejaVuSans-Oblique.ttf" if (d / "DejaVuSans-Oblique.ttf").exists()
-                         else "DejaVuSans-BoldOblique.ttf")
-                if r.exists() and b.exists():
-                    return r, b, (i if i.exists() else r)
-            return None
-
-        def _find_noto_cjk() -> tuple[Path, Path] | None:
-            """Return (regular, bold) NotoSansCJK font paths (TTF), or None."""
-            # 1. Integration bundled TTF (proper glyf outlines, browser-compatible)
-            r = _integration_fonts / "NotoSansCJK-SC-Regular.ttf"
-            b = _integration_fonts / "NotoSansCJK-SC-Bold.ttf"
-            if r.exists():
-                return r, (b if b.exists() else r)
-            # 2. System TTC (Debian / HA Docker) – fallback if bundled OTF is absent
-            system_ttc = [
-                Path("/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc"),
-                Path("/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc"),
-                Path("/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc"),
-            ]
-            for r in system_ttc:
-                b = r.parent / r.name.replace("Regular", "Bold")
-                if r.exists():
-                    return r, (b if b.exists() else r)
-            return None
-
+        # Font files are located once per process (see _find_dejavu / _find_noto_cjk)
         _dejavu_paths = _find_dejavu()
         _noto_paths   = _find_noto_cjk()
 
@@ -517,12 +573,12 @@ class ReportGenerator:
                 pdf.multi_cell(0, 5, msg)
                 pdf.ln(2)
 
-        _pdf_section(script_issues,      "script_issues_section",      "no_script_issues")
-        _pdf_section(scene_issues,       "scene_issues_section",       "no_scene_issues")
-        _pdf_section(blueprint_issues,   "blueprint_issues_section",   "no_blueprint_issues")
-        _pdf_section(performance_issues, "performance_issues_section", "no_performance_issues")
-        _pdf_section(security_issues,    "security_issues_section",    "no_security_issues")
-        _pdf_section(dashboard_issues,   "dashboard_issues_section",   "no_dashboard_issues")
+        _pdf_section(ctx.script_issues,      "script_issues_section",      "no_script_issues")
+        _pdf_section(ctx.scene_issues,       "scene_issues_section",       "no_scene_issues")
+        _pdf_section(ctx.blueprint_issues,   "blueprint_issues_section",   "no_blueprint_issues")
+        _pdf_section(ctx.performance_issues, "performance_issues_section", "no_performance_issues")
+        _pdf_section(ctx.security_issues,    "security_issues_section",    "no_security_issues")
+        _pdf_section(ctx.dashboard_issues,   "dashboard_issues_section",   "no_dashboard_issues")
 
         # Recommendations
         pdf.ln(10)
@@ -536,13 +592,10 @@ class ReportGenerator:
         pdf.set_font(_pdf_font, "I", 9)
         pdf.cell(0, 8, f"{t('report_generated_by')} v1.3.0 - {timestamp_display}", ln=1)
 
-        filename = f"report_{timestamp_str}.pdf"
-        filepath = self._reports_dir / filename
-        
-        def save_pdf():
-            pdf.output(str(filepath))
-            
-        await self.hass.async_add_executor_job(save_pdf)
+        filepath = self._reports_dir / f"report_{ctx.timestamp_str}.pdf"
+        tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+        pdf.output(str(tmp_path))
+        os.replace(tmp_path, filepath)
         _LOGGER.info("Generated PDF report: %s", filepath)
         return str(filepath)
 
@@ -680,83 +733,36 @@ class ReportGenerator:
             counts[issue_type] = counts.get(issue_type, 0) + 1
         return counts
 
-    def list_reports(self) -> list[dict]:
-        """List all generated reports grouped by session (audit reports + agent reports)."""
-        import re
-        sessions = {}
-
-        # ── Rapports d'audit classiques : report_TIMESTAMP.* ─────────────
-        audit_pattern = re.compile(r"report_(\d{8}_\d{6})")
-        for report_file in self._reports_dir.glob("report_*"):
-            match = audit_pattern.match(report_file.stem)
-            if not match:
-                continue
-            session_id = match.group(1)
-            stat = report_file.stat()
-            fmt = report_file.suffix[1:]  # "md", "pdf", "html"
-            if session_id not in sessions:
-                sessions[session_id] = {
-                    "session_id": session_id,
-                    "report_type": "audit",
-                    "created": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    "formats": {},
-                }
-            sessions[session_id]["formats"][fmt] = {
-                "name": report_file.name,
-                "size": stat.st_size,
-            }
-
-        # ── Rapports agent hebdomadaires : agent_report_TIMESTAMP_scoreXX.md ──
-        agent_pattern = re.compile(r"agent_report_(\d{8}_\d{6})")
-        for report_file in self._reports_dir.glob("agent_report_*"):
-            match = agent_pattern.match(report_file.stem)
-            if not match:
-                continue
-            session_id = "agent_" + match.group(1)
-            stat = report_file.stat()
-            if session_id not in sessions:
-                sessions[session_id] = {
-                    "session_id": session_id,
-                    "report_type": "agent",   # ← distingue les rapports agent
-                    "created": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    "formats": {},
-                }
-            sessions[session_id]["formats"]["md"] = {
-                "name": report_file.name,
-                "size": stat.st_size,
-            }
+    def list_reports(self, limit: int | None = None) -> list[dict]:
+        """List generated reports grouped by session, newest first (audit + agent).
 
-        # Sort by timestamp descending
-        sorted_sessions = sorted(
-            sessions.values(),
-            key=lambda x: x["session_id"].replace("agent_", ""),
-            reverse=True,
-        )
-        return sorted_sessions[:30]  # 30 rapports max
+        Served from the report catalog (see report_catalog.py) — no directory
+        scan per call.  Runs in the executor.
+        """
+        return self._catalog.sessions(limit)
 
     async def delete_report_session(self, session_id: str) -> dict:
         """Delete all report files for a given session ID."""
-        import re
-        
         deleted_files = []
         errors = []
-        
-        # Find all files matching this session
-        pattern = re.compile(f"report_{re.escape(session_id)}")
-        
-        for report_file in self._reports_dir.glob("report_*"):
-            if pattern.match(report_file.name):
+
+        session = await self.hass.async_add_executor_job(self._catalog.get, session_id)
+        names = [info["name"] for info in (session or {}).get("formats", {}).values()]
+
+        def delete_files() -> None:
+            for name in names:
                 try:
-                    def delete_file():
-                        report_file.unlink()
-                    
-                    await self.hass.async_add_executor_job(delete_file)
-                    deleted_files.append(report_file.name)
-                    _LOGGER.info("Deleted report file: %s", report_file.name)
-                except Exception as e:
-                    errors.append(f"{report_file.name}: {str(e)}")
-                    _LOGGER.error("Failed to delete report file %s: %s", report_file.name, e)
-        
+                    (self._reports_dir / name).unlink(missing_ok=True)
+                    deleted_files.append(name)
+                    _LOGGER.info("Deleted report file: %s", name)
+                except OSError as e:
+                    errors.append(f"{name}: {str(e)}")
+                    _LOGGER.error("Failed to delete report file %s: %s", name, e)
+            if deleted_files:
+                self._catalog.remove_session(session_id)
+
+        await self.hass.async_add_executor_job(delete_files)
+
         if not deleted_files and not errors:
             return {
                 "success": False,
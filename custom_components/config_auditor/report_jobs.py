@@ -0,0 +1,194 @@
+"""Background report jobs — queued generation with progress events.
+
+``ReportJobQueue`` generates reports in the background so the caller
+(service call, panel button) does not wait for the Markdown → JSON → PDF
+sequence:
+
+* ``submit`` returns immediately; the job runs in the background, reads
+  the latest audit results when it starts and can be awaited with
+  ``async_wait``;
+* jobs run one at a time (the generator holds per-language translations),
+  a job still waiting in the queue absorbs identical new requests, and the
+  three formats of a job are rendered concurrently in executor threads
+  (see ``ReportGenerator.generate_all_reports``);
+* every finished format fires a ``haca_report_progress`` event so the
+  panel can show a percentage and refresh its list when the job is done.
+
+The report generator module itself is only imported when the first job
+runs (see lazy.py).
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .job_queue import (
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_QUEUED,
+    STATUS_RUNNING,
+    JobQueue,
+    new_job_id,
+)
+from .lazy import async_resolve
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_REPORT_PROGRESS = "haca_report_progress"
+REPORT_FORMATS = ("markdown", "json", "pdf")
+
+# coordinator.data key → generate_all_reports keyword argument
+_EXTRA_ISSUE_LISTS = {
+    "script_issue_list": "script_issues",
+    "scene_issue_list": "scene_issues",
+    "blueprint_issue_list": "blueprint_issues",
+    "performance_issue_list": "performance_issues",
+    "security_issue_list": "security_issues",
+    "dashboard_issue_list": "dashboard_issues",
+}
+_SUMMARY_KEYS = (
+    "health_score", "automation_issues", "entity_issues", "total_issues",
+    "script_issues", "scene_issues", "performance_issues", "security_issues",
+)
+
+
+def build_report_inputs(data: dict[str, Any] | None) -> tuple[dict, list, list, dict]:
+    """Return (summary, automation_issues, entity_issues, extra) from coordinator data."""
+    data = data or {}
+    summary = {key: data.get(key, 0) for key in _SUMMARY_KEYS}
+    extra = {kwarg: data.get(key, []) for key, kwarg in _EXTRA_ISSUE_LISTS.items()}
+    return (
+        summary,
+        data.get("automation_issue_list", []),
+        data.get("entity_issue_list", []),
+        extra,
+    )
+
+
+@dataclass
+class ReportJob:
+    """One report generation request."""
+
+    job_id: str
+    language: str
+    status: str = STATUS_QUEUED
+    formats_done: list[str] = field(default_factory=list)
+    result: dict[str, str] | None = None
+    error: str | None = None
+    created: float = field(default_factory=time.time)
+    finished: float | None = None
+    task: asyncio.Task | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def percent(self) -> int:
+        if self.status == STATUS_DONE:
+            return 100
+        return int(100 * len(self.formats_done) / len(REPORT_FORMATS))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "language": self.language,
+            "status": self.status,
+            "percent": self.percent,
+            "formats_done": list(self.formats_done),
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+
+class ReportJobQueue(JobQueue[ReportJob]):
+    """Run report generation jobs in the background, one at a time."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        coordinator: Any,
+        report_generator: Any,
+    ) -> None:
+        super().__init__(hass)
+        self.entry_id = entry_id
+        self._coordinator = coordinator
+        self._report_generator = report_generator   # ReportGenerator or LazyInstance
+
+    # ── Submission ────────────────────────────────────────────────────────
+
+    @callback
+    def submit(self, language: str | None = None) -> ReportJob:
+        """Queue a report job and return it without waiting.
+
+        A job for the same language that has not started yet already covers
+        the request (it will read the latest results when it starts).
+        """
+        language = language or self._default_language()
+        for job in self._jobs.values():
+            if job.status == STATUS_QUEUED and job.language == language:
+                return job
+
+        job = ReportJob(job_id=new_job_id(), language=language)
+        self._start(job)
+        return job
+
+    # ── Execution ─────────────────────────────────────────────────────────
+
+    async def _async_run(self, job: ReportJob) -> None:
+        async with self._lock:
+            job.status = STATUS_RUNNING
+            self._fire(job)
+            # Snapshot at start: a queued job reports the latest scan results
+            summary, automation_issues, entity_issues, extra = build_report_inputs(
+                self._coordinator.data
+            )
+
+            @callback
+            def _format_done(fmt: str) -> None:
+                job.formats_done.append(fmt)
+                self._fire(job, fmt)
+
+            try:
+                generator = await async_resolve(self._report_generator)
+                job.result = await generator.generate_all_reports(
+                    summary,
+                    automation_issues,
+                    entity_issues,
+                    language=job.language,
+                    progress=_format_done,
+                    **extra,
+                )
+                job.status = STATUS_DONE
+                _LOGGER.info(
+                    "[HACA Reports] Job %s done — reports generated with timestamp %s",
+                    job.job_id, job.result.get("timestamp"),
+                )
+            except asyncio.CancelledError:
+                job.status = STATUS_FAILED
+                job.error = "cancelled"
+                raise
+            except Exception as err:
+                job.status = STATUS_FAILED
+                job.error = str(err)
+                _LOGGER.error("[HACA Reports] Job %s failed: %s", job.job_id, err, exc_info=True)
+            finally:
+                job.finished = time.time()
+                self._fire(job)
+
+    @callback
+    def _fire(self, job: ReportJob, fmt: str | None = None) -> None:
+        self.hass.bus.async_fire(EVENT_REPORT_PROGRESS, {
+            "entry_id": self.entry_id,
+            "job_id": job.job_id,
+            "status": job.status,
+            "format": fmt,
+            "percent": job.percent,
+            "formats_done": list(job.formats_done),
+            "timestamp": (job.result or {}).get("timestamp"),
+            "error": job.error,
+        })
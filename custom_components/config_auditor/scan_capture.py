@@ -0,0 +1,337 @@
+"""H.A.C.A — Scan-input capture for offline profiling.
+
+When a scan takes minutes on one installation, we cannot reproduce it
+without that hass instance.  ``async_save_capture`` serializes exactly what
+the analyzers consume into one gzip-compressed JSON file under
+``CAPTURES_DIR``:
+
+  • ``files`` — every configuration file the loaders read: the YAML files
+    followed by the include resolver, ``automations/scripts/scenes.yaml``,
+    blueprints, YAML dashboards and the ``.storage`` files read directly
+    (``core.automation``, ``lovelace*``).  ``secrets.yaml`` is never
+    captured (``!secret`` values are not expanded anyway);
+  • ``states`` — state, attributes and timestamps of every entity.  Access
+    tokens, entity pictures and GPS coordinates are dropped;
+  • ``registries`` — the entity, device, area, floor and label fields the
+    registry snapshot and the analyzers read, plus config entries;
+  • ``services`` and the dashboards served by the lovelace integration
+    that are not stored in ``.storage`` (YAML mode, API only);
+  • ``recorder`` — anonymized aggregates only: row counts per entity
+    (entities unknown to Home Assistant get a hashed id) and the noisy
+    entity counts of the last 24 h.  No recorded value or timestamp.
+
+The replay harness (tests/replay.py) rebuilds stub hass objects from such a
+file and runs the full ``ScanPipeline`` against them.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import CAPTURES_DIR, DOMAIN, VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_FORMAT = "haca-scan-inputs"
+CAPTURE_VERSION = 1
+
+# Files read by the loaders besides the include graph (relative to config dir)
+CAPTURED_FILES = (
+    "configuration.yaml",
+    "automations.yaml",
+    "scripts.yaml",
+    "scenes.yaml",
+    "ui-lovelace.yaml",
+    "lovelace.yaml",
+    ".storage/core.automation",
+    ".storage/lovelace_dashboards",
+)
+CAPTURED_GLOBS = (".storage/lovelace", ".storage/lovelace.*", "blueprints/**/*.yaml")
+EXCLUDED_FILES = frozenset({"secrets.yaml"})
+MAX_FILE_BYTES = 32 * 1024 * 1024
+
+# State attributes never written to a capture
+REDACTED_ATTRIBUTES = frozenset({
+    "access_token", "entity_picture", "latitude", "longitude", "gps_accuracy",
+})
+
+ENTITY_FIELDS = (
+    "entity_id", "platform", "unique_id", "device_id", "area_id", "config_entry_id",
+    "disabled_by", "hidden_by", "entity_category", "icon", "name", "original_name", "labels",
+)
+DEVICE_FIELDS = (
+    "id", "area_id", "labels", "name", "name_by_user", "manufacturer", "model",
+    "sw_version", "disabled_by", "via_device_id", "config_entries",
+)
+AREA_FIELDS = ("id", "name", "floor_id", "labels")
+FLOOR_FIELDS = ("floor_id", "name", "level")
+LABEL_FIELDS = ("label_id", "name")
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert attribute / registry values to plain JSON types."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return _jsonable(value.value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted((_jsonable(v) for v in value), key=str)
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return str(value)
+
+
+def _fields(obj: Any, names: tuple[str, ...]) -> dict[str, Any]:
+    return {name: _jsonable(getattr(obj, name, None)) for name in names}
+
+
+def anonymize_entity_id(entity_id: str) -> str:
+    """Stable pseudonym keeping the domain, for entities unknown to HA."""
+    domain = entity_id.split(".", 1)[0] if "." in entity_id else "unknown"
+    digest = hashlib.sha256(entity_id.encode("utf-8")).hexdigest()[:12]
+    return f"{domain}.recorded_{digest}"
+
+
+# ── Collection ────────────────────────────────────────────────────────────────
+
+def _collect_files(config_dir: str, watched: frozenset[str]) -> dict[str, str]:
+    """Read the captured files (executor).  Keys are relative POSIX paths."""
+    root = Path(config_dir).resolve()
+    candidates: set[Path] = {Path(p) for p in watched}
+    candidates.update(root / name for name in CAPTURED_FILES)
+    for pattern in CAPTURED_GLOBS:
+        candidates.update(root.glob(pattern))
+
+    files: dict[str, str] = {}
+    for path in sorted(candidates):
+        try:
+            path = path.resolve()
+            rel = path.relative_to(root)
+        except (OSError, ValueError):
+            continue                    # outside the config directory
+        if path.name in EXCLUDED_FILES or not path.is_file():
+            continue
+        if path.stat().st_size > MAX_FILE_BYTES:
+            _LOGGER.warning("[HACA Capture] %s skipped (larger than %d bytes)", rel, MAX_FILE_BYTES)
+            continue
+        files[rel.as_posix()] = path.read_text(encoding="utf-8", errors="replace")
+    return files
+
+
+def _collect_states(hass: HomeAssistant) -> list[dict[str, Any]]:
+    return [
+        {
+            "entity_id": state.entity_id,
+            "state": state.state,
+            "attributes": _jsonable({
+                k: v for k, v in state.attributes.items() if k not in REDACTED_ATTRIBUTES
+            }),
+            "last_changed": _jsonable(state.last_changed),
+            "last_updated": _jsonable(state.last_updated),
+        }
+        for state in hass.states.async_all()
+    ]
+
+
+def _collect_registries(hass: HomeAssistant) -> dict[str, list[dict[str, Any]]]:
+    from homeassistant.helpers import (
+        area_registry as ar,
+        device_registry as dr,
+        entity_registry as er,
+    )
+
+    out: dict[str, list[dict[str, Any]]] = {
+        "entities": [_fields(e, ENTITY_FIELDS) for e in er.async_get(hass).entities.values()],
+        "devices": [_fields(d, DEVICE_FIELDS) for d in dr.async_get(hass).devices.values()],
+        "areas": [_fields(a, AREA_FIELDS) for a in ar.async_get(hass).async_list_areas()],
+        "floors": [],
+        "labels": [],
+    }
+    try:
+        from homeassistant.helpers import floor_registry as fr
+        out["floors"] = [_fields(f, FLOOR_FIELDS) for f in fr.async_get(hass).async_list_floors()]
+    except Exception as exc:
+        _LOGGER.debug("[HACA Capture] floor registry not available: %s", exc)
+    try:
+        from homeassistant.helpers import label_registry as lr
+        out["labels"] = [_fields(l, LABEL_FIELDS) for l in lr.async_get(hass).async_list_labels()]
+    except Exception as exc:
+        _LOGGER.debug("[HACA Capture] label registry not available: %s", exc)
+
+    out["config_entries"] = [
+        {
+            "entry_id": ce.entry_id,
+            "domain": ce.domain,
+            "title": ce.title,
+            "state": _jsonable(ce.state),
+            "recoverable": bool(getattr(ce.state, "recoverable", True)),
+            "disabled_by": _jsonable(ce.disabled_by),
+        }
+        for ce in hass.config_entries.async_entries()
+    ]
+    return out
+
+
+async def _collect_api_dashboards(hass: HomeAssistant, files: dict[str, str]) -> dict[str, Any]:
+    """Dashboards the lovelace integration serves that are not in ``files``."""
+    result: dict[str, Any] = {}
+    lovelace = hass.data.get("lovelace", {})
+    if not isinstance(lovelace, dict):
+        return result
+    stored = {name.removeprefix(".storage/") for name in files if name.startswith(".storage/")}
+    for url_path, dashboard in lovelace.get("dashboards", {}).items():
+        key = getattr(dashboard, "_storage_key", None) or getattr(
+            getattr(dashboard, "_store", None), "key", None
+        )
+        if key and key in stored:
+            continue
+        try:
+            config = await dashboard.async_load(False)
+        except Exception as exc:
+            _LOGGER.debug("[HACA Capture] dashboard %s not loadable: %s", url_path, exc)
+            continue
+        if isinstance(config, dict):
+            result[url_path or ""] = _jsonable(config)
+    return result
+
+
+async def _collect_recorder(hass: HomeAssistant, pipeline: Any, known: set[str]) -> dict[str, Any]:
+    """Anonymized recorder aggregates: row counts and 24 h change counts."""
+    from .state_rate_monitor import get_state_rate_monitor
+
+    def _anon(entity_id: str) -> str:
+        return entity_id if entity_id in known else anonymize_entity_id(entity_id)
+
+    out: dict[str, Any] = {"available": False, "state_rows": {}, "stat_rows": {}, "noisy_24h": []}
+    recorder_analyzer = pipeline.recorder_analyzer
+    if recorder_analyzer is not None:
+        try:
+            from homeassistant.helpers.recorder import get_instance
+
+            instance = get_instance(hass)
+            states, stats = await instance.async_add_executor_job(
+                recorder_analyzer._query_row_counts, instance
+            )
+            out["available"] = True
+            out["state_rows"] = {_anon(eid): n for eid, n in states.items()}
+            out["stat_rows"] = {_anon(eid): n for eid, n in stats.items()}
+        except Exception as exc:
+            _LOGGER.debug("[HACA Capture] recorder row counts not available: %s", exc)
+
+    from .performance_analyzer import NOISY_QUERY_LIMIT, NOISY_THRESHOLD_MEDIUM
+
+    monitor = get_state_rate_monitor(hass)
+    if monitor is not None and not monitor.needs_backfill:
+        rows = monitor.top(NOISY_QUERY_LIMIT, NOISY_THRESHOLD_MEDIUM)
+    else:
+        db_rows = await pipeline.performance_analyzer._detect_noisy_entities_from_db()
+        rows = [(eid, count, None) for eid, count in db_rows or ()]
+    out["noisy_24h"] = [[_anon(eid), count, attr_only] for eid, count, attr_only in rows]
+    return out
+
+
+async def async_capture_scan_inputs(
+    hass: HomeAssistant, entry: ConfigEntry, pipeline: Any
+) -> dict[str, Any]:
+    """Collect everything the analyzers of ``pipeline`` consume."""
+    from .config_watcher import get_parsed_config_cache
+
+    files = await hass.async_add_executor_job(
+        _collect_files, hass.config.config_dir, get_parsed_config_cache(hass).watched_files()
+    )
+    registries = _collect_registries(hass)
+    states = _collect_states(hass)
+    known = {s["entity_id"] for s in states} | {e["entity_id"] for e in registries["entities"]}
+    services = {
+        domain: sorted(names) for domain, names in hass.services.async_services().items()
+    }
+    return {
+        "format": CAPTURE_FORMAT,
+        "version": CAPTURE_VERSION,
+        "captured_at": dt_util.utcnow().isoformat(),
+        "haca_version": VERSION,
+        "ha_version": HA_VERSION,
+        "language": hass.data.get(DOMAIN, {}).get("user_language") or hass.config.language,
+        "options": _jsonable(dict(entry.options)),
+        "files": files,
+        "states": states,
+        "registries": registries,
+        "services": services,
+        "dashboards": await _collect_api_dashboards(hass, files),
+        "recorder": await _collect_recorder(hass, pipeline, known),
+    }
+
+
+# ── File format ───────────────────────────────────────────────────────────────
+
+def write_capture(path: str | Path, capture: dict[str, Any]) -> int:
+    """Write ``capture`` as gzip JSON through a temp file; return the size in bytes."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as fh:
+            json.dump(capture, fh, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return path.stat().st_size
+
+
+def read_capture(path: str | Path) -> dict[str, Any]:
+    """Load a capture file; ValueError when it is not a supported capture."""
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        capture = json.load(fh)
+    if not isinstance(capture, dict) or capture.get("format") != CAPTURE_FORMAT:
+        raise ValueError(f"{path} is not a HACA scan-input capture")
+    if capture.get("version", 0) > CAPTURE_VERSION:
+        raise ValueError(
+            f"{path} uses capture version {capture.get('version')}, "
+            f"this HACA reads up to {CAPTURE_VERSION}"
+        )
+    return capture
+
+
+def capture_counts(capture: dict[str, Any]) -> dict[str, int]:
+    """Item counts of a capture (service response / replay summary)."""
+    registries = capture.get("registries", {})
+    return {
+        "files": len(capture.get("files", {})),
+        "states": len(capture.get("states", [])),
+        "entities": len(registries.get("entities", [])),
+        "devices": len(registries.get("devices", [])),
+        "areas": len(registries.get("areas", [])),
+        "dashboards": len(capture.get("dashboards", {})),
+        "recorded_entities": len(capture.get("recorder", {}).get("state_rows", {})),
+    }
+
+
+async def async_save_capture(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Capture the scan inputs of ``entry`` to ``<config>/CAPTURES_DIR``."""
+    pipeline = hass.data[DOMAIN][entry.entry_id]["scan_pipeline"]
+    capture = await async_capture_scan_inputs(hass, entry, pipeline)
+    stamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+    path = Path(hass.config.config_dir) / CAPTURES_DIR / f"scan_inputs_{stamp}.json.gz"
+    size = await hass.async_add_executor_job(write_capture, path, capture)
+    counts = capture_counts(capture)
+    _LOGGER.info(
+        "[HACA Capture] Scan inputs written to %s (%d bytes, %d files, %d states)",
+        path, size, counts["files"], counts["states"],
+    )
+    return {"path": str(path), "size_bytes": size, "counts": counts}
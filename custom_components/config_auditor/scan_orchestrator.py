@@ -0,0 +1,233 @@
+"""Scan orchestrator — one lock, superseding scans, progressive results.
+
+Every scan (coordinator tick, ``haca/scan_all``, services, event-driven
+partial rescans) goes through ``ScanOrchestrator.async_run``:
+
+* a single ``asyncio.Lock`` serialises pipeline runs — it replaces the
+  pipeline lock of ``__init__.py``, the ``_scan_lock`` of ``services.py``
+  and the ``_scan_in_progress`` flag of the WebSocket handler;
+* a newer request cancels the scan that is still running.  The replacement
+  covers the new scope plus the phases the cancelled scan had not finished
+  yet, and callers awaiting the cancelled scan transparently wait for its
+  replacement.  After ``MAX_CONSECUTIVE_SUPERSEDES`` cancellations in a row
+  a request queues behind the running scan instead, so a stream of
+  triggers cannot starve the pipeline;
+* every completed phase is reported through the ``progress`` callback
+  handed to the pipeline: the results of the phases finished since the
+  last publication are merged into coordinator data (throttled to one
+  publication per ``PUBLISH_MIN_INTERVAL``) and a ``haca_scan_progress``
+  event is fired with the phase name and percentage.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import ALL_SCAN_SCOPES
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_SCAN_PROGRESS = "haca_scan_progress"
+PHASE_FINALIZE = "finalize"
+MAX_CONSECUTIVE_SUPERSEDES = 3
+PUBLISH_MIN_INTERVAL = 0.5      # seconds between two partial publications
+
+# progress(phase) — awaited by the pipeline after each completed scan scope
+Progress = Callable[[str], Awaitable[None]]
+# pipeline(scope, progress) → final coordinator data
+Pipeline = Callable[[frozenset[str], Progress], Awaitable[dict[str, Any]]]
+# publish_partial(scopes) → None (merge the finished scopes into coordinator data)
+PartialPublisher = Callable[[frozenset[str]], Awaitable[None]]
+
+
+class _ScanRun:
+    """Book-keeping of one scheduled pipeline run."""
+
+    __slots__ = ("scan_id", "scope", "completed", "unpublished", "superseded", "task")
+
+    def __init__(self, scan_id: int, scope: frozenset[str]) -> None:
+        self.scan_id = scan_id
+        self.scope = scope
+        self.completed: set[str] = set()
+        self.unpublished: set[str] = set()
+        self.superseded = False
+        self.task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> frozenset[str]:
+        return self.scope - self.completed
+
+    @property
+    def total_phases(self) -> int:
+        return len(self.scope) + 1      # + finalize
+
+
+class ScanOrchestrator:
+    """Serialise, supersede and report progress of scan pipeline runs."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        pipeline: Pipeline,
+        publish_partial: PartialPublisher | None = None,
+    ) -> None:
+        self.hass = hass
+        self.entry_id = entry_id
+        self._pipeline = pipeline
+        self._publish_partial = publish_partial
+        self._lock = asyncio.Lock()
+        self._run: _ScanRun | None = None       # latest request (may be queued)
+        self._active: _ScanRun | None = None    # run holding the lock
+        self._next_id = 0
+        self._streak = 0
+        self._last_publish = 0.0
+        self._publishing = False
+        self.completed_scans = 0
+        self.superseded_scans = 0
+
+    # ── State ─────────────────────────────────────────────────────────────
+
+    @property
+    def is_running(self) -> bool:
+        """True while a scan is running or waiting for the lock."""
+        return bool(self._runs())
+
+    def _runs(self) -> list[_ScanRun]:
+        """Unfinished runs: the one holding the lock, then the queued one."""
+        runs = [self._active] if self._active is not None else []
+        if self._run is not None and self._run is not self._active and not self._run.task.done():
+            runs.append(self._run)
+        return runs
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return orchestrator counters (diagnostics)."""
+        runs = self._runs()
+        run = runs[0] if runs else None
+        return {
+            "running": run is not None,
+            "queued": len(runs) > 1,
+            "scan_id": run.scan_id if run else None,
+            "scope": sorted(run.scope) if run else [],
+            "completed_phases": sorted(run.completed) if run else [],
+            "completed_scans": self.completed_scans,
+            "superseded_scans": self.superseded_scans,
+        }
+
+    # ── Scheduling ────────────────────────────────────────────────────────
+
+    def _submit(self, scope: frozenset[str]) -> asyncio.Task:
+        current = self._run if self._run is not None and not self._run.task.done() else None
+        if current is not None:
+            if self._streak >= MAX_CONSECUTIVE_SUPERSEDES:
+                # Let the running scan finish; the new one waits on the lock
+                _LOGGER.debug(
+                    "[HACA Scan] Scan #%d superseded %d times in a row — queueing",
+                    current.scan_id, self._streak,
+                )
+                self._streak = 0
+            else:
+                scope = scope | current.pending
+                current.superseded = True
+                current.task.cancel()
+                self._streak += 1
+                self.superseded_scans += 1
+                _LOGGER.debug(
+                    "[HACA Scan] Cancelling stale scan #%d (%s done)",
+                    current.scan_id, ", ".join(sorted(current.completed)) or "nothing",
+                )
+        self._next_id += 1
+        run = _ScanRun(self._next_id, scope)
+        run.task = self.hass.loop.create_task(self._execute(run))
+        self._run = run
+        return run.task
+
+    async def _execute(self, run: _ScanRun) -> dict[str, Any]:
+        async with self._lock:
+            self._active = run
+            try:
+                _LOGGER.debug(
+                    "[HACA Scan] Scan #%d started: %s", run.scan_id, ", ".join(sorted(run.scope)),
+                )
+                data = await self._pipeline(run.scope, partial(self._async_phase_done, run))
+            finally:
+                self._active = None
+            self.completed_scans += 1
+            if self._run is run:
+                self._streak = 0
+            self._fire(run, PHASE_FINALIZE, 100)
+            return data
+
+    async def async_run(self, scope: frozenset[str] | set[str]) -> dict[str, Any]:
+        """Run the pipeline on ``scope`` and return the resulting data.
+
+        A scan already running is cancelled and folded into this one.  If
+        this request is itself superseded, the call follows the replacement
+        scan and returns its data.
+        """
+        task = self._submit(frozenset(scope) & ALL_SCAN_SCOPES)
+        while True:
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                replacement = self._run.task if self._run else None
+                if not task.cancelled() or replacement is None or replacement is task:
+                    raise
+                task = replacement
+
+    async def async_cancel(self) -> None:
+        """Cancel the running scan and the queued one, if any (entry unload)."""
+        tasks = [run.task for run in self._runs()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ── Progress ──────────────────────────────────────────────────────────
+
+    def _fire(self, run: _ScanRun, phase: str, percent: int) -> None:
+        self.hass.bus.async_fire(EVENT_SCAN_PROGRESS, {
+            "entry_id": self.entry_id,
+            "scan_id": run.scan_id,
+            "phase": phase,
+            "percent": percent,
+            "scope": sorted(run.scope),
+        })
+
+    async def _async_phase_done(self, run: _ScanRun, phase: str) -> None:
+        """Record a finished phase, publish partial data and report progress.
+
+        ``phase`` is a scan scope.  Partial publications are throttled; the
+        final data is always published by the caller of ``async_run``.
+        """
+        if phase not in run.scope or run.superseded:
+            return      # the replacement scan reports progress
+        run.completed.add(phase)
+        run.unpublished.add(phase)
+        percent = int(100 * len(run.completed) / run.total_phases)
+
+        now = time.monotonic()
+        if (
+            self._publish_partial is not None
+            and not self._publishing
+            and now - self._last_publish >= PUBLISH_MIN_INTERVAL
+        ):
+            self._publishing = True
+            scopes = frozenset(run.unpublished)
+            run.unpublished.clear()
+            try:
+                await self._publish_partial(scopes)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                _LOGGER.debug("[HACA Scan] Partial publish failed: %s", err)
+            finally:
+                self._publishing = False
+                self._last_publish = time.monotonic()
+
+        self._fire(run, phase, percent)
@@ -0,0 +1,516 @@
+"""H.A.C.A — Scan pipeline: the analyzers of a config entry and their results.
+
+One ``ScanPipeline`` per config entry owns every analyzer instance and the
+raw result of the last run of each one, keyed by scan scope (same keys as
+the "excluded_categories" option).  A full scan reruns every analyzer; a
+periodic tick only reruns the scopes that are due (see scan_scheduler.py)
+and an event-driven partial rescan (see event_monitor.py) only those in its
+scope — coordinator data is then reassembled from the cached results.
+
+The coordinator drives it through the ScanOrchestrator (one lock, newer
+requests supersede stale scans, each finished phase published early).  It
+only needs ``hass`` and the entry options, so benchmarks and offline
+harnesses run the exact same pipeline against stub objects.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import hashlib
+import logging
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as _dt_util
+
+from .const import (
+    ALL_SCAN_SCOPES,
+    MODULE_9_DASHBOARD_ANALYZER,
+    MODULE_11_RECORDER_ANALYZER,
+    MODULE_17_COMPLIANCE_ANALYZER,
+    MODULE_18_BATTERY_PREDICTOR,
+    MODULE_19_AREA_COMPLEXITY,
+    MODULE_20_REDUNDANCY_ANALYZER,
+    MODULE_21_RECORDER_IMPACT,
+)
+from .automation_analyzer import AutomationAnalyzer
+from .entity_analyzer import EntityAnalyzer
+from .battery_monitor import BatteryMonitor
+from .dependency_mapper import DependencyMapper
+from .performance_analyzer import PerformanceAnalyzer
+from .security_analyzer import SecurityAnalyzer
+from .dashboard_analyzer import DashboardAnalyzer
+from .recorder_analyzer import RecorderAnalyzer
+from .health_score import calculate_health_score
+from .history_manager import HistoryManager
+from .registry_snapshot import RegistrySnapshot, async_build_registry_snapshot
+from .scan_scheduler import ScanScheduler
+
+if MODULE_17_COMPLIANCE_ANALYZER:
+    from .compliance_analyzer import ComplianceAnalyzer
+if MODULE_18_BATTERY_PREDICTOR:
+    from .battery_predictor import BatteryPredictor
+if MODULE_19_AREA_COMPLEXITY:
+    from .area_complexity_analyzer import AreaComplexityAnalyzer
+if MODULE_20_REDUNDANCY_ANALYZER:
+    from .redundancy_analyzer import RedundancyAnalyzer
+if MODULE_21_RECORDER_IMPACT:
+    from .recorder_impact_analyzer import RecorderImpactAnalyzer
+
+_LOGGER = logging.getLogger(__name__)
+
+# ``progress(scope_name)`` — awaited when an analyzer group has stored its results
+Progress = Callable[[str], Awaitable[None]]
+
+
+async def _no_progress(_scope: str) -> None:
+    return None
+
+
+class ScanPipeline:
+    """Analyzers of one config entry plus the raw results of their last run."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        scheduler: ScanScheduler,
+        history_manager: HistoryManager | None = None,
+    ) -> None:
+        self.hass = hass
+        self._entry = entry
+        self.scheduler = scheduler
+        self.history_manager = history_manager
+        options = entry.options
+
+        self.automation_analyzer = AutomationAnalyzer(hass)
+        self.entity_analyzer = EntityAnalyzer(hass)
+        self.battery_monitor = BatteryMonitor(
+            hass,
+            critical=options.get("battery_critical", 5),
+            low=options.get("battery_low", 15),
+            warning=options.get("battery_warning", 25),
+        )
+        self.dependency_mapper = DependencyMapper(hass)
+        self.performance_analyzer = PerformanceAnalyzer(hass)
+        self.security_analyzer = SecurityAnalyzer(hass)
+        self.dashboard_analyzer = DashboardAnalyzer(hass) if MODULE_9_DASHBOARD_ANALYZER else None
+        self.recorder_analyzer = RecorderAnalyzer(hass) if MODULE_11_RECORDER_ANALYZER else None
+        self.compliance_analyzer = (
+            ComplianceAnalyzer(hass) if MODULE_17_COMPLIANCE_ANALYZER else None
+        )
+
+        # ── v1.5.0 analyzers ──────────────────────────────────────────────
+        self.battery_predictor = BatteryPredictor(hass) if MODULE_18_BATTERY_PREDICTOR else None
+        self.area_complexity_analyzer = (
+            AreaComplexityAnalyzer(hass) if MODULE_19_AREA_COMPLEXITY else None
+        )
+        self.redundancy_analyzer = (
+            RedundancyAnalyzer(hass) if MODULE_20_REDUNDANCY_ANALYZER else None
+        )
+        self.recorder_impact_analyzer = (
+            RecorderImpactAnalyzer(hass) if MODULE_21_RECORDER_IMPACT else None
+        )
+
+        self.raw: dict[str, Any] = {
+            "entities": [],
+            "performance": [],
+            "security": [],
+            "dashboards": [],
+            "batteries": [],
+            "recorder": ([], 0.0),
+            "compliance": [],
+            "battery_predictions": [],
+            "area_complexity": {},
+            "redundancy": {},
+            "recorder_impact": {},
+        }
+        self.full_scan_done = False
+
+    async def async_scan(
+        self, scope: frozenset[str], progress: Progress = _no_progress
+    ) -> dict[str, Any]:
+        """One scan: analyzers in ``scope``, then assembly of coordinator data."""
+        # One immutable registry snapshot per scan, shared by every analyzer
+        # (area/floor/label joins + haca_ignore set computed exactly once).
+        snapshot = async_build_registry_snapshot(self.hass)
+        await self.async_run_analyzers(snapshot, scope, progress)
+        data = await self.async_assemble_data(save_history="automations" in scope)
+        self.full_scan_done = True
+        return data
+
+    async def async_run_analyzers(
+        self, snapshot: RegistrySnapshot, scope: frozenset[str], progress: Progress
+    ) -> None:
+        """Run the analyzers in ``scope`` and store their raw results in ``self.raw``.
+
+        ``progress(scope_name)`` is awaited as soon as each analyzer group
+        has stored its results.
+        """
+        # Catégories exclues configurées dans le panel HACA
+        excluded: set = set(self._entry.options.get("excluded_categories", []))
+        _clock = time.monotonic
+
+        if "automations" in scope:
+            _t0 = _clock()
+            try:
+                if "automations" not in excluded:
+                    await self.automation_analyzer.analyze_all(snapshot=snapshot)
+            except Exception as _auto_err:
+                _LOGGER.error(
+                    "HACA: self.automation_analyzer.analyze_all() CRASHED — %s",
+                    _auto_err, exc_info=True,
+                )
+            self.scheduler.record_run("automations", _clock() - _t0)
+            await progress("automations")
+
+        if "entities" in scope:
+            _t0 = _clock()
+            try:
+                self.raw["entities"] = (
+                    await self.entity_analyzer.analyze_all(
+                        self.automation_analyzer.automation_configs,
+                        self.automation_analyzer.script_configs,
+                        snapshot=snapshot,
+                    )
+                    if "entities" not in excluded else []
+                )
+            except Exception as _ent_err:
+                _LOGGER.error(
+                    "HACA: self.entity_analyzer.analyze_all() CRASHED — %s",
+                    _ent_err, exc_info=True,
+                )
+                self.raw["entities"] = []
+            self.scheduler.record_run("entities", _clock() - _t0)
+            await progress("entities")
+
+        # ── Phase 2: parallel analysis ────────────────────────────────────
+        # All analyzers below depend on self.automation_analyzer results (already
+        # available) but are independent of each other.  Running them with
+        # asyncio.gather reduces total scan time by 40-60% on large setups.
+
+        async def _safe_perf() -> list:
+            if "performance" in excluded:
+                return []
+            return await self.performance_analyzer.analyze_all(
+                self.automation_analyzer.automation_configs, snapshot=snapshot
+            )
+
+        async def _safe_security() -> list:
+            if "security" in excluded:
+                return []
+            return await self.security_analyzer.analyze_all(
+                self.automation_analyzer.automation_configs, snapshot=snapshot
+            )
+
+        async def _safe_dashboard() -> list:
+            if not self.dashboard_analyzer or "dashboards" in excluded:
+                return []
+            return await self.dashboard_analyzer.analyze_all(snapshot=snapshot)
+
+        async def _safe_battery() -> list:
+            if "batteries" in excluded:
+                return []
+            return await self.battery_monitor.analyze_all(
+                critical=self._entry.options.get("battery_critical", 5),
+                low=self._entry.options.get("battery_low", 15),
+                warning=self._entry.options.get("battery_warning", 25),
+                snapshot=snapshot,
+            )
+
+        async def _safe_recorder() -> tuple[list, float]:
+            if not self.recorder_analyzer or "recorder" in excluded:
+                return [], 0.0
+            orphans = await self.recorder_analyzer.analyze_all(snapshot=snapshot)
+            return orphans, self.recorder_analyzer.total_wasted_mb
+
+        async def _safe_compliance() -> list:
+            if not self.compliance_analyzer or "compliance" in excluded:
+                return []
+            return await self.compliance_analyzer.async_analyze(snapshot=snapshot)
+
+        # (scope, runner, fallback on crash)
+        parallel = [
+            (name, runner, fallback)
+            for name, runner, fallback in (
+                ("performance", _safe_perf, []),
+                ("security", _safe_security, []),
+                ("dashboards", _safe_dashboard, []),
+                ("batteries", _safe_battery, []),
+                ("recorder", _safe_recorder, ([], 0.0)),
+                ("compliance", _safe_compliance, []),
+            )
+            if name in scope
+        ]
+
+        async def _timed(name: str, runner, fallback) -> None:
+            # Store each result (safe fallback on crash) as soon as it is
+            # ready so fast analyzers are published before slow ones finish
+            _t0 = _clock()
+            try:
+                self.raw[name] = await runner()
+            except Exception as err:
+                _LOGGER.error("HACA: %s analyzer CRASHED — %s", name, err, exc_info=err)
+                self.raw[name] = fallback
+            self.scheduler.record_run(name, _clock() - _t0)
+            await progress(name)
+
+        await asyncio.gather(
+            *(_timed(name, runner, fallback) for name, runner, fallback in parallel)
+        )
+
+        # ── v1.5.0 — Battery prediction ───────────────────────────────────
+        if "batteries" in scope:
+            battery_list = self.raw["batteries"]
+            battery_predictions: list = []
+            if self.battery_predictor and battery_list:
+                try:
+                    await self.battery_predictor.async_save_battery_snapshot(battery_list)
+                    battery_predictions = await self.battery_predictor.async_compute_predictions(battery_list)
+                except Exception as bp_err:
+                    _LOGGER.warning("Battery predictor error: %s", bp_err)
+            self.raw["battery_predictions"] = battery_predictions
+
+        # ── v1.5.0 — Area complexity heatmap ──────────────────────────────
+        # Cheap (snapshot lookups only) and area assignments may have changed
+        # even when automations did not — always recomputed.
+        if self.area_complexity_analyzer:
+            try:
+                self.raw["area_complexity"] = await self.area_complexity_analyzer.async_analyze(
+                    automation_configs=self.automation_analyzer.automation_configs,
+                    complexity_scores=self.automation_analyzer.complexity_scores,
+                    snapshot=snapshot,
+                )
+            except Exception as ac_err:
+                _LOGGER.warning("Area complexity analyzer error: %s", ac_err)
+
+        if "automations" not in scope:
+            return
+
+        # ── v1.5.0 — Redundancy analysis ──────────────────────────────────
+        if self.redundancy_analyzer:
+            try:
+                self.raw["redundancy"] = await self.redundancy_analyzer.async_analyze(
+                    automation_configs=self.automation_analyzer.automation_configs,
+                    blueprint_stats=self.automation_analyzer.blueprint_stats,
+                    complexity_scores=self.automation_analyzer.complexity_scores,
+                )
+            except Exception as red_err:
+                _LOGGER.warning("Redundancy analyzer error: %s", red_err)
+
+        # ── v1.5.0 — Recorder impact analysis ────────────────────────────
+        if self.recorder_impact_analyzer:
+            try:
+                self.raw["recorder_impact"] = await self.recorder_impact_analyzer.async_analyze(
+                    automation_configs=self.automation_analyzer.automation_configs,
+                    complexity_scores=self.automation_analyzer.complexity_scores,
+                )
+            except Exception as ri_err:
+                _LOGGER.warning("Recorder impact analyzer error: %s", ri_err)
+
+    # ── Assembly ──────────────────────────────────────────────────────────
+
+    def _scope_data(self, scopes: frozenset[str]) -> dict[str, Any]:
+        """Coordinator data keys filled by the analyzers of ``scopes``."""
+        excluded_types: set = set(self._entry.options.get("excluded_issue_types", []))
+
+        def _prepare(issues: list, cat_code: str) -> list:
+            # Filtrage par type d'issue (configuré dans le panel HACA → onglet Configuration)
+            if excluded_types:
+                issues = [i for i in issues if i.get("type", "") not in excluded_types]
+            return _tag_ids(issues, cat_code)
+
+        automations = self.automation_analyzer
+        entity_issues: list = self.raw["entities"]
+        data: dict[str, Any] = {}
+
+        if scopes & {"automations", "entities"}:
+            # scene.* issues of the entity analyzer (unavailable/stale/zombie)
+            # belong in the Scenes tab, not the Entities tab
+            entity_scene_issues = [i for i in entity_issues if i.get("entity_id", "").startswith("scene.")]
+            data["scene_issue_list"] = _prepare(automations.scene_issues + entity_scene_issues, "SCENE")
+
+        if "automations" in scopes:
+            data.update({
+                "automation_issue_list": _prepare(automations.automation_issues, "AUTO"),
+                "script_issue_list": _prepare(automations.script_issues, "SCRIPT"),
+                "blueprint_issue_list": _prepare(automations.blueprint_issues, "BP"),
+                "complexity_scores": sorted(automations.complexity_scores, key=lambda x: x["score"], reverse=True),
+                "script_complexity_scores": automations.script_complexity_scores,
+                "scene_stats": automations.scene_stats,
+                "blueprint_stats": automations.blueprint_stats,
+                "redundancy": self.raw["redundancy"],
+                "redundancy_issue_list": _redundancy_issues(self.raw["redundancy"]),
+                "recorder_impact": self.raw["recorder_impact"],
+            })
+
+        if "entities" in scopes:
+            data["entity_issue_list"] = _prepare(
+                [i for i in entity_issues if not i.get("entity_id", "").startswith("scene.")], "ENT"
+            )
+            data["helper_issue_list"] = _prepare(getattr(self.entity_analyzer, "helper_issues", []), "HELPER")
+
+        for scope, cat_code in (
+            ("performance", "PERF"), ("security", "SEC"), ("dashboards", "DASH"), ("compliance", "COMPL"),
+        ):
+            if scope in scopes:
+                key = "dashboard" if scope == "dashboards" else scope
+                data[f"{key}_issue_list"] = _prepare(self.raw[scope], cat_code)
+
+        if "batteries" in scopes:
+            battery_list: list = self.raw["batteries"]
+            battery_predictions: list = self.raw["battery_predictions"]
+            data.update({
+                "battery_list": battery_list,
+                "battery_count": len(battery_list),
+                "battery_alerts": sum(1 for b in battery_list if b["severity"] is not None),
+                "battery_alert_entities": [
+                    {"entity_id": b["entity_id"], "level": b["level"], "unit": b.get("unit", "%"),
+                     "device_class": b.get("device_class", ""), "severity": b["severity"]}
+                    for b in battery_list if b["severity"] is not None
+                ],
+                # ── v1.5.0 ────────────────────────────────────────────────
+                "battery_predictions": battery_predictions,
+                "battery_predictions_count": len(battery_predictions),
+                "battery_alert_7d": sum(1 for p in battery_predictions if p.get("alert_7d")),
+            })
+
+        if "recorder" in scopes:
+            recorder_orphans, recorder_wasted_mb = self.raw["recorder"]
+            data.update({
+                "recorder_orphans": recorder_orphans,
+                "recorder_orphan_count": len(recorder_orphans),
+                "recorder_wasted_mb": recorder_wasted_mb,
+                "recorder_db_available": getattr(self.recorder_analyzer, "db_available", False),
+            })
+        return data
+
+    def _summarize(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Add the issue counts and the health score to ``data`` (in place)."""
+        lists = {kind: data.get(f"{kind}_issue_list", []) for kind in _COUNTED_ISSUE_KINDS}
+        for kind, issues in lists.items():
+            data[f"{kind}_issues"] = len(issues)
+        data["total_issues"] = sum(data[f"{kind}_issues"] for kind in _COUNTED_ISSUE_KINDS)
+
+        automations = self.automation_analyzer
+        data["health_score"] = calculate_health_score(
+            lists["automation"], lists["entity"], lists["performance"], lists["security"], lists["dashboard"],
+            total_entities=len(self.hass.states.async_all()),
+            total_automations=len(automations.automation_configs) + len(automations.script_configs),
+            helper_issues=lists["helper"],
+            compliance_issues=lists["compliance"],
+            script_issues=lists["script"],
+            scene_issues=lists["scene"],
+            blueprint_issues=lists["blueprint"],
+        )
+        data["area_complexity"] = self.raw["area_complexity"]
+        data["analyzer_schedule"] = self.scheduler.as_dict()
+        data["last_scan"] = _dt_util.utcnow().isoformat()
+        return data
+
+    def partial_data(
+        self, previous: dict[str, Any] | None, scopes: frozenset[str]
+    ) -> dict[str, Any]:
+        """``previous`` coordinator data with the results of ``scopes`` merged in.
+
+        Published while a scan is still running: only the finished scopes
+        are reassembled, the dependency graph and audit history are left to
+        ``async_assemble_data`` at the end of the scan.
+        """
+        if previous is None:
+            # First scan: nothing to merge into yet
+            previous = {"dependency_graph": {"nodes": [], "edges": []}}
+            scopes = ALL_SCAN_SCOPES
+        return self._summarize({**previous, **self._scope_data(scopes)})
+
+    async def async_assemble_data(self, save_history: bool = True) -> dict[str, Any]:
+        """Build coordinator data from the latest raw result of every analyzer.
+
+        ``save_history`` is False for cheap-tier ticks so the audit history
+        keeps one entry per real scan, not one every few minutes.
+        """
+        data = self._summarize(self._scope_data(ALL_SCAN_SCOPES))
+        _LOGGER.info(
+            "Health Score Calculation: Automation=%d, Scripts=%d, Blueprints=%d, Entities=%d, Helpers=%d, Performance=%d, Dashboard=%d. Score=%d%%",
+            data["automation_issues"], data["script_issues"], data["blueprint_issues"],
+            data["entity_issues"], data["helper_issues"], data["performance_issues"],
+            data["dashboard_issues"], data["health_score"],
+        )
+
+        # ── Save audit snapshot to history ───────────────────────────────
+        if self.history_manager and save_history:
+            scan_result = {"health_score": data["health_score"]}
+            scan_result.update(
+                (f"{kind}_issues", data[f"{kind}_issues"])
+                for kind in _COUNTED_ISSUE_KINDS if kind != "compliance"
+            )
+            scan_result["total_issues"] = data["total_issues"] - data["compliance_issues"]
+            try:
+                await self.history_manager.async_save_scan(scan_result)
+            except Exception as hist_err:
+                _LOGGER.warning("HACA History save error: %s", hist_err)
+
+        # Build dependency graph
+        data["dependency_graph"] = {"nodes": [], "edges": []}
+        try:
+            all_flat_issues = [
+                issue
+                for kind in _COUNTED_ISSUE_KINDS if kind != "compliance"
+                for issue in data[f"{kind}_issue_list"]
+            ]
+            data["dependency_graph"] = await self.dependency_mapper.build(
+                automation_configs=self.automation_analyzer.automation_configs,
+                script_configs=self.automation_analyzer.script_configs,
+                scene_configs=self.automation_analyzer.scene_configs,
+                entity_references=dict(self.entity_analyzer.entity_references),
+                alias_map=self.entity_analyzer.automation_alias_map,
+                all_issues=all_flat_issues,
+            )
+        except Exception as dep_err:
+            _LOGGER.error("Dependency mapper error: %s", dep_err)
+        return data
+
+
+# Issue kinds counted in coordinator data (``<kind>_issues`` / ``<kind>_issue_list``)
+_COUNTED_ISSUE_KINDS = (
+    "automation", "script", "scene", "blueprint", "entity", "helper",
+    "performance", "security", "dashboard", "compliance",
+)
+
+
+def _tag_ids(issue_list: list, cat_code: str) -> list:
+    """Tag each issue with its haca_id for frontend display."""
+    for issue in issue_list:
+        eid = issue.get("entity_id") or issue.get("alias") or "unknown"
+        itype = (issue.get("type") or "unknown").upper()
+        h = hashlib.md5(eid.encode()).hexdigest()[:6]
+        issue["haca_id"] = f"HACA-{cat_code}-{itype}-{h}"
+    return issue_list
+
+
+def _redundancy_issues(redundancy_data: dict) -> list[dict]:
+    """Flatten the redundancy analysis into a standard issue list."""
+    redundancy_issue_list: list[dict] = []
+    for item in redundancy_data.get("blueprint_matches", []):
+        item["type"] = "redundancy_blueprint_candidate"
+        item["fix_available"] = True
+        item["message"] = f"Could be replaced by blueprint: {item.get('blueprint_id', '?')}"
+        item["recommendation"] = "Use AI to create a blueprint and convert this automation"
+        redundancy_issue_list.append(item)
+    for item in redundancy_data.get("native_feature_matches", []):
+        item["type"] = "redundancy_native_replacement"
+        item["fix_available"] = True
+        item["message"] = f"Can be replaced by native HA feature: {item.get('description') or item.get('pattern', '?')}"
+        item["recommendation"] = "Use AI to refactor this automation using the native HA feature"
+        redundancy_issue_list.append(item)
+    for item in redundancy_data.get("trigger_overlaps", []):
+        item["type"] = "redundancy_trigger_overlap"
+        item["entity_id"] = item.get("entity_id_a", "")
+        item["alias"] = f"{item.get('alias_a', '')} ↔ {item.get('alias_b', '')}"
+        item["fix_available"] = False
+        item["message"] = f"Trigger overlap with {item.get('alias_b', '?')}: {item.get('trigger_sig', '?')}"
+        item["recommendation"] = "Review both automations to determine if they conflict or should be merged"
+        redundancy_issue_list.append(item)
+    return _tag_ids(redundancy_issue_list, "REDUND")
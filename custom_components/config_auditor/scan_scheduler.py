@@ -0,0 +1,212 @@
+"""Tiered, cost-aware scan scheduler.
+
+Every analyzer group (scan scope, same keys as ``excluded_categories``)
+declares a cost class and a default interval.  The coordinator ticks at the
+shortest interval and each tick only reruns the scopes that are due; the
+results of the others are reused from their last run (see
+``ScanPipeline.raw`` in ``scan_pipeline.py``).
+
+Options (``entry.options``):
+
+* ``analyzer_intervals`` — ``{scope: minutes}`` overrides.  ``0`` disables
+  periodic runs of that scope (manual / event-driven scans still run it).
+  Scopes without a default interval follow ``scan_interval``.
+* ``max_scan_budget_seconds`` — estimated time budget per periodic tick
+  (``0`` = unlimited).  Scopes are picked cheap first using the measured
+  average duration of each analyzer; expensive scopes that do not fit, or
+  any expensive scope while the event loop is lagging, are deferred to a
+  later tick — but never for more than ``MAX_DEFERRAL_FACTOR`` intervals.
+
+``scan_interval = 0`` keeps the old "manual only" behaviour: no tick at all.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+
+from .const import ALL_SCAN_SCOPES, DEFAULT_SCAN_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_SCHEDULER_KEY = "scan_scheduler"
+
+COST_CHEAP = "cheap"
+COST_MODERATE = "moderate"
+COST_EXPENSIVE = "expensive"
+_COST_ORDER = {COST_CHEAP: 0, COST_MODERATE: 1, COST_EXPENSIVE: 2}
+
+MIN_TICK_MINUTES = 1
+DUE_SLACK_SECONDS = 30          # a scope due within the next 30 s runs now
+MAX_DEFERRAL_FACTOR = 2         # never defer beyond 2 × the scope interval
+LOOP_LAG_THRESHOLD = 0.25       # seconds — event loop considered under load
+DURATION_SMOOTHING = 0.3        # EWMA weight of the latest measurement
+
+
+@dataclass(frozen=True)
+class AnalyzerSpec:
+    """Scheduling declaration of one scan scope."""
+
+    scope: str
+    cost: str
+    default_interval: int | None    # minutes; None → follow scan_interval
+
+
+ANALYZER_SPECS: dict[str, AnalyzerSpec] = {
+    spec.scope: spec
+    for spec in (
+        AnalyzerSpec("batteries", COST_CHEAP, 5),
+        AnalyzerSpec("entities", COST_CHEAP, 5),
+        AnalyzerSpec("automations", COST_MODERATE, None),
+        AnalyzerSpec("performance", COST_MODERATE, None),
+        AnalyzerSpec("security", COST_MODERATE, None),
+        AnalyzerSpec("compliance", COST_EXPENSIVE, None),
+        AnalyzerSpec("dashboards", COST_EXPENSIVE, 240),
+        AnalyzerSpec("recorder", COST_EXPENSIVE, 240),
+    )
+}
+
+
+async def async_measure_loop_lag(samples: int = 3) -> float:
+    """Return the worst delay (seconds) of a few event-loop round trips."""
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    for _ in range(samples):
+        start = loop.time()
+        await asyncio.sleep(0)
+        worst = max(worst, loop.time() - start)
+    return worst
+
+
+class ScanScheduler:
+    """Decide which scopes a coordinator tick should run."""
+
+    def __init__(self, entry: ConfigEntry) -> None:
+        self._entry = entry
+        self.last_run: dict[str, float] = {}
+        self.avg_duration: dict[str, float] = {}
+        self.deferred: dict[str, int] = {}
+        self._force_full = False
+
+    # ── Configuration ─────────────────────────────────────────────────────
+
+    @property
+    def scan_interval(self) -> int:
+        return int(self._entry.options.get("scan_interval", DEFAULT_SCAN_INTERVAL))
+
+    @property
+    def budget(self) -> float:
+        try:
+            return max(0.0, float(self._entry.options.get("max_scan_budget_seconds", 0) or 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def interval(self, scope: str) -> int:
+        """Return the periodic interval of ``scope`` in minutes (0 = never)."""
+        overrides = self._entry.options.get("analyzer_intervals") or {}
+        value = overrides.get(scope) if isinstance(overrides, dict) else None
+        if value is not None:
+            try:
+                return max(0, int(value))
+            except (TypeError, ValueError):
+                pass
+        spec = ANALYZER_SPECS.get(scope)
+        if spec is None or spec.default_interval is None:
+            return self.scan_interval
+        return spec.default_interval
+
+    def tick_interval(self) -> timedelta | None:
+        """Coordinator ``update_interval``: the shortest scope interval."""
+        if self.scan_interval <= 0:
+            return None
+        intervals = [self.interval(scope) for scope in ALL_SCAN_SCOPES]
+        active = [m for m in intervals if m > 0]
+        if not active:
+            return None
+        return timedelta(minutes=max(MIN_TICK_MINUTES, min(active)))
+
+    # ── Selection ─────────────────────────────────────────────────────────
+
+    def request_full(self) -> None:
+        """Make the next coordinator refresh run every scope."""
+        self._force_full = True
+
+    def consume_full_request(self) -> bool:
+        forced, self._force_full = self._force_full, False
+        return forced
+
+    def due(self, now: float | None = None) -> list[str]:
+        """Return the scopes whose interval has elapsed, cheapest first."""
+        now = time.time() if now is None else now
+        result = []
+        for scope in ALL_SCAN_SCOPES:
+            minutes = self.interval(scope)
+            if minutes <= 0:
+                continue
+            last = self.last_run.get(scope)
+            if last is None or now - last + DUE_SLACK_SECONDS >= minutes * 60:
+                result.append(scope)
+        return sorted(result, key=lambda s: (_COST_ORDER[ANALYZER_SPECS[s].cost], s))
+
+    def select(self, now: float | None = None, loop_lag: float = 0.0) -> frozenset[str]:
+        """Apply the scan budget / load policy to the due scopes."""
+        now = time.time() if now is None else now
+        budget = self.budget
+        under_load = loop_lag >= LOOP_LAG_THRESHOLD
+        selected: list[str] = []
+        spent = 0.0
+        for scope in self.due(now):
+            cost = ANALYZER_SPECS[scope].cost
+            estimate = self.avg_duration.get(scope, 0.0)
+            last = self.last_run.get(scope)
+            starving = last is None or (
+                now - last >= MAX_DEFERRAL_FACTOR * self.interval(scope) * 60
+            )
+            if cost == COST_EXPENSIVE and not starving and (
+                under_load or (budget and spent + estimate > budget)
+            ):
+                self.deferred[scope] = self.deferred.get(scope, 0) + 1
+                _LOGGER.debug(
+                    "[HACA Scheduler] Deferring %s (est. %.1fs, spent %.1fs/%s, loop lag %.3fs)",
+                    scope, estimate, spent, budget or "∞", loop_lag,
+                )
+                continue
+            selected.append(scope)
+            spent += estimate
+        return frozenset(selected)
+
+    async def async_select(self, now: float | None = None) -> frozenset[str]:
+        """``select`` with the current event-loop lag as the load signal."""
+        return self.select(now, await async_measure_loop_lag())
+
+    # ── Bookkeeping ───────────────────────────────────────────────────────
+
+    def record_run(self, scope: str, duration: float, finished: float | None = None) -> None:
+        """Store the completion time and smoothed duration of ``scope``."""
+        self.last_run[scope] = time.time() if finished is None else finished
+        previous = self.avg_duration.get(scope)
+        self.avg_duration[scope] = (
+            duration if previous is None
+            else previous + DURATION_SMOOTHING * (duration - previous)
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Per-scope schedule state (diagnostics / coordinator data)."""
+        out: dict[str, Any] = {}
+        for scope in sorted(ALL_SCAN_SCOPES):
+            last = self.last_run.get(scope)
+            out[scope] = {
+                "cost": ANALYZER_SPECS[scope].cost,
+                "interval_minutes": self.interval(scope),
+                "last_run": (
+                    datetime.fromtimestamp(last, timezone.utc).isoformat() if last else None
+                ),
+                "avg_duration_s": round(self.avg_duration.get(scope, 0.0), 3),
+                "deferred": self.deferred.get(scope, 0),
+            }
+        return out
@@ -4,6 +4,7 @@ import re
 from typing import Any
 
 from homeassistant.core import HomeAssistant
+from .registry_snapshot import RegistrySnapshot
 from .translation_utils import TranslationHelper
 
 _LOGGER = logging.getLogger(__name__)
@@ -35,7 +36,11 @@ class SecurityAnalyzer:
         self.issues: list[dict[str, Any]] = []
         self._translator = TranslationHelper(hass)
 
-    async def analyze_all(self, automation_configs: dict[str, dict[str, Any]] | None = None) -> list[dict[str, Any]]:
+    async def analyze_all(
+        self,
+        automation_configs: dict[str, dict[str, Any]] | None = None,
+        snapshot: RegistrySnapshot | None = None,
+    ) -> list[dict[str, Any]]:
         """Run all security checks."""
         self.issues = []
         
@@ -44,8 +49,11 @@ class SecurityAnalyzer:
         await self._translator.async_load_language(language)
 
         # Load haca_ignore label (entity + device level)
-        from .translation_utils import async_get_haca_ignored_entity_ids
-        _ignored = await async_get_haca_ignored_entity_ids(self.hass)
+        if snapshot is not None:
+            _ignored = snapshot.ignored_entity_ids
+        else:
+            from .translation_utils import async_get_haca_ignored_entity_ids
+            _ignored = await async_get_haca_ignored_entity_ids(self.hass)
         
         # Filter out ignored automations from configs
         automation_configs = {
@@ -11,7 +11,6 @@ from __future__ import annotations
 
 from .translation_utils import TranslationHelper
 
-import asyncio
 import logging
 from typing import Any
 
@@ -42,9 +41,9 @@ from .const import (
     SERVICE_RESTORE_BACKUP,
     SERVICE_PURGE_GHOSTS,
     SERVICE_FUZZY_SUGGESTIONS,
+    SERVICE_CAPTURE_SCAN_INPUTS,
 )
-from .health_score import calculate_health_score
-from .conversation import explain_issue_ai, analyze_complexity_ai
+from .lazy import async_import, async_resolve
 
 # ═══════════════════════════════════════════════════════════════════════
 # Helper : notifications HACA uniformes, riches et signées
@@ -118,156 +117,57 @@ def _ts(hass, section: str, key: str, **kwargs) -> str:
 async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Setup all services."""
     
-    _scan_lock = asyncio.Lock()
+    def _fire_scan_complete() -> None:
+        hass.bus.async_fire("haca_scan_complete", {
+            "entry_id": entry.entry_id,
+            "success": True,
+        })
 
     async def handle_scan_all(call: ServiceCall) -> None:
-        """Handle scan_all service."""
-        if _scan_lock.locked():
-            _LOGGER.warning("Scan already in progress — ignoring concurrent scan_all request")
-            return
+        """Handle scan_all service.
+
+        A scan already running is superseded by this full scan (see
+        scan_orchestrator.py) instead of being ignored.
+        """
         _LOGGER.info("Starting full scan in background")
 
         data = hass.data[DOMAIN][entry.entry_id]
         coordinator = data["coordinator"]
 
-        async def _locked_refresh():
-            data["_scan_in_progress"] = True
+        async def _full_refresh():
             try:
-                async with _scan_lock:
-                    await coordinator.async_refresh()
+                if data.get("scan_scheduler"):
+                    data["scan_scheduler"].request_full()
+                await coordinator.async_refresh()
             finally:
-                data["_scan_in_progress"] = False
-                hass.bus.async_fire("haca_scan_complete", {
-                    "entry_id": entry.entry_id,
-                    "success": True,
-                })
+                _fire_scan_complete()
+
+        hass.async_create_task(_full_refresh())
+
+    async def _async_partial_scan(scope: str) -> None:
+        # Same pipeline (and lock) as every other scan: the analyzer reruns,
+        # its results are merged with the others and the health score,
+        # totals and scene routing are recomputed by the assembly step.
+        data = hass.data[DOMAIN][entry.entry_id]
+        try:
+            await data["async_rescan"](frozenset({scope}))
+        finally:
+            _fire_scan_complete()
 
-        hass.async_create_task(_locked_refresh())
-    
     async def handle_scan_automations(call: ServiceCall) -> None:
         """Handle scan_automations service."""
         _LOGGER.info("Scanning automations")
-        
-        data = hass.data[DOMAIN][entry.entry_id]
-        automation_analyzer = data["automation_analyzer"]
-        coordinator = data["coordinator"]
-        
-        async def _run_scan():
-            await automation_analyzer.analyze_all()
-            
-            # Mettre à jour le coordinator avec les nouvelles données séparées
-            current_data = coordinator.data or {}
-            updated_data = {
-                **current_data,
-                "automation_issues": len(automation_analyzer.automation_issues),
-                "automation_issue_list": automation_analyzer.automation_issues,
-                "script_issues": len(automation_analyzer.script_issues),
-                "script_issue_list": automation_analyzer.script_issues,
-                "scene_issues": len(automation_analyzer.scene_issues),
-                "scene_issue_list": automation_analyzer.scene_issues,
-                "blueprint_issues": len(automation_analyzer.blueprint_issues),
-                "blueprint_issue_list": automation_analyzer.blueprint_issues,
-            }
-            
-            # Recalculer le health_score avec les 4 catégories
-            auto_issues = updated_data.get("automation_issue_list", [])
-            entity_issues = updated_data.get("entity_issue_list", [])
-            perf_issues = updated_data.get("performance_issue_list", [])
-            sec_issues = updated_data.get("security_issue_list", [])
-            
-            _n_ent  = len(list(hass.states.async_all()))
-            _n_auto = (len(automation_analyzer.automation_configs)
-                       + len(automation_analyzer.script_configs))
-            updated_data["health_score"] = calculate_health_score(
-                auto_issues, entity_issues, perf_issues, sec_issues,
-                total_entities=_n_ent, total_automations=_n_auto,
-            )
-            updated_data["total_issues"] = (
-                len(auto_issues)
-                + len(updated_data.get("script_issue_list", []))
-                + len(updated_data.get("scene_issue_list", []))
-                + len(updated_data.get("blueprint_issue_list", []))
-                + len(entity_issues) + len(perf_issues) + len(sec_issues)
-            )
-
-            coordinator.async_set_updated_data(updated_data)
-            hass.bus.async_fire("haca_scan_complete", {
-                "entry_id": entry.entry_id,
-                "success": True,
-            })
+        hass.async_create_task(_async_partial_scan("automations"))
 
-        if not _scan_lock.locked():
-            hass.async_create_task(_run_scan())
-        else:
-            _LOGGER.warning("Scan in progress — ignoring concurrent scan_automations")
-    
     async def handle_scan_entities(call: ServiceCall) -> None:
         """Handle scan_entities service."""
         _LOGGER.info("Scanning entities")
-        
-        data = hass.data[DOMAIN][entry.entry_id]
-        entity_analyzer = data["entity_analyzer"]
-        automation_analyzer = data["automation_analyzer"]
-        coordinator = data["coordinator"]
-        
-        async def _run_scan():
-            issues = await entity_analyzer.analyze_all(
-                automation_analyzer.automation_configs,
-                automation_analyzer.script_configs,
-            )
-            
-            # Mettre à jour le coordinator avec les nouvelles données
-            current_data = coordinator.data or {}
-
-            # Route scene.* issues from entity_analyzer into scene_issue_list
-            entity_scene_issues = [i for i in issues if i.get("entity_id", "").startswith("scene.")]
-            pure_entity_issues  = [i for i in issues if not i.get("entity_id", "").startswith("scene.")]
-            merged_scene_issues = current_data.get("scene_issue_list", []) + entity_scene_issues
-
-            # Separate helper issues (already split by entity_analyzer.analyze_all)
-            helper_issues = getattr(entity_analyzer, "helper_issues", [])
-
-            updated_data = {
-                **current_data,
-                "entity_issues": len(pure_entity_issues),
-                "entity_issue_list": pure_entity_issues,
-                "helper_issues": len(helper_issues),
-                "helper_issue_list": helper_issues,
-                "scene_issues": len(merged_scene_issues),
-                "scene_issue_list": merged_scene_issues,
-            }
-            
-            # Recalculer le health_score
-            auto_issues = updated_data.get("automation_issue_list", [])
-            entity_issues = updated_data.get("entity_issue_list", [])
-            perf_issues = updated_data.get("performance_issue_list", [])
-            sec_issues = updated_data.get("security_issue_list", [])
-            
-            _n_ent  = len(list(hass.states.async_all()))
-            _n_auto = (len(automation_analyzer.automation_configs)
-                       + len(automation_analyzer.script_configs))
-            updated_data["health_score"] = calculate_health_score(
-                auto_issues, entity_issues, perf_issues, sec_issues,
-                total_entities=_n_ent, total_automations=_n_auto,
-            )
-            updated_data["total_issues"] = (
-                len(updated_data.get("automation_issue_list", []))
-                + len(updated_data.get("script_issue_list", []))
-                + len(updated_data.get("scene_issue_list", []))
-                + len(updated_data.get("blueprint_issue_list", []))
-                + len(entity_issues) + len(helper_issues) + len(perf_issues) + len(sec_issues)
-            )
-
-            coordinator.async_set_updated_data(updated_data)
-            hass.bus.async_fire("haca_scan_complete", {
-                "entry_id": entry.entry_id,
-                "success": True,
-            })
+        hass.async_create_task(_async_partial_scan("entities"))
 
-        if not _scan_lock.locked():
-            hass.async_create_task(_run_scan())
-        else:
-            _LOGGER.warning("Scan in progress — ignoring concurrent scan_entities")
+    async def handle_capture_scan_inputs(call: ServiceCall) -> dict:
+        """Write what the analyzers consume to one file for offline replay."""
+        scan_capture = await async_import(hass, "scan_capture")
+        return await scan_capture.async_save_capture(hass, entry)
 
     # Module 4: Report services
     if MODULE_4_COMPLIANCE_REPORT:
@@ -275,53 +175,31 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             """Handle generate_report service."""
             _LOGGER.info("Generating report")
             
-            data = hass.data[DOMAIN][entry.entry_id]
-            coordinator = data["coordinator"]
-            report_gen = data["report_generator"]
-            
-            # Get the current language from Home Assistant
-            language = hass.data.get("config_auditor", {}).get("user_language") or hass.config.language or "en"
-            
-            summary = {
-                "health_score": coordinator.data.get("health_score", 0),
-                "automation_issues": coordinator.data.get("automation_issues", 0),
-                "entity_issues": coordinator.data.get("entity_issues", 0),
-                "total_issues": coordinator.data.get("total_issues", 0),
-                "script_issues": coordinator.data.get("script_issues", 0),
-                "scene_issues": coordinator.data.get("scene_issues", 0),
-                "performance_issues": coordinator.data.get("performance_issues", 0),
-                "security_issues": coordinator.data.get("security_issues", 0),
-            }
-            
-            # Use generate_all_reports to ensure all formats have the same timestamp
-            result = await report_gen.generate_all_reports(
-                summary,
-                coordinator.data.get("automation_issue_list", []),
-                coordinator.data.get("entity_issue_list", []),
-                language=language,
-                script_issues=coordinator.data.get("script_issue_list", []),
-                scene_issues=coordinator.data.get("scene_issue_list", []),
-                blueprint_issues=coordinator.data.get("blueprint_issue_list", []),
-                performance_issues=coordinator.data.get("performance_issue_list", []),
-                security_issues=coordinator.data.get("security_issue_list", []),
-                dashboard_issues=coordinator.data.get("dashboard_issue_list", []),
-            )
-            
+            # Queued as a background job (see report_jobs.py); the service
+            # call still returns once the reports are written.
+            report_jobs = hass.data[DOMAIN][entry.entry_id]["report_jobs"]
+            job = await report_jobs.async_wait(report_jobs.submit())
+            if job.error:
+                _LOGGER.error("Report generation failed: %s", job.error)
+                return
+            result = job.result
             _LOGGER.info("Reports generated with timestamp: %s", result.get("timestamp"))
         
         async def handle_list_reports(call: ServiceCall) -> dict:
             """Handle list_reports service."""
             data = hass.data[DOMAIN][entry.entry_id]
-            report_gen = data["report_generator"]
-            # list_reports() does synchronous glob() — must run in executor
-            reports = await hass.async_add_executor_job(report_gen.list_reports)
+            report_gen = await async_resolve(data["report_generator"])
+            # list_reports() reads the report catalog — must run in executor
+            reports = await hass.async_add_executor_job(
+                report_gen.list_reports, call.data.get("limit")
+            )
             return {"reports": reports, "count": len(reports)}
 
         async def handle_get_report_content(call: ServiceCall) -> dict:
             """Handle get_report_content service."""
             filename = call.data.get("filename")
             data = hass.data[DOMAIN][entry.entry_id]
-            report_gen = data["report_generator"]
+            report_gen = await async_resolve(data["report_generator"])
             
             result = await report_gen.get_report_content(filename)
             if not result:
@@ -333,7 +211,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             """Handle delete_report service."""
             session_id = call.data.get("session_id")
             data = hass.data[DOMAIN][entry.entry_id]
-            report_gen = data["report_generator"]
+            report_gen = await async_resolve(data["report_generator"])
             
             result = await report_gen.delete_report_session(session_id)
             
@@ -356,7 +234,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             automation_id = call.data.get("automation_id")
             
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             
             result = await refactoring.preview_device_id_fix(automation_id)
             
@@ -381,7 +259,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             dry_run = call.data.get("dry_run", False)
             
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             
             result = await refactoring.apply_device_id_fix(automation_id, dry_run=dry_run)
             
@@ -404,7 +282,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             new_mode = call.data.get("mode")
             
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             
             result = await refactoring.preview_mode_fix(automation_id, new_mode)
             
@@ -426,7 +304,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             dry_run = call.data.get("dry_run", False)
             
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             
             result = await refactoring.apply_mode_fix(automation_id, new_mode, dry_run=dry_run)
             
@@ -448,7 +326,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             automation_id = call.data.get("automation_id")
             
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             
             result = await refactoring.preview_template_fix(automation_id)
             return result
@@ -459,7 +337,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             dry_run = call.data.get("dry_run", False)
             
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             
             result = await refactoring.apply_template_fix(automation_id, dry_run=dry_run)
             return result
@@ -467,7 +345,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
         async def handle_list_backups(call: ServiceCall) -> dict:
             """Handle list_backups service."""
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             
             backups = await refactoring.list_backups()
             return {"backups": backups, "count": len(backups)}
@@ -475,7 +353,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
         async def handle_create_backup(call: ServiceCall) -> dict:
             """Handle create_backup service."""
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             
             result = await refactoring.create_backup()
             
@@ -495,7 +373,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             backup_path = call.data.get("backup_path")
             
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             
             result = await refactoring.restore_backup(backup_path)
             
@@ -517,7 +395,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             backup_path = call.data.get("backup_path")
             
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             
             result = await refactoring.delete_backup(backup_path)
             
@@ -537,14 +415,14 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             """Handle purge_ghosts service."""
             dry_run = call.data.get("dry_run", True)
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             return await refactoring.purge_orphaned_entities(dry_run=dry_run)
             
         async def handle_fuzzy_suggestions(call: ServiceCall) -> dict:
             """Handle get_fuzzy_suggestions service."""
             entity_id = call.data.get("entity_id")
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             suggestions = await refactoring.get_fuzzy_suggestions(entity_id)
             return {"suggestions": suggestions}
             
@@ -552,7 +430,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             """Handle suggest_description_ai service."""
             entity_id = call.data.get("entity_id")
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             return await refactoring.suggest_description_ai(entity_id)
             
         async def handle_fix_description(call: ServiceCall) -> dict:
@@ -560,7 +438,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             entity_id = call.data.get("entity_id")
             description = call.data.get("description")
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             return await refactoring.apply_description_fix(entity_id, description)
 
         async def handle_apply_zombie_fix(call: ServiceCall) -> dict:
@@ -569,7 +447,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
             old_entity_id = call.data.get("old_entity_id", "")
             new_entity_id = call.data.get("new_entity_id", "")
             data = hass.data[DOMAIN][entry.entry_id]
-            refactoring = data["refactoring_assistant"]
+            refactoring = await async_resolve(data["refactoring_assistant"])
             return await refactoring.apply_zombie_entity_fix(
                 automation_id, old_entity_id, new_entity_id
             )
@@ -578,12 +456,19 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
     hass.services.async_register(DOMAIN, SERVICE_SCAN_ALL, handle_scan_all, schema=vol.Schema({}))
     hass.services.async_register(DOMAIN, SERVICE_SCAN_AUTOMATIONS, handle_scan_automations, schema=vol.Schema({}))
     hass.services.async_register(DOMAIN, SERVICE_SCAN_ENTITIES, handle_scan_entities, schema=vol.Schema({}))
+    hass.services.async_register(
+        DOMAIN, SERVICE_CAPTURE_SCAN_INPUTS, handle_capture_scan_inputs,
+        schema=vol.Schema({}),
+        supports_response=SupportsResponse.OPTIONAL
+    )
     
     if MODULE_4_COMPLIANCE_REPORT:
         hass.services.async_register(DOMAIN, SERVICE_GENERATE_REPORT, handle_generate_report, schema=vol.Schema({}))
         hass.services.async_register(
             DOMAIN, SERVICE_LIST_REPORTS, handle_list_reports,
-            schema=vol.Schema({}),
+            schema=vol.Schema({
+                vol.Optional("limit"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            }),
             supports_response=SupportsResponse.ONLY
         )
         hass.services.async_register(
@@ -697,7 +582,8 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
     async def handle_explain_issue(call: ServiceCall) -> dict:
         """Handle explain_issue_ai service."""
         issue_data = call.data.get("issue")
-        explanation = await explain_issue_ai(hass, issue_data)
+        conversation = await async_import(hass, "conversation")
+        explanation = await conversation.explain_issue_ai(hass, issue_data)
         return {"explanation": explanation}
 
     hass.services.async_register(
@@ -709,7 +595,8 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
     async def handle_analyze_complexity(call: ServiceCall) -> dict:
         """AI analysis + refactoring proposal for a complex automation/script."""
         row = call.data.get("row", {})
-        result = await analyze_complexity_ai(hass, row)
+        conversation = await async_import(hass, "conversation")
+        result = await conversation.analyze_complexity_ai(hass, row)
         return result
 
     hass.services.async_register(
@@ -723,7 +610,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
         entity_id         = call.data.get("entity_id", "")
         issues            = call.data.get("issues", [])
         complexity_scores = call.data.get("complexity_scores", [])
-        optimizer = hass.data[DOMAIN][entry.entry_id]["automation_optimizer"]
+        optimizer = await async_resolve(hass.data[DOMAIN][entry.entry_id]["automation_optimizer"])
         result = await optimizer.optimize(entity_id, issues, complexity_scores)
         return result
 
@@ -741,7 +628,7 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
         """Apply optimised YAML — backup + atomic write."""
         entity_id = call.data.get("entity_id", "")
         new_yaml  = call.data.get("new_yaml", "")
-        optimizer = hass.data[DOMAIN][entry.entry_id]["automation_optimizer"]
+        optimizer = await async_resolve(hass.data[DOMAIN][entry.entry_id]["automation_optimizer"])
         result    = await optimizer.apply(entity_id, new_yaml)
         return result
 
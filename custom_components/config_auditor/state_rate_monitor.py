@@ -0,0 +1,350 @@
+"""Live state-change rate monitor for noisy-entity detection (Module 3).
+
+Counts state changes per entity over a sliding 24 h window from the
+``state_changed`` stream, so finding noisy entities needs no recorder query:
+
+* two count-min sketches (all changes / attribute-only changes) with
+  conservative update, ``SKETCH_DEPTH × SKETCH_WIDTH`` ``array('I')``
+  counters each, so memory does not grow with the number of entities;
+* each sketch has a current and a previous 24 h epoch; the sliding 24 h
+  count is ``current + previous × (1 − elapsed / 24 h)``;
+* a bounded candidate set (``MAX_CANDIDATES``) of the heaviest hitters,
+  so ``top()`` is O(k) and never scans the sketch.
+
+Hashing uses ``zlib.crc32`` (stable across restarts, unlike ``hash()``), and
+the sketches are persisted to ``.haca_state_rates.json`` every
+``SAVE_INTERVAL`` and on unload.  Until a full 24 h window has been observed
+(live or restored from disk) ``needs_backfill`` is true and the
+analyzer runs its recorder query once to seed the previous epoch.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import os
+import time
+import zlib
+from array import array
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_RATE_MONITOR_KEY = "state_rate_monitor"
+STATE_RATES_FILE = ".haca_state_rates.json"
+STORAGE_VERSION = 1
+
+WINDOW_SECONDS = 86400
+SKETCH_WIDTH = 4096
+SKETCH_DEPTH = 4
+MAX_CANDIDATES = 256
+FLOOR_TTL_SECONDS = 60
+SAVE_INTERVAL = timedelta(minutes=15)
+
+# crc32 start values, one per sketch row
+_ROW_SEEDS = (0, 0x9E3779B9, 0x85EBCA6B, 0xC2B2AE35, 0x27D4EB2F, 0x165667B1)
+
+
+class _Sketch:
+    """Count-min sketch with a current and a previous epoch."""
+
+    __slots__ = ("width", "depth", "current", "previous")
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH) -> None:
+        self.width = width
+        self.depth = depth
+        self.current = array("I", bytes(4 * width * depth))
+        self.previous = array("I", bytes(4 * width * depth))
+
+    def add(self, slots: list[int]) -> None:
+        """Conservative update: only raise the counters that hold the minimum."""
+        cur = self.current
+        low = min(cur[s] for s in slots) + 1
+        for s in slots:
+            if cur[s] < low:
+                cur[s] = low
+
+    def estimate(self, slots: list[int], decay: float) -> int:
+        cur = min(self.current[s] for s in slots)
+        prev = min(self.previous[s] for s in slots) if decay > 0 else 0
+        return cur + round(prev * decay)
+
+    def rotate(self, keep_previous: bool) -> None:
+        self.previous = self.current if keep_previous else array("I", bytes(len(self.current) * 4))
+        self.current = array("I", bytes(len(self.previous) * 4))
+
+    def dump(self) -> list[str]:
+        return [base64.b64encode(a.tobytes()).decode("ascii") for a in (self.current, self.previous)]
+
+    def restore(self, blobs: list[str]) -> None:
+        arrays = []
+        for blob in blobs:
+            arr = array("I")
+            arr.frombytes(base64.b64decode(blob))
+            if len(arr) != self.width * self.depth:
+                raise ValueError("sketch size mismatch")
+            arrays.append(arr)
+        self.current, self.previous = arrays
+
+
+class StateRateMonitor:
+    """Approximate per-entity 24 h state-change counts from ``state_changed``."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: Path | None = None,
+        *,
+        width: int = SKETCH_WIDTH,
+        depth: int = SKETCH_DEPTH,
+        max_candidates: int = MAX_CANDIDATES,
+    ) -> None:
+        self.hass = hass
+        self.path = path or Path(hass.config.config_dir) / STATE_RATES_FILE
+        self.width = width
+        self.depth = min(depth, len(_ROW_SEEDS))
+        self.max_candidates = max_candidates
+        self.changes = _Sketch(self.width, self.depth)
+        self.attr_changes = _Sketch(self.width, self.depth)
+        self._candidates: dict[str, list[int]] = {}
+        self._floor = 0
+        self._floor_until = 0.0
+        now = time.time()
+        self.epoch_start = now
+        self.observed_since = now
+        self.backfilled = False
+        self.restored = False
+        self.events_seen = 0
+
+    # ── Recording ─────────────────────────────────────────────────────────
+
+    def _slots(self, entity_id: str) -> list[int]:
+        raw = entity_id.encode()
+        width = self.width
+        return [
+            row * width + zlib.crc32(raw, _ROW_SEEDS[row]) % width
+            for row in range(self.depth)
+        ]
+
+    def _decay(self, now: float) -> float:
+        return max(0.0, 1.0 - (now - self.epoch_start) / WINDOW_SECONDS)
+
+    def _maybe_rotate(self, now: float) -> None:
+        elapsed = now - self.epoch_start
+        if elapsed < WINDOW_SECONDS:
+            return
+        keep = elapsed < 2 * WINDOW_SECONDS
+        self.changes.rotate(keep)
+        self.attr_changes.rotate(keep)
+        self.epoch_start = now if not keep else self.epoch_start + WINDOW_SECONDS
+        self._floor = 0
+
+    @callback
+    def async_handle_event(self, event) -> None:
+        """Count one ``state_changed`` event."""
+        data = event.data
+        new_state = data.get("new_state")
+        if new_state is None:
+            return
+        old_state = data.get("old_state")
+        attr_only = old_state is not None and old_state.state == new_state.state
+        self.record(data.get("entity_id") or new_state.entity_id, attr_only)
+
+    @callback
+    def record(self, entity_id: str, attr_only: bool = False, now: float | None = None) -> None:
+        """Count one state change of ``entity_id``."""
+        now = time.time() if now is None else now
+        self._maybe_rotate(now)
+        self.events_seen += 1
+        slots = self._slots(entity_id)
+        self.changes.add(slots)
+        if attr_only:
+            self.attr_changes.add(slots)
+
+        if entity_id in self._candidates:
+            return
+        if len(self._candidates) < self.max_candidates:
+            self._candidates[entity_id] = slots
+            return
+        # Estimates decay with the previous epoch, so the cached floor expires
+        if now >= self._floor_until:
+            self._floor = 0
+        decay = self._decay(now)
+        estimate = self.changes.estimate(slots, decay)
+        if estimate <= self._floor:
+            return
+        weakest = min(
+            self._candidates,
+            key=lambda eid: self.changes.estimate(self._candidates[eid], decay),
+        )
+        weakest_count = self.changes.estimate(self._candidates[weakest], decay)
+        if estimate > weakest_count:
+            del self._candidates[weakest]
+            self._candidates[entity_id] = slots
+        self._floor = weakest_count
+        self._floor_until = now + FLOOR_TTL_SECONDS
+
+    # ── Queries ───────────────────────────────────────────────────────────
+
+    @property
+    def needs_backfill(self) -> bool:
+        """True until a full window is covered by live (or restored) data or a backfill."""
+        if self.backfilled:
+            return False
+        return time.time() - self.observed_since < WINDOW_SECONDS
+
+    def count(self, entity_id: str, now: float | None = None) -> dict[str, int]:
+        """Return the approximate 24 h change / attribute-only counts."""
+        now = time.time() if now is None else now
+        self._maybe_rotate(now)
+        slots = self._candidates.get(entity_id) or self._slots(entity_id)
+        decay = self._decay(now)
+        return {
+            "changes": self.changes.estimate(slots, decay),
+            "attribute_only": self.attr_changes.estimate(slots, decay),
+        }
+
+    def top(self, limit: int = 50, min_count: int = 0, now: float | None = None) -> list[tuple[str, int, int]]:
+        """Return ``(entity_id, changes, attribute_only)`` sorted by changes."""
+        now = time.time() if now is None else now
+        self._maybe_rotate(now)
+        decay = self._decay(now)
+        rows = []
+        for entity_id, slots in self._candidates.items():
+            changes = self.changes.estimate(slots, decay)
+            if changes > min_count:
+                rows.append((entity_id, changes, self.attr_changes.estimate(slots, decay)))
+        rows.sort(key=lambda r: (-r[1], r[0]))
+        return rows[:limit]
+
+    def backfill(self, rows: list[tuple[str, int]]) -> None:
+        """Seed the window with recorder counts (cold start only).
+
+        The recorder rows cover the last 24 h up to now, live counts
+        included, so they become the previous epoch and a new epoch starts.
+        """
+        self.changes.rotate(False)
+        self.attr_changes.rotate(True)
+        prev = self.changes.previous
+        for entity_id, count in rows:
+            slots = self._slots(entity_id)
+            for s in slots:
+                prev[s] = max(prev[s], min(int(count), 0xFFFFFFFF))
+            self._candidates.setdefault(entity_id, slots)
+        self.epoch_start = time.time()
+        self._floor = 0
+        self.backfilled = True
+        _LOGGER.debug("[HACA StateRates] Backfilled %d entities from the recorder", len(rows))
+
+    # ── Persistence ───────────────────────────────────────────────────────
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": STORAGE_VERSION,
+            "width": self.width,
+            "depth": self.depth,
+            "epoch_start": self.epoch_start,
+            "observed_since": self.observed_since,
+            "backfilled": self.backfilled,
+            "changes": self.changes.dump(),
+            "attribute_only": self.attr_changes.dump(),
+            "candidates": list(self._candidates),
+        }
+
+    def save(self) -> None:
+        """Write the sketches atomically (executor)."""
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def load(self) -> bool:
+        """Restore persisted sketches (executor); stale or invalid files are ignored."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as exc:
+            _LOGGER.debug("[HACA StateRates] Ignoring unreadable %s: %s", self.path.name, exc)
+            return False
+        if (
+            data.get("version") != STORAGE_VERSION
+            or data.get("width") != self.width
+            or data.get("depth") != self.depth
+            or time.time() - float(data.get("epoch_start", 0)) >= 2 * WINDOW_SECONDS
+        ):
+            return False
+        try:
+            self.changes.restore(data["changes"])
+            self.attr_changes.restore(data["attribute_only"])
+        except (KeyError, ValueError, TypeError) as exc:
+            _LOGGER.debug("[HACA StateRates] Ignoring corrupt %s: %s", self.path.name, exc)
+            self.changes = _Sketch(self.width, self.depth)
+            self.attr_changes = _Sketch(self.width, self.depth)
+            return False
+        self.epoch_start = float(data["epoch_start"])
+        self.observed_since = float(data.get("observed_since", self.epoch_start))
+        self.backfilled = bool(data.get("backfilled"))
+        self._candidates = {
+            eid: self._slots(eid) for eid in data.get("candidates", [])[: self.max_candidates]
+        }
+        self.restored = True
+        self._maybe_rotate(time.time())
+        return True
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return monitor state for diagnostics."""
+        return {
+            "events_seen": self.events_seen,
+            "candidates": len(self._candidates),
+            "sketch_bytes": 4 * 4 * self.width * self.depth,
+            "needs_backfill": self.needs_backfill,
+            "restored": self.restored,
+            "backfilled": self.backfilled,
+        }
+
+
+def get_state_rate_monitor(hass: HomeAssistant) -> StateRateMonitor | None:
+    """Return the running monitor, if enabled."""
+    return hass.data.get(DOMAIN, {}).get(STATE_RATE_MONITOR_KEY)
+
+
+async def async_setup_state_rate_monitor(hass: HomeAssistant, entry: ConfigEntry) -> StateRateMonitor | None:
+    """Restore, start and periodically persist the monitor (option-gated)."""
+    if not entry.options.get("state_rate_monitor_enabled", True):
+        _LOGGER.debug("[HACA StateRates] Disabled by option")
+        return None
+
+    monitor = StateRateMonitor(hass)
+    if await hass.async_add_executor_job(monitor.load):
+        _LOGGER.debug("[HACA StateRates] Restored state-change counters")
+    hass.data.setdefault(DOMAIN, {})[STATE_RATE_MONITOR_KEY] = monitor
+
+    entry.async_on_unload(
+        hass.bus.async_listen(EVENT_STATE_CHANGED, monitor.async_handle_event)
+    )
+
+    async def _async_save(_now=None) -> None:
+        try:
+            await hass.async_add_executor_job(monitor.save)
+        except OSError as exc:
+            _LOGGER.debug("[HACA StateRates] Could not persist counters: %s", exc)
+
+    entry.async_on_unload(async_track_time_interval(hass, _async_save, SAVE_INTERVAL))
+
+    @callback
+    def _stop() -> None:
+        if hass.data.get(DOMAIN, {}).get(STATE_RATE_MONITOR_KEY) is monitor:
+            hass.data[DOMAIN].pop(STATE_RATE_MONITOR_KEY, None)
+        hass.async_create_task(_async_save())
+
+    entry.async_on_unload(_stop)
+    return monitor
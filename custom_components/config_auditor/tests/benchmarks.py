@@ -0,0 +1,304 @@
+"""Scan benchmarks on synthetic installs (see synthetic_install.py).
+
+For each scale (1×, 10×, 50× by default) a fresh install is generated and
+timed:
+
+* ``analyzer.<name>`` — each analyzer's ``analyze_all`` / ``async_analyze``
+  on its own, fed with the registry snapshot and the automation analyzer
+  results like the coordinator does;
+* ``dependency_mapper.build`` — graph construction from those results;
+* ``pipeline.full_scan`` — ``ScanPipeline.async_scan`` over every scope on a
+  cold pipeline, i.e. what ``async_update_data`` runs on a full refresh;
+* ``mcp.<tool>`` — the MCP lookups an assistant issues most, against the
+  coordinator data of that scan.
+
+Each timing keeps every run plus the median and minimum.  Results are
+written as JSON; ``--baseline`` compares the medians with a previous file
+and exits non-zero when one regressed by more than ``--threshold``::
+
+    python -m custom_components.config_auditor.tests.benchmarks \\
+        --scales 1 10 50 --output bench.json --baseline bench-main.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import json
+import logging
+from pathlib import Path
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from custom_components.config_auditor.const import ALL_SCAN_SCOPES, DOMAIN
+from custom_components.config_auditor.registry_snapshot import async_build_registry_snapshot
+from custom_components.config_auditor.scan_pipeline import ScanPipeline
+from custom_components.config_auditor.scan_scheduler import ScanScheduler
+from custom_components.config_auditor.tests.synthetic_install import (
+    SyntheticInstall,
+    build_install,
+)
+
+SCHEMA_VERSION = 1
+DEFAULT_SCALES = (1, 10, 50)
+DEFAULT_THRESHOLD = 1.25        # median ratio counted as a regression
+MIN_COMPARED_SECONDS = 0.005    # faster timings are too noisy to compare
+
+# (MCP tool, params) — every lookup must succeed on any synthetic install
+MCP_LOOKUPS: tuple[tuple[str, dict[str, Any]], ...] = (
+    ("haca_get_issues", {"limit": 50}),
+    ("haca_get_issues", {"severity": "high", "limit": 500}),
+    ("haca_get_score", {}),
+    ("haca_get_automation", {"entity_id": "automation.automation_0"}),
+    ("ha_get_entities", {"domain": "sensor", "limit": 100}),
+    ("ha_get_entities", {"search": "battery", "limit": 100}),
+    ("ha_deep_search", {"query": "script.routine_1"}),
+)
+
+
+def _summary(runs: list[float]) -> dict[str, Any]:
+    return {
+        "median": statistics.median(runs),
+        "min": min(runs),
+        "runs": [round(r, 6) for r in runs],
+    }
+
+
+async def _time(
+    timings: dict[str, Any],
+    name: str,
+    factory: Callable[[], Awaitable[Any]],
+    repeats: int,
+) -> Any:
+    """Await ``factory()`` ``repeats`` times, record the durations, return the last result."""
+    runs: list[float] = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = await factory()
+        runs.append(time.perf_counter() - start)
+    timings[name] = _summary(runs)
+    return result
+
+
+def _entry() -> SimpleNamespace:
+    return SimpleNamespace(entry_id="haca_benchmark", options={})
+
+
+async def _bench_analyzers(
+    install: SyntheticInstall, timings: dict[str, Any], repeats: int
+) -> ScanPipeline:
+    entry = _entry()
+    pipeline = ScanPipeline(install.hass, entry, ScanScheduler(entry))
+
+    async def _snapshot():
+        return async_build_registry_snapshot(install.hass)
+
+    snapshot = await _time(timings, "registry_snapshot", _snapshot, repeats)
+    auto = pipeline.automation_analyzer
+    await _time(timings, "analyzer.automations", lambda: auto.analyze_all(snapshot=snapshot), repeats)
+
+    options = entry.options
+    steps: list[tuple[str, Any, Callable[[], Awaitable[Any]]]] = [
+        ("entities", pipeline.entity_analyzer, lambda: pipeline.entity_analyzer.analyze_all(
+            auto.automation_configs, auto.script_configs, snapshot=snapshot)),
+        ("performance", pipeline.performance_analyzer, lambda: pipeline.performance_analyzer.analyze_all(
+            auto.automation_configs, snapshot=snapshot)),
+        ("security", pipeline.security_analyzer, lambda: pipeline.security_analyzer.analyze_all(
+            auto.automation_configs, snapshot=snapshot)),
+        ("dashboards", pipeline.dashboard_analyzer, lambda: pipeline.dashboard_analyzer.analyze_all(
+            snapshot=snapshot)),
+        ("batteries", pipeline.battery_monitor, lambda: pipeline.battery_monitor.analyze_all(
+            critical=options.get("battery_critical", 5), low=options.get("battery_low", 15),
+            warning=options.get("battery_warning", 25), snapshot=snapshot)),
+        ("recorder", pipeline.recorder_analyzer, lambda: pipeline.recorder_analyzer.analyze_all(
+            snapshot=snapshot)),
+        ("compliance", pipeline.compliance_analyzer, lambda: pipeline.compliance_analyzer.async_analyze(
+            snapshot=snapshot)),
+        ("area_complexity", pipeline.area_complexity_analyzer,
+         lambda: pipeline.area_complexity_analyzer.async_analyze(
+            automation_configs=auto.automation_configs,
+            complexity_scores=auto.complexity_scores, snapshot=snapshot)),
+        ("redundancy", pipeline.redundancy_analyzer, lambda: pipeline.redundancy_analyzer.async_analyze(
+            automation_configs=auto.automation_configs, blueprint_stats=auto.blueprint_stats,
+            complexity_scores=auto.complexity_scores)),
+        ("recorder_impact", pipeline.recorder_impact_analyzer,
+         lambda: pipeline.recorder_impact_analyzer.async_analyze(
+            automation_configs=auto.automation_configs,
+            complexity_scores=auto.complexity_scores)),
+    ]
+    results: dict[str, Any] = {}
+    for name, analyzer, factory in steps:
+        if analyzer is not None:
+            results[name] = await _time(timings, f"analyzer.{name}", factory, repeats)
+
+    all_issues = (
+        auto.automation_issues + auto.script_issues + auto.scene_issues
+        + auto.blueprint_issues + list(results.get("entities") or [])
+    )
+    await _time(timings, "dependency_mapper.build", lambda: pipeline.dependency_mapper.build(
+        automation_configs=auto.automation_configs,
+        script_configs=auto.script_configs,
+        scene_configs=auto.scene_configs,
+        entity_references=dict(pipeline.entity_analyzer.entity_references),
+        alias_map=pipeline.entity_analyzer.automation_alias_map,
+        all_issues=all_issues,
+    ), repeats)
+    return pipeline
+
+
+async def _bench_pipeline(install: SyntheticInstall, timings: dict[str, Any], repeats: int) -> dict:
+    """Full scan on a cold pipeline each run (fresh analyzers, empty caches)."""
+    entry = _entry()
+    runs: list[float] = []
+    data: dict = {}
+    for _ in range(repeats):
+        pipeline = ScanPipeline(install.hass, entry, ScanScheduler(entry))
+        start = time.perf_counter()
+        data = await pipeline.async_scan(frozenset(ALL_SCAN_SCOPES))
+        runs.append(time.perf_counter() - start)
+    timings["pipeline.full_scan"] = _summary(runs)
+    return data
+
+
+async def _bench_mcp(
+    install: SyntheticInstall, data: dict, timings: dict[str, Any], repeats: int
+) -> None:
+    from custom_components.config_auditor import mcp_server
+
+    hass = install.hass
+    entry = _entry()
+    hass.config_entries.async_entries = lambda domain=None: [entry]
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        "coordinator": SimpleNamespace(data=data),
+    }
+    seen: dict[str, int] = {}
+    for tool, params in MCP_LOOKUPS:
+        seen[tool] = seen.get(tool, 0) + 1
+        name = f"mcp.{tool}" if seen[tool] == 1 else f"mcp.{tool}#{seen[tool]}"
+        handler = mcp_server.TOOL_HANDLERS[tool]
+        result = await _time(timings, name, lambda h=handler, p=params: h(hass, dict(p)), repeats)
+        if isinstance(result, dict) and result.get("error"):
+            raise RuntimeError(f"MCP lookup {name} failed: {result['error']}")
+
+
+async def async_run_scale(
+    scale: int, *, seed: int = 0, repeats: int = 3, workdir: Path | None = None
+) -> dict[str, Any]:
+    """Generate one install of ``scale`` units and time every benchmark on it."""
+    with tempfile.TemporaryDirectory(prefix=f"haca_bench_{scale}x_", dir=workdir) as tmp:
+        start = time.perf_counter()
+        install = build_install(tmp, scale, seed)
+        generated = time.perf_counter() - start
+
+        timings: dict[str, Any] = {}
+        await _bench_analyzers(install, timings, repeats)
+        data = await _bench_pipeline(install, timings, repeats)
+        await _bench_mcp(install, data, timings, repeats)
+        return {
+            "counts": install.counts(),
+            "generate_seconds": round(generated, 6),
+            "total_issues": data.get("total_issues", 0),
+            "timings": timings,
+        }
+
+
+async def async_run(
+    scales: tuple[int, ...] = DEFAULT_SCALES,
+    *,
+    seed: int = 0,
+    repeats: int = 3,
+    workdir: Path | None = None,
+) -> dict[str, Any]:
+    """Run every scale and return the JSON-serialisable report."""
+    results = {}
+    for scale in scales:
+        # Larger scales run once per benchmark: one 50× full scan is long enough
+        results[str(scale)] = await async_run_scale(
+            scale, seed=seed, repeats=repeats if scale <= 10 else 1, workdir=workdir
+        )
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "scales": results,
+    }
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> list[dict[str, Any]]:
+    """Benchmarks whose median grew by more than ``threshold`` × the baseline.
+
+    Only scales and names present in both reports are compared, and timings
+    under ``MIN_COMPARED_SECONDS`` in both are ignored as noise.
+    """
+    regressions = []
+    for scale, result in current.get("scales", {}).items():
+        before = baseline.get("scales", {}).get(scale, {}).get("timings", {})
+        for name, timing in result.get("timings", {}).items():
+            if name not in before:
+                continue
+            old, new = before[name]["median"], timing["median"]
+            if max(old, new) < MIN_COMPARED_SECONDS:
+                continue
+            ratio = new / old if old > 0 else float("inf")
+            if ratio > threshold:
+                regressions.append({
+                    "scale": int(scale), "name": name,
+                    "baseline": old, "current": new, "ratio": round(ratio, 3),
+                })
+    return regressions
+
+
+def _format(report: dict[str, Any]) -> str:
+    lines = []
+    for scale, result in report["scales"].items():
+        counts = ", ".join(f"{v} {k}" for k, v in result["counts"].items())
+        lines.append(f"── {scale}× ({counts})")
+        for name, timing in result["timings"].items():
+            lines.append(f"  {name:<34} {timing['median'] * 1000:10.1f} ms")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="HACA scan benchmarks on synthetic installs")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="write the JSON report to this file")
+    parser.add_argument("--baseline", type=Path, help="previous JSON report to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    # Analyzers log every finding; keep the benchmark output readable
+    logging.basicConfig(level=logging.ERROR)
+    report = asyncio.run(async_run(tuple(args.scales), seed=args.seed, repeats=args.repeats))
+    print(_format(report))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.baseline:
+        regressions = compare(
+            report, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold
+        )
+        for reg in regressions:
+            print(
+                f"REGRESSION {reg['scale']}× {reg['name']}: "
+                f"{reg['baseline'] * 1000:.1f} → {reg['current'] * 1000:.1f} ms (×{reg['ratio']})"
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
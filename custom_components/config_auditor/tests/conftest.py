@@ -27,10 +27,13 @@ sys.path.insert(0, str(_ROOT))
 class MockState:
     def __init__(self, entity_id: str, state: str = "on", attributes: dict | None = None):
         self.entity_id = entity_id
+        self.domain = entity_id.split(".", 1)[0]
+        self.object_id = entity_id.split(".", 1)[-1]
         self.state = state
         self.attributes = attributes or {}
         # Provide a recent last_updated so stale-entity checks don't fire
         self.last_updated = datetime.now(tz=timezone.utc)
+        self.last_changed = self.last_updated
 
 
 class _MockStatesProxy:
@@ -43,8 +46,11 @@ class _MockStatesProxy:
     def async_entity_ids(self, domain: str):
         return [eid for eid in self._store if eid.startswith(domain + ".")]
 
-    def async_all(self):
-        return list(self._store.values())
+    def async_all(self, domain_filter: str | None = None):
+        if domain_filter is None:
+            return list(self._store.values())
+        prefix = domain_filter + "."
+        return [s for eid, s in self._store.items() if eid.startswith(prefix)]
 
 
 class MockRegistryEntry:
@@ -61,6 +67,7 @@ class MockRegistryEntry:
         unique_id: str | None = None,
         config_entry_id: str | None = None,
         area_id: str | None = None,
+        icon: str | None = None,
     ):
         self.entity_id = entity_id
         self.labels: set = labels or set()
@@ -70,6 +77,7 @@ class MockRegistryEntry:
         self.unique_id = unique_id or entity_id
         self.config_entry_id = config_entry_id
         self.area_id = area_id
+        self.icon = icon
         self.domain = entity_id.split(".")[0] if "." in entity_id else "unknown"
 
 
@@ -122,6 +130,49 @@ class MockDeviceRegistry:
         return self._devices.get(device_id)
 
 
+class MockAreaEntry:
+    def __init__(
+        self, area_id: str, name: str | None = None, *,
+        floor_id: str | None = None, labels: set | None = None,
+    ):
+        self.id = area_id
+        self.name = name or area_id
+        self.floor_id = floor_id
+        self.labels: set = labels or set()
+
+
+class MockFloorEntry:
+    def __init__(self, floor_id: str, name: str | None = None):
+        self.floor_id = floor_id
+        self.name = name or floor_id
+
+
+class MockLabelEntry:
+    def __init__(self, label_id: str, name: str | None = None):
+        self.label_id = label_id
+        self.name = name or label_id
+
+
+class MockListRegistry:
+    """Area / floor / label registry mock (``async_list_*`` + ``async_get_*``)."""
+
+    def __init__(self, key_attr: str):
+        self._key_attr = key_attr
+        self.items: dict = {}
+
+    def add(self, item) -> None:
+        self.items[getattr(item, self._key_attr)] = item
+
+    def _list(self) -> list:
+        return list(self.items.values())
+
+    def _get(self, item_id: str):
+        return self.items.get(item_id)
+
+    async_list_areas = async_list_floors = async_list_labels = _list
+    async_get_area = async_get_floor = async_get_label = _get
+
+
 class MockHass:
     """Minimal HomeAssistant mock sufficient for all HACA unit tests.
 
@@ -164,6 +215,20 @@ class MockHass:
     def add_device(self, device: MockDeviceEntry) -> None:
         self._device_registry._devices[device.id] = device
 
+    def _list_registry(self, module: str, key_attr: str) -> MockListRegistry:
+        import importlib
+        key = importlib.import_module(f"homeassistant.helpers.{module}").DATA_REGISTRY
+        return self.data.setdefault(key, MockListRegistry(key_attr))
+
+    def add_area(self, area: MockAreaEntry) -> None:
+        self._list_registry("area_registry", "id").add(area)
+
+    def add_floor(self, floor: MockFloorEntry) -> None:
+        self._list_registry("floor_registry", "floor_id").add(floor)
+
+    def add_label(self, label: MockLabelEntry) -> None:
+        self._list_registry("label_registry", "label_id").add(label)
+
     async def async_add_executor_job(self, func, *args):
         return func(*args)
 
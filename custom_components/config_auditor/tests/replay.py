@@ -0,0 +1,266 @@
+"""Replay a scan-input capture (see scan_capture.py) against stub hass objects.
+
+``build_hass`` restores the captured configuration files into a scratch
+directory and rebuilds a ``MockHass`` (see conftest.py) with the captured
+states, registries, services, lovelace dashboards and recorder aggregates;
+``async_replay`` then runs the full ``ScanPipeline`` on it with the
+captured entry options, exactly like the coordinator does::
+
+    python -m custom_components.config_auditor.tests.replay scan_inputs.json.gz \\
+        --profile --top 40 --profile-output scan.prof
+
+prints the per-scope durations and, with ``--profile``, the hottest
+functions of the scan (the ``.prof`` file opens in snakeviz / pstats).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+from datetime import datetime
+import io
+import json
+import logging
+from pathlib import Path
+import pstats
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from custom_components.config_auditor.const import ALL_SCAN_SCOPES, DOMAIN
+from custom_components.config_auditor.scan_capture import capture_counts, read_capture
+from custom_components.config_auditor.scan_pipeline import ScanPipeline
+from custom_components.config_auditor.scan_scheduler import ScanScheduler
+from custom_components.config_auditor.state_rate_monitor import STATE_RATE_MONITOR_KEY
+from custom_components.config_auditor.tests.conftest import (
+    MockAreaEntry,
+    MockDeviceEntry,
+    MockFloorEntry,
+    MockHass,
+    MockLabelEntry,
+    MockRegistryEntry,
+)
+
+
+class _ReplayDashboard:
+    """Lovelace dashboard object answering ``async_load`` from the capture."""
+
+    def __init__(self, config: dict) -> None:
+        self._config = config
+
+    async def async_load(self, force: bool) -> dict:
+        return self._config
+
+
+class _ReplayRecorder:
+    """Recorder instance stub: executor jobs run inline."""
+
+    engine = None
+
+    async def async_add_executor_job(self, func, *args):
+        return func(*args)
+
+
+class _ReplayRateMonitor:
+    """State-rate monitor stub serving the captured 24 h change counts."""
+
+    needs_backfill = False
+
+    def __init__(self, rows: list[list[Any]]) -> None:
+        self._rows = [(eid, int(count), attr_only) for eid, count, attr_only in rows]
+
+    def top(self, limit: int = 50, min_count: int = 0, now: float | None = None) -> list:
+        return [row for row in self._rows if row[1] > min_count][:limit]
+
+    def backfill(self, rows) -> None:
+        return None
+
+
+def _set_extra(obj: Any, fields: dict[str, Any], skip: tuple[str, ...]) -> None:
+    for name, value in fields.items():
+        if name not in skip:
+            setattr(obj, name, value)
+
+
+def _restore_files(files: dict[str, str], root: Path) -> None:
+    root = root.resolve()
+    for rel, text in files.items():
+        target = (root / rel).resolve()
+        if not target.is_relative_to(root):
+            raise ValueError(f"capture file {rel!r} escapes the config directory")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(text, encoding="utf-8")
+
+
+def build_hass(capture: dict[str, Any], config_dir: str | Path) -> MockHass:
+    """Restore ``capture`` into ``config_dir`` and return the matching stub hass."""
+    root = Path(config_dir)
+    _restore_files(capture.get("files", {}), root)
+    hass = MockHass(config_dir=str(root))
+    hass.config.language = capture.get("language") or "en"
+
+    registries = capture.get("registries", {})
+    for floor in registries.get("floors", []):
+        entry = MockFloorEntry(floor["floor_id"], floor.get("name"))
+        entry.level = floor.get("level")
+        hass.add_floor(entry)
+    for label in registries.get("labels", []):
+        hass.add_label(MockLabelEntry(label["label_id"], label.get("name")))
+    for area in registries.get("areas", []):
+        hass.add_area(MockAreaEntry(
+            area["id"], area.get("name"), floor_id=area.get("floor_id"),
+            labels=set(area.get("labels") or ()),
+        ))
+    for device in registries.get("devices", []):
+        entry = MockDeviceEntry(
+            device["id"], labels=set(device.get("labels") or ()), area_id=device.get("area_id")
+        )
+        _set_extra(entry, device, ("id", "labels", "area_id"))
+        hass.add_device(entry)
+    for ent in registries.get("entities", []):
+        entry = MockRegistryEntry(
+            ent["entity_id"],
+            labels=set(ent.get("labels") or ()),
+            disabled_by=ent.get("disabled_by"),
+            device_id=ent.get("device_id"),
+            platform=ent.get("platform") or "unknown",
+            unique_id=ent.get("unique_id"),
+            config_entry_id=ent.get("config_entry_id"),
+            area_id=ent.get("area_id"),
+            icon=ent.get("icon"),
+        )
+        _set_extra(entry, ent, (
+            "entity_id", "labels", "disabled_by", "device_id", "platform", "unique_id",
+            "config_entry_id", "area_id", "icon",
+        ))
+        # Registered entities without a state stay without one
+        hass._entity_registry.add(entry)
+
+    for item in capture.get("states", []):
+        hass.add_state(item["entity_id"], item["state"], item.get("attributes") or {})
+        state = hass._states[item["entity_id"]]
+        for name in ("last_changed", "last_updated"):
+            if item.get(name):
+                setattr(state, name, datetime.fromisoformat(item[name]))
+
+    entries = {
+        ce["entry_id"]: SimpleNamespace(
+            entry_id=ce["entry_id"], domain=ce.get("domain"), title=ce.get("title"),
+            disabled_by=ce.get("disabled_by"),
+            state=SimpleNamespace(value=ce.get("state"), recoverable=ce.get("recoverable", True)),
+        )
+        for ce in registries.get("config_entries", [])
+    }
+    hass.config_entries.async_get_entry = entries.get
+    hass.config_entries.async_entries = lambda domain=None: [
+        e for e in entries.values() if domain is None or e.domain == domain
+    ]
+
+    services = {
+        domain: {name: None for name in names}
+        for domain, names in capture.get("services", {}).items()
+    }
+    hass.services.async_services = lambda: services
+
+    dashboards = capture.get("dashboards") or {}
+    if dashboards:
+        hass.data["lovelace"] = {"dashboards": {
+            url_path or None: _ReplayDashboard(config) for url_path, config in dashboards.items()
+        }}
+
+    recorder = capture.get("recorder") or {}
+    if recorder.get("available"):
+        from homeassistant.helpers.recorder import DATA_INSTANCE
+        hass.data[DATA_INSTANCE] = _ReplayRecorder()
+    hass.data.setdefault(DOMAIN, {})[STATE_RATE_MONITOR_KEY] = _ReplayRateMonitor(
+        recorder.get("noisy_24h", [])
+    )
+    return hass
+
+
+def build_pipeline(capture: dict[str, Any], hass: MockHass) -> ScanPipeline:
+    """Pipeline with the captured options; the recorder answers with the captured counts."""
+    entry = SimpleNamespace(entry_id="haca_replay", options=dict(capture.get("options") or {}))
+    pipeline = ScanPipeline(hass, entry, ScanScheduler(entry))
+    recorder = capture.get("recorder") or {}
+    if pipeline.recorder_analyzer is not None and recorder.get("available"):
+        counts = (dict(recorder.get("state_rows", {})), dict(recorder.get("stat_rows", {})))
+        pipeline.recorder_analyzer._query_row_counts = lambda _instance: counts
+    return pipeline
+
+
+async def async_replay(
+    capture: dict[str, Any] | str | Path, *, workdir: Path | None = None
+) -> dict[str, Any]:
+    """Run one full scan on ``capture``; return durations and result totals."""
+    if not isinstance(capture, dict):
+        capture = read_capture(capture)
+    with tempfile.TemporaryDirectory(prefix="haca_replay_", dir=workdir) as tmp:
+        hass = build_hass(capture, tmp)
+        pipeline = build_pipeline(capture, hass)
+        start = time.perf_counter()
+        data = await pipeline.async_scan(frozenset(ALL_SCAN_SCOPES))
+        total = time.perf_counter() - start
+    return {
+        "captured_at": capture.get("captured_at"),
+        "haca_version": capture.get("haca_version"),
+        "counts": capture_counts(capture),
+        "total_seconds": round(total, 6),
+        "scopes": {
+            scope: round(seconds, 6)
+            for scope, seconds in sorted(pipeline.scheduler.avg_duration.items())
+        },
+        "health_score": data.get("health_score"),
+        "issues": {
+            key: value for key, value in data.items()
+            if key.endswith("_issues") and isinstance(value, int)
+        },
+        "recorder_orphan_count": data.get("recorder_orphan_count", 0),
+        "data": data,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a HACA scan-input capture")
+    parser.add_argument("capture", type=Path)
+    parser.add_argument("--profile", action="store_true", help="profile the scan with cProfile")
+    parser.add_argument("--top", type=int, default=30, help="functions listed with --profile")
+    parser.add_argument("--profile-output", type=Path, help="write the raw cProfile stats here")
+    parser.add_argument("--output", type=Path, help="write the replay summary as JSON")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    capture = read_capture(args.capture)
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    result = asyncio.run(async_replay(capture))
+    if profiler:
+        profiler.disable()
+    result.pop("data")
+
+    counts = ", ".join(f"{v} {k}" for k, v in result["counts"].items())
+    print(f"Capture {args.capture.name} (HACA {result['haca_version']}, {counts})")
+    print(f"Full scan: {result['total_seconds'] * 1000:.1f} ms")
+    for scope, seconds in result["scopes"].items():
+        print(f"  {scope:<14} {seconds * 1000:10.1f} ms")
+    print(f"Health score {result['health_score']}, {result['issues'].get('total_issues', 0)} issues")
+
+    if profiler:
+        if args.profile_output:
+            profiler.dump_stats(str(args.profile_output))
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(args.top)
+        print(out.getvalue())
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,458 @@
+"""Deterministic synthetic Home Assistant installations for benchmarks.
+
+``build_install(config_dir, scale)`` writes a realistic configuration to
+``config_dir`` and returns a ``MockHass`` (see conftest.py) populated with
+the matching registries and states.  The same ``(scale, seed)`` always
+produces the same install (timestamps are relative to the build time), so
+timings can be compared across commits.
+
+At scale 1 the install has about 60 automations, 20 scripts, 10 scenes,
+3 dashboards and 250 entities; every count grows linearly with ``scale``
+(50× ≈ 3,000 automations and 12,500 entities).  It contains what real
+installs contain and what the analyzers look at:
+
+* devices spread over areas, floors and labels, each with a few entities
+  (lights, switches, sensors, battery sensors, covers, climates…) and
+  helpers (input_boolean, input_number, timer…);
+* automations with state / numeric_state / time / template triggers,
+  nested ``choose`` and ``repeat`` blocks, delays, templates, device and
+  area targets, calls into script chains, and blueprint instances;
+* scripts calling each other in chains of up to four levels, scenes,
+  template sensors and storage-mode dashboards with nested stacks;
+* a small share of defects — references to missing entities, unavailable
+  or stale entities, missing aliases / descriptions / modes, unknown
+  services, haca_ignore labels — so the issue paths are exercised too.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import json
+from pathlib import Path
+import random
+from typing import Any
+
+import yaml
+
+from .conftest import (
+    MockAreaEntry,
+    MockDeviceEntry,
+    MockFloorEntry,
+    MockHass,
+    MockLabelEntry,
+    MockRegistryEntry,
+)
+
+# Per unit of scale
+AUTOMATIONS = 60
+SCRIPTS = 20
+SCENES = 10
+DEVICES = 55
+HELPERS = 12
+TEMPLATE_SENSORS = 8
+AREAS = 6
+DASHBOARD_VIEWS = 4
+
+FLOORS = ("basement", "ground_floor", "first_floor", "attic")
+LABEL_NAMES = ("critical", "zigbee", "wifi", "outdoor", "night", "energy", "haca_ignore")
+
+# (domain, device_class, states) of the entities a device may expose
+_ENTITY_KINDS: tuple[tuple[str, str | None, tuple[str, ...]], ...] = (
+    ("light", None, ("on", "off")),
+    ("switch", None, ("on", "off")),
+    ("sensor", "temperature", ("19.5", "21.0", "22.4")),
+    ("sensor", "humidity", ("41", "55", "63")),
+    ("sensor", "power", ("0.0", "12.5", "145.2")),
+    ("binary_sensor", "motion", ("on", "off")),
+    ("binary_sensor", "door", ("on", "off")),
+    ("cover", "shutter", ("open", "closed")),
+    ("climate", None, ("heat", "off")),
+    ("media_player", None, ("playing", "idle")),
+)
+_HELPER_DOMAINS = ("input_boolean", "input_number", "input_select", "input_text", "timer")
+
+_SERVICES: dict[str, tuple[str, ...]] = {
+    "light": ("turn_on", "turn_off", "toggle"),
+    "switch": ("turn_on", "turn_off", "toggle"),
+    "cover": ("open_cover", "close_cover", "set_cover_position"),
+    "climate": ("set_temperature", "set_hvac_mode"),
+    "media_player": ("media_pause", "volume_set"),
+    "notify": ("notify", "mobile_app_phone"),
+    "script": ("turn_on", "turn_off", "reload"),
+    "scene": ("turn_on", "reload"),
+    "automation": ("trigger", "reload", "turn_on", "turn_off"),
+    "input_boolean": ("turn_on", "turn_off", "toggle"),
+    "input_number": ("set_value",),
+    "timer": ("start", "cancel"),
+    "homeassistant": ("reload_all", "update_entity"),
+    "persistent_notification": ("create", "dismiss"),
+}
+
+
+@dataclass
+class SyntheticInstall:
+    """What ``build_install`` created, for assertions and lookups."""
+
+    hass: MockHass
+    scale: int
+    automations: list[dict[str, Any]] = field(default_factory=list)
+    scripts: dict[str, dict[str, Any]] = field(default_factory=dict)
+    scenes: list[dict[str, Any]] = field(default_factory=list)
+    entity_ids: list[str] = field(default_factory=list)
+    dashboards: int = 0
+
+    def counts(self) -> dict[str, int]:
+        return {
+            "automations": len(self.automations),
+            "scripts": len(self.scripts),
+            "scenes": len(self.scenes),
+            "entities": len(self.hass.states.async_all()),
+            "devices": len(self.hass._device_registry.devices),
+            "dashboards": self.dashboards,
+        }
+
+
+class _Builder:
+    def __init__(self, config_dir: Path, scale: int, seed: int) -> None:
+        self.dir = config_dir
+        self.scale = scale
+        self.rng = random.Random(f"{seed}:{scale}")
+        # Ages (stale states, last_triggered) are relative to the build time
+        self.now = datetime.now(timezone.utc)
+        self.hass = MockHass(config_dir=str(config_dir))
+        self.install = SyntheticInstall(self.hass, scale)
+        self.areas: list[str] = []
+        self.by_domain: dict[str, list[str]] = {}
+        self.devices: list[str] = []
+
+    # ── Registries and states ─────────────────────────────────────────────
+
+    def _add_entity(
+        self,
+        entity_id: str,
+        state: str,
+        attributes: dict[str, Any],
+        *,
+        platform: str = "synthetic",
+        device_id: str | None = None,
+        area_id: str | None = None,
+        labels: set[str] | None = None,
+        unique_id: str | None = None,
+        registered: bool = True,
+        stale_days: int = 0,
+    ) -> None:
+        self.hass.add_state(entity_id, state, attributes)
+        if stale_days:
+            state_obj = self.hass._states[entity_id]
+            state_obj.last_updated = state_obj.last_changed = self.now - timedelta(days=stale_days)
+        if registered:
+            self.hass.add_registry_entry(MockRegistryEntry(
+                entity_id, platform=platform, device_id=device_id, area_id=area_id,
+                labels=labels, unique_id=unique_id,
+                config_entry_id=f"ce_{platform}",
+            ))
+        self.by_domain.setdefault(entity_id.split(".", 1)[0], []).append(entity_id)
+        self.install.entity_ids.append(entity_id)
+
+    def build_registries(self) -> None:
+        rng, scale = self.rng, self.scale
+        for floor in FLOORS:
+            self.hass.add_floor(MockFloorEntry(floor, floor.replace("_", " ").title()))
+        for label in LABEL_NAMES:
+            self.hass.add_label(MockLabelEntry(label))
+        for i in range(AREAS * scale):
+            area_id = f"area_{i:03d}"
+            self.hass.add_area(MockAreaEntry(
+                area_id, f"Room {i}", floor_id=FLOORS[i % len(FLOORS)],
+                labels={"outdoor"} if i % 9 == 0 else set(),
+            ))
+            self.areas.append(area_id)
+
+        for d in range(DEVICES * scale):
+            device_id = f"dev_{d:05d}"
+            area = rng.choice(self.areas)
+            labels = {rng.choice(LABEL_NAMES[:-1])} if rng.random() < 0.3 else set()
+            if rng.random() < 0.01:
+                labels.add("haca_ignore")
+            self.hass.add_device(MockDeviceEntry(device_id, labels=labels, area_id=area))
+            self.devices.append(device_id)
+            platform = rng.choice(("zha", "mqtt", "hue", "esphome", "tuya"))
+            for k in range(rng.randint(2, 6)):
+                domain, device_class, states = rng.choice(_ENTITY_KINDS)
+                entity_id = f"{domain}.{area}_{device_class or domain}_{d}_{k}"
+                attributes: dict[str, Any] = {"friendly_name": f"{area} {device_class or domain} {d}.{k}"}
+                if device_class:
+                    attributes["device_class"] = device_class
+                if domain == "sensor":
+                    attributes["state_class"] = "measurement"
+                roll = rng.random()
+                state = rng.choice(states)
+                if roll < 0.02:
+                    state = "unavailable"
+                elif roll < 0.03:
+                    state = "unknown"
+                self._add_entity(
+                    entity_id, state, attributes, platform=platform, device_id=device_id,
+                    area_id=rng.choice(self.areas) if rng.random() < 0.1 else None,
+                    registered=rng.random() > 0.01,
+                    stale_days=rng.choice((0, 0, 0, 0, 40)) if domain == "sensor" else 0,
+                )
+            if rng.random() < 0.35:
+                level = rng.choice((3, 12, 22, 48, 76, 100))
+                self._add_entity(
+                    f"sensor.{area}_battery_{d}", str(level),
+                    {"device_class": "battery", "unit_of_measurement": "%",
+                     "friendly_name": f"Battery {d}"},
+                    platform=platform, device_id=device_id,
+                )
+
+        for h in range(HELPERS * scale):
+            domain = _HELPER_DOMAINS[h % len(_HELPER_DOMAINS)]
+            name = f"helper_{h}"
+            attributes = {} if h % 7 == 0 else {"friendly_name": f"Helper {h}"}
+            state = {"input_number": "20.0", "timer": "idle", "input_text": "x"}.get(domain, "off")
+            self._add_entity(f"{domain}.{name}", state, attributes, platform=domain)
+
+        services = {domain: {s: None for s in names} for domain, names in _SERVICES.items()}
+        self.hass.services.async_services = lambda: services
+
+    # ── Configuration ─────────────────────────────────────────────────────
+
+    def _entity(self, domain: str) -> str:
+        pool = self.by_domain.get(domain) or self.by_domain["light"]
+        if self.rng.random() < 0.01:
+            return f"{domain}.missing_{self.rng.randint(0, 999)}"
+        return self.rng.choice(pool)
+
+    def _target(self) -> dict[str, Any]:
+        roll = self.rng.random()
+        if roll < 0.15:
+            return {"device_id": self.rng.choice(self.devices)}
+        if roll < 0.3:
+            return {"area_id": self.rng.choice(self.areas)}
+        return {"entity_id": [self._entity("light") for _ in range(self.rng.randint(1, 3))]}
+
+    def _trigger(self) -> dict[str, Any]:
+        kind = self.rng.choice(("state", "state", "numeric_state", "time", "template", "time_pattern"))
+        if kind == "state":
+            return {"trigger": "state", "entity_id": self._entity("binary_sensor"), "to": "on"}
+        if kind == "numeric_state":
+            return {"trigger": "numeric_state", "entity_id": self._entity("sensor"), "above": 25}
+        if kind == "time":
+            return {"trigger": "time", "at": f"{self.rng.randint(0, 23):02d}:{self.rng.choice((0, 15, 30, 45)):02d}:00"}
+        if kind == "template":
+            return {"trigger": "template",
+                    "value_template": f"{{{{ states('{self._entity('sensor')}') | float(0) > 30 }}}}"}
+        return {"trigger": "time_pattern", "minutes": f"/{self.rng.choice((1, 5, 15))}"}
+
+    def _action(self, depth: int, script_keys: list[str]) -> dict[str, Any]:
+        rng = self.rng
+        roll = rng.random()
+        if depth < 2 and roll < 0.15:
+            return {"choose": [
+                {"conditions": [{"condition": "state", "entity_id": self._entity("binary_sensor"),
+                                 "state": "on"}],
+                 "sequence": [self._action(depth + 1, script_keys) for _ in range(rng.randint(1, 3))]}
+                for _ in range(rng.randint(1, 3))
+            ], "default": [self._action(depth + 1, script_keys)]}
+        if depth < 2 and roll < 0.25:
+            repeat: dict[str, Any] = {"sequence": [self._action(depth + 1, script_keys),
+                                                   {"delay": {"seconds": rng.randint(1, 30)}}]}
+            if rng.random() < 0.5:
+                repeat["count"] = rng.randint(2, 5)
+            else:
+                repeat["until"] = [{"condition": "state", "entity_id": self._entity("cover"),
+                                    "state": "closed"}]
+            return {"repeat": repeat}
+        if roll < 0.32:
+            return {"delay": {"minutes": rng.choice((1, 5, 30, 90))}}
+        if roll < 0.42 and script_keys:
+            key = rng.choice(script_keys)
+            if rng.random() < 0.5:
+                return {"action": f"script.{key}"}
+            return {"action": "script.turn_on", "target": {"entity_id": f"script.{key}"}}
+        if roll < 0.5:
+            return {"action": "notify.notify",
+                    "data": {"message": "{{ states('" + self._entity("sensor") + "') }} °C"}}
+        if roll < 0.51:
+            return {"action": "legacy.unknown_service"}
+        domain = rng.choice(("light", "switch", "cover"))
+        service = rng.choice(_SERVICES[domain])
+        return {"action": f"{domain}.{service}", "target": self._target()}
+
+    def build_scripts(self) -> None:
+        rng = self.rng
+        keys = [f"routine_{i}" for i in range(SCRIPTS * self.scale)]
+        for i, key in enumerate(keys):
+            # Chains of up to four scripts: routine_4k → 4k+1 → 4k+2 → 4k+3
+            callees = [keys[i + 1]] if i % 4 != 3 and i + 1 < len(keys) else []
+            config: dict[str, Any] = {
+                "alias": f"Routine {i}",
+                "sequence": [self._action(1, []) for _ in range(rng.randint(1, 4))]
+                + [{"action": f"script.{c}"} for c in callees],
+            }
+            if i % 3:
+                config["mode"] = rng.choice(("single", "restart", "queued"))
+            if i % 5 == 0:
+                config["fields"] = {"brightness": {"description": "Brightness", "example": 120}}
+            self.install.scripts[key] = config
+            self._add_entity(f"script.{key}", "off", {"friendly_name": config["alias"]},
+                             platform="script", unique_id=key)
+
+    def build_scenes(self) -> None:
+        rng = self.rng
+        for i in range(SCENES * self.scale):
+            entities = {self._entity("light"): {"state": "on", "brightness": rng.randint(1, 255)}
+                        for _ in range(rng.randint(2, 8))}
+            scene = {"id": f"scene_{i}", "name": f"Scene {i}", "entities": entities}
+            self.install.scenes.append(scene)
+            self._add_entity(f"scene.scene_{i}", "2026-01-01T00:00:00+00:00",
+                             {"friendly_name": scene["name"]}, platform="homeassistant",
+                             unique_id=scene["id"])
+
+    def build_automations(self) -> None:
+        rng = self.rng
+        script_keys = list(self.install.scripts)
+        blueprints = [f"haca_bench/blueprint_{b}.yaml" for b in range(4 + self.scale // 5)]
+        for i in range(AUTOMATIONS * self.scale):
+            uid = f"{1_700_000_000_000 + i}"
+            alias = f"Automation {i}"
+            if rng.random() < 0.08:
+                config: dict[str, Any] = {
+                    "id": uid, "alias": alias,
+                    "use_blueprint": {"path": rng.choice(blueprints),
+                                      "input": {"motion_entity": self._entity("binary_sensor"),
+                                                "light_target": {"entity_id": self._entity("light")}}},
+                }
+            else:
+                config = {
+                    "id": uid,
+                    "alias": alias,
+                    "triggers": [self._trigger() for _ in range(rng.randint(1, 3))],
+                    "conditions": [
+                        {"condition": "state", "entity_id": self._entity("input_boolean"), "state": "on"}
+                    ] if rng.random() < 0.5 else [],
+                    "actions": [self._action(0, script_keys) for _ in range(rng.randint(1, 6))],
+                }
+                if rng.random() < 0.8:
+                    config["description"] = f"Synthetic automation {i}"
+                if rng.random() < 0.7:
+                    config["mode"] = rng.choice(("single", "restart", "queued", "parallel"))
+            if rng.random() < 0.03:
+                del config["alias"]
+            self.install.automations.append(config)
+            last = self.now - timedelta(days=rng.choice((0, 1, 3, 20, 120)))
+            self._add_entity(
+                f"automation.automation_{i}", "on" if rng.random() > 0.05 else "off",
+                {"id": uid, "friendly_name": alias,
+                 "last_triggered": None if rng.random() < 0.05 else last.isoformat()},
+                platform="automation", unique_id=uid,
+            )
+        self._write_blueprints(blueprints)
+
+    def _write_blueprints(self, paths: list[str]) -> None:
+        for path in paths:
+            target = self.dir / "blueprints" / "automation" / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(
+                "blueprint:\n"
+                f"  name: {target.stem}\n"
+                "  domain: automation\n"
+                "  input:\n"
+                "    motion_entity:\n"
+                "      selector: {entity: {domain: binary_sensor}}\n"
+                "    light_target:\n"
+                "      selector: {target: {entity: {domain: light}}}\n"
+                "triggers:\n"
+                "  - trigger: state\n"
+                "    entity_id: !input motion_entity\n"
+                "    to: 'on'\n"
+                "actions:\n"
+                "  - action: light.turn_on\n"
+                "    target: !input light_target\n",
+                encoding="utf-8",
+            )
+
+    def build_templates(self) -> list[dict[str, Any]]:
+        sensors = []
+        for i in range(TEMPLATE_SENSORS * self.scale):
+            source = self._entity("sensor")
+            sensor: dict[str, Any] = {
+                "name": f"Derived {i}",
+                "state": f"{{{{ (states('{source}') | float(0) * 1.8 + 32) | round(1) }}}}",
+            }
+            if i % 2:
+                sensor.update({"unit_of_measurement": "°F", "device_class": "temperature",
+                               "availability": f"{{{{ has_value('{source}') }}}}"})
+            sensors.append(sensor)
+            self._add_entity(f"sensor.derived_{i}", "70.1", {"friendly_name": sensor["name"]},
+                             platform="template")
+        return [{"sensor": sensors}]
+
+    def build_dashboards(self) -> None:
+        rng = self.rng
+        storage = self.dir / ".storage"
+        storage.mkdir(exist_ok=True)
+        count = 2 + self.scale // 5
+        items = []
+        for d in range(count):
+            views = []
+            for v in range(DASHBOARD_VIEWS * max(1, self.scale // max(1, count))):
+                cards: list[dict[str, Any]] = [
+                    {"type": "entities", "title": f"Card {v}",
+                     "entities": [self._entity("sensor") for _ in range(rng.randint(2, 6))]},
+                    {"type": "vertical-stack", "cards": [
+                        {"type": "tile", "entity": self._entity("light")},
+                        {"type": "button", "entity": self._entity("switch"),
+                         "tap_action": {"action": "perform-action",
+                                        "perform_action": f"script.{rng.choice(list(self.install.scripts) or ['none'])}"}},
+                    ]},
+                    {"type": "history-graph", "entities": [self._entity("sensor")]},
+                ]
+                views.append({"title": f"View {v}", "path": f"view-{v}", "cards": cards})
+            name = "lovelace" if d == 0 else f"lovelace.dashboard_{d}"
+            (storage / name).write_text(json.dumps({
+                "version": 1, "minor_version": 1, "key": name,
+                "data": {"config": {"title": f"Dashboard {d}", "views": views}},
+            }), encoding="utf-8")
+            if d:
+                items.append({"id": f"dashboard_{d}", "url_path": f"dashboard-{d}",
+                              "title": f"Dashboard {d}", "mode": "storage"})
+        (storage / "lovelace_dashboards").write_text(json.dumps({
+            "version": 1, "key": "lovelace_dashboards", "data": {"items": items},
+        }), encoding="utf-8")
+        self.install.dashboards = count
+
+    def write_config(self, templates: list[dict[str, Any]]) -> None:
+        def _dump(name: str, data: Any) -> None:
+            (self.dir / name).write_text(
+                yaml.safe_dump(data, sort_keys=False, allow_unicode=True), encoding="utf-8"
+            )
+
+        (self.dir / "configuration.yaml").write_text(
+            "default_config:\n"
+            "automation: !include automations.yaml\n"
+            "script: !include scripts.yaml\n"
+            "scene: !include scenes.yaml\n"
+            "template: !include templates.yaml\n",
+            encoding="utf-8",
+        )
+        _dump("automations.yaml", self.install.automations)
+        _dump("scripts.yaml", self.install.scripts)
+        _dump("scenes.yaml", self.install.scenes)
+        _dump("templates.yaml", templates)
+
+
+def build_install(config_dir: str | Path, scale: int = 1, seed: int = 0) -> SyntheticInstall:
+    """Write a synthetic install of ``scale`` units to ``config_dir`` and stub hass."""
+    config_dir = Path(config_dir)
+    config_dir.mkdir(parents=True, exist_ok=True)
+    builder = _Builder(config_dir, scale, seed)
+    builder.build_registries()
+    builder.build_scripts()
+    builder.build_scenes()
+    builder.build_automations()
+    templates = builder.build_templates()
+    builder.build_dashboards()
+    builder.write_config(templates)
+    return builder.install
@@ -0,0 +1,138 @@
+"""Tests for ai_cache.py and the cached AI call wrapper of conversation.py."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor import conversation
+from custom_components.config_auditor.ai_cache import (
+    AiResponseCache,
+    cache_key,
+    config_hash,
+    get_ai_cache,
+)
+from custom_components.config_auditor.tests.conftest import MockHass
+
+AUTO = {"id": "hall", "alias": "Hall light", "triggers": [{"trigger": "state"}], "actions": []}
+
+
+class TestConfigHash:
+    def test_formatting_and_key_order_do_not_matter(self):
+        reordered = {"actions": [], "triggers": [{"trigger": "state"}], "alias": "Hall light", "id": "hall"}
+        as_text = yaml.dump(AUTO, default_flow_style=True)
+        assert config_hash(AUTO) == config_hash(reordered) == config_hash(as_text)
+        assert config_hash({**AUTO, "mode": "restart"}) != config_hash(AUTO)
+        assert config_hash("") == config_hash(None) == ""
+
+    def test_key_covers_every_component(self):
+        base = ("explain", "en", "h1", {"type": "x"}, "ai_task.a")
+        variants = [
+            ("suggest_fix", "en", "h1", {"type": "x"}, "ai_task.a"),
+            ("explain", "fr", "h1", {"type": "x"}, "ai_task.a"),
+            ("explain", "en", "h2", {"type": "x"}, "ai_task.a"),
+            ("explain", "en", "h1", {"type": "y"}, "ai_task.a"),
+            ("explain", "en", "h1", {"type": "x"}, "ai_task.b"),
+        ]
+        assert len({cache_key(*base), *(cache_key(*v) for v in variants)}) == 6
+
+
+class TestAiResponseCache:
+    def test_ttl_and_lru(self, tmp_path):
+        cache = AiResponseCache(tmp_path / "c.json", max_entries=2, ttl=100)
+        cache.put("a", "A", now=0)
+        cache.put("b", "B", now=1)
+        assert cache.get("a", now=2) == "A"       # a is now the most recent
+        cache.put("c", "C", now=3)                # evicts b
+        assert cache.get("b", now=4) is None and cache.get("c", now=4) == "C"
+        assert cache.get("a", now=101) is None    # expired
+        assert cache.hits == 2 and cache.misses == 2
+
+    def test_a_new_config_version_drops_older_replies(self, tmp_path):
+        cache = AiResponseCache(tmp_path / "c.json")
+        cache.put("k1", "old", kind="explain", entity_id="automation.hall", cfg_hash="h1")
+        cache.put("k2", "other", kind="explain", entity_id="automation.other", cfg_hash="h9")
+        cache.put("k3", "new", kind="optimize", entity_id="automation.hall", cfg_hash="h2")
+        assert cache.get("k1") is None
+        assert cache.get("k2") == "other" and cache.get("k3") == "new"
+        assert cache.invalidate("automation.hall") == 1 and len(cache) == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        cache = AiResponseCache(tmp_path / "c.json")
+        cache.put("k", "reply", entity_id="automation.hall", cfg_hash="h1")
+        cache.save()
+        reloaded = AiResponseCache(tmp_path / "c.json")
+        reloaded.load()
+        assert reloaded.get("k") == "reply"
+
+        (tmp_path / "c.json").write_text("not json", encoding="utf-8")
+        broken = AiResponseCache(tmp_path / "c.json")
+        broken.load()
+        assert broken.loaded and len(broken) == 0
+
+
+def _hass(tmp_path) -> MockHass:
+    (tmp_path / "automations.yaml").write_text(yaml.dump([AUTO]), encoding="utf-8")
+    return MockHass(config_dir=str(tmp_path))
+
+
+class TestCachedCalls:
+    @pytest.mark.asyncio
+    async def test_explain_is_served_from_cache_until_the_automation_changes(self, tmp_path):
+        hass = _hass(tmp_path)
+        issue = {"type": "no_description", "entity_id": "automation.hall", "message": "m"}
+        call = AsyncMock(return_value="Because.")
+        with patch.object(conversation, "_async_find_ai_task_entity", AsyncMock(return_value="ai_task.a")), \
+             patch.object(conversation, "_async_call_ai", call), \
+             patch.object(conversation, "TranslationHelper") as th:
+            th.return_value.async_load_language_section = AsyncMock()
+            th.return_value.t.return_value = "{message} {type} {severity} {entity} {recommendation}"
+            assert await conversation.explain_issue_ai(hass, issue) == "Because."
+            assert await conversation.explain_issue_ai(hass, issue) == "Because."
+            assert call.await_count == 1
+
+            await conversation.explain_issue_ai(hass, {**issue, "type": "other"})
+            assert call.await_count == 2
+
+            (tmp_path / "automations.yaml").write_text(
+                yaml.dump([{**AUTO, "mode": "restart"}]), encoding="utf-8"
+            )
+            await conversation.explain_issue_ai(hass, issue)
+            assert call.await_count == 3
+        assert (tmp_path / ".haca_ai_cache.json").exists()
+        assert get_ai_cache(hass).hits == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_and_missing_providers_are_not_cached(self, tmp_path):
+        hass = _hass(tmp_path)
+        call = AsyncMock(return_value="")
+        with patch.object(conversation, "_async_find_ai_task_entity", AsyncMock(return_value="ai_task.a")), \
+             patch.object(conversation, "_async_call_ai", call):
+            for _ in range(2):
+                await conversation._async_call_ai_cached(hass, "p", "t", "explain", "en")
+        assert call.await_count == 2 and len(get_ai_cache(hass)) == 0
+
+        call = AsyncMock(return_value="reply")
+        with patch.object(conversation, "_async_find_ai_task_entity", AsyncMock(return_value=None)), \
+             patch.object(conversation, "_async_call_ai", call):
+            for _ in range(2):
+                await conversation._async_call_ai_cached(hass, "p", "t", "explain", "en")
+        assert call.await_count == 2 and len(get_ai_cache(hass)) == 0
+
+    @pytest.mark.asyncio
+    async def test_provider_is_part_of_the_key(self, tmp_path):
+        hass = _hass(tmp_path)
+        call = AsyncMock(return_value="reply")
+        provider = AsyncMock(return_value="ai_task.a")
+        with patch.object(conversation, "_async_find_ai_task_entity", provider), \
+             patch.object(conversation, "_async_call_ai", call):
+            await conversation._async_call_ai_cached(hass, "p", "t", "optimize", "en", config=AUTO)
+            provider.return_value = "conversation.b"
+            await conversation._async_call_ai_cached(hass, "p", "t", "optimize", "en", config=AUTO)
+            await conversation._async_call_ai_cached(hass, "p", "t", "optimize", "en", config=AUTO)
+        assert call.await_count == 2
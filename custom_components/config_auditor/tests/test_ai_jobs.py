@@ -0,0 +1,224 @@
+"""Tests for ai_jobs.py — batching, rate limits, checkpoints and the batched write."""
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor import conversation
+from custom_components.config_auditor.ai_jobs import (
+    AI_JOB_DIR,
+    ITEM_DONE,
+    STATUS_CANCELLED,
+    STATUS_DONE,
+    AiJobQueue,
+    _RateLimiter,
+    parse_batch_reply,
+)
+from custom_components.config_auditor.backup_store import get_backup_store
+from custom_components.config_auditor.reload_scheduler import get_reload_scheduler
+from custom_components.config_auditor.tests.conftest import MockHass
+
+ISSUES = [
+    {"entity_id": f"light.l{i}", "type": "unavailable", "severity": "high", "message": f"m{i}"}
+    for i in range(3)
+]
+
+
+def _batch_answer(prompt: str, text: str = "answer") -> str:
+    labels = re.findall(r"^\[\[(\d+)\]\]$", prompt, re.MULTILINE)
+    return json.dumps({label: f"{text} {label}" for label in labels})
+
+
+def _queue(tmp_path, refactoring=None, data=None, options=None) -> AiJobQueue:
+    hass = MockHass(config_dir=str(tmp_path))
+    hass.loop = asyncio.get_running_loop()
+    entry = MagicMock(entry_id="e1", options=options or {})
+    coordinator = MagicMock(data=data or {})
+    return AiJobQueue(hass, entry, coordinator, refactoring)
+
+
+@pytest.fixture
+def provider():
+    with patch.object(conversation, "_async_find_ai_task_entity", AsyncMock(return_value="ai_task.a")):
+        yield
+
+
+def _checkpoints(tmp_path) -> list[Path]:
+    return sorted((tmp_path / AI_JOB_DIR).glob("*.json"))
+
+
+class TestBatching:
+    def test_batch_reply_parsing(self):
+        assert parse_batch_reply('```json\n{"1": "a", "2": ""}\n```', ["1", "2"]) == {"1": "a"}
+        assert parse_batch_reply("Sorry, I cannot do that.", ["1"]) is None
+        assert parse_batch_reply('["a"]', ["1"]) is None
+
+    @pytest.mark.asyncio
+    async def test_small_items_share_one_prompt_and_fill_the_cache(self, tmp_path, provider):
+        queue = _queue(tmp_path, options={"ai_job_rate_limit": 0})
+        call = AsyncMock(side_effect=lambda hass, prompt, task: _batch_answer(prompt))
+        with patch.object(conversation, "_async_call_ai", call):
+            job = await queue.async_wait(queue.submit("explain", queue.select("explain", issues=ISSUES)))
+            assert job.status == STATUS_DONE and job.prompts == 1 and job.batches == 1
+            assert [r["text"] for r in job.results.values()] == ["answer 1", "answer 2", "answer 3"]
+
+            # The single-issue path now finds the reply without calling the AI
+            assert await conversation.explain_issue_ai(queue.hass, ISSUES[1]) == "answer 2"
+            again = await queue.async_wait(queue.submit("explain", queue.select("explain", issues=ISSUES)))
+        assert call.await_count == 1 and again.counts()["cached"] == 3
+        assert _checkpoints(tmp_path) == []
+
+    @pytest.mark.asyncio
+    async def test_unparsable_batch_replies_fall_back_to_one_prompt_per_item(self, tmp_path, provider):
+        queue = _queue(tmp_path)
+        replies = iter(["Here you go!", "one", "two", "three"])
+        call = AsyncMock(side_effect=lambda *args: next(replies))
+        with patch.object(conversation, "_async_call_ai", call):
+            job = await queue.async_wait(
+                queue.submit("explain", queue.select("explain", issues=ISSUES), rate_limit=0)
+            )
+        assert not job.batching and job.prompts == 4
+        assert [r["text"] for r in job.results.values()] == ["one", "two", "three"]
+
+    @pytest.mark.asyncio
+    async def test_default_selection_is_every_high_issue(self, tmp_path):
+        data = {
+            "entity_issue_list": ISSUES[:2] + [{**ISSUES[2], "severity": "low"}],
+            "security_issue_list": [{"id": "s1", "severity": "high", "type": "secret"}],
+        }
+        queue = _queue(tmp_path, data=data)
+        assert list(queue.select("explain")) == ["light.l0|unavailable", "light.l1|unavailable", "s1"]
+        assert queue.select("describe", ["automation.a", "light.x", "script.s"]) == {
+            "automation.a": "automation.a", "script.s": "script.s",
+        }
+
+
+class TestLimits:
+    @pytest.mark.asyncio
+    async def test_concurrency_bounds_prompts_in_flight(self, tmp_path, provider):
+        queue = _queue(tmp_path)
+        issues = [{**ISSUES[0], "entity_id": f"light.c{i}"} for i in range(6)]
+        in_flight = peak = 0
+
+        async def call(hass, prompt, task):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return "ok"
+
+        with patch.object(conversation, "_async_call_ai", call):
+            job = await queue.async_wait(queue.submit(
+                "explain", queue.select("explain", issues=issues),
+                concurrency=2, rate_limit=0, batch_size=1,
+            ))
+        assert job.counts()["done"] == 6 and peak == 2
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_spaces_prompts(self):
+        limiter = _RateLimiter(600)          # one prompt every 0.1 s
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.async_wait() for _ in range(3)))
+        assert time.monotonic() - start >= 0.19
+        assert _RateLimiter(0).interval == 0
+
+
+class TestCheckpoints:
+    @pytest.mark.asyncio
+    async def test_interrupted_job_resumes_with_the_remaining_items(self, tmp_path, provider):
+        queue = _queue(tmp_path)
+        blocked = asyncio.Event()
+
+        async def call(hass, prompt, task):
+            if "m0" in prompt:
+                return "first"
+            blocked.set()
+            await asyncio.Event().wait()      # hangs until the unload
+
+        with patch.object(conversation, "_async_call_ai", call):
+            job = queue.submit(
+                "explain", queue.select("explain", issues=ISSUES), rate_limit=0, batch_size=1, concurrency=1,
+            )
+            await blocked.wait()
+            await queue.async_cancel()
+        saved = json.loads(_checkpoints(tmp_path)[0].read_text(encoding="utf-8"))
+        assert saved["status"] == "running" and list(saved["results"]) == ["light.l0|unavailable"]
+
+        restarted = _queue(tmp_path)
+        call = AsyncMock(return_value="later")
+        with patch.object(conversation, "_async_call_ai", call):
+            [resumed] = await restarted.async_resume()
+            await restarted.async_wait(resumed)
+        assert resumed.job_id == job.job_id and resumed.resumed and resumed.status == STATUS_DONE
+        assert call.await_count == 2
+        assert [r["text"] for r in resumed.results.values()] == ["first", "later", "later"]
+        assert _checkpoints(tmp_path) == []
+
+    @pytest.mark.asyncio
+    async def test_cancelled_job_does_not_resume(self, tmp_path, provider):
+        queue = _queue(tmp_path)
+        started = asyncio.Event()
+
+        async def call(hass, prompt, task):
+            started.set()
+            await asyncio.Event().wait()
+
+        with patch.object(conversation, "_async_call_ai", call):
+            job = queue.submit("explain", queue.select("explain", issues=ISSUES), rate_limit=0)
+            await started.wait()
+            await queue.async_cancel_job(job.job_id)
+        assert job.status == STATUS_CANCELLED and _checkpoints(tmp_path) == []
+        assert await _queue(tmp_path).async_resume() == []
+
+
+def _automations() -> list[dict]:
+    return [
+        {"id": "hall", "alias": "Hall", "triggers": [{"trigger": "state"}], "actions": []},
+        {"id": "door", "alias": "Door", "triggers": [{"trigger": "time"}], "actions": []},
+    ]
+
+
+class TestDescribe:
+    @pytest.mark.asyncio
+    async def test_descriptions_are_written_in_one_transaction(self, tmp_path, provider):
+        (tmp_path / "automations.yaml").write_text(yaml.dump(_automations()), encoding="utf-8")
+        (tmp_path / "scripts.yaml").write_text(
+            yaml.dump({"wake": {"sequence": [{"delay": 1}]}}), encoding="utf-8"
+        )
+        with patch("custom_components.config_auditor.refactoring_assistant.er") as mock_er:
+            mock_er.async_get.return_value.async_get.return_value = None
+            from custom_components.config_auditor.refactoring_assistant import RefactoringAssistant
+
+            queue = _queue(tmp_path)
+            get_reload_scheduler(queue.hass).window = 0
+            queue._refactoring = RefactoringAssistant(queue.hass)
+            call = AsyncMock(side_effect=lambda hass, prompt, task: _batch_answer(prompt, "Turns on"))
+            with patch.object(conversation, "_async_call_ai", call):
+                job = await queue.async_wait(queue.submit(
+                    "describe",
+                    queue.select("describe", ["automation.hall", "automation.door", "script.wake", "automation.gone"]),
+                    apply=True, rate_limit=0,
+                ))
+
+        assert job.status == STATUS_DONE and job.prompts == 1
+        assert job.results["automation.gone"] == {"status": "failed", "error": "not_found"}
+        assert job.applied["applied"] == 3 and job.results["script.wake"]["applied"] == "applied"
+        written = yaml.safe_load((tmp_path / "automations.yaml").read_text(encoding="utf-8"))
+        assert [a["description"] for a in written] == ["Turns on 1", "Turns on 2"]
+        assert yaml.safe_load((tmp_path / "scripts.yaml").read_text(encoding="utf-8"))["wake"]["description"] == "Turns on 3"
+
+        entries = get_backup_store(queue.hass).entries()
+        assert {e["reason"] for e in entries} == {"description_batch"} and len(entries) == 2
+        assert queue.hass.services.async_call.await_count == 2     # script + automation reloads
+        assert all(r["status"] == ITEM_DONE for k, r in job.results.items() if k != "automation.gone")
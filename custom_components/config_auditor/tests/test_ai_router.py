@@ -0,0 +1,191 @@
+"""Tests for ai_router.py — discovery cache, circuit breakers, timeouts, hedging."""
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor import ai_router, conversation
+from custom_components.config_auditor.ai_router import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_OPEN_SECONDS,
+    Provider,
+    ProviderError,
+    get_ai_router,
+)
+from custom_components.config_auditor.tests.conftest import MockHass
+
+A = Provider("ai_task", "ai_task.a")
+B = Provider("conversation", "conversation.b")
+
+
+def _router(tasks=("ai_task.a",), agents=("conversation.b",), hedging=False):
+    hass = MockHass()
+    entry = MagicMock()
+    entry.options = {"ai_hedging": hedging}
+    hass.config_entries.async_entries = MagicMock(return_value=[entry])
+    find_tasks = AsyncMock(return_value=list(tasks))
+    find_agents = AsyncMock(return_value=list(agents))
+    patches = (
+        patch.object(conversation, "_async_find_all_ai_task_entities", find_tasks),
+        patch.object(conversation, "_async_find_all_conversation_agents", find_agents),
+    )
+    for p in patches:
+        p.start()
+    return hass, get_ai_router(hass), find_tasks, patches
+
+
+@pytest.fixture
+def routed():
+    started = []
+
+    def make(**kwargs):
+        hass, router, find_tasks, patches = _router(**kwargs)
+        started.extend(patches)
+        return hass, router, find_tasks
+
+    yield make
+    for p in started:
+        p.stop()
+
+
+def _asker(replies: dict[str, object], calls: list[str] | None = None):
+    """ask(provider) returning / raising / sleeping per provider id."""
+    async def ask(provider: Provider) -> str:
+        if calls is not None:
+            calls.append(provider.id)
+        reply = replies[provider.id]
+        if isinstance(reply, float):
+            await asyncio.sleep(reply)
+            return f"slow {provider.id}"
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+    return ask
+
+
+class TestDiscovery:
+    @pytest.mark.asyncio
+    async def test_providers_are_cached_until_an_ai_entity_changes(self, routed):
+        hass, router, find_tasks = routed()
+        assert await router.async_providers() == [A, B]
+        await router.async_providers()
+        assert find_tasks.await_count == 1
+
+        listener = next(
+            c.args[1] for c in hass.bus.async_listen.call_args_list
+            if c.args[0] == "entity_registry_updated"
+        )
+        listener(MagicMock(data={"entity_id": "light.kitchen"}))
+        await router.async_providers()
+        assert find_tasks.await_count == 1
+
+        listener(MagicMock(data={"entity_id": "ai_task.new"}))
+        await router.async_providers()
+        assert find_tasks.await_count == 2 and router.invalidations == 1
+
+    @pytest.mark.asyncio
+    async def test_ttl_bounds_the_cache(self, routed, monkeypatch):
+        _hass, router, find_tasks = routed()
+        monkeypatch.setattr(ai_router, "DISCOVERY_TTL_SECONDS", 0)
+        await router.async_providers()
+        await router.async_providers()
+        assert find_tasks.await_count == 2
+
+
+class TestCircuitBreaker:
+    @pytest.mark.asyncio
+    async def test_failing_provider_is_skipped_once_its_circuit_opens(self, routed):
+        _hass, router, _find = routed()
+        calls: list[str] = []
+        ask = _asker({"ai_task.a": ProviderError("Error talking to API"), "conversation.b": "ok"}, calls)
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD + 2):
+            assert await router.async_call("t", ask) == "ok"
+        assert calls.count("ai_task.a") == CIRCUIT_FAILURE_THRESHOLD
+        stats = router.as_dict()["stats"]["ai_task.a"]
+        assert stats["state"] == "open" and stats["failures"] == CIRCUIT_FAILURE_THRESHOLD
+        assert router.skipped == 2
+
+    @pytest.mark.asyncio
+    async def test_trial_call_closes_or_doubles_the_cooldown(self, routed):
+        _hass, router, _find = routed()
+        ask = _asker({"ai_task.a": RuntimeError("503"), "conversation.b": "ok"})
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            await router.async_call("t", ask)
+        stats = router.stats(A)
+        stats.open_until = 1.0                     # cooldown elapsed → half-open
+        await router.async_call("t", ask)
+        assert stats.cooldown == 2 * CIRCUIT_OPEN_SECONDS
+        assert stats.state(time.monotonic()) == "open"
+
+        stats.open_until = 1.0
+        assert await router.async_call("t", _asker({"ai_task.a": "back", "conversation.b": "ok"})) == "back"
+        assert stats.state(0.0) == "closed" and stats.cooldown == CIRCUIT_OPEN_SECONDS
+
+    @pytest.mark.asyncio
+    async def test_a_hanging_provider_times_out(self, routed, monkeypatch):
+        _hass, router, _find = routed()
+        monkeypatch.setattr(ai_router, "PROVIDER_TIMEOUT_SECONDS", 0.01)
+        reply = await router.async_call("t", _asker({"ai_task.a": 1.0, "conversation.b": "ok"}))
+        assert reply == "ok" and router.stats(A).last_error == "timeout"
+
+    @pytest.mark.asyncio
+    async def test_the_timeout_is_an_option(self, routed):
+        hass, router, _find = routed()
+        assert router.provider_timeout() == ai_router.PROVIDER_TIMEOUT_SECONDS
+        options = hass.config_entries.async_entries.return_value[0].options
+        options["ai_provider_timeout"] = "oops"
+        assert router.provider_timeout() == ai_router.PROVIDER_TIMEOUT_SECONDS
+        options["ai_provider_timeout"] = 0.01
+        reply = await router.async_call("t", _asker({"ai_task.a": 1.0, "conversation.b": "ok"}))
+        assert reply == "ok" and router.stats(A).last_error == "timeout"
+
+
+class TestHedging:
+    @pytest.mark.asyncio
+    async def test_first_valid_reply_wins_and_the_loser_is_not_a_failure(self, routed):
+        _hass, router, _find = routed(hedging=True)
+        reply = await router.async_call("t", _asker({"ai_task.a": 0.2, "conversation.b": "fast"}))
+        assert reply == "fast" and router.hedged == 1
+        await asyncio.sleep(0)
+        assert router.stats(A).failures == 0 and router.stats(A).calls == 0
+
+    @pytest.mark.asyncio
+    async def test_hedges_to_the_two_fastest(self, routed):
+        _hass, router, _find = routed(tasks=("ai_task.a", "ai_task.c"), hedging=True)
+        router.stats(A).record_success(5.0)
+        router.stats(Provider("ai_task", "ai_task.c")).record_success(0.5)
+        router.stats(B).record_success(1.0)
+        calls: list[str] = []
+        await router.async_call("t", _asker({"ai_task.a": "a", "ai_task.c": "c", "conversation.b": "b"}, calls))
+        assert sorted(calls) == ["ai_task.c", "conversation.b"]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_sequentially_when_both_hedged_fail(self, routed):
+        _hass, router, _find = routed(tasks=("ai_task.a", "ai_task.c"), hedging=True)
+        reply = await router.async_call("t", _asker({
+            "ai_task.a": ProviderError("x"), "ai_task.c": ProviderError("y"), "conversation.b": "b",
+        }))
+        assert reply == "b"
+
+
+class TestCallAi:
+    @pytest.mark.asyncio
+    async def test_error_replies_fall_through_to_the_next_provider(self, routed):
+        hass, router, _find = routed(tasks=("ai_task.a", "ai_task.c"), agents=())
+
+        async def generate(domain, service, data, **kwargs):
+            if data["entity_id"] == "ai_task.a":
+                return {"ai_task.a": {"data": "Error talking to API"}}
+            return {"data": "Real answer"}
+
+        hass.services.async_call = generate
+        assert await conversation._async_call_ai(hass, "prompt", "t") == "Real answer"
+        assert router.stats(A).last_error == "Error talking to API"
+        assert await conversation._async_find_ai_task_entity(hass) == "ai_task.a"
@@ -0,0 +1,206 @@
+"""Tests for backup_store.py and the RefactoringAssistant backup API on top of it."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.backup_store import (
+    BackupStore,
+    get_backup_store,
+    item_diffs,
+)
+from custom_components.config_auditor.reload_scheduler import get_reload_scheduler
+from custom_components.config_auditor.tests.conftest import MockHass
+
+
+def _automations(*aliases: str) -> str:
+    return yaml.dump(
+        [{"id": a.lower(), "alias": a, "actions": [{"delay": 1}]} for a in aliases],
+        allow_unicode=True,
+    )
+
+
+def _store(tmp_path, **kwargs) -> tuple[BackupStore, Path]:
+    target = tmp_path / "automations.yaml"
+    target.write_text(_automations("A"), encoding="utf-8")
+    return BackupStore(tmp_path / ".haca_backups", **kwargs), target
+
+
+def _blobs(store: BackupStore) -> list[Path]:
+    return sorted((store.root / "objects").glob("*.yaml.gz"))
+
+
+class TestDeduplication:
+    def test_unchanged_file_keeps_its_last_backup(self, tmp_path):
+        store, target = _store(tmp_path)
+        first = store.snapshot(target, "fix", ["i1"])
+        again = store.snapshot(target, "fix", ["i2"])
+        assert again["id"] == first["id"] and again["issue_ids"] == ["i1"]
+        assert len(store.entries()) == 1 and len(_blobs(store)) == 1
+
+    def test_identical_content_shares_one_blob(self, tmp_path):
+        store, target = _store(tmp_path)
+        store.snapshot(target, "fix")
+        target.write_text(_automations("A", "B"), encoding="utf-8")
+        store.snapshot(target, "fix")
+        target.write_text(_automations("A"), encoding="utf-8")
+        back = store.snapshot(target, "manual")
+        assert len(store.entries()) == 3 and len(_blobs(store)) == 2
+        assert store.read(back["id"]) == _automations("A")
+        assert back["stored_size"] < back["size"] or back["size"] < 200
+
+    def test_manifest_survives_a_new_instance(self, tmp_path):
+        store, target = _store(tmp_path)
+        entry = store.snapshot(target, "optimizer", ["automation.a"])
+        reopened = BackupStore(store.root)
+        assert reopened.get(entry["id"]) == entry
+        assert reopened.read(entry["id"]) == _automations("A")
+
+
+class TestRetention:
+    def test_oldest_entries_go_but_each_file_keeps_its_newest(self, tmp_path):
+        store, target = _store(tmp_path, max_bytes=1)
+        scripts = tmp_path / "scripts.yaml"
+        scripts.write_text("s: {}\n", encoding="utf-8")
+        store.snapshot(scripts, "fix")
+        for n in range(5):
+            target.write_text(_automations(*(f"A{i}" for i in range(n + 1))), encoding="utf-8")
+            store.snapshot(target, "fix")
+        files = [e["file"] for e in store.entries()]
+        assert sorted(files) == ["automations.yaml", "scripts.yaml"]
+        assert len(_blobs(store)) == 2
+        assert store.stats()["entries"] == 2
+
+    def test_history_is_kept_while_it_fits(self, tmp_path):
+        store, target = _store(tmp_path)
+        for n in range(25):
+            target.write_text(_automations(*(f"A{i}" for i in range(n + 1))), encoding="utf-8")
+            store.snapshot(target, "fix")
+        assert len(store.entries()) == 25
+
+    def test_delete_collects_unshared_blobs_only(self, tmp_path):
+        store, target = _store(tmp_path)
+        first = store.snapshot(target, "fix")
+        target.write_text(_automations("B"), encoding="utf-8")
+        store.snapshot(target, "fix")
+        target.write_text(_automations("A"), encoding="utf-8")
+        third = store.snapshot(target, "fix")
+        assert store.delete(first["id"]) and len(_blobs(store)) == 2
+        assert store.delete(third["id"]) and len(_blobs(store)) == 1
+        assert not store.delete("missing")
+
+
+class TestLegacyImport:
+    def test_full_copies_are_imported_and_removed(self, tmp_path):
+        root = tmp_path / ".haca_backups"
+        root.mkdir()
+        (root / "automations_20260101_120000.yaml").write_text(_automations("Old"), encoding="utf-8")
+        (root / "automations_optim_20260102_120000.yaml").write_text(_automations("Opt"), encoding="utf-8")
+        (root / "scripts_20260103_120000.yaml").write_text("s: {}\n", encoding="utf-8")
+        (root / "notes.txt").write_text("keep me", encoding="utf-8")
+
+        entries = BackupStore(root).entries()
+        assert [(e["file"], e["reason"], e["created"]) for e in entries] == [
+            ("scripts.yaml", "legacy", "2026-01-03T12:00:00"),
+            ("automations.yaml", "optimizer", "2026-01-02T12:00:00"),
+            ("automations.yaml", "legacy", "2026-01-01T12:00:00"),
+        ]
+        assert sorted(p.name for p in root.iterdir()) == ["manifest.json", "notes.txt", "objects"]
+
+    def test_originals_stay_when_the_manifest_cannot_be_saved(self, tmp_path):
+        root = tmp_path / ".haca_backups"
+        root.mkdir()
+        legacy = root / "automations_20260101_120000.yaml"
+        legacy.write_text(_automations("Old"), encoding="utf-8")
+        store = BackupStore(root)
+        with patch.object(store, "_save", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                store.entries()
+        assert legacy.exists()
+        assert [e["reason"] for e in BackupStore(root).entries()] == ["legacy"]
+        assert not legacy.exists()
+
+
+class TestItemDiffs:
+    def test_automations_are_compared_item_by_item(self):
+        current = yaml.dump([
+            {"id": "a", "alias": "Kept", "mode": "single"},
+            {"id": "b", "alias": "Changed", "mode": "single"},
+            {"id": "n", "alias": "New since backup"},
+        ])
+        backup = yaml.dump([
+            {"id": "a", "alias": "Kept", "mode": "single"},
+            {"id": "b", "alias": "Changed", "mode": "restart"},
+            {"id": "d", "alias": "Deleted since backup"},
+        ])
+        changes = {c["key"]: c for c in item_diffs(current, backup)}
+        assert {k: c["status"] for k, c in changes.items()} == {
+            "b": "changed", "n": "removed", "d": "added",
+        }
+        assert "-mode: single" in changes["b"]["diff"] and "+mode: restart" in changes["b"]["diff"]
+        assert changes["d"]["alias"] == "Deleted since backup"
+
+    def test_scripts_are_keyed_by_name(self):
+        changes = item_diffs("s1:\n  sequence: []\n", "s1:\n  sequence: []\ns2:\n  sequence: []\n")
+        assert [(c["key"], c["status"]) for c in changes] == [("s2", "added")]
+        assert item_diffs("", "") == []
+
+
+def _assistant(tmp_path):
+    (tmp_path / "automations.yaml").write_text(_automations("A"), encoding="utf-8")
+    (tmp_path / "scripts.yaml").write_text("s1:\n  sequence: []\n", encoding="utf-8")
+    hass = MockHass(config_dir=str(tmp_path))
+    get_reload_scheduler(hass).window = 0
+    with patch("custom_components.config_auditor.refactoring_assistant.er") as mock_er:
+        mock_er.async_get.return_value = MagicMock()
+        from custom_components.config_auditor.refactoring_assistant import RefactoringAssistant
+        return RefactoringAssistant(hass), hass
+
+
+class TestAssistantBackups:
+    @pytest.mark.asyncio
+    async def test_preview_and_restore_by_id(self, tmp_path):
+        ra, hass = _assistant(tmp_path)
+        created = await ra.create_backup()
+        backups = await ra.list_backups()
+        assert created["success"] and {b["file"] for b in backups} == {"automations.yaml", "scripts.yaml"}
+        assert all(b["reason"] == "manual" for b in backups)
+
+        (tmp_path / "automations.yaml").write_text(_automations("A", "B"), encoding="utf-8")
+        preview = await ra.preview_restore(created["backup_path"])
+        assert [(c["key"], c["status"]) for c in preview["changes"]] == [("b", "removed")]
+
+        result = await ra.restore_backup(created["backup_path"])
+        assert result["success"]
+        assert (tmp_path / "automations.yaml").read_text(encoding="utf-8") == _automations("A")
+        assert ra._store.get(result["backup_before_restore"])["reason"] == "pre_restore"
+        hass.services.async_call.assert_awaited_once_with("automation", "reload", blocking=True)
+
+    @pytest.mark.asyncio
+    async def test_unknown_ids_and_paths_are_rejected(self, tmp_path):
+        ra, _hass = _assistant(tmp_path)
+        outside = tmp_path / "secrets.yaml"
+        outside.write_text("password: x\n", encoding="utf-8")
+        for bad in (str(outside), "../secrets.yaml", "nope"):
+            assert not (await ra.restore_backup(bad))["success"]
+            assert not (await ra.preview_restore(bad))["success"]
+            assert not (await ra.delete_backup(bad))["success"]
+        assert outside.exists()
+
+    @pytest.mark.asyncio
+    async def test_fix_batches_record_their_issue_ids(self, tmp_path):
+        ra, hass = _assistant(tmp_path)
+        with patch.object(ra, "_match_automation", return_value=0):
+            outcome = await ra.apply_fixes([
+                {"id": "i1", "type": "incorrect_mode_for_pattern", "automation_id": "a", "mode": "queued"},
+                {"id": "i2", "type": "unknown_type", "automation_id": "a"},
+            ])
+        assert outcome["applied"] == 1
+        entry = get_backup_store(hass).get(outcome["backup_path"])
+        assert entry["reason"] == "batch_fix" and entry["issue_ids"] == ["i1", "i2"]
@@ -0,0 +1,207 @@
+"""Tests for battery_analytics.py — batched robust battery trends."""
+from __future__ import annotations
+
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.tests.conftest import MockHass
+from custom_components.config_auditor import battery_analytics as ba
+from custom_components.config_auditor.battery_predictor import BatteryPredictor
+from custom_components.config_auditor.battery_series import MIN_SAMPLE_INTERVAL, RunningFit
+
+DAY = ba.SECONDS_PER_DAY
+T0 = 1_760_000_000.0
+
+needs_numpy = pytest.mark.skipif(not ba.numpy_available(), reason="NumPy not installed")
+
+
+def _random_series(rng: random.Random, count: int) -> list[tuple[list[float], list[float]]]:
+    series = []
+    for _ in range(count):
+        t, y = T0, rng.uniform(50, 100)
+        times, levels = [], []
+        for _ in range(rng.choice([0, 1, 2, 3, 8, 60, 260])):
+            t += rng.choice([0, 3600, DAY])
+            y -= rng.uniform(0, 2)
+            if rng.random() < 0.02:
+                y += 45                      # replacement
+            if rng.random() < 0.03:
+                y -= 30                      # bogus reading
+            times.append(t)
+            levels.append(y)
+        series.append((times, levels))
+    return series
+
+
+def _assert_same(a: ba.TrendFit, b: ba.TrendFit) -> None:
+    assert a.n == b.n and a.jump_at == b.jump_at
+    for u, v in zip(a[:6], b[:6]):
+        assert math.isclose(u, v, rel_tol=1e-9, abs_tol=1e-9), (a, b)
+
+
+class TestPythonPath:
+    def test_outlier_does_not_drag_the_robust_slope(self):
+        times = [T0 + d * DAY for d in range(20)]
+        levels = [90 - d for d in range(20)]
+        levels[10] = 5                           # one bogus reading
+        (fit,) = ba.fit_trends([(times, levels)], times[-1], use_numpy=False)
+        assert fit.jump_at is None and fit.n == 20      # recovery is not a replacement
+        assert fit.slope == pytest.approx(-1.0)
+        assert fit.level == pytest.approx(71.0)
+        assert fit.slope_low <= -1.0 <= fit.slope_high
+        assert fit.ols_slope != pytest.approx(-1.0, abs=0.05)
+        assert fit.r2 < 0.9
+
+    def test_only_samples_after_the_last_replacement_are_fitted(self):
+        times = [T0 + d * DAY for d in range(12)]
+        levels = [40, 35, 30, 100, 98, 96, 94, 92, 90, 88, 86, 84]
+        (fit,) = ba.fit_trends([(times, levels)], times[-1], use_numpy=False)
+        assert fit.jump_at == times[3] and fit.n == 9
+        assert fit.slope == pytest.approx(-2.0)
+
+    def test_degenerate_series(self):
+        fits = ba.fit_trends(
+            [([], []), ([T0], [42.0]), ([T0, T0], [40.0, 44.0])], T0, use_numpy=False
+        )
+        assert fits[0] == (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, None)
+        assert fits[1].level == 42.0 and fits[1].n == 1
+        assert fits[2].slope == 0.0 and fits[2].level == 42.0
+
+    def test_confidence_interval_narrows_with_more_samples(self):
+        rng = random.Random(3)
+
+        def _width(days: int) -> float:
+            times = [T0 + d * DAY for d in range(days)]
+            levels = [90 - 0.5 * d + rng.gauss(0, 2) for d in range(days)]
+            (fit,) = ba.fit_trends([(times, levels)], times[-1], use_numpy=False)
+            return fit.slope_high - fit.slope_low
+
+        assert _width(60) < _width(10)
+
+
+@needs_numpy
+class TestNumpyPath:
+    def test_matches_pure_python(self):
+        series = _random_series(random.Random(11), 250)
+        at = T0 + 300 * DAY
+        for fast, slow in zip(
+            ba.fit_trends(series, at, use_numpy=True),
+            ba.fit_trends(series, at, use_numpy=False),
+        ):
+            _assert_same(fast, slow)
+
+    def test_small_blocks_give_the_same_result(self, monkeypatch):
+        series = _random_series(random.Random(5), 40)
+        expected = ba.fit_trends(series, T0, use_numpy=True)
+        monkeypatch.setattr(ba, "_PAIR_BLOCK", 1)
+        for got, want in zip(ba.fit_trends(series, T0, use_numpy=True), expected):
+            _assert_same(got, want)
+
+    def test_benchmark_1000_entities_365_days(self):
+        rng = random.Random(2)
+        times = [T0 + d * DAY for d in range(365)]
+        series = [
+            (times, [100 - 0.2 * d + rng.gauss(0, 1) for d in range(365)])
+            for _ in range(1000)
+        ]
+        at = times[-1]
+
+        start = time.perf_counter()
+        fits = ba.fit_trends(series, at, use_numpy=True)
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reference = ba.fit_trends(series[:50], at, use_numpy=False)
+        per_entity = (time.perf_counter() - start) / 50
+
+        print(f"\nbattery trends 1000×365: numpy {batched:.2f}s, "
+              f"pure Python ≈{per_entity * 1000:.2f}s")
+        assert len(fits) == 1000
+        assert all(f.slope == pytest.approx(-0.2, abs=0.02) for f in fits)
+        for got, want in zip(fits, reference):
+            _assert_same(got, want)
+        assert batched < 10.0
+        assert batched < per_entity * 1000
+
+
+class TestSeriesAndPredictor:
+    def test_running_fit_restarts_on_replacement(self):
+        fit = RunningFit(30 * DAY)
+        for d in range(5):
+            fit.add(T0 + d * DAY, 30 - d)
+        fit.add(T0 + 5 * DAY, 100)
+        assert fit.n == 1 and fit.replaced_at == T0 + 5 * DAY
+        fit.add(T0 + 6 * DAY, 99)
+        assert fit.fit(T0 + 6 * DAY)[0] == pytest.approx(-1.0)
+
+    @pytest.mark.asyncio
+    async def test_predictions_carry_interval_and_reuse_unchanged_fits(self, tmp_path, monkeypatch):
+        predictor = BatteryPredictor(MockHass(config_dir=str(tmp_path)))
+        clock = {"now": T0}
+        monkeypatch.setattr(
+            "custom_components.config_auditor.battery_predictor.time.time", lambda: clock["now"]
+        )
+        for d in range(10):
+            clock["now"] = T0 + d * DAY
+            predictor._store.record(
+                {"sensor.a": 15 + (d >= 3) * 80 - 2 * d, "sensor.b": 80 - 0.5 * d},
+                now=clock["now"],
+            )
+        (b, a) = sorted(
+            await predictor.async_compute_predictions([]), key=lambda p: p["entity_id"], reverse=True
+        )
+        assert a["slope_per_day"] == pytest.approx(-2.0)
+        assert a["replaced_at"] is not None and b["replaced_at"] is None
+        low, high = b["slope_ci95"]
+        assert low <= b["slope_per_day"] <= high
+        assert b["predicted_date_range"][0] <= b["predicted_date"]
+
+        calls = []
+        monkeypatch.setattr(
+            "custom_components.config_auditor.battery_predictor.fit_trends",
+            lambda series, at: calls.append(len(series)) or ba.fit_trends(series, at),
+        )
+        clock["now"] += DAY
+        predictor._store.record({"sensor.b": 74.5}, now=clock["now"])
+        preds = await predictor.async_compute_predictions([])
+        assert calls == [1]                       # only sensor.b was refitted
+        a2 = next(p for p in preds if p["entity_id"] == "sensor.a")
+        assert a2["current_level"] == pytest.approx(a["current_level"] - 2.0, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_running_sums_update_between_robust_refits(self, tmp_path, monkeypatch):
+        predictor = BatteryPredictor(MockHass(config_dir=str(tmp_path)))
+        calls = []
+        monkeypatch.setattr(
+            "custom_components.config_auditor.battery_predictor.fit_trends",
+            lambda series, at: calls.append(len(series)) or ba.fit_trends(series, at),
+        )
+        now = T0
+        for h in range(0, 72, 6):
+            now = T0 + h * 3600
+            predictor._store.record({"sensor.a": 90 - h / 24}, now=now)
+        predictor._compute({}, {}, now)
+        assert calls == [1]
+
+        # A sample on the same trend an hour later: least squares only
+        now += 3600
+        predictor._store.record({"sensor.a": 90 - (now - T0) / DAY + 0.1}, now=now)
+        [pred] = predictor._compute({}, {}, now)
+        assert calls == [1]
+        assert predictor._trend_cache["sensor.a"].trend.n == 13
+        assert pred["slope_per_day"] == pytest.approx(-1.0, abs=0.01)
+        assert pred["r2"] < 1.0
+
+        # The slope moved: Theil–Sen runs again before ROBUST_REFIT_SECONDS
+        for _ in range(4):
+            now += MIN_SAMPLE_INTERVAL
+            predictor._store.record({"sensor.a": 40.0}, now=now)
+            predictor._compute({}, {}, now)
+        assert calls[1:] and len(calls) < 5
@@ -0,0 +1,151 @@
+"""Tests for battery_series.py and the battery predictor built on it."""
+from __future__ import annotations
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.tests.conftest import MockHass
+from custom_components.config_auditor.battery_predictor import BatteryPredictor
+from custom_components.config_auditor.battery_series import (
+    CSV_HEADER,
+    HEARTBEAT_INTERVAL,
+    MIN_SAMPLE_INTERVAL,
+    SECONDS_PER_DAY,
+    BatterySeriesStore,
+    RunningFit,
+)
+
+DAY = SECONDS_PER_DAY
+T0 = 1_760_000_000.0
+
+
+def _linear_regression(points: list[tuple[float, float]]) -> tuple[float, float, float]:
+    """Reference (slope, intercept, R²) computed from scratch."""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    ss_xy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    ss_xx = sum((x - mean_x) ** 2 for x, _ in points)
+    ss_yy = sum((y - mean_y) ** 2 for _, y in points)
+    if n < 2 or ss_xx == 0:
+        return 0.0, mean_y, 0.0
+    slope = ss_xy / ss_xx
+    return slope, mean_y - slope * mean_x, ss_xy * ss_xy / (ss_xx * ss_yy)
+
+
+class TestRunningFit:
+    def test_matches_batch_regression_through_evictions(self):
+        rng = random.Random(7)
+        fit = RunningFit(10 * DAY)
+        t = T0
+        for _ in range(400):
+            t += rng.uniform(0.1, 0.5) * DAY
+            fit.add(t, 90 - 0.8 * (t - T0) / DAY + rng.gauss(0, 1))
+            fit.evict_before(t - fit.window)
+
+            points = [((ts - t) / DAY, y) for ts, y in fit.samples]
+            slope, intercept, r2 = _linear_regression(points)
+            got_slope, got_level, got_r2 = fit.fit(t)
+            assert got_slope == pytest.approx(slope, abs=1e-9)
+            assert got_level == pytest.approx(intercept, abs=1e-7)
+            assert got_r2 == pytest.approx(r2, abs=1e-9)
+
+    def test_flat_or_single_sample(self):
+        fit = RunningFit(DAY)
+        assert fit.fit(T0) == (0.0, 0.0, 0.0)
+        fit.add(T0, 50.0)
+        fit.add(T0, 52.0)
+        assert fit.fit(T0) == (0.0, 51.0, 0.0)
+
+
+@pytest.fixture
+def store(tmp_path) -> BatterySeriesStore:
+    return BatterySeriesStore(tmp_path, window_days=30)
+
+
+class TestStore:
+    def test_sampling_keeps_intra_day_changes_and_heartbeats(self, store, tmp_path):
+        assert store.record({"sensor.a": 80}, now=T0) == 1
+        assert store.record({"sensor.a": 79}, now=T0 + 60) == 0               # too soon
+        assert store.record({"sensor.a": 79}, now=T0 + MIN_SAMPLE_INTERVAL) == 1
+        assert store.record({"sensor.a": 79}, now=T0 + 2 * MIN_SAMPLE_INTERVAL) == 0
+        assert store.record({"sensor.a": 79}, now=T0 + HEARTBEAT_INTERVAL + 1000) == 1
+        # 4-byte magic + 8 bytes per sample
+        assert (tmp_path / "sensor.a.bin").stat().st_size == 4 + 3 * 8
+        assert store.record({"../evil": 5}, now=T0 + DAY) == 0
+
+    def test_reload_restores_the_same_fit(self, store, tmp_path):
+        for i in range(20):
+            store.record({"sensor.a": 100 - i, "sensor.b": 50}, now=T0 + i * DAY / 4)
+        reloaded = BatterySeriesStore(tmp_path, window_days=30)
+        now = T0 + 5 * DAY
+        reloaded.load(now)
+        assert reloaded.fits["sensor.a"].fit(now) == pytest.approx(store.fits["sensor.a"].fit(now))
+        assert reloaded.fits["sensor.b"].n == store.fits["sensor.b"].n
+
+    def test_old_samples_leave_window_and_file(self, store, tmp_path):
+        store.record({"sensor.a": 90, "sensor.gone": 40}, now=T0)
+        store.record({"sensor.a": 80}, now=T0 + 10 * DAY)
+        store.record({"sensor.a": 70}, now=T0 + 31 * DAY)
+        assert store.fits["sensor.a"].n == 2            # T0 sample left the window
+        assert (tmp_path / "sensor.gone.bin").exists()  # still within retention
+
+        store.record({"sensor.a": 60}, now=T0 + 40 * DAY)
+        assert not (tmp_path / "sensor.gone.bin").exists()
+        assert "sensor.gone" not in store.fits
+        remaining = [line for line in store.iter_csv()][1:]
+        assert len(remaining) == 3                      # T0 sample trimmed from disk
+
+    def test_legacy_daily_files_are_migrated(self, tmp_path):
+        (tmp_path / "2026-01-01.json").write_text(json.dumps({"sensor.a": 90, "sensor.b": 40}))
+        (tmp_path / "2026-01-02.json").write_text(json.dumps({"sensor.a": 85}))
+        store = BatterySeriesStore(tmp_path, window_days=30)
+        store.load(now=1_767_312_000.0)        # 2026-01-02
+        assert not list(tmp_path.glob("*.json"))
+        assert store.fits["sensor.a"].n == 2 and store.fits["sensor.b"].n == 1
+        rows = list(store.iter_csv())
+        assert rows[0] == CSV_HEADER
+        assert rows[1] == "2026-01-01T12:00:00+00:00,sensor.a,90\n"
+
+    def test_csv_rows_are_merged_in_time_order(self, store):
+        store.record({"sensor.b": 10}, now=T0)
+        store.record({"sensor.a": 20.5}, now=T0 + DAY)
+        store.record({"sensor.b": 9}, now=T0 + 2 * DAY)
+        entities = [row.split(",")[1] for row in list(store.iter_csv())[1:]]
+        assert entities == ["sensor.b", "sensor.a", "sensor.b"]
+
+
+class TestPredictor:
+    @pytest.mark.asyncio
+    async def test_intra_day_drain_raises_alert(self, tmp_path, monkeypatch):
+        predictor = BatteryPredictor(MockHass(config_dir=str(tmp_path)))
+        clock = {"now": T0}
+        monkeypatch.setattr(
+            "custom_components.config_auditor.battery_predictor.time.time", lambda: clock["now"]
+        )
+        batteries = [{"entity_id": "sensor.door", "friendly_name": "Door", "level": 0}]
+        for hour in range(0, 36, 2):            # −1 % every two hours
+            clock["now"] = T0 + hour * 3600
+            predictor._store.record({"sensor.door": 60 - hour / 2}, now=clock["now"])
+
+        (pred,) = await predictor.async_compute_predictions(batteries)
+        assert pred["friendly_name"] == "Door"
+        assert pred["slope_per_day"] == pytest.approx(-12.0, abs=0.01)
+        assert pred["r2"] == pytest.approx(1.0)
+        assert pred["alert_7d"] is True
+        assert [p["day"] for p in pred["history_points"]][-1] == 0
+
+        csv = await predictor.async_export_csv()
+        assert csv.startswith(CSV_HEADER) and csv.count("\n") == 19
+
+    @pytest.mark.asyncio
+    async def test_short_history_gives_no_prediction(self, tmp_path):
+        predictor = BatteryPredictor(MockHass(config_dir=str(tmp_path)))
+        await predictor.async_save_battery_snapshot([{"entity_id": "sensor.x", "level": 50}])
+        assert await predictor.async_compute_predictions([]) == []
@@ -0,0 +1,93 @@
+"""Tests for the synthetic install generator and the scan benchmarks.
+
+The 1× benchmark runs as a smoke test; larger scales are opt-in through
+``HACA_BENCHMARK_SCALES`` (e.g. ``HACA_BENCHMARK_SCALES="10 50"``), with the
+JSON report written to ``HACA_BENCHMARK_OUTPUT`` when set.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.tests import benchmarks
+from custom_components.config_auditor.tests.synthetic_install import (
+    AUTOMATIONS,
+    SCRIPTS,
+    build_install,
+)
+
+_OPT_IN_SCALES = tuple(int(s) for s in os.environ.get("HACA_BENCHMARK_SCALES", "").split())
+
+
+class TestSyntheticInstall:
+    def test_same_seed_gives_the_same_install(self, tmp_path):
+        a = build_install(tmp_path / "a", 1, seed=4)
+        b = build_install(tmp_path / "b", 1, seed=4)
+        c = build_install(tmp_path / "c", 1, seed=5)
+        for name in ("automations.yaml", "scripts.yaml", "scenes.yaml", ".storage/lovelace"):
+            assert (tmp_path / "a" / name).read_text() == (tmp_path / "b" / name).read_text()
+        assert a.counts() == b.counts()
+        assert a.automations != c.automations
+
+    def test_counts_grow_linearly(self, tmp_path):
+        small = build_install(tmp_path / "s", 1).counts()
+        large = build_install(tmp_path / "l", 3).counts()
+        assert small["automations"] == AUTOMATIONS and large["automations"] == 3 * AUTOMATIONS
+        assert large["scripts"] == 3 * SCRIPTS
+        assert 2.5 * small["entities"] < large["entities"] < 3.5 * small["entities"]
+
+    def test_install_has_nested_actions_and_script_chains(self, tmp_path):
+        install = build_install(tmp_path, 2)
+        dumped = json.dumps(install.automations)
+        for key in ('"choose"', '"repeat"', '"use_blueprint"', '"device_id"', '"area_id"'):
+            assert key in dumped
+        assert install.scripts["routine_0"]["sequence"][-1] == {"action": "script.routine_1"}
+        assert list((tmp_path / "blueprints" / "automation").rglob("*.yaml"))
+
+
+class TestCompare:
+    @staticmethod
+    def _report(**medians: float) -> dict:
+        return {"scales": {"1": {"timings": {
+            name.replace("_", "."): {"median": value} for name, value in medians.items()
+        }}}}
+
+    def test_flags_only_significant_regressions(self):
+        baseline = self._report(pipeline_full=1.0, mcp_fast=0.001, analyzer_x=0.5)
+        current = self._report(pipeline_full=1.5, mcp_fast=0.003, analyzer_x=0.55, new_one=9.0)
+        (reg,) = benchmarks.compare(current, baseline)
+        assert reg["name"] == "pipeline.full" and reg["ratio"] == 1.5
+        assert benchmarks.compare(current, baseline, threshold=2.0) == []
+
+
+@pytest.mark.asyncio
+async def test_benchmark_smoke_1x(tmp_path):
+    report = await benchmarks.async_run((1,), repeats=1, workdir=tmp_path)
+    result = report["scales"]["1"]
+    assert report["schema"] == benchmarks.SCHEMA_VERSION
+    assert result["counts"]["automations"] == AUTOMATIONS
+    assert result["total_issues"] > 0
+    timings = result["timings"]
+    for name in ("analyzer.automations", "analyzer.entities", "analyzer.compliance",
+                 "dependency_mapper.build", "pipeline.full_scan", "mcp.haca_get_issues",
+                 "mcp.ha_deep_search"):
+        assert timings[name]["median"] >= 0 and len(timings[name]["runs"]) == 1
+    json.dumps(report)
+    assert not list(tmp_path.iterdir())          # install removed after the run
+
+
+@pytest.mark.skipif(not _OPT_IN_SCALES, reason="set HACA_BENCHMARK_SCALES to run")
+@pytest.mark.asyncio
+async def test_benchmark_opt_in_scales():
+    report = await benchmarks.async_run(_OPT_IN_SCALES)
+    output = os.environ.get("HACA_BENCHMARK_OUTPUT")
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print("\n" + benchmarks._format(report))
+    assert set(report["scales"]) == {str(s) for s in _OPT_IN_SCALES}
@@ -0,0 +1,272 @@
+"""Tests for config_transaction.py and the batched fixes built on it."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor import mcp_server
+from custom_components.config_auditor.config_transaction import ConfigEdit, ConfigTransaction
+from custom_components.config_auditor.const import DOMAIN
+from custom_components.config_auditor.refactoring_assistant import RefactoringAssistant
+from custom_components.config_auditor.reload_scheduler import get_reload_scheduler
+from custom_components.config_auditor.tests.conftest import MockHass
+
+
+def _device_automation(index: int) -> dict:
+    return {
+        "id": f"auto_{index:03d}", "alias": f"Auto {index}", "mode": "single",
+        "triggers": [{"platform": "device", "device_id": f"dev{index}", "domain": "light",
+                      "type": "turned_on"}],
+        "actions": [{"service": "light.turn_off", "target": {"device_id": f"dev{index}"}}],
+    }
+
+
+def _make(tmp_path, automations, scripts=None):
+    (tmp_path / "automations.yaml").write_text(yaml.dump(automations), encoding="utf-8")
+    (tmp_path / "scripts.yaml").write_text(yaml.dump(scripts or {}), encoding="utf-8")
+    hass = MockHass(config_dir=str(tmp_path))
+    get_reload_scheduler(hass).window = 0
+    ra = RefactoringAssistant(hass)
+
+    async def resolve(device_id, registry_uuid, domain=""):
+        return f"light.{device_id}"
+
+    ra._resolve_entity_id = resolve
+    return hass, ra
+
+
+def _reload_calls(hass) -> list[str]:
+    return [c.args[0] for c in hass.services.async_call.call_args_list if c.args[1] == "reload"]
+
+
+def _backups(ra, prefix="automations") -> list[str]:
+    return [e["id"] for e in ra._store.entries() if e["file"] == f"{prefix}.yaml"]
+
+
+class TestApplyFixes:
+    @pytest.mark.asyncio
+    async def test_many_fixes_one_write_one_backup_one_reload(self, tmp_path):
+        hass, ra = _make(tmp_path, [_device_automation(i) for i in range(40)])
+        fixes = []
+        for i in range(40):
+            for issue_type in ("device_id_in_trigger", "device_id_in_target"):
+                fixes.append({"id": f"{issue_type}-{i}", "type": issue_type,
+                              "automation_id": f"auto_{i:03d}"})
+
+        outcome = await ra.apply_fixes(fixes)
+        assert outcome["success"] and outcome["applied"] == 80
+        assert [r["id"] for r in outcome["results"]] == [f["id"] for f in fixes]
+        assert {r["status"] for r in outcome["results"]} == {"applied"}
+        assert _reload_calls(hass) == ["automation"]
+        assert outcome["reloaded"] == ["automation"] and outcome["files"] == ["automations.yaml"]
+        assert len(_backups(ra)) == 1 and outcome["backup_path"] == _backups(ra)[0]
+
+        written = yaml.safe_load((tmp_path / "automations.yaml").read_text())
+        assert "device_id" not in written[7]["triggers"][0]
+        assert written[7]["actions"][0]["target"] == {"entity_id": "light.dev7"}
+        assert not list(tmp_path.glob(".*.haca_tmp"))
+
+    @pytest.mark.asyncio
+    async def test_per_fix_statuses(self, tmp_path):
+        hass, ra = _make(tmp_path, [_device_automation(1), _device_automation(2)])
+        outcome = await ra.apply_fixes([
+            {"id": "a", "type": "device_id_in_trigger", "automation_id": "auto_001"},
+            {"id": "b", "type": "device_id_in_trigger", "automation_id": "missing"},
+            {"id": "c", "type": "template_simple_state", "automation_id": "auto_002"},
+            {"id": "d", "type": "no_description", "automation_id": "auto_002"},
+            {"id": "e", "type": "incorrect_mode_motion_single", "automation_id": "auto_002"},
+        ])
+        statuses = {r["id"]: r["status"] for r in outcome["results"]}
+        assert statuses == {"a": "applied", "b": "not_found", "c": "unchanged",
+                            "d": "not_fixable", "e": "applied"}
+        assert outcome["applied"] == 2
+        written = yaml.safe_load((tmp_path / "automations.yaml").read_text())
+        assert written[1]["mode"] == "restart"
+        assert _reload_calls(hass) == ["automation"]
+
+    @pytest.mark.asyncio
+    async def test_failing_edit_leaves_its_item_untouched(self, tmp_path):
+        hass, ra = _make(tmp_path, [_device_automation(1), _device_automation(2)])
+
+        async def broken(config):
+            config["alias"] = "half-done"
+            raise RuntimeError("boom")
+
+        transaction = ra.transaction()
+        transaction.add(ConfigEdit("bad", "automation", "auto_001", broken))
+        transaction.add(ConfigEdit("good", "automation", "auto_002", ra._mode_edit("queued")))
+        outcome = await transaction.async_commit()
+
+        assert [r["status"] for r in outcome["results"]] == ["error", "applied"]
+        assert outcome["results"][0]["error"] == "boom"
+        written = yaml.safe_load((tmp_path / "automations.yaml").read_text())
+        assert written[0]["alias"] == "Auto 1"
+        assert written[1]["mode"] == "queued" and written[1]["max"] == 10
+
+    @pytest.mark.asyncio
+    async def test_dry_run_writes_nothing(self, tmp_path):
+        hass, ra = _make(tmp_path, [_device_automation(1)])
+        before = (tmp_path / "automations.yaml").read_text()
+        outcome = await ra.apply_fixes(
+            [{"id": "a", "type": "device_id_in_trigger", "automation_id": "auto_001"}], dry_run=True,
+        )
+        assert outcome["dry_run"] and outcome["results"][0]["status"] == "planned"
+        assert outcome["results"][0]["changes"] and outcome["applied"] == 1
+        assert (tmp_path / "automations.yaml").read_text() == before
+        assert _backups(ra) == [] and _reload_calls(hass) == []
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_change_skips_backup_and_reload(self, tmp_path):
+        hass, ra = _make(tmp_path, [_device_automation(1)])
+        outcome = await ra.apply_fixes(
+            [{"id": "a", "type": "template_simple_state", "automation_id": "auto_001"}],
+        )
+        assert outcome["success"] and outcome["files"] == [] and outcome["applied"] == 0
+        assert _backups(ra) == [] and _reload_calls(hass) == []
+
+    @pytest.mark.asyncio
+    async def test_reload_failure_rolls_back(self, tmp_path):
+        hass, ra = _make(tmp_path, [_device_automation(1)])
+        before = (tmp_path / "automations.yaml").read_text()
+        hass.services.async_call = AsyncMock(side_effect=[RuntimeError("invalid config"), None])
+
+        outcome = await ra.apply_fixes(
+            [{"id": "a", "type": "device_id_in_trigger", "automation_id": "auto_001"}],
+        )
+        assert not outcome["success"] and outcome["rolled_back"]
+        assert "automation.reload failed" in outcome["error"]
+        assert outcome["results"][0]["status"] == "rolled_back"
+        assert (tmp_path / "automations.yaml").read_text() == before
+        assert _reload_calls(hass) == ["automation", "automation"]
+        assert len(_backups(ra)) == 1
+
+    @pytest.mark.asyncio
+    async def test_unparsable_file_is_reported_per_edit(self, tmp_path):
+        hass, ra = _make(tmp_path, [])
+        (tmp_path / "automations.yaml").write_text("- id: [unclosed\n", encoding="utf-8")
+        outcome = await ra.apply_fixes(
+            [{"id": "a", "type": "device_id_in_trigger", "automation_id": "auto_001"}],
+        )
+        assert outcome["results"][0]["status"] == "error"
+        assert "automations.yaml" in outcome["results"][0]["error"]
+        assert (tmp_path / "automations.yaml").read_text() == "- id: [unclosed\n"
+
+
+class TestTransaction:
+    @pytest.mark.asyncio
+    async def test_scripts_reload_before_automations_and_share_a_backup(self, tmp_path):
+        hass, ra = _make(tmp_path, [_device_automation(1)], {"wake": {"sequence": []}})
+
+        async def describe(config):
+            config["description"] = "Morning routine"
+            return [{"field": "description"}]
+
+        transaction = ra.transaction()
+        transaction.add(ConfigEdit("auto", "automation", "auto_001", ra._mode_edit("restart")))
+        transaction.add(ConfigEdit("script", "script", "script.wake", describe))
+        transaction.add(ConfigEdit("scene", "scene", "scene.x", describe))
+        outcome = await transaction.async_commit()
+
+        assert [r["status"] for r in outcome["results"]] == ["applied", "applied", "error"]
+        assert _reload_calls(hass) == ["script", "automation"]
+        assert outcome["files"] == ["scripts.yaml", "automations.yaml"]
+        assert len(_backups(ra, "scripts")) == len(_backups(ra)) == 1
+        scripts = yaml.safe_load((tmp_path / "scripts.yaml").read_text())
+        assert scripts["wake"]["description"] == "Morning routine"
+
+    @pytest.mark.asyncio
+    async def test_commits_are_serialized(self, tmp_path):
+        import asyncio
+
+        hass, ra = _make(tmp_path, [_device_automation(1), _device_automation(2)])
+        first, second = ra.transaction(), ra.transaction()
+        first.add(ConfigEdit("a", "automation", "auto_001", ra._mode_edit("queued")))
+        second.add(ConfigEdit("b", "automation", "auto_002", ra._mode_edit("parallel")))
+        await asyncio.gather(first.async_commit(), second.async_commit())
+
+        written = yaml.safe_load((tmp_path / "automations.yaml").read_text())
+        assert [a["mode"] for a in written] == ["queued", "parallel"]
+
+    @pytest.mark.asyncio
+    async def test_without_backup_callback(self, tmp_path):
+        path = tmp_path / "automations.yaml"
+        path.write_text(yaml.dump([{"id": "x"}]), encoding="utf-8")
+        hass = MockHass(config_dir=str(tmp_path))
+
+        async def tag(config):
+            config["alias"] = "Tagged"
+            return [{"field": "alias"}]
+
+        transaction = ConfigTransaction(
+            hass, {"automation": path},
+            {"automation": lambda doc, target: next(
+                (i for i, a in enumerate(doc) if a.get("id") == target), None)},
+        )
+        transaction.add(ConfigEdit("x", "automation", "x", tag))
+        assert len(transaction) == 1
+        outcome = await transaction.async_commit()
+        assert outcome["backup_path"] is None and outcome["applied"] == 1
+        assert yaml.safe_load(path.read_text()) == [{"id": "x", "alias": "Tagged"}]
+
+
+class TestSingleFixes:
+    @pytest.mark.asyncio
+    async def test_apply_mode_fix_reloads(self, tmp_path):
+        hass, ra = _make(tmp_path, [_device_automation(1)])
+        result = await ra.apply_mode_fix("auto_001", "restart")
+        assert result["success"] and result["new_mode"] == "restart"
+        assert result["reloaded"] == ["automation"] and ra._store.get(result["backup_path"]) is not None
+        assert (await ra.apply_mode_fix("auto_001", "restart"))["message"] == "Mode is already 'restart'."
+        assert not (await ra.apply_mode_fix("missing", "restart"))["success"]
+
+    @pytest.mark.asyncio
+    async def test_apply_device_id_fix_uses_the_preview(self, tmp_path):
+        hass, ra = _make(tmp_path, [_device_automation(1)])
+        preview = await ra.preview_device_id_fix("auto_001")
+        result = await ra.apply_device_id_fix("auto_001", preview)
+        assert result["success"] and result["changes_applied"] == preview["changes_count"] == 2
+        written = yaml.safe_load((tmp_path / "automations.yaml").read_text())
+        assert yaml.dump(written[0], default_flow_style=False, allow_unicode=True) == preview["new_yaml"]
+
+    @pytest.mark.asyncio
+    async def test_apply_template_fix(self, tmp_path):
+        automation = _device_automation(1)
+        automation["conditions"] = [{"condition": "template",
+                                     "value_template": "{{ is_state('sun.sun', 'above_horizon') }}"}]
+        hass, ra = _make(tmp_path, [automation])
+        result = await ra.apply_template_fix("auto_001")
+        assert result["success"] and result["changes_applied"] == 1
+        written = yaml.safe_load((tmp_path / "automations.yaml").read_text())
+        assert written[0]["conditions"] == [
+            {"condition": "state", "entity_id": "sun.sun", "state": "above_horizon"}
+        ]
+
+
+@pytest.mark.asyncio
+async def test_mcp_fix_batch_uses_one_transaction(tmp_path):
+    hass, ra = _make(tmp_path, [_device_automation(i) for i in range(5)])
+    issues = [
+        {"type": "device_id_in_trigger", "entity_id": f"automation.auto_{i}",
+         "automation_id": f"auto_{i:03d}", "severity": "medium", "fix_available": True}
+        for i in range(5)
+    ] + [{"type": "no_alias", "entity_id": "automation.x", "severity": "low"}]
+    hass.config_entries.async_entries = MagicMock(return_value=[SimpleNamespace(entry_id="e1")])
+    hass.data[DOMAIN] = {"e1": {
+        "coordinator": SimpleNamespace(data={"automation_issue_list": issues}),
+        "refactoring_assistant": ra,
+    }}
+
+    result = await mcp_server._tool_fix_batch(
+        hass, {"category": "automation", "dry_run": False},
+    )
+    assert result["applied"] == 5 and result["errors"] == 0 and result["not_fixable"] == 1
+    assert result["reloaded"] == ["automation"] and not result["rolled_back"]
+    assert _reload_calls(hass) == ["automation"]
+    assert len(_backups(ra)) == 1
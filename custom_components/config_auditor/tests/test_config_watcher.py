@@ -0,0 +1,139 @@
+"""Tests for config_watcher.py — parsed-config cache and file watcher."""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.tests.conftest import MockHass
+from custom_components.config_auditor.config_watcher import (
+    ConfigFileWatcher,
+    ParsedConfigCache,
+)
+
+
+def _bump(path: Path, text: str) -> None:
+    """Rewrite a file and force a different mtime."""
+    path.write_text(text, encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestParsedConfigCache:
+    def test_unchanged_file_is_served_from_cache(self, tmp_path):
+        f = tmp_path / "automations.yaml"
+        f.write_text("- id: '1'\n  alias: A\n", encoding="utf-8")
+        cache = ParsedConfigCache()
+        assert cache.load(f, {"automations"})[0]["alias"] == "A"
+        assert cache.load(f, {"automations"})[0]["alias"] == "A"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_modified_file_is_reparsed(self, tmp_path):
+        f = tmp_path / "automations.yaml"
+        f.write_text("- alias: A\n", encoding="utf-8")
+        cache = ParsedConfigCache()
+        cache.load(f, {"automations"})
+        _bump(f, "- alias: B\n")
+        assert cache.load(f, {"automations"})[0]["alias"] == "B"
+
+    def test_returned_content_is_a_copy(self, tmp_path):
+        f = tmp_path / "scripts.yaml"
+        f.write_text("morning:\n  sequence: []\n", encoding="utf-8")
+        cache = ParsedConfigCache()
+        cache.load(f, {"automations"})["morning"]["sequence"].append("x")
+        assert cache.load(f, {"automations"})["morning"]["sequence"] == []
+
+    def test_scopes_for_files_and_include_dirs(self, tmp_path):
+        f = tmp_path / "ui-lovelace.yaml"
+        f.write_text("views: []\n", encoding="utf-8")
+        cache = ParsedConfigCache()
+        cache.load(f, {"dashboards"})
+        cache.track_dir(tmp_path / "packages", {"automations", "entities"})
+        assert cache.scopes_for([str(f)]) == {"dashboards"}
+        new_pkg = str(tmp_path / "packages" / "sub" / "new.yaml")
+        assert cache.scopes_for([new_pkg]) == {"automations", "entities"}
+        assert not cache.is_relevant(str(tmp_path / "packages" / "notes.txt"))
+        assert not cache.is_relevant(str(tmp_path / "other.yaml"))
+
+
+def _watcher(hass, cache, rescan):
+    hass.loop = asyncio.get_event_loop()
+    entry = MagicMock()
+    entry.entry_id = "e1"
+    coord = MagicMock()
+    coord.async_refresh = AsyncMock()
+    hass.data["config_auditor"] = {"e1": {"coordinator": coord, "async_rescan": rescan}}
+    tasks = []
+    hass.async_create_task = lambda coro: tasks.append(asyncio.ensure_future(coro))
+    return ConfigFileWatcher(hass, entry, cache, debounce_seconds=0.05), coord, tasks
+
+
+class TestConfigFileWatcher:
+    @pytest.mark.asyncio
+    async def test_changes_are_coalesced_into_one_scoped_rescan(self, tmp_path):
+        autos = tmp_path / "automations.yaml"
+        board = tmp_path / "ui-lovelace.yaml"
+        autos.write_text("[]\n", encoding="utf-8")
+        board.write_text("views: []\n", encoding="utf-8")
+        cache = ParsedConfigCache()
+        cache.load(autos, {"automations"})
+        cache.load(board, {"dashboards"})
+        rescan = AsyncMock()
+        watcher, coord, tasks = _watcher(MockHass(), cache, rescan)
+
+        watcher._queue([str(autos)])
+        watcher._queue([str(board)])
+        await asyncio.sleep(0.15)
+        await asyncio.gather(*tasks)
+
+        rescan.assert_awaited_once_with(frozenset({"automations", "dashboards"}))
+        coord.async_refresh.assert_not_awaited()
+        assert cache.invalidations == 2
+
+    @pytest.mark.asyncio
+    async def test_polling_detects_modified_file(self, tmp_path):
+        f = tmp_path / "scenes.yaml"
+        f.write_text("[]\n", encoding="utf-8")
+        cache = ParsedConfigCache()
+        cache.load(f, {"automations"})
+        rescan = AsyncMock()
+        hass = MockHass()
+        hass.async_add_executor_job = AsyncMock(side_effect=lambda fn, *a: fn(*a))
+        watcher, _coord, tasks = _watcher(hass, cache, rescan)
+
+        await watcher._async_poll()          # seeds signatures
+        _bump(f, "- name: Evening\n")
+        await watcher._async_poll()
+        await asyncio.sleep(0.15)
+        await asyncio.gather(*tasks)
+        rescan.assert_awaited_once_with(frozenset({"automations"}))
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+    async def test_inotify_backend_sees_editor_writes(self, tmp_path):
+        f = tmp_path / "automations.yaml"
+        f.write_text("[]\n", encoding="utf-8")
+        cache = ParsedConfigCache()
+        cache.load(f, {"automations"})
+        rescan = AsyncMock()
+        watcher, _coord, tasks = _watcher(MockHass(), cache, rescan)
+        watcher.async_start()
+        try:
+            assert watcher.backend == "inotify"
+            # Editors usually write a temp file and rename it over the original
+            tmp = tmp_path / ".automations.yaml.swp"
+            tmp.write_text("- alias: New\n", encoding="utf-8")
+            os.replace(tmp, f)
+            (tmp_path / "unrelated.txt").write_text("x", encoding="utf-8")
+            await asyncio.sleep(0.3)
+            await asyncio.gather(*tasks)
+        finally:
+            watcher.async_stop()
+        rescan.assert_awaited_once_with(frozenset({"automations"}))
+        assert watcher.changes_detected >= 1
@@ -0,0 +1,103 @@
+"""Tests for entity_health.py — incremental unavailable / unknown / stale index."""
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.tests.conftest import MockHass
+from custom_components.config_auditor.entity_health import (
+    ENTITY_HEALTH_KEY,
+    FLAP_THRESHOLD,
+    EntityHealthIndex,
+)
+
+DAY = 86400
+T0 = 1_700_000_000.0
+
+
+def _state(entity_id, value, ts):
+    dt = datetime.fromtimestamp(ts, timezone.utc)
+    return SimpleNamespace(entity_id=entity_id, state=value, last_changed=dt, last_updated=dt)
+
+
+def _changed(entity_id, value, ts):
+    new = _state(entity_id, value, ts) if value is not None else None
+    return MagicMock(data={"entity_id": entity_id, "new_state": new})
+
+
+class TestAvailabilitySets:
+    def test_unavailable_since_is_kept_until_recovery(self):
+        index = EntityHealthIndex()
+        index.seed([_state("sensor.a", "unavailable", T0)], now=T0 + 60)
+        index.update(_state("sensor.a", "unavailable", T0 + 120), now=T0 + 120)
+        assert index.unavailable == {"sensor.a": T0}
+        index.update(_state("sensor.a", "21", T0 + 180), now=T0 + 180)
+        assert index.unavailable == {}
+
+    def test_unknown_and_removal(self):
+        index = EntityHealthIndex()
+        index.update(_state("sensor.b", "unknown", T0), now=T0)
+        assert "sensor.b" in index.unknown
+        index.async_handle_event(_changed("sensor.b", None, T0))
+        assert index.unknown == {}
+        assert index.as_dict()["tracked_entities"] == 0
+
+
+class TestStaleWheel:
+    def test_entity_becomes_stale_after_seven_days(self):
+        index = EntityHealthIndex()
+        index.seed([_state("sensor.old", "1", T0 - 10 * DAY), _state("sensor.new", "1", T0)], now=T0)
+        assert set(index.stale(T0)) == {"sensor.old"}
+        assert set(index.stale(T0 + 6 * DAY)) == {"sensor.old"}
+        assert set(index.stale(T0 + 7 * DAY + 1)) == {"sensor.old", "sensor.new"}
+
+    def test_update_reschedules_and_clears_stale(self):
+        index = EntityHealthIndex()
+        index.seed([_state("sensor.old", "1", T0 - 10 * DAY)], now=T0)
+        index.update(_state("sensor.old", "2", T0 + 10), now=T0 + 10)
+        assert index.stale(T0 + 20) == {}
+        assert set(index.stale(T0 + 8 * DAY)) == {"sensor.old"}
+
+
+class TestFlapping:
+    def test_repeated_availability_transitions_flag_flapping(self):
+        index = EntityHealthIndex()
+        index.seed([_state("light.plug", "on", T0)], now=T0)
+        for i in range(FLAP_THRESHOLD):
+            value = "unavailable" if i % 2 == 0 else "on"
+            index.update(_state("light.plug", value, T0 + i * 60), now=T0 + i * 60)
+        assert index.flapping(T0 + 600) == {"light.plug": FLAP_THRESHOLD}
+        assert index.flapping(T0 + 2 * 3600) == {}
+
+
+class TestEntityAnalyzerReadsIndex:
+    @pytest.mark.asyncio
+    async def test_issues_come_from_index(self):
+        from custom_components.config_auditor.entity_analyzer import EntityAnalyzer
+
+        hass = MockHass()
+        index = EntityHealthIndex()
+        now = datetime.now(timezone.utc).timestamp()
+        index.seed([
+            _state("sensor.down", "unavailable", now - 3600),
+            _state("sensor.h_a_c_a_score", "unavailable", now),
+            _state("automation.x", "unavailable", now),
+        ], now=now)
+        hass.data.setdefault("config_auditor", {})[ENTITY_HEALTH_KEY] = index
+        # The full state walk must not be used when the index is available
+        hass.states.async_all = MagicMock(side_effect=AssertionError("full scan"))
+
+        analyzer = EntityAnalyzer(hass)
+        analyzer._ignored_entity_ids = set()
+        await analyzer._analyze_entity_states()
+
+        assert [i["entity_id"] for i in analyzer.issues] == ["sensor.down"]
+        since = datetime.fromisoformat(analyzer.issues[0]["unavailable_since"])
+        assert abs(since.timestamp() - (now - 3600)) < 1
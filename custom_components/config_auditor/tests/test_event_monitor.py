@@ -99,3 +99,104 @@ class TestDebounce:
 
         await asyncio.sleep(0.2)
         assert scan_count <= 1, f"Debounce failed: {scan_count} scans"
+
+
+class TestEventRouting:
+    def test_reload_skips_battery_and_recorder(self):
+        from custom_components.config_auditor.event_monitor import route_event
+        scopes = route_event("automation_reloaded", {"domain": "automation"})
+        assert "automations" in scopes
+        assert "batteries" not in scopes and "recorder" not in scopes
+
+    def test_label_change_requires_full_scan(self):
+        from custom_components.config_auditor.event_monitor import route_event
+        data = {"action": "update", "entity_id": "light.a", "changes": {"labels": set()}}
+        assert route_event("entity_registry_updated", data) is None
+
+    def test_entity_removal_includes_recorder(self):
+        from custom_components.config_auditor.event_monitor import route_event
+        scopes = route_event("entity_registry_updated", {"action": "remove", "entity_id": "sensor.x"})
+        assert {"recorder", "batteries", "entities"} <= scopes
+
+    def test_irrelevant_device_change_is_ignored(self):
+        from custom_components.config_auditor.event_monitor import route_event
+        data = {"action": "update", "device_id": "d1", "changes": {"sw_version": "1.0"}}
+        assert route_event("device_registry_updated", data) == frozenset()
+
+    def test_non_dict_payload_is_tolerated(self):
+        from custom_components.config_auditor.event_monitor import route_event
+        assert route_event("entity_registry_updated", MagicMock())
+
+
+def _setup_routed(hass, rescan, options=None):
+    from custom_components.config_auditor.event_monitor import async_setup_event_monitor
+    hass.loop = asyncio.get_event_loop()
+    coord = MagicMock()
+    coord.async_refresh = AsyncMock()
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    entry.options = options or {"event_debounce_seconds": 0.02}
+    entry.async_on_unload = lambda cb: None
+    hass.data["config_auditor"] = {
+        "test_entry": {"coordinator": coord, "async_rescan": rescan},
+    }
+    listeners = {}
+    hass.bus.async_listen = lambda evt, h: listeners.update({evt: h}) or (lambda: None)
+    tasks = []
+    hass.async_create_task = lambda coro: tasks.append(asyncio.ensure_future(coro))
+    async_setup_event_monitor(hass, entry)
+    return coord, listeners, tasks
+
+
+def _event(data):
+    evt = MagicMock()
+    evt.data = data
+    return evt
+
+
+class TestRoutedScans:
+    @pytest.mark.asyncio
+    async def test_scopes_merged_into_single_partial_rescan(self):
+        hass = MockHass()
+        rescan = AsyncMock()
+        coord, listeners, tasks = _setup_routed(hass, rescan)
+        listeners["automation_reloaded"](_event({"domain": "automation"}))
+        listeners["entity_registry_updated"](_event({"action": "create", "entity_id": "sensor.b"}))
+        await asyncio.sleep(0.1)
+        await asyncio.gather(*tasks)
+        rescan.assert_awaited_once()
+        scope = rescan.await_args.args[0]
+        assert {"automations", "batteries", "dashboards"} <= scope
+        coord.async_refresh.assert_not_awaited()
+        stats = hass.data["config_auditor"]["test_entry"]["event_router_stats"]
+        assert stats.partial_scans == 1 and stats.full_scans == 0
+        assert stats.events_coalesced == 1          # second event joined the pending scan
+
+    @pytest.mark.asyncio
+    async def test_large_window_falls_back_to_full_scan(self):
+        hass = MockHass()
+        rescan = AsyncMock()
+        coord, listeners, tasks = _setup_routed(hass, rescan)
+        for i in range(40):
+            listeners["entity_registry_updated"](
+                _event({"action": "update", "entity_id": f"light.l{i}", "changes": {"name": "x"}})
+            )
+        await asyncio.sleep(0.1)
+        await asyncio.gather(*tasks)
+        rescan.assert_not_awaited()
+        coord.async_refresh.assert_awaited_once()
+        stats = hass.data["config_auditor"]["test_entry"]["event_router_stats"]
+        assert stats.full_scans == 1 and stats.events_coalesced == 39
+
+    @pytest.mark.asyncio
+    async def test_ignored_event_schedules_nothing(self):
+        hass = MockHass()
+        rescan = AsyncMock()
+        coord, listeners, tasks = _setup_routed(hass, rescan)
+        listeners["device_registry_updated"](
+            _event({"action": "update", "device_id": "d1", "changes": {"sw_version": "2"}})
+        )
+        await asyncio.sleep(0.1)
+        assert not tasks
+        stats = hass.data["config_auditor"]["test_entry"]["event_router_stats"]
+        assert stats.events_ignored == 1
@@ -18,7 +18,7 @@ import json
 import pytest
 import sys
 from pathlib import Path
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
@@ -129,6 +129,110 @@ class TestSharedIgnoreUtility:
         assert len(result) == 50
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+# HacaIgnoreCache — event-invalidated cache of the ignore set
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _setup_ignore_cache(hass):
+    """Set up the cache and return (cache, {event_type: listener})."""
+    from custom_components.config_auditor.translation_utils import async_setup_haca_ignore_cache
+    listeners = {}
+
+    def _listen(evt, cb):
+        listeners[evt] = cb
+        return lambda: None
+
+    hass.bus.async_listen = _listen
+    entry = MagicMock()
+    entry.async_on_unload = lambda cb: None
+    return async_setup_haca_ignore_cache(hass, entry), listeners
+
+
+class TestHacaIgnoreCache:
+
+    @pytest.mark.asyncio
+    async def test_second_call_is_a_cache_hit(self):
+        hass = MockHass()
+        hass.add_registry_entry(MockRegistryEntry("sensor.ignored", labels={"haca_ignore"}))
+        cache, _ = _setup_ignore_cache(hass)
+
+        from custom_components.config_auditor.translation_utils import async_get_haca_ignored_entity_ids
+        first = await async_get_haca_ignored_entity_ids(hass)
+        # Registry change without event → cached value is still served
+        hass.add_registry_entry(MockRegistryEntry("sensor.new", labels={"haca_ignore"}))
+        second = await async_get_haca_ignored_entity_ids(hass)
+        assert first == second == {"sensor.ignored"}
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_listens_to_registry_events(self):
+        from custom_components.config_auditor.translation_utils import HACA_IGNORE_INVALIDATING_EVENTS
+        _, listeners = _setup_ignore_cache(MockHass())
+        for evt in HACA_IGNORE_INVALIDATING_EVENTS:
+            assert evt in listeners
+        assert "label_registry_updated" in HACA_IGNORE_INVALIDATING_EVENTS
+
+    @pytest.mark.asyncio
+    async def test_label_change_event_invalidates(self):
+        hass = MockHass()
+        cache, listeners = _setup_ignore_cache(hass)
+
+        from custom_components.config_auditor.translation_utils import async_get_haca_ignored_entity_ids
+        assert await async_get_haca_ignored_entity_ids(hass) == set()
+        hass.add_registry_entry(MockRegistryEntry("sensor.new", labels={"haca_ignore"}))
+        event = MagicMock()
+        event.data = {"action": "update", "entity_id": "sensor.new", "changes": {"labels": set()}}
+        listeners["entity_registry_updated"](event)
+        assert await async_get_haca_ignored_entity_ids(hass) == {"sensor.new"}
+        assert cache.invalidations == 1
+
+    @pytest.mark.asyncio
+    async def test_unrelated_update_keeps_cache(self):
+        hass = MockHass()
+        cache, listeners = _setup_ignore_cache(hass)
+
+        from custom_components.config_auditor.translation_utils import async_get_haca_ignored_entity_ids
+        await async_get_haca_ignored_entity_ids(hass)
+        event = MagicMock()
+        event.data = {"action": "update", "entity_id": "light.x", "changes": {"name": "Old"}}
+        listeners["entity_registry_updated"](event)
+        await async_get_haca_ignored_entity_ids(hass)
+        assert cache.hits == 1
+        assert cache.invalidations == 0
+
+    @pytest.mark.asyncio
+    async def test_device_removal_invalidates(self):
+        hass = MockHass()
+        cache, listeners = _setup_ignore_cache(hass)
+
+        from custom_components.config_auditor.translation_utils import async_get_haca_ignored_entity_ids
+        await async_get_haca_ignored_entity_ids(hass)
+        event = MagicMock()
+        event.data = {"action": "remove", "device_id": "dev_1"}
+        listeners["device_registry_updated"](event)
+        assert cache.as_dict()["cached"] is False
+
+    def test_registry_snapshot_seeds_cache(self):
+        from custom_components.config_auditor.registry_snapshot import async_build_registry_snapshot
+        hass = MockHass()
+        hass.add_registry_entry(MockRegistryEntry("sensor.ignored", labels={"haca_ignore"}))
+        cache, _ = _setup_ignore_cache(hass)
+        async_build_registry_snapshot(hass)
+        assert cache.get() == frozenset({"sensor.ignored"})
+
+    def test_stats_for_diagnostics(self):
+        from custom_components.config_auditor.translation_utils import HacaIgnoreCache
+        cache = HacaIgnoreCache()
+        assert cache.get() is None
+        cache.set({"a.b"})
+        cache.get()
+        stats = cache.as_dict()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["size"] == 1
+        assert stats["hit_rate"] == 0.5
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # EntityAnalyzer
 # ══════════════════════════════════════════════════════════════════════════════
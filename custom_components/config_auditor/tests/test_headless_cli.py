@@ -0,0 +1,199 @@
+"""Tests for headless.py (HomeAssistant stand-in) and the batch CLI (cli.py)."""
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+    floor_registry as fr,
+    label_registry as lr,
+)
+
+from custom_components.config_auditor import cli
+from custom_components.config_auditor.const import HEADLESS_STATE
+from custom_components.config_auditor.headless import HEADLESS_SCOPES, HeadlessHass
+from custom_components.config_auditor.report_generator import ReportGenerator
+from custom_components.config_auditor.tests.synthetic_install import build_install
+
+
+def _write_storage(config_dir: Path, key: str, data: dict) -> None:
+    storage = config_dir / ".storage"
+    storage.mkdir(exist_ok=True)
+    (storage / key).write_text(json.dumps({"version": 1, "key": key, "data": data}))
+
+
+def _export_registries(install, config_dir: Path) -> None:
+    """Write the registries of a synthetic install the way HA stores them."""
+    hass = install.hass
+    entities = []
+    for entry in hass._entity_registry.entities.values():
+        attributes = getattr(hass._states.get(entry.entity_id), "attributes", {})
+        entities.append({
+            "entity_id": entry.entity_id, "platform": entry.platform,
+            "unique_id": entry.unique_id, "device_id": entry.device_id,
+            "area_id": entry.area_id, "config_entry_id": entry.config_entry_id,
+            "disabled_by": entry.disabled_by, "labels": sorted(entry.labels),
+            "icon": entry.icon, "original_name": attributes.get("friendly_name"),
+            "original_device_class": attributes.get("device_class"),
+            "unit_of_measurement": attributes.get("unit_of_measurement"),
+        })
+    _write_storage(config_dir, "core.entity_registry", {"entities": entities})
+    _write_storage(config_dir, "core.device_registry", {"devices": [
+        {"id": d.id, "area_id": d.area_id, "labels": sorted(d.labels)}
+        for d in hass._device_registry.devices.values()
+    ]})
+    _write_storage(config_dir, "core.area_registry", {"areas": [
+        {"id": a.id, "name": a.name, "floor_id": a.floor_id, "labels": sorted(a.labels)}
+        for a in hass.data[ar.DATA_REGISTRY].items.values()
+    ]})
+
+
+def _tree(root: Path) -> set[str]:
+    return {str(p.relative_to(root)) for p in root.rglob("*")}
+
+
+class TestHeadlessHass:
+    def test_registries_and_placeholder_states(self, tmp_path):
+        (tmp_path / "configuration.yaml").write_text("homeassistant:\n")
+        _write_storage(tmp_path, "core.entity_registry", {"entities": [
+            {"entity_id": "sensor.power", "platform": "template", "device_id": "d1",
+             "original_name": "Power", "original_device_class": "power",
+             "unit_of_measurement": "W", "capabilities": {"state_class": "measurement"},
+             "labels": ["energy"]},
+            {"entity_id": "light.old", "platform": "hue", "disabled_by": "user"},
+        ]})
+        _write_storage(tmp_path, "core.device_registry", {"devices": [
+            {"id": "d1", "area_id": "kitchen", "labels": ["haca_ignore"]},
+        ]})
+        _write_storage(tmp_path, "core.area_registry", {"areas": [
+            {"id": "kitchen", "name": "Kitchen", "floor_id": "ground"},
+        ]})
+        _write_storage(tmp_path, "core.floor_registry", {"floors": [{"floor_id": "ground", "level": 0}]})
+        _write_storage(tmp_path, "core.label_registry", {"labels": [{"label_id": "energy"}]})
+        _write_storage(tmp_path, "core.config_entries", {"entries": [
+            {"entry_id": "ce1", "domain": "hue", "title": "Hue", "data": {"api_key": "secret"}},
+        ]})
+
+        hass = HeadlessHass(tmp_path, language="fr")
+        assert er.async_get(hass).async_get("sensor.power").labels == {"energy"}
+        assert dr.async_get(hass).async_get("d1").labels == {"haca_ignore"}
+        assert ar.async_get(hass).async_get_area("kitchen").floor_id == "ground"
+        assert [f.name for f in fr.async_get(hass).async_list_floors()] == ["ground"]
+        assert [l.label_id for l in lr.async_get(hass).async_list_labels()] == ["energy"]
+
+        state = hass.states.get("sensor.power")
+        assert state.state == HEADLESS_STATE
+        assert state.attributes == {
+            "state_class": "measurement", "friendly_name": "Power",
+            "device_class": "power", "unit_of_measurement": "W",
+        }
+        assert hass.states.get("light.old") is None          # disabled → no state
+        assert hass.states.async_entity_ids("sensor") == ["sensor.power"]
+
+        (entry,) = hass.config_entries.async_entries("hue")
+        assert hass.config_entries.async_get_entry("ce1") is entry
+        assert not hasattr(entry, "data")
+        assert hass.services.async_services() == {}
+        assert hass.config.language == "fr" and hass.scan_scopes == HEADLESS_SCOPES
+
+    def test_without_registries(self, tmp_path):
+        (tmp_path / "configuration.yaml").write_text("homeassistant:\n")
+        hass = HeadlessHass(tmp_path)
+        assert hass.storage_dir is None and hass.states.async_all() == []
+        assert "dashboards" not in hass.scan_scopes
+        assert {"automations", "security", "compliance"} <= hass.scan_scopes
+
+    def test_requires_a_config_directory(self, tmp_path):
+        with pytest.raises(ValueError):
+            HeadlessHass(tmp_path)
+
+
+class TestAudit:
+    @pytest.mark.asyncio
+    async def test_audit_emits_the_json_report_without_touching_the_directory(self, tmp_path):
+        build_install(tmp_path / "config", 1)
+        before = _tree(tmp_path / "config")
+
+        report = await cli.async_audit_directory(tmp_path / "config")
+        reference = ReportGenerator.for_export("en").build_json_document({}, [], [])
+        assert report.keys() == reference.keys()
+        assert report["issues"].keys() == reference["issues"].keys()
+        assert report["summary"]["automation_issues"] == len(report["issues"]["automation"]) > 0
+        assert report["issues"]["entity"] == []                  # needs live state
+        assert _tree(tmp_path / "config") == before
+        json.dumps(report)
+
+    @pytest.mark.asyncio
+    async def test_registries_enable_entity_checks_but_no_runtime_ones(self, tmp_path):
+        config = tmp_path / "config"
+        install = build_install(config, 1)
+        bare = await cli.async_audit_directory(config)
+        _export_registries(install, config)
+        full = await cli.async_audit_directory(config)
+
+        types = {i["type"] for i in full["issues"]["automation"] + full["issues"]["performance"]}
+        assert "never_triggered" not in types                    # placeholder states
+        assert len(full["issues"]["performance"]) >= len(bare["issues"]["performance"])
+        assert full["summary"]["automation_issues"] == bare["summary"]["automation_issues"]
+
+    @pytest.mark.asyncio
+    async def test_options_exclude_categories_and_types(self, tmp_path):
+        build_install(tmp_path, 1)
+        no_automations = await cli.async_audit_directory(
+            tmp_path, options={"excluded_categories": ["automations"]}
+        )
+        assert no_automations["issues"]["automation"] == no_automations["issues"]["script"] == []
+        filtered = await cli.async_audit_directory(
+            tmp_path, options={"excluded_issue_types": ["no_description"]}
+        )
+        assert filtered["issues"]["script"]
+        assert all(
+            i["type"] != "no_description"
+            for i in filtered["issues"]["automation"] + filtered["issues"]["script"]
+        )
+
+    def test_broken_directory_is_reported_not_raised(self, tmp_path):
+        result = cli.audit_directory(str(tmp_path))
+        assert result["config_dir"] == str(tmp_path) and "configuration.yaml" in result["error"]
+
+
+class TestMain:
+    def test_single_directory_prints_the_report(self, tmp_path, capsys):
+        build_install(tmp_path / "config", 1)
+        assert cli.main([str(tmp_path / "config"), "--fail-on", "high"]) == cli.EXIT_ISSUES
+        out, err = capsys.readouterr()
+        report = json.loads(out)
+        assert cli.count_at_or_above(report, "high") > 0
+        assert err.startswith(f"{tmp_path / 'config'}: health {report['summary']['health_score']}%")
+
+    def test_batch_in_worker_processes(self, tmp_path, capsys):
+        dirs = [tmp_path / "a" / "config", tmp_path / "b" / "config"]
+        for seed, config_dir in enumerate(dirs):
+            build_install(config_dir, 1, seed=seed)
+        (tmp_path / "empty").mkdir()
+        out_dir = tmp_path / "reports"
+
+        argv = [str(d) for d in dirs] + [str(tmp_path / "empty"), "-j", "2", "-o", str(out_dir)]
+        assert cli.main(argv) == cli.EXIT_ERROR
+        assert sorted(p.name for p in out_dir.iterdir()) == ["config.json", "config_2.json"]
+        first = json.loads((out_dir / "config.json").read_text())
+        assert first["summary"]["total_issues"] > 0
+        err = capsys.readouterr().err
+        assert f"{tmp_path / 'empty'}: ERROR" in err and err.count("health") == 2
+
+    def test_storage_option_needs_a_single_directory(self, tmp_path):
+        with pytest.raises(SystemExit):
+            cli.main([str(tmp_path), str(tmp_path), "--storage", str(tmp_path)])
+
+
+def test_count_at_or_above():
+    report = {"statistics": {"by_severity": {"high": 2, "medium": 3, "low": 5}}}
+    assert [cli.count_at_or_above(report, s) for s in cli.SEVERITY_LEVELS] == [10, 5, 2]
@@ -0,0 +1,121 @@
+"""Import-cost benchmark — optional subsystems must stay lazy (see lazy.py).
+
+Each check runs in a fresh interpreter with the Home Assistant modules HA
+itself always has loaded already imported first, so only the integration's
+own import cost is measured.
+"""
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+REPO_ROOT = Path(__file__).parent.parent.parent.parent
+PACKAGE = "custom_components.config_auditor"
+
+# Loaded on first use only — never by the integration import itself
+LAZY_MODULES = (
+    "mcp_server",
+    "report_generator",
+    "refactoring_assistant",
+    "automation_optimizer",
+    "conversation",
+    "proactive_agent",
+    "scan_capture",
+    "headless",
+    "cli",
+    "config_transaction",
+    "backup_store",
+    "ai_cache",
+    "ai_router",
+)
+
+# Source lines imported with the package (≈ 14,700 today, 23,300 before
+# lazy loading).  Raise deliberately when a new always-on module is added.
+IMPORT_LINE_BUDGET = 17_500
+# Wall-clock cap of the package import alone; generous for slow CI runners
+IMPORT_TIME_BUDGET_MS = 1_500
+
+_PROBE = f"""
+import json, sys, time
+import homeassistant.config_entries, homeassistant.helpers.llm
+import homeassistant.components.http, homeassistant.components.websocket_api
+import homeassistant.helpers.config_validation, homeassistant.helpers.update_coordinator
+import homeassistant.util.yaml
+start = time.perf_counter()
+import {PACKAGE}
+elapsed = (time.perf_counter() - start) * 1000
+mods = {{n: m for n, m in sys.modules.items() if n.startswith("{PACKAGE}")}}
+lines = 0
+for m in mods.values():
+    path = getattr(m, "__file__", None)
+    if path:
+        with open(path, encoding="utf-8") as fh:
+            lines += sum(1 for _ in fh)
+print(json.dumps({{
+    "ms": elapsed,
+    "modules": sorted(mods),
+    "lines": lines,
+    "third_party": [n for n in ("fpdf", "numpy") if n in sys.modules],
+}}))
+"""
+
+
+@pytest.fixture(scope="module")
+def probe() -> dict:
+    runs = []
+    for _ in range(3):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE],
+            cwd=REPO_ROOT, capture_output=True, text=True, timeout=120,
+        )
+        if out.returncode:
+            pytest.skip(f"integration not importable here: {out.stderr[-300:]}")
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    runs.sort(key=lambda r: r["ms"])
+    return runs[1]      # median run
+
+
+def test_optional_subsystems_are_not_imported(probe):
+    loaded = {name.rsplit(".", 1)[-1] for name in probe["modules"]}
+    assert not loaded & set(LAZY_MODULES)
+    assert probe["third_party"] == []
+
+
+def test_imported_source_stays_within_budget(probe):
+    assert probe["lines"] <= IMPORT_LINE_BUDGET
+
+
+def test_import_time_stays_within_budget(probe):
+    assert probe["ms"] <= IMPORT_TIME_BUDGET_MS
+
+
+class TestLazyInstance:
+    @pytest.mark.asyncio
+    async def test_instance_is_built_once_on_first_use(self):
+        from custom_components.config_auditor.lazy import LazyInstance, async_resolve
+        from custom_components.config_auditor.tests.conftest import MockHass
+
+        hass = MockHass()
+        lazy = LazyInstance(hass, "battery_monitor", "BatteryMonitor")
+        assert lazy.loaded is False
+
+        monitor = await async_resolve(lazy)
+        assert type(monitor).__name__ == "BatteryMonitor"
+        assert monitor.hass is hass
+        assert lazy.loaded is True
+        assert await async_resolve(lazy) is monitor
+        assert lazy.analyze_all == monitor.analyze_all    # attribute proxy
+
+    @pytest.mark.asyncio
+    async def test_resolve_passes_plain_values_through(self):
+        from custom_components.config_auditor.lazy import async_resolve
+
+        marker = object()
+        assert await async_resolve(marker) is marker
+        assert await async_resolve(None) is None
@@ -0,0 +1,150 @@
+"""Tests for include_resolver.py — HA include directives and file graph."""
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.config_watcher import ParsedConfigCache
+from custom_components.config_auditor.include_resolver import ConfigResolver
+
+
+def _write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def _split_config(tmp_path: Path) -> Path:
+    _write(tmp_path / "configuration.yaml", (
+        "homeassistant:\n"
+        "  packages: !include_dir_named packages\n"
+        "automation: !include automations.yaml\n"
+        "automation split: !include_dir_merge_list automations/\n"
+        "script: !include_dir_merge_named scripts/\n"
+        "scene: !include_dir_list scenes/\n"
+        "notify:\n"
+        "  - platform: smtp\n"
+        "    password: !secret smtp_password\n"
+    ))
+    _write(tmp_path / "secrets.yaml", "smtp_password: hunter2\n")
+    _write(tmp_path / "automations.yaml", "- id: a1\n  alias: Root\n")
+    _write(tmp_path / "automations" / "lights" / "hall.yaml", "- id: a2\n  alias: Hall\n")
+    _write(tmp_path / "automations" / ".hidden" / "skip.yaml", "- id: a9\n")
+    _write(tmp_path / "scripts" / "morning.yaml", "morning:\n  sequence: !include ../seq.yaml\n")
+    _write(tmp_path / "seq.yaml", "- delay: 5\n")
+    _write(tmp_path / "scenes" / "evening.yaml", "name: Evening\nentities: {}\n")
+    _write(tmp_path / "packages" / "garden.yaml", "automation:\n  - id: a3\n    alias: Garden\n")
+    return tmp_path
+
+
+class TestIncludeDirectives:
+    def test_all_directives_expanded(self, tmp_path):
+        resolver = ConfigResolver(ParsedConfigCache())
+        data = resolver.resolve(_split_config(tmp_path) / "configuration.yaml", {"automations"}).data
+        assert data["automation"] == [{"id": "a1", "alias": "Root"}]
+        assert data["automation split"] == [{"id": "a2", "alias": "Hall"}]
+        assert data["script"]["morning"]["sequence"] == [{"delay": 5}]
+        assert data["scene"][0]["name"] == "Evening"
+        assert data["homeassistant"]["packages"]["garden"]["automation"][0]["id"] == "a3"
+
+    def test_secret_value_is_never_expanded(self, tmp_path):
+        resolver = ConfigResolver(ParsedConfigCache())
+        data = resolver.resolve(_split_config(tmp_path) / "configuration.yaml", ()).data
+        assert data["notify"][0]["password"] == "!secret smtp_password"
+
+    def test_graph_lists_nested_includes(self, tmp_path):
+        root = _split_config(tmp_path)
+        resolved = ConfigResolver(ParsedConfigCache()).resolve(root / "configuration.yaml", ())
+        script_file = str(root / "scripts" / "morning.yaml")
+        assert str(root / "seq.yaml") in resolved.graph[script_file]
+        assert str(root / "automations" / ".hidden" / "skip.yaml") not in resolved.files
+        assert str(root / "secrets.yaml") not in resolved.files
+
+    def test_circular_include_does_not_recurse(self, tmp_path):
+        _write(tmp_path / "a.yaml", "b: !include b.yaml\n")
+        _write(tmp_path / "b.yaml", "a: !include a.yaml\n")
+        data = ConfigResolver(ParsedConfigCache()).resolve(tmp_path / "a.yaml", ()).data
+        assert data == {"b": {"a": None}}
+
+
+class TestResolverCache:
+    def test_unchanged_tree_is_not_recomposed(self, tmp_path):
+        root = _split_config(tmp_path) / "configuration.yaml"
+        resolver = ConfigResolver(ParsedConfigCache())
+        resolver.resolve(root, ())
+        resolver.resolve(root, ())
+        assert (resolver.hits, resolver.misses) == (1, 1)
+
+    def test_new_file_in_include_dir_is_picked_up(self, tmp_path):
+        root = _split_config(tmp_path) / "configuration.yaml"
+        resolver = ConfigResolver(ParsedConfigCache())
+        resolver.resolve(root, ())
+        new = _write(tmp_path / "automations" / "lights" / "porch.yaml", "- id: a4\n")
+        parent = new.parent.stat()
+        os.utime(new.parent, ns=(parent.st_atime_ns, parent.st_mtime_ns + 1_000_000_000))
+        data = resolver.resolve(root, ()).data
+        assert {"id": "a4"} in data["automation split"]
+
+
+class TestCollectDomainItems:
+    def test_sources_are_relative_to_config_dir(self, tmp_path):
+        resolver = ConfigResolver(ParsedConfigCache())
+        items = resolver.collect_domain_items(_split_config(tmp_path), "automation", ())
+        sources = {item["id"]: src for src, item in items}
+        assert sources == {
+            "a1": "automations.yaml",
+            "a2": os.path.join("automations", "lights", "hall.yaml"),
+            "a3": os.path.join("packages", "garden.yaml"),
+        }
+
+    def test_named_domain_and_cached_copies_keep_sources(self, tmp_path):
+        root = _split_config(tmp_path)
+        resolver = ConfigResolver(ParsedConfigCache())
+        resolver.collect_domain_items(root, "script", (), named=True)
+        items = resolver.collect_domain_items(root, "script", (), named=True)
+        assert items == [(os.path.join("scripts", "morning.yaml"),
+                          ("morning", {"sequence": [{"delay": 5}]}))]
+
+    def test_items_are_copies_of_the_cached_config(self, tmp_path):
+        root = _split_config(tmp_path)
+        resolver = ConfigResolver(ParsedConfigCache())
+        for _src, item in resolver.collect_domain_items(root, "automation", ()):
+            item["alias"] = "changed by an analyzer"
+        items = resolver.collect_domain_items(root, "automation", ())
+        assert resolver.hits and all(item.get("alias") != "changed by an analyzer" for _, item in items)
+
+    def test_merge_named_items_keep_their_own_file(self, tmp_path):
+        # The per-file dicts are discarded after the merge: their ids must not
+        # be reused for (and misattribute) items registered later
+        _write(tmp_path / "configuration.yaml", (
+            "homeassistant:\n"
+            "  packages: !include_dir_merge_named packages\n"
+            "script: !include_dir_merge_named scripts\n"
+        ))
+        for f in range(12):
+            _write(tmp_path / "scripts" / f"s{f:02}.yaml", "".join(
+                f"s{f}_{i}:\n  sequence:\n    - delay: {i}\n" for i in range(5)
+            ))
+            _write(tmp_path / "packages" / f"p{f:02}.yaml", (
+                f"pkg{f}:\n  automation:\n"
+                + "".join(f"    - id: p{f}_{i}\n" for i in range(3))
+            ))
+        resolver = ConfigResolver(ParsedConfigCache())
+        scripts = resolver.collect_domain_items(tmp_path, "script", (), named=True)
+        assert len(scripts) == 60
+        for src, (name, _cfg) in scripts:
+            assert src == os.path.join("scripts", f"s{int(name[1:].split('_')[0]):02}.yaml")
+        automations = resolver.collect_domain_items(tmp_path, "automation", ())
+        assert len(automations) == 36
+        for src, item in automations:
+            assert src == os.path.join("packages", f"p{int(item['id'][1:].split('_')[0]):02}.yaml")
+
+    def test_legacy_files_used_when_not_referenced(self, tmp_path):
+        _write(tmp_path / "scenes.yaml", "- name: Night\n")
+        items = ConfigResolver(ParsedConfigCache()).collect_domain_items(
+            tmp_path, "scene", (), default_file="scenes.yaml"
+        )
+        assert items == [("scenes.yaml", {"name": "Night"})]
@@ -41,19 +41,10 @@ class TestVersion:
 # ══════════════════════════════════════════════════════════════════════════════
 
 class TestHealthScoreIntegration:
-    def test_health_score_importable_from_services(self):
-        from custom_components.config_auditor.services import calculate_health_score
-        assert callable(calculate_health_score)
-
     def test_health_score_importable_standalone(self):
         from custom_components.config_auditor.health_score import calculate_health_score
         assert callable(calculate_health_score)
 
-    def test_same_function_both_paths(self):
-        from custom_components.config_auditor.health_score import calculate_health_score as hs1
-        from custom_components.config_auditor.services import calculate_health_score as hs2
-        assert hs1 is hs2
-
 
 # ══════════════════════════════════════════════════════════════════════════════
 # event_monitor
@@ -156,6 +156,58 @@ class TestHacaToolRouting:
             )
 
 
+# ── Per-turn caching ──────────────────────────────────────────────────────────
+
+def _api(options=None):
+    from custom_components.config_auditor.const import DOMAIN
+    from custom_components.config_auditor.llm_api import HacaLLMAPI
+    from custom_components.config_auditor.tests.conftest import MockHass
+
+    hass = MockHass()
+    entry = MagicMock(entry_id="e1", options=options or {})
+    hass.config_entries.async_entries = MagicMock(return_value=[entry])
+    coordinator = MagicMock(data={"health_score": 80, "entity_issue_list": [
+        {"entity_id": "light.a", "severity": "low", "message": "minor"},
+        {"entity_id": "light.b", "severity": "high", "message": "broken"},
+    ]})
+    hass.data.setdefault(DOMAIN, {})["e1"] = {"coordinator": coordinator}
+    return HacaLLMAPI(hass), hass, coordinator
+
+
+class TestApiInstanceCache:
+    """The prompt and the tool wrappers are not rebuilt on every turn."""
+
+    @pytest.mark.asyncio
+    async def test_prompt_is_rebuilt_only_for_new_data_or_language(self):
+        api, hass, coordinator = _api()
+        first = await api.async_get_api_instance(MagicMock())
+        second = await api.async_get_api_instance(MagicMock())
+        assert api.prompt_builds == 1 and second.api_prompt == first.api_prompt
+        assert first.api_prompt.index("light.b") < first.api_prompt.index("light.a")
+        assert second.tools[0] is first.tools[0]
+
+        coordinator.data = {**coordinator.data, "health_score": 55}
+        third = await api.async_get_api_instance(MagicMock())
+        assert api.prompt_builds == 2 and "55" in third.api_prompt
+
+        hass.add_state("automation.new", "on")
+        await api.async_get_api_instance(MagicMock())
+        hass.data["config_auditor"]["user_language"] = "fr"
+        await api.async_get_api_instance(MagicMock())
+        assert api.prompt_builds == 4
+
+    @pytest.mark.asyncio
+    async def test_essentials_tool_set_is_smaller(self):
+        from custom_components.config_auditor.llm_api import ESSENTIAL_HA_TOOLS
+
+        full = await _api()[0].async_get_api_instance(MagicMock())
+        small = await _api({"llm_tool_set": "essentials"})[0].async_get_api_instance(MagicMock())
+        names = {t.name for t in small.tools}
+        assert ESSENTIAL_HA_TOOLS <= names and "ha_create_automation" not in names
+        assert len(small.tools) < len(full.tools) / 2
+        assert len(small.api_prompt) < len(full.api_prompt)
+
+
 # ── _auto_backup delegates to _tool_ha_backup_create ─────────────────────────
 
 class TestAutoBackupDelegation:
@@ -108,9 +108,9 @@ class TestToolRegistry:
         )
 
     def test_expected_tool_count(self, registered_tool_names):
-        """There should be exactly 69 registered tools (v1.7.0)."""
+        """There should be exactly 70 registered tools (v1.7.0 + haca_get_trigger_rates)."""
         count = len(registered_tool_names)
-        assert count == 69, f"Expected 69 tools, got {count}. Update this test if tools were added/removed."
+        assert count == 70, f"Expected 70 tools, got {count}. Update this test if tools were added/removed."
 
     def test_no_duplicate_tool_names(self):
         """No tool name should appear twice in the tools list."""
@@ -70,26 +70,22 @@ class TestLoadAutomationById:
 
 class TestBackupCreation:
     @pytest.mark.asyncio
-    async def test_backup_creates_file(self, tmp_path):
+    async def test_backup_creates_entry(self, tmp_path):
         ra = make_ra(tmp_path, [AUTOMATION_DEVICE_ID])
-        backup_path = await ra._create_backup()
-        assert backup_path.exists()
-        content = yaml.safe_load(backup_path.read_text())
+        backup_id = await ra._create_backup()
+        assert ra._store.get(backup_id)["file"] == "automations.yaml"
+        content = yaml.safe_load(ra._store.read(backup_id))
         assert isinstance(content, list)
         assert content[0]["id"] == "auto_001"
 
     @pytest.mark.asyncio
-    async def test_backup_cleanup_keeps_last_10(self, tmp_path):
+    async def test_unchanged_file_is_not_stored_again(self, tmp_path):
         ra = make_ra(tmp_path, [AUTOMATION_DEVICE_ID])
-        for _ in range(15):
-            await ra._create_backup()
-            await asyncio.sleep(0.01)
-        await ra._cleanup_old_backups()
-        assert len(list(ra._backup_dir.glob("automations_*.yaml"))) <= 10
+        ids = {await ra._create_backup() for _ in range(15)}
+        assert len(ids) == 1
+        assert len(await ra.list_backups()) == 1
 
 
-import asyncio
-
 class TestNormalizeAutomation:
     def test_no_alias_detected(self, tmp_path):
         (tmp_path / "automations.yaml").write_text(yaml.dump([AUTOMATION_NO_ALIAS]), encoding="utf-8")
@@ -0,0 +1,122 @@
+"""Tests for registry_snapshot.py — per-scan registry snapshot."""
+from __future__ import annotations
+
+import dataclasses
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.tests.conftest import (
+    MockHass, MockRegistryEntry, MockDeviceEntry,
+)
+from custom_components.config_auditor.registry_snapshot import (
+    RegistrySnapshot, async_build_registry_snapshot,
+)
+
+
+def _hass_with_registry() -> MockHass:
+    hass = MockHass()
+    hass.add_device(MockDeviceEntry("dev_kitchen", area_id="kitchen", labels={"zigbee"}))
+    hass.add_device(MockDeviceEntry("dev_ignored", labels={"haca_ignore"}))
+    hass.add_registry_entry(MockRegistryEntry(
+        "light.kitchen", device_id="dev_kitchen", config_entry_id="ce_zha",
+    ))
+    hass.add_registry_entry(MockRegistryEntry(
+        "light.override", device_id="dev_kitchen", area_id="living", labels={"night"},
+    ))
+    hass.add_registry_entry(MockRegistryEntry(
+        "sensor.noisy", device_id="dev_ignored", config_entry_id="ce_zha",
+    ))
+    hass.add_registry_entry(MockRegistryEntry("sensor.direct", labels={"haca_ignore"}))
+    hass.add_registry_entry(MockRegistryEntry(
+        "automation.morning", platform="automation", unique_id="1700000000",
+    ))
+    hass.add_registry_entry(MockRegistryEntry(
+        "script.renamed", platform="script", unique_id="original_key",
+    ))
+    return hass
+
+
+class TestSnapshotJoins:
+    def test_effective_area_falls_back_to_device(self):
+        snap = async_build_registry_snapshot(_hass_with_registry())
+        assert snap.area_of("light.kitchen") == "kitchen"
+
+    def test_entity_area_overrides_device_area(self):
+        snap = async_build_registry_snapshot(_hass_with_registry())
+        assert snap.area_of("light.override") == "living"
+        assert "light.override" in snap.entities_by_area["living"]
+
+    def test_labels_include_device_labels(self):
+        snap = async_build_registry_snapshot(_hass_with_registry())
+        assert snap.labels_of("light.override") == frozenset({"night", "zigbee"})
+        assert "zigbee" in snap.used_label_ids
+
+    def test_ignore_set_covers_entity_and_device_labels(self):
+        snap = async_build_registry_snapshot(_hass_with_registry())
+        assert snap.ignored_entity_ids == frozenset({"sensor.noisy", "sensor.direct"})
+        assert snap.is_ignored("sensor.noisy")
+        assert not snap.is_ignored("light.kitchen")
+
+    def test_entities_per_config_entry(self):
+        snap = async_build_registry_snapshot(_hass_with_registry())
+        assert set(snap.entities_by_config_entry["ce_zha"]) == {"light.kitchen", "sensor.noisy"}
+
+    def test_unique_id_maps(self):
+        snap = async_build_registry_snapshot(_hass_with_registry())
+        assert snap.automation_entity_ids["1700000000"] == "automation.morning"
+        assert snap.script_entity_ids["original_key"] == "script.renamed"
+        assert snap.script_entity_ids["renamed"] == "script.renamed"
+
+    def test_missing_area_registry_is_tolerated(self):
+        snap = async_build_registry_snapshot(MockHass())
+        assert snap.area_ids == frozenset()
+        assert snap.area_of("light.unknown") is None
+
+
+class TestSnapshotImmutability:
+    def test_frozen_dataclass(self):
+        snap = async_build_registry_snapshot(_hass_with_registry())
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snap.ignored_entity_ids = frozenset()
+
+    def test_mappings_are_read_only(self):
+        snap = async_build_registry_snapshot(_hass_with_registry())
+        with pytest.raises(TypeError):
+            snap.entity_area["light.kitchen"] = "garage"
+
+    def test_later_registry_changes_do_not_leak_into_snapshot(self):
+        hass = _hass_with_registry()
+        snap = async_build_registry_snapshot(hass)
+        hass.add_registry_entry(MockRegistryEntry("light.new", labels={"haca_ignore"}))
+        assert "light.new" not in snap.ignored_entity_ids
+        assert "light.new" not in snap.entity_ids
+
+
+class TestAnalyzersUseSnapshot:
+    @pytest.mark.asyncio
+    async def test_battery_monitor_uses_snapshot_ignore_set(self):
+        from unittest.mock import AsyncMock, patch
+        hass = MockHass()
+        hass.add_state("sensor.phone_battery", "3", {"device_class": "battery", "unit_of_measurement": "%"})
+        snap = RegistrySnapshot(ignored_entity_ids=frozenset({"sensor.phone_battery"}))
+        with patch("custom_components.config_auditor.battery_monitor.TranslationHelper") as TH:
+            TH.return_value.t = lambda key, **kw: key
+            TH.return_value.async_load_language = AsyncMock()
+            from custom_components.config_auditor.battery_monitor import BatteryMonitor
+            monitor = BatteryMonitor(hass)
+        result = await monitor.analyze_all(snapshot=snap)
+        assert all(b["entity_id"] != "sensor.phone_battery" for b in result)
+
+    @pytest.mark.asyncio
+    async def test_area_complexity_resolves_areas_from_snapshot(self):
+        from custom_components.config_auditor.area_complexity_analyzer import AreaComplexityAnalyzer
+        hass = _hass_with_registry()
+        snap = async_build_registry_snapshot(hass)
+        cfg = {"triggers": [{"platform": "state", "entity_id": "light.kitchen"}],
+               "actions": [{"service": "light.turn_on", "target": {"entity_id": "light.override"}}]}
+        areas = AreaComplexityAnalyzer._extract_automation_areas("automation.x", cfg, snap)
+        assert areas == {"kitchen", "living"}
@@ -0,0 +1,217 @@
+"""Tests for reload_scheduler.py and how the event monitor / watcher use it."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor import reload_scheduler
+from custom_components.config_auditor.config_watcher import ConfigFileWatcher, get_parsed_config_cache
+from custom_components.config_auditor.const import CONFIG_SCAN_SCOPES, DOMAIN
+from custom_components.config_auditor.reload_scheduler import async_reload, get_reload_scheduler
+from custom_components.config_auditor.tests.conftest import MockHass
+
+
+def _hass(window: float = 0.02) -> MockHass:
+    hass = MockHass()
+    get_reload_scheduler(hass).window = window
+    return hass
+
+
+def _reloads(hass) -> list[str]:
+    return [c.args[0] for c in hass.services.async_call.call_args_list]
+
+
+class TestCoalescing:
+    @pytest.mark.asyncio
+    async def test_requests_in_the_window_share_one_reload(self):
+        hass = _hass()
+        await asyncio.gather(*(
+            async_reload(hass, "automation", [f"automation.a{i}"]) for i in range(10)
+        ), async_reload(hass, "script"))
+        assert sorted(_reloads(hass)) == ["automation", "script"]
+        stats = get_reload_scheduler(hass).as_dict()
+        assert stats["requests"] == 11 and stats["reloads"] == 2 and stats["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_sequential_requests_reload_each_time(self):
+        hass = _hass(window=0)
+        await async_reload(hass, "scene")
+        await async_reload(hass, "scene")
+        assert _reloads(hass) == ["scene", "scene"]
+
+    @pytest.mark.asyncio
+    async def test_every_caller_gets_the_reload_error(self):
+        hass = _hass()
+        hass.services.async_call = AsyncMock(side_effect=RuntimeError("bad yaml"))
+        results = await asyncio.gather(
+            async_reload(hass, "automation"), async_reload(hass, "automation"),
+            return_exceptions=True,
+        )
+        assert [str(r) for r in results] == ["bad yaml", "bad yaml"]
+        assert get_reload_scheduler(hass).failures == 1
+
+    @pytest.mark.asyncio
+    async def test_a_cancelled_caller_does_not_cancel_the_reload(self):
+        hass = _hass()
+        leader = asyncio.ensure_future(async_reload(hass, "automation"))
+        follower = asyncio.ensure_future(async_reload(hass, "automation"))
+        await asyncio.sleep(0)
+        follower.cancel()
+        await leader
+        assert _reloads(hass) == ["automation"]
+
+    @pytest.mark.asyncio
+    async def test_cancelling_the_leader_does_not_strand_the_others(self):
+        hass = _hass()
+        leader = asyncio.ensure_future(async_reload(hass, "automation"))
+        follower = asyncio.ensure_future(async_reload(hass, "automation"))
+        await asyncio.sleep(0)
+        leader.cancel()                      # during the coalescing window
+        await asyncio.wait_for(follower, 1)
+        assert _reloads(hass) == ["automation"]
+
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_reload(domain, service, blocking=False):
+            started.set()
+            await release.wait()
+
+        hass.services.async_call = slow_reload
+        leader = asyncio.ensure_future(async_reload(hass, "script"))
+        follower = asyncio.ensure_future(async_reload(hass, "script"))
+        await started.wait()
+        leader.cancel()                      # during the blocking reload
+        release.set()
+        await asyncio.wait_for(follower, 1)
+
+    @pytest.mark.asyncio
+    async def test_reloads_of_one_domain_never_overlap(self):
+        hass = _hass(window=0)
+        running = 0
+        peak = 0
+
+        async def slow_reload(domain, service, blocking=False):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+        hass.services.async_call = slow_reload
+        first = asyncio.ensure_future(async_reload(hass, "automation"))
+        await asyncio.sleep(0.005)
+        await asyncio.gather(first, async_reload(hass, "automation"))
+        assert peak == 1
+
+
+class TestTargetedRescan:
+    @pytest.mark.asyncio
+    async def test_rescans_the_scopes_of_the_written_files(self, tmp_path):
+        hass = _hass()
+        autos = tmp_path / "automations.yaml"
+        autos.write_text("[]\n", encoding="utf-8")
+        cache = get_parsed_config_cache(hass)
+        cache.load(autos, {"automations", "security"})
+        rescan = MagicMock()
+        hass.data[DOMAIN]["e1"] = {"async_rescan": rescan}
+
+        await asyncio.gather(
+            async_reload(hass, "automation", ["a"], [autos]),
+            async_reload(hass, "automation", ["b"], [autos]),
+        )
+        rescan.assert_called_once_with(frozenset({"automations", "security"}))
+        assert cache.invalidations == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_files_rescan_config_scopes_and_failures_none(self):
+        hass = _hass()
+        rescan = MagicMock()
+        hass.data[DOMAIN]["e1"] = {"async_rescan": rescan}
+        await async_reload(hass, "script", ["script.x"])
+        rescan.assert_called_once_with(CONFIG_SCAN_SCOPES)
+
+        rescan.reset_mock()
+        await async_reload(hass, "scene", rescan=False)
+        hass.services.async_call = AsyncMock(side_effect=RuntimeError("boom"))
+        with pytest.raises(RuntimeError):
+            await async_reload(hass, "script")
+        rescan.assert_not_called()
+
+
+class TestSelfTriggeredChanges:
+    @pytest.mark.asyncio
+    async def test_event_monitor_drops_reload_events_caused_by_haca(self, monkeypatch):
+        from custom_components.config_auditor.event_monitor import async_setup_event_monitor
+
+        hass = _hass()
+        hass.loop = asyncio.get_event_loop()
+        entry = MagicMock()
+        entry.entry_id = "e1"
+        entry.options = {"event_debounce_seconds": 0.01}
+        entry.async_on_unload = lambda cb: None
+        rescan = AsyncMock()
+        hass.data[DOMAIN]["e1"] = {"coordinator": MagicMock(), "async_rescan": rescan}
+        listeners = {}
+        hass.bus.async_listen = lambda evt, h: listeners.update({evt: h}) or (lambda: None)
+        async_setup_event_monitor(hass, entry)
+
+        async def reload_firing_event(domain, service, blocking=False):
+            listeners[f"{domain}_reloaded"](MagicMock(data={}))
+
+        hass.services.async_call = reload_firing_event
+        await async_reload(hass, "automation", rescan=False)
+        listeners["script_reloaded"](MagicMock(data={}))     # not ours
+        stats = hass.data[DOMAIN]["e1"]["event_router_stats"]
+        assert stats.events_self_triggered == 1 and stats.events_received == 2
+
+        monkeypatch.setattr(reload_scheduler, "SELF_RELOAD_GRACE_SECONDS", 0)
+        await async_reload(hass, "automation", rescan=False)
+        listeners["automation_reloaded"](MagicMock(data={}))  # after the grace period
+        assert stats.events_self_triggered == 2 and stats.events_received == 4
+
+    @pytest.mark.asyncio
+    async def test_only_one_event_per_haca_reload_is_ours(self):
+        hass = _hass()
+        await async_reload(hass, "automation", rescan=False)
+        scheduler = get_reload_scheduler(hass)
+        assert scheduler.is_self_reload("automation_reloaded")       # within the grace period
+        assert not scheduler.is_self_reload("automation_reloaded")   # the user's own reload
+
+    @pytest.mark.asyncio
+    async def test_watcher_skips_files_as_haca_wrote_them(self, tmp_path):
+        hass = _hass()
+        hass.loop = asyncio.get_event_loop()
+        autos = tmp_path / "automations.yaml"
+        autos.write_text("[]\n", encoding="utf-8")
+        cache = get_parsed_config_cache(hass)
+        cache.load(autos, {"automations"})
+        rescan = AsyncMock()
+        entry = MagicMock()
+        entry.entry_id = "e1"
+        hass.data[DOMAIN]["e1"] = {"coordinator": MagicMock(), "async_rescan": rescan}
+        tasks = []
+        hass.async_create_task = lambda coro: tasks.append(asyncio.ensure_future(coro))
+        watcher = ConfigFileWatcher(hass, entry, cache, debounce_seconds=0.01)
+
+        autos.write_text("- alias: HACA\n", encoding="utf-8")
+        await async_reload(hass, "automation", paths=[autos])
+        await asyncio.gather(*tasks)
+        rescan.reset_mock()
+        watcher._queue([str(autos)])
+        await asyncio.sleep(0.05)
+        await asyncio.gather(*tasks)
+        rescan.assert_not_awaited()
+        assert get_reload_scheduler(hass).writes_suppressed == 1
+
+        autos.write_text("- alias: Edited by hand\n", encoding="utf-8")
+        watcher._queue([str(autos)])
+        await asyncio.sleep(0.05)
+        await asyncio.gather(*tasks)
+        rescan.assert_awaited_once_with(frozenset({"automations"}))
@@ -0,0 +1,159 @@
+"""Tests for report_catalog.py — manifest-backed report listing."""
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.tests.conftest import MockHass
+from custom_components.config_auditor import report_catalog
+from custom_components.config_auditor.report_catalog import (
+    CATALOG_FILENAME,
+    ReportCatalog,
+    get_report_catalog,
+)
+
+
+def _audit_session(directory: Path, ts: str, score: int = 80) -> None:
+    (directory / f"report_{ts}.md").write_text("# report", encoding="utf-8")
+    (directory / f"report_{ts}.json").write_text(
+        json.dumps({"summary": {"health_score": score, "total_issues": 3}}), encoding="utf-8"
+    )
+
+
+def _touch_dir(directory: Path) -> None:
+    """Bump the directory mtime (filesystem timestamps may be coarse)."""
+    st = os.stat(directory)
+    os.utime(directory, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def reports_dir(tmp_path) -> Path:
+    d = tmp_path / "haca_reports"
+    d.mkdir()
+    return d
+
+
+class TestRebuild:
+    def test_missing_manifest_is_rebuilt_from_files(self, reports_dir):
+        _audit_session(reports_dir, "20260101_100000", score=72)
+        (reports_dir / "agent_report_20260102_080000_score91.md").write_text("x")
+        (reports_dir / ".report_20260103_000000.md.tmp").write_text("partial")
+
+        sessions = ReportCatalog(reports_dir).sessions()
+
+        assert [s["session_id"] for s in sessions] == ["agent_20260102_080000", "20260101_100000"]
+        audit = sessions[1]
+        assert set(audit["formats"]) == {"md", "json"}
+        assert audit["health_score"] == 72
+        assert audit["summary"]["total_issues"] == 3
+        assert sessions[0]["report_type"] == "agent" and sessions[0]["health_score"] == 91
+        assert (reports_dir / CATALOG_FILENAME).exists()
+
+    def test_corrupt_manifest_is_rebuilt(self, reports_dir):
+        _audit_session(reports_dir, "20260101_100000")
+        (reports_dir / CATALOG_FILENAME).write_text("{not json", encoding="utf-8")
+        assert len(ReportCatalog(reports_dir).sessions()) == 1
+        stored = json.loads((reports_dir / CATALOG_FILENAME).read_text(encoding="utf-8"))
+        assert stored["sessions"][0]["session_id"] == "20260101_100000"
+
+
+class TestListing:
+    def test_unchanged_directory_is_not_rescanned(self, reports_dir):
+        _audit_session(reports_dir, "20260101_100000")
+        catalog = ReportCatalog(reports_dir)
+        catalog.sessions()
+        with patch.object(report_catalog.os, "scandir", side_effect=AssertionError):
+            assert len(catalog.sessions()) == 1
+
+    def test_metadata_comes_from_manifest_after_restart(self, reports_dir):
+        _audit_session(reports_dir, "20260101_100000")
+        ReportCatalog(reports_dir).add_session(
+            "20260101_100000",
+            {"md": reports_dir / "report_20260101_100000.md", "pdf": ""},
+            health_score=55, summary={"health_score": 55},
+        )
+        # A new process reads scores from the manifest, not from the JSON report
+        session = ReportCatalog(reports_dir).get("20260101_100000")
+        assert session["health_score"] == 55
+        assert set(session["formats"]) == {"md", "json"}     # reconciled with disk
+
+    def test_external_changes_are_picked_up(self, reports_dir):
+        _audit_session(reports_dir, "20260101_100000")
+        catalog = ReportCatalog(reports_dir)
+        assert len(catalog.sessions()) == 1
+
+        _audit_session(reports_dir, "20260102_100000")
+        _touch_dir(reports_dir)
+        assert len(catalog.sessions()) == 2
+
+        for f in reports_dir.glob("report_20260101_*"):
+            f.unlink()
+        _touch_dir(reports_dir)
+        assert [s["session_id"] for s in catalog.sessions()] == ["20260102_100000"]
+
+    def test_add_session_reconciles_external_changes_first(self, reports_dir):
+        _audit_session(reports_dir, "20260101_100000")
+        catalog = ReportCatalog(reports_dir)
+        assert len(catalog.sessions()) == 1
+
+        for f in reports_dir.glob("report_20260101_*"):
+            f.unlink()
+        _audit_session(reports_dir, "20260102_100000")
+        _touch_dir(reports_dir)
+        catalog.add_session(
+            "20260102_100000", {"md": reports_dir / "report_20260102_100000.md"}, health_score=64
+        )
+
+        stored = json.loads((reports_dir / CATALOG_FILENAME).read_text(encoding="utf-8"))
+        assert [s["session_id"] for s in stored["sessions"]] == ["20260102_100000"]
+        assert stored["sessions"][0]["health_score"] == 64
+
+    def test_many_sessions_are_kept_and_limit_applies(self, reports_dir):
+        for i in range(45):
+            _audit_session(reports_dir, f"202601{i // 24 + 1:02d}_{i % 24:02d}0000")
+        catalog = ReportCatalog(reports_dir)
+        assert len(catalog.sessions()) == 45
+        assert len(catalog.sessions(limit=10)) == 10
+
+    def test_returned_sessions_are_copies(self, reports_dir):
+        _audit_session(reports_dir, "20260101_100000")
+        catalog = ReportCatalog(reports_dir)
+        catalog.sessions()[0]["formats"].clear()
+        assert catalog.sessions()[0]["formats"]
+
+
+class TestReportGeneratorIntegration:
+    @pytest.mark.asyncio
+    async def test_generate_list_and_delete(self, tmp_path):
+        from custom_components.config_auditor.report_generator import ReportGenerator
+
+        hass = MockHass(config_dir=str(tmp_path))
+        gen = ReportGenerator(hass)
+        assert get_report_catalog(hass) is gen._catalog
+
+        result = await gen.generate_all_reports(
+            {"health_score": 64, "total_issues": 2}, [], [], "en"
+        )
+        (sessions,) = gen.list_reports()
+        assert sessions["session_id"] == result["timestamp"]
+        assert sessions["health_score"] == 64
+        assert "md" in sessions["formats"] and "json" in sessions["formats"]
+
+        agent = tmp_path / "haca_reports" / "agent_report_20200101_000000_score40.md"
+        agent.write_text("agent")
+        _touch_dir(agent.parent)
+        deleted = await gen.delete_report_session("agent_20200101_000000")
+        assert deleted["success"] and not agent.exists()
+
+        deleted = await gen.delete_report_session(result["timestamp"])
+        assert deleted["success"]
+        assert gen.list_reports() == []
+        missing = await gen.delete_report_session("20000101_000000")
+        assert missing["success"] is False
@@ -0,0 +1,201 @@
+"""Tests for report_jobs.py and the streaming renderers of report_generator.py."""
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.tests.conftest import MockHass
+from custom_components.config_auditor import report_generator as rg
+from custom_components.config_auditor.report_jobs import (
+    EVENT_REPORT_PROGRESS,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_QUEUED,
+    ReportJobQueue,
+    build_report_inputs,
+)
+
+TS = datetime(2026, 1, 2, 3, 4, 5)
+TS_STR = "20260102_030405"
+
+
+def _issues(n: int, kind: str) -> list[dict]:
+    return [
+        {
+            "entity_id": f"{kind}.e{i}",
+            "severity": ("high", "medium", "low")[i % 3],
+            "type": ("zombie_entity", "unavailable", "ghost_registry_entry")[i % 3],
+            "message": f"message {i}",
+            "recommendation": "fix it",
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def generator(tmp_path) -> rg.ReportGenerator:
+    gen = rg.ReportGenerator(MockHass(config_dir=str(tmp_path)))
+    gen._translations = gen._load_translations("en")
+    return gen
+
+
+def _ctx(**extra) -> rg._ReportContext:
+    summary = {"health_score": 70, "automation_issues": 12, "entity_issues": 9}
+    return rg._ReportContext.build(
+        summary, _issues(12, "automation"), _issues(9, "sensor"), TS, TS_STR, **extra
+    )
+
+
+class TestRenderers:
+    def test_json_stream_matches_json_dump(self, generator):
+        ctx = _ctx(script_issues=_issues(2, "script"), scene_issues=None)
+        path = Path(generator._render_json(ctx))
+        expected = json.dumps(generator._build_json_report(ctx), indent=2, default=str)
+        assert path.read_text(encoding="utf-8") == expected
+        assert json.loads(expected)["issues"]["scene"] == []
+
+    def test_markdown_is_written_in_chunks(self, generator):
+        ctx = _ctx()
+        chunks = list(generator._iter_markdown(ctx))
+        assert len(chunks) > 10
+        path = Path(generator._render_markdown(ctx))
+        assert path.read_text(encoding="utf-8") == "".join(chunks)
+        assert any(c.startswith("\n### 🟡") and "(4)" in c for c in chunks)
+
+    def test_failed_write_leaves_no_partial_file(self, tmp_path):
+        def _chunks():
+            yield "partial"
+            raise RuntimeError("boom")
+
+        target = tmp_path / "report.md"
+        with pytest.raises(RuntimeError):
+            rg._write_chunks(target, _chunks())
+        assert list(tmp_path.iterdir()) == []
+
+    def test_font_lookup_is_cached(self):
+        rg._find_dejavu.cache_clear()
+        first = rg._find_dejavu()
+        assert rg._find_dejavu() is first
+        assert rg._find_dejavu.cache_info().hits == 1
+
+    @pytest.mark.asyncio
+    async def test_all_formats_share_timestamp_and_report_progress(self, generator):
+        pytest.importorskip("fpdf")
+        done: list[str] = []
+        result = await generator.generate_all_reports(
+            {"health_score": 90}, _issues(3, "automation"), [], "en",
+            security_issues=_issues(2, "s"), progress=done.append,
+        )
+        assert sorted(done) == ["json", "markdown", "pdf"]
+        for fmt in ("markdown", "json", "pdf"):
+            assert result["timestamp"] in result[fmt]
+            assert Path(result[fmt]).stat().st_size > 0
+        leftovers = [p for p in generator._reports_dir.iterdir() if p.suffix == ".tmp"]
+        assert leftovers == []
+
+
+class _FakeGenerator:
+    """Reports each format; optionally blocks until ``gate`` is set."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.gate: asyncio.Event | None = None
+        self.calls: list[tuple[str, dict]] = []
+        self.fail = fail
+
+    async def generate_all_reports(self, summary, automation_issues, entity_issues,
+                                   language="en", *, progress=None, **extra):
+        self.calls.append((language, summary))
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise OSError("disk full")
+        for fmt in ("markdown", "json", "pdf"):
+            progress(fmt)
+        return {"markdown": "m", "json": "j", "pdf": "p", "timestamp": "T"}
+
+
+def _queue(generator, data=None) -> tuple[ReportJobQueue, MockHass]:
+    hass = MockHass()
+    hass.loop = asyncio.get_running_loop()
+    coordinator = MagicMock()
+    coordinator.data = data if data is not None else {"health_score": 80}
+    return ReportJobQueue(hass, "e1", coordinator, generator), hass
+
+
+def _events(hass) -> list[dict]:
+    return [
+        c.args[1] for c in hass.bus.async_fire.call_args_list
+        if c.args[0] == EVENT_REPORT_PROGRESS
+    ]
+
+
+class TestReportJobQueue:
+    def test_inputs_come_from_coordinator_data(self):
+        summary, autos, entities, extra = build_report_inputs({
+            "health_score": 55, "automation_issue_list": [{"a": 1}],
+            "dashboard_issue_list": [{"d": 1}],
+        })
+        assert summary["health_score"] == 55 and summary["entity_issues"] == 0
+        assert autos == [{"a": 1}] and entities == []
+        assert extra["dashboard_issues"] == [{"d": 1}]
+        assert extra["script_issues"] == []
+
+    @pytest.mark.asyncio
+    async def test_job_reports_progress_and_result(self):
+        queue, hass = _queue(_FakeGenerator())
+        job = queue.submit("fr")
+        assert job.status == STATUS_QUEUED
+
+        await queue.async_wait(job)
+        assert job.status == STATUS_DONE
+        assert job.result["timestamp"] == "T"
+        events = _events(hass)
+        assert [e["percent"] for e in events] == [0, 0, 33, 66, 100, 100]
+        assert events[-1]["status"] == STATUS_DONE
+        assert queue.get(job.job_id) is job
+
+    @pytest.mark.asyncio
+    async def test_jobs_run_one_at_a_time_and_queued_jobs_absorb_requests(self):
+        gen = _FakeGenerator()
+        gen.gate = asyncio.Event()
+        queue, _ = _queue(gen)
+
+        running = queue.submit("en")
+        await asyncio.sleep(0.01)
+        queued = queue.submit("en")
+        assert queue.submit("en") is queued        # still waiting: absorbed
+        other = queue.submit("de")
+        assert other is not queued
+        assert len(gen.calls) == 1                 # serialised behind the lock
+
+        gen.gate.set()
+        await asyncio.gather(*(queue.async_wait(j) for j in (running, queued, other)))
+        assert [lang for lang, _ in gen.calls] == ["en", "en", "de"]
+        assert len(queue.jobs()) == 3
+
+    @pytest.mark.asyncio
+    async def test_failure_is_recorded_not_raised(self):
+        queue, hass = _queue(_FakeGenerator(fail=True))
+        job = await queue.async_wait(queue.submit())
+        assert job.status == STATUS_FAILED
+        assert job.error == "disk full"
+        assert job.language == "en"
+        assert _events(hass)[-1]["error"] == "disk full"
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_pending_jobs(self):
+        gen = _FakeGenerator()
+        gen.gate = asyncio.Event()
+        queue, _ = _queue(gen)
+        job = queue.submit()
+        await asyncio.sleep(0.01)
+        await queue.async_cancel()
+        assert job.status == STATUS_FAILED and job.error == "cancelled"
@@ -0,0 +1,167 @@
+"""Tests for scan_capture.py and the replay harness (tests/replay.py)."""
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor import scan_capture
+from custom_components.config_auditor.const import ALL_SCAN_SCOPES, CAPTURES_DIR, DOMAIN
+from custom_components.config_auditor.scan_pipeline import ScanPipeline
+from custom_components.config_auditor.scan_scheduler import ScanScheduler
+from custom_components.config_auditor.tests.replay import async_replay
+from custom_components.config_auditor.tests.synthetic_install import build_install
+
+
+def _pipeline(hass) -> ScanPipeline:
+    entry = SimpleNamespace(entry_id="cap", options={"excluded_categories": ["security"]})
+    return ScanPipeline(hass, entry, ScanScheduler(entry))
+
+
+async def _capture(hass, pipeline) -> dict:
+    return await scan_capture.async_capture_scan_inputs(hass, pipeline._entry, pipeline)
+
+
+class TestCapture:
+    @pytest.mark.asyncio
+    async def test_captures_files_states_and_registries(self, tmp_path):
+        install = build_install(tmp_path / "config", 1)
+        hass = install.hass
+        (tmp_path / "config" / "secrets.yaml").write_text("api_key: hunter2\n")
+        (tmp_path / "outside.yaml").write_text("x: 1\n")
+        hass.add_state("device_tracker.phone", "home", {
+            "latitude": 48.85, "longitude": 2.35, "entity_picture": "/api/x?token=abc",
+            "source_type": "gps",
+        })
+        pipeline = _pipeline(hass)
+        await pipeline.async_scan(frozenset(ALL_SCAN_SCOPES))
+
+        capture = await _capture(hass, pipeline)
+        files = capture["files"]
+        for name in ("configuration.yaml", "automations.yaml", "scripts.yaml",
+                     "templates.yaml", ".storage/lovelace", ".storage/lovelace_dashboards"):
+            assert name in files
+        assert any(name.startswith("blueprints/automation/") for name in files)
+        assert "secrets.yaml" not in files and not any("outside" in f for f in files)
+
+        phone = next(s for s in capture["states"] if s["entity_id"] == "device_tracker.phone")
+        assert phone["attributes"] == {"source_type": "gps"}
+        assert capture["options"] == {"excluded_categories": ["security"]}
+        assert len(capture["registries"]["entities"]) == len(hass._entity_registry.entities)
+        entity = capture["registries"]["entities"][0]
+        assert isinstance(entity["labels"], list) and "platform" in entity
+        assert capture["services"]["light"] == ["toggle", "turn_off", "turn_on"]
+        assert capture["recorder"]["available"] is False
+        json.dumps(capture)
+
+    @pytest.mark.asyncio
+    async def test_recorder_aggregates_are_anonymized(self, tmp_path):
+        from homeassistant.helpers.recorder import DATA_INSTANCE
+
+        install = build_install(tmp_path, 1)
+        hass = install.hass
+        pipeline = _pipeline(hass)
+        live = install.entity_ids[0]
+
+        class _Recorder:
+            async def async_add_executor_job(self, func, *args):
+                return func(*args)
+
+        hass.data[DATA_INSTANCE] = _Recorder()
+        pipeline.recorder_analyzer._query_row_counts = lambda _i: (
+            {live: 40, "sensor.old_kitchen_temp": 1200}, {"sensor.old_kitchen_temp": 300},
+        )
+        recorder = (await _capture(hass, pipeline))["recorder"]
+        ghost = scan_capture.anonymize_entity_id("sensor.old_kitchen_temp")
+        assert ghost.startswith("sensor.recorded_") and ghost != "sensor.old_kitchen_temp"
+        assert recorder["available"] is True
+        assert recorder["state_rows"] == {live: 40, ghost: 1200}
+        assert recorder["stat_rows"] == {ghost: 300}
+        assert "old_kitchen" not in json.dumps(recorder)
+
+
+class TestFileFormat:
+    def test_round_trip_and_atomic_write(self, tmp_path):
+        path = tmp_path / CAPTURES_DIR / "c.json.gz"
+        capture = {"format": scan_capture.CAPTURE_FORMAT, "version": 1, "files": {"a.yaml": "é"}}
+        assert scan_capture.write_capture(path, capture) == path.stat().st_size
+        assert scan_capture.read_capture(path) == capture
+        assert [p.name for p in path.parent.iterdir()] == ["c.json.gz"]
+
+    @pytest.mark.parametrize("payload", [
+        {"format": "something-else", "version": 1},
+        {"format": scan_capture.CAPTURE_FORMAT, "version": scan_capture.CAPTURE_VERSION + 1},
+        [1, 2],
+    ])
+    def test_rejects_foreign_or_newer_files(self, tmp_path, payload):
+        path = tmp_path / "x.json.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            json.dump(payload, fh)
+        with pytest.raises(ValueError):
+            scan_capture.read_capture(path)
+
+
+class TestReplay:
+    @pytest.mark.asyncio
+    async def test_replay_reproduces_the_live_scan(self, tmp_path):
+        install = build_install(tmp_path / "config", 1, seed=3)
+        hass = install.hass
+        pipeline = _pipeline(hass)
+        live = await pipeline.async_scan(frozenset(ALL_SCAN_SCOPES))
+        path = tmp_path / "capture.json.gz"
+        scan_capture.write_capture(path, await _capture(hass, pipeline))
+
+        result = await async_replay(path, workdir=tmp_path)
+        replayed = result["data"]
+        assert set(result["scopes"]) == set(ALL_SCAN_SCOPES)
+        for key in ("health_score", "total_issues", "automation_issues", "script_issues",
+                    "scene_issues", "entity_issues", "helper_issues", "performance_issues",
+                    "dashboard_issues", "compliance_issues", "battery_count"):
+            assert replayed[key] == live[key], key
+        assert replayed["security_issues"] == 0            # captured option is honoured
+        assert result["counts"]["files"] >= 6
+
+    @pytest.mark.asyncio
+    async def test_replay_serves_recorder_counts_and_dashboards(self, tmp_path):
+        install = build_install(tmp_path / "config", 1)
+        hass = install.hass
+        pipeline = _pipeline(hass)
+        capture = await _capture(hass, pipeline)
+        ghost = scan_capture.anonymize_entity_id("sensor.gone")
+        noisy = next(eid for eid in install.entity_ids if eid.startswith("sensor."))
+        capture["recorder"] = {
+            "available": True,
+            "state_rows": {ghost: 5000, install.entity_ids[0]: 10},
+            "stat_rows": {},
+            "noisy_24h": [[noisy, 900, 0]],
+        }
+        capture["dashboards"] = {"api-only": {"title": "API", "views": [
+            {"cards": [{"type": "tile", "entity": "light.not_there"}]},
+        ]}}
+
+        data = (await async_replay(capture, workdir=tmp_path))["data"]
+        assert [o["entity_id"] for o in data["recorder_orphans"]] == [ghost]
+        assert any(
+            i.get("entity_id") == noisy and i["type"] == "noisy_entity"
+            for i in data["performance_issue_list"]
+        )
+        assert any(i.get("entity_id") == "light.not_there" for i in data["dashboard_issue_list"])
+
+
+@pytest.mark.asyncio
+async def test_save_capture_writes_under_captures_dir(tmp_path):
+    install = build_install(tmp_path, 1)
+    hass = install.hass
+    pipeline = _pipeline(hass)
+    hass.data.setdefault(DOMAIN, {})["cap"] = {"scan_pipeline": pipeline}
+    result = await scan_capture.async_save_capture(hass, pipeline._entry)
+    path = Path(result["path"])
+    assert path.parent == tmp_path / CAPTURES_DIR and path.name.endswith(".json.gz")
+    assert result["size_bytes"] == path.stat().st_size
+    assert result["counts"]["states"] == len(hass._states)
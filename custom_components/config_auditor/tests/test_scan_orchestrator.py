@@ -0,0 +1,186 @@
+"""Tests for scan_orchestrator.py — superseding scans and progressive results."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.tests.conftest import MockHass
+from custom_components.config_auditor.scan_orchestrator import (
+    EVENT_SCAN_PROGRESS,
+    MAX_CONSECUTIVE_SUPERSEDES,
+    PHASE_FINALIZE,
+    ScanOrchestrator,
+)
+
+
+class _Pipeline:
+    """Fake pipeline: reports each scope, optionally blocking on a gate."""
+
+    def __init__(self) -> None:
+        self.calls: list[frozenset[str]] = []
+        self.gate: asyncio.Event | None = None
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, scope, progress):
+        self.calls.append(scope)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            for phase in sorted(scope):
+                if phase == "recorder" and self.gate is not None:
+                    await self.gate.wait()
+                await progress(phase)
+            return {"scope": sorted(scope), "run": len(self.calls)}
+        finally:
+            self.active -= 1
+
+
+def _orchestrator(pipeline, publish=None) -> tuple[ScanOrchestrator, MockHass]:
+    hass = MockHass()
+    hass.loop = asyncio.get_running_loop()
+    return ScanOrchestrator(hass, "e1", pipeline, publish), hass
+
+
+def _progress_events(hass) -> list[dict]:
+    return [
+        c.args[1] for c in hass.bus.async_fire.call_args_list
+        if c.args[0] == EVENT_SCAN_PROGRESS
+    ]
+
+
+class TestProgress:
+    @pytest.mark.asyncio
+    async def test_each_phase_publishes_and_fires_progress(self):
+        publish = AsyncMock()
+        orch, hass = _orchestrator(_Pipeline(), publish)
+
+        data = await orch.async_run({"automations", "entities", "bogus"})
+
+        assert data["scope"] == ["automations", "entities"]
+        events = _progress_events(hass)
+        assert [(e["phase"], e["percent"]) for e in events] == [
+            ("automations", 33), ("entities", 66), (PHASE_FINALIZE, 100),
+        ]
+        assert all(e["entry_id"] == "e1" for e in events)
+        # Second partial publication falls inside the throttle window
+        publish.assert_awaited_once_with(frozenset({"automations"}))
+        assert orch.is_running is False
+
+    @pytest.mark.asyncio
+    async def test_throttled_phases_are_published_with_the_next_one(self, monkeypatch):
+        publish = AsyncMock()
+        pipeline = _Pipeline()
+        pipeline.gate = asyncio.Event()
+        orch, _ = _orchestrator(pipeline, publish)
+
+        task = asyncio.create_task(orch.async_run({"automations", "entities", "recorder"}))
+        await asyncio.sleep(0.01)          # automations published, entities throttled
+        monkeypatch.setattr(orch, "_last_publish", 0.0)
+        pipeline.gate.set()
+        await task
+        assert [c.args[0] for c in publish.await_args_list] == [
+            frozenset({"automations"}), frozenset({"entities", "recorder"}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_publish_error_does_not_abort_scan(self):
+        orch, _ = _orchestrator(_Pipeline(), AsyncMock(side_effect=RuntimeError("boom")))
+        assert (await orch.async_run({"automations"}))["run"] == 1
+
+
+class TestSupersede:
+    @pytest.mark.asyncio
+    async def test_newer_request_cancels_and_absorbs_pending_phases(self):
+        pipeline = _Pipeline()
+        pipeline.gate = asyncio.Event()
+        orch, _ = _orchestrator(pipeline)
+
+        first = asyncio.create_task(orch.async_run({"automations", "recorder"}))
+        await asyncio.sleep(0.01)          # automations done, blocked on recorder
+        assert orch.as_dict()["completed_phases"] == ["automations"]
+
+        pipeline.gate.set()
+        second = await orch.async_run({"entities"})
+        # The superseded caller follows the replacement scan
+        assert await first == second
+        assert pipeline.calls[-1] == frozenset({"entities", "recorder"})
+        assert orch.superseded_scans == 1
+        assert orch.completed_scans == 1
+        assert pipeline.max_active == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_of_triggers_cannot_starve_the_pipeline(self):
+        pipeline = _Pipeline()
+        pipeline.gate = asyncio.Event()
+        orch, _ = _orchestrator(pipeline)
+
+        waiters = []
+        for _ in range(MAX_CONSECUTIVE_SUPERSEDES + 2):
+            waiters.append(asyncio.create_task(orch.async_run({"recorder"})))
+            await asyncio.sleep(0.01)
+        assert orch.superseded_scans == MAX_CONSECUTIVE_SUPERSEDES
+
+        pipeline.gate.set()
+        results = await asyncio.gather(*waiters)
+        assert orch.completed_scans == 2
+        assert pipeline.max_active == 1
+        assert len({r["run"] for r in results}) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_the_running_scan(self):
+        pipeline = _Pipeline()
+        pipeline.gate = asyncio.Event()
+        orch, _ = _orchestrator(pipeline)
+
+        waiter = asyncio.create_task(orch.async_run({"recorder"}))
+        await asyncio.sleep(0.01)
+        await orch.async_cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert orch.is_running is False
+
+    @pytest.mark.asyncio
+    async def test_queued_request_leaves_the_running_scan_reachable(self):
+        pipeline = _Pipeline()
+        pipeline.gate = asyncio.Event()
+        orch, hass = _orchestrator(pipeline)
+        orch._streak = MAX_CONSECUTIVE_SUPERSEDES      # next request queues
+
+        running = asyncio.create_task(orch.async_run({"automations", "recorder"}))
+        await asyncio.sleep(0.01)
+        orch._streak = MAX_CONSECUTIVE_SUPERSEDES
+        queued = asyncio.create_task(orch.async_run({"entities"}))
+        await asyncio.sleep(0.01)
+        state = orch.as_dict()
+        assert state["queued"] and state["completed_phases"] == ["automations"]
+
+        await orch.async_cancel()
+        for waiter in (running, queued):
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        assert orch.is_running is False and pipeline.active == 0
+        assert pipeline.calls == [frozenset({"automations", "recorder"})]
+
+    @pytest.mark.asyncio
+    async def test_running_scan_keeps_reporting_while_another_is_queued(self):
+        pipeline = _Pipeline()
+        pipeline.gate = asyncio.Event()
+        orch, hass = _orchestrator(pipeline)
+
+        running = asyncio.create_task(orch.async_run({"automations", "recorder"}))
+        await asyncio.sleep(0.01)
+        orch._streak = MAX_CONSECUTIVE_SUPERSEDES
+        queued = asyncio.create_task(orch.async_run({"entities"}))
+        await asyncio.sleep(0.01)
+        pipeline.gate.set()
+        first, second = await asyncio.gather(running, queued)
+        assert first["run"] == 1 and second["run"] == 2
+        phases = [(e["scan_id"], e["phase"]) for e in _progress_events(hass)]
+        assert (1, "recorder") in phases and (2, "entities") in phases
@@ -0,0 +1,45 @@
+"""Tests for scan_pipeline.py — assembly of coordinator data."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.const import ALL_SCAN_SCOPES
+from custom_components.config_auditor.scan_pipeline import ScanPipeline
+from custom_components.config_auditor.scan_scheduler import ScanScheduler
+from custom_components.config_auditor.tests.synthetic_install import build_install
+
+
+class TestPartialData:
+    @pytest.mark.asyncio
+    async def test_partial_publication_skips_the_dependency_graph(self, tmp_path):
+        hass = build_install(tmp_path, 1, seed=5).hass
+        entry = SimpleNamespace(entry_id="p", options={})
+        pipeline = ScanPipeline(hass, entry, ScanScheduler(entry))
+        full = await pipeline.async_scan(frozenset(ALL_SCAN_SCOPES))
+
+        assert full["performance_issues"] > 0
+        pipeline.dependency_mapper.build = AsyncMock()
+        pipeline.raw["performance"] = []
+        partial = pipeline.partial_data(full, frozenset({"performance"}))
+        pipeline.dependency_mapper.build.assert_not_awaited()
+
+        assert partial["dependency_graph"] is full["dependency_graph"]
+        assert partial["performance_issue_list"] == [] and partial["performance_issues"] == 0
+        assert partial["total_issues"] == full["total_issues"] - full["performance_issues"]
+        for key in ("automation_issue_list", "entity_issue_list", "battery_list"):
+            assert partial[key] is full[key], key
+
+    @pytest.mark.asyncio
+    async def test_first_publication_has_every_key(self, tmp_path):
+        hass = build_install(tmp_path, 1, seed=5).hass
+        entry = SimpleNamespace(entry_id="p", options={})
+        pipeline = ScanPipeline(hass, entry, ScanScheduler(entry))
+        full = await pipeline.async_scan(frozenset(ALL_SCAN_SCOPES))
+        assert set(pipeline.partial_data(None, frozenset({"batteries"}))) == set(full)
@@ -0,0 +1,91 @@
+"""Tests for scan_scheduler.py — tiered, cost-aware scan scheduling."""
+from __future__ import annotations
+
+import sys
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.const import ALL_SCAN_SCOPES
+from custom_components.config_auditor.scan_scheduler import (
+    LOOP_LAG_THRESHOLD,
+    ScanScheduler,
+    async_measure_loop_lag,
+)
+
+T0 = 1_700_000_000.0
+
+
+def _scheduler(**options) -> ScanScheduler:
+    entry = MagicMock()
+    entry.options = {"scan_interval": 60, **options}
+    return ScanScheduler(entry)
+
+
+def _ran_all(sched: ScanScheduler, at: float, duration: float = 1.0) -> None:
+    for scope in ALL_SCAN_SCOPES:
+        sched.record_run(scope, duration, finished=at)
+
+
+class TestIntervals:
+    def test_defaults_and_overrides(self):
+        sched = _scheduler(analyzer_intervals={"recorder": 720, "entities": "bad"})
+        assert sched.interval("batteries") == 5
+        assert sched.interval("entities") == 5          # invalid override ignored
+        assert sched.interval("automations") == 60      # follows scan_interval
+        assert sched.interval("recorder") == 720
+
+    def test_tick_is_the_shortest_interval(self):
+        assert _scheduler().tick_interval() == timedelta(minutes=5)
+        assert _scheduler(scan_interval=0).tick_interval() is None
+        quiet = _scheduler(analyzer_intervals={"batteries": 30, "entities": 0})
+        assert quiet.tick_interval() == timedelta(minutes=30)
+
+
+class TestSelection:
+    def test_only_due_scopes_run(self):
+        sched = _scheduler()
+        _ran_all(sched, T0)
+        assert sched.select(T0 + 5 * 60) == {"batteries", "entities"}
+        assert sched.select(T0 + 60 * 60) == {
+            "batteries", "entities", "automations", "performance", "security", "compliance",
+        }
+        assert "recorder" in sched.select(T0 + 240 * 60)
+
+    def test_budget_defers_expensive_scopes_until_starving(self):
+        sched = _scheduler(max_scan_budget_seconds=10)
+        _ran_all(sched, T0, duration=8.0)
+        at = T0 + 240 * 60
+        picked = sched.select(at)
+        assert "recorder" not in picked and "dashboards" not in picked
+        assert "batteries" in picked                    # cheap scopes are never deferred
+        assert sched.deferred["recorder"] == 1
+        assert "recorder" in sched.select(T0 + 480 * 60)
+
+    def test_event_loop_lag_defers_expensive_scopes(self):
+        sched = _scheduler()
+        _ran_all(sched, T0)
+        picked = sched.select(T0 + 240 * 60, loop_lag=LOOP_LAG_THRESHOLD * 2)
+        assert "dashboards" not in picked
+        assert "automations" in picked
+
+    def test_full_request_is_consumed_once(self):
+        sched = _scheduler()
+        sched.request_full()
+        assert sched.consume_full_request() is True
+        assert sched.consume_full_request() is False
+
+    def test_duration_is_smoothed(self):
+        sched = _scheduler()
+        sched.record_run("recorder", 10.0)
+        sched.record_run("recorder", 20.0)
+        assert 10.0 < sched.avg_duration["recorder"] < 20.0
+        assert sched.as_dict()["recorder"]["cost"] == "expensive"
+
+    @pytest.mark.asyncio
+    async def test_loop_lag_probe(self):
+        assert 0.0 <= await async_measure_loop_lag() < LOOP_LAG_THRESHOLD
@@ -0,0 +1,114 @@
+"""Tests for state_rate_monitor.py — live noisy-entity counters."""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.tests.conftest import MockHass, MockState
+from custom_components.config_auditor.state_rate_monitor import (
+    STATE_RATE_MONITOR_KEY,
+    WINDOW_SECONDS,
+    StateRateMonitor,
+)
+
+
+def _monitor(tmp_path, **kw) -> StateRateMonitor:
+    return StateRateMonitor(MockHass(config_dir=str(tmp_path)), **kw)
+
+
+def _event(entity_id, old, new):
+    return MagicMock(data={
+        "entity_id": entity_id,
+        "old_state": MockState(entity_id, old) if old is not None else None,
+        "new_state": MockState(entity_id, new) if new is not None else None,
+    })
+
+
+class TestCounting:
+    def test_counts_changes_and_attribute_only(self, tmp_path):
+        mon = _monitor(tmp_path)
+        mon.async_handle_event(_event("sensor.power", "10", "11"))
+        mon.async_handle_event(_event("sensor.power", "11", "11"))
+        mon.async_handle_event(_event("sensor.power", "11", "11"))
+        mon.async_handle_event(_event("sensor.gone", "1", None))      # removal ignored
+        assert mon.count("sensor.power") == {"changes": 3, "attribute_only": 2}
+        assert mon.count("sensor.gone")["changes"] == 0
+
+    def test_top_keeps_heavy_hitters_with_bounded_candidates(self, tmp_path):
+        mon = _monitor(tmp_path, width=512, max_candidates=4)
+        now = time.time()
+        for i in range(40):
+            mon.record(f"sensor.quiet_{i}", now=now)
+        for _ in range(300):
+            mon.record("sensor.noisy", now=now)
+        top = mon.top(limit=5, min_count=200, now=now)
+        assert top[0][0] == "sensor.noisy"
+        assert top[0][1] >= 300
+        assert len(mon._candidates) == 4
+
+    def test_previous_epoch_decays_out_of_the_window(self, tmp_path):
+        mon = _monitor(tmp_path)
+        start = mon.epoch_start
+        for _ in range(100):
+            mon.record("sensor.a", now=start + 10)
+        half = mon.count("sensor.a", now=start + WINDOW_SECONDS * 1.5)["changes"]
+        assert 40 <= half <= 60
+        assert mon.count("sensor.a", now=start + WINDOW_SECONDS * 3)["changes"] == 0
+
+
+class TestPersistenceAndBackfill:
+    def test_save_and_restore_round_trip(self, tmp_path):
+        mon = _monitor(tmp_path)
+        for _ in range(7):
+            mon.record("sensor.a", attr_only=True)
+        mon.observed_since -= WINDOW_SECONDS
+        mon.save()
+
+        restored = _monitor(tmp_path)
+        assert restored.load() is True
+        assert restored.count("sensor.a") == {"changes": 7, "attribute_only": 7}
+        assert restored.needs_backfill is False
+
+    def test_corrupt_file_is_ignored(self, tmp_path):
+        (tmp_path / ".haca_state_rates.json").write_text("{not json", encoding="utf-8")
+        mon = _monitor(tmp_path)
+        assert mon.load() is False
+        assert mon.needs_backfill is True
+
+    def test_backfill_seeds_counts_once(self, tmp_path):
+        mon = _monitor(tmp_path)
+        mon.record("sensor.a")
+        mon.backfill([("sensor.b", 450)])
+        assert mon.needs_backfill is False
+        assert mon.top(min_count=200)[0][:2] == ("sensor.b", 450)
+
+
+class TestPerformanceAnalyzerNoisy:
+    @pytest.mark.asyncio
+    async def test_db_only_queried_for_cold_start(self, tmp_path):
+        from custom_components.config_auditor.performance_analyzer import PerformanceAnalyzer
+
+        hass = MockHass(config_dir=str(tmp_path))
+        mon = StateRateMonitor(hass)
+        hass.data.setdefault("config_auditor", {})[STATE_RATE_MONITOR_KEY] = mon
+        pa = PerformanceAnalyzer(hass)
+        pa._detect_noisy_entities_from_db = AsyncMock(return_value=[("sensor.power", 600)])
+
+        await pa._detect_noisy_entities()
+        assert pa._detect_noisy_entities_from_db.await_count == 1
+        assert [i["entity_id"] for i in pa.issues] == ["sensor.power"]
+
+        for _ in range(250):
+            mon.record("sensor.power", attr_only=True)
+        pa.issues = []
+        await pa._detect_noisy_entities()
+        assert pa._detect_noisy_entities_from_db.await_count == 1
+        issue = pa.issues[0]
+        assert issue["entity_id"] == "sensor.power"
+        assert issue["attribute_only_changes"] == 250
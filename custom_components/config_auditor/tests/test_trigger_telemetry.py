@@ -0,0 +1,125 @@
+"""Tests for trigger_telemetry.py — measured automation/script trigger rates."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from custom_components.config_auditor.tests.conftest import MockHass
+from custom_components.config_auditor.trigger_telemetry import (
+    EVENT_RUNAWAY_AUTOMATION,
+    RUNAWAY_TRIGGERS_PER_MINUTE,
+    TRIGGER_TELEMETRY_KEY,
+    TriggerTelemetry,
+    async_setup_trigger_telemetry,
+)
+
+T0 = 1_700_000_000.0
+
+
+class TestRateWindows:
+    def test_counts_per_window(self):
+        tel = TriggerTelemetry(MockHass())
+        for i in range(5):
+            tel.record("automation.a", T0 + i * 600)      # every 10 min
+        rates = tel.rates("automation.a", T0 + 2400)
+        assert rates["minute"] == 1
+        assert rates["hour"] == 5
+        assert rates["day"] == 5
+
+    def test_old_triggers_age_out(self):
+        tel = TriggerTelemetry(MockHass())
+        tel.record("automation.a", T0)
+        assert tel.rates("automation.a", T0 + 120)["minute"] == 0
+        assert tel.rates("automation.a", T0 + 3 * 3600)["hour"] == 0
+        assert tel.rates("automation.a", T0 + 3 * 3600)["day"] == 1
+        assert tel.rates("automation.a", T0 + 2 * 86400)["day"] == 0
+
+    def test_burst_window(self):
+        tel = TriggerTelemetry(MockHass())
+        tel.record("automation.a", T0)
+        for i in range(4):
+            tel.record("automation.a", T0 + 1800 + i)
+        assert tel.count_in_last_minutes("automation.a", 5, T0 + 1810) == 4
+
+    def test_top_is_ranked_by_window(self):
+        tel = TriggerTelemetry(MockHass())
+        for _ in range(3):
+            tel.record("automation.busy", T0)
+        tel.record("script.quiet", T0)
+        top = tel.top(5, "hour", T0 + 1)
+        assert [r["entity_id"] for r in top] == ["automation.busy", "script.quiet"]
+        with pytest.raises(ValueError):
+            tel.top(5, "week")
+
+
+class TestBoundsAndRunaway:
+    def test_least_active_entity_is_evicted(self):
+        tel = TriggerTelemetry(MockHass(), max_tracked=2)
+        tel.record("automation.a", T0)
+        tel.record("automation.a", T0 + 1)
+        tel.record("automation.b", T0 + 2)
+        tel.record("automation.c", T0 + 3)
+        assert tel.rates("automation.b", T0 + 4)["day"] == 0
+        assert tel.rates("automation.a", T0 + 4)["day"] == 2
+        assert tel.evictions == 1
+
+    def test_runaway_fires_event_once_per_cooldown(self):
+        hass = MockHass()
+        tel = TriggerTelemetry(hass)
+        for i in range(RUNAWAY_TRIGGERS_PER_MINUTE * 2):
+            tel.record("automation.loop", T0 + i * 0.5)
+        fired = [c for c in hass.bus.async_fire.call_args_list
+                 if c.args[0] == EVENT_RUNAWAY_AUTOMATION]
+        assert len(fired) == 1
+        assert fired[0].args[1]["entity_id"] == "automation.loop"
+        assert tel.rates("automation.loop", T0 + 30)["runaway"] is True
+
+    def test_setup_listens_and_unload_cleans_up(self):
+        hass = MockHass()
+        entry = MagicMock()
+        tel = async_setup_trigger_telemetry(hass, entry)
+        listened = {c.args[0] for c in hass.bus.async_listen.call_args_list}
+        assert listened == {"automation_triggered", "script_started"}
+        tel.async_handle_event(MagicMock(data={"entity_id": "script.s"}))
+        assert tel.events_seen == 1
+        assert hass.data["config_auditor"][TRIGGER_TELEMETRY_KEY] is tel
+        for call in entry.async_on_unload.call_args_list:
+            if callable(call.args[0]) and not isinstance(call.args[0], MagicMock):
+                call.args[0]()
+        assert TRIGGER_TELEMETRY_KEY not in hass.data["config_auditor"]
+
+
+class TestPerformanceAnalyzerRates:
+    @pytest.mark.asyncio
+    async def test_measured_rates_produce_issues(self):
+        from custom_components.config_auditor.performance_analyzer import PerformanceAnalyzer
+
+        hass = MockHass()
+        tel = TriggerTelemetry(hass)
+        hass.data.setdefault("config_auditor", {})[TRIGGER_TELEMETRY_KEY] = tel
+        for i in range(60):
+            tel.record("automation.chatty", None)
+        for i in range(12):
+            tel.record("automation.bursty", None)
+        tel.record("automation.calm", None)
+
+        pa = PerformanceAnalyzer(hass)
+        for eid in ("automation.chatty", "automation.bursty", "automation.calm"):
+            await pa._analyze_trigger_rate(MagicMock(entity_id=eid), eid)
+        types = {i["entity_id"]: i["type"] for i in pa.issues}
+        assert types["automation.chatty"] == "very_high_trigger_frequency"  # runaway
+        assert types["automation.bursty"] == "burst_trigger_pattern"
+        assert "automation.calm" not in types
+
+    @pytest.mark.asyncio
+    async def test_no_telemetry_no_issue(self):
+        from custom_components.config_auditor.performance_analyzer import PerformanceAnalyzer
+
+        pa = PerformanceAnalyzer(MockHass())
+        await pa._analyze_trigger_rate(MagicMock(entity_id="automation.a"), "A")
+        assert pa.issues == []
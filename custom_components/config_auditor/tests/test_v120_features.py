@@ -64,13 +64,8 @@ class TestMultiSourceAutomationLoading:
         automations = [{"id": "auto1", "alias": "Alarm", "trigger": [], "action": []}]
         (tmp_path / "automations.yaml").write_text(yaml.dump(automations))
         hass = MockHass(config_dir=str(tmp_path))
-        er_mock = MockEntityRegistry([
-            MockRegistryEntry("automation.alarm", platform="automation", unique_id="auto1")
-        ])
         aa = self._make_analyzer(hass)
-        with patch("custom_components.config_auditor.automation_analyzer.er") as er_m:
-            er_m.async_get.return_value = er_mock
-            await aa._load_automation_configs()
+        await aa._load_automation_configs()
         assert any("auto1" in str(v.get("id")) for v in aa._automation_configs.values())
 
     @pytest.mark.asyncio
@@ -87,11 +82,8 @@ class TestMultiSourceAutomationLoading:
         (storage_dir / "core.automation").write_text(json.dumps(storage_data))
         (tmp_path / "automations.yaml").write_text("[]")
         hass = MockHass(config_dir=str(tmp_path))
-        er_mock = MockEntityRegistry()
         aa = self._make_analyzer(hass)
-        with patch("custom_components.config_auditor.automation_analyzer.er") as er_m:
-            er_m.async_get.return_value = er_mock
-            await aa._load_automation_configs()
+        await aa._load_automation_configs()
         found = any(
             cfg.get("_source_file") == ".storage/core.automation"
             for cfg in aa._automation_configs.values()
@@ -111,11 +103,8 @@ class TestMultiSourceAutomationLoading:
         (packages / "lights.yaml").write_text(yaml.dump(pkg_content))
         (tmp_path / "automations.yaml").write_text("[]")
         hass = MockHass(config_dir=str(tmp_path))
-        er_mock = MockEntityRegistry()
         aa = self._make_analyzer(hass)
-        with patch("custom_components.config_auditor.automation_analyzer.er") as er_m:
-            er_m.async_get.return_value = er_mock
-            await aa._load_automation_configs()
+        await aa._load_automation_configs()
         found = any(
             "packages/" in str(cfg.get("_source_file", ""))
             for cfg in aa._automation_configs.values()
@@ -135,11 +124,8 @@ class TestMultiSourceAutomationLoading:
         ]}}
         (storage_dir / "core.automation").write_text(json.dumps(storage_data))
         hass = MockHass(config_dir=str(tmp_path))
-        er_mock = MockEntityRegistry()
         aa = self._make_analyzer(hass)
-        with patch("custom_components.config_auditor.automation_analyzer.er") as er_m:
-            er_m.async_get.return_value = er_mock
-            await aa._load_automation_configs()
+        await aa._load_automation_configs()
         dup_entries = [
             cfg for cfg in aa._automation_configs.values() if cfg.get("id") == "dup_auto"
         ]
@@ -156,12 +142,9 @@ class TestMultiSourceAutomationLoading:
         (packages / "test.yaml").write_text(yaml.dump(pkg_content))
         (tmp_path / "automations.yaml").write_text("[]")
         hass = MockHass(config_dir=str(tmp_path))
-        er_mock = MockEntityRegistry()
-        with patch("custom_components.config_auditor.automation_analyzer.TranslationHelper") as TH, \
-             patch("custom_components.config_auditor.automation_analyzer.er") as er_m:
+        with patch("custom_components.config_auditor.automation_analyzer.TranslationHelper") as TH:
             TH.return_value.async_load_language = AsyncMock()
             TH.return_value.t = lambda k, **kw: k
-            er_m.async_get.return_value = er_mock
             from custom_components.config_auditor.automation_analyzer import AutomationAnalyzer
             aa = AutomationAnalyzer(hass)
             await aa.analyze_all()
@@ -183,11 +166,8 @@ class TestMultiSourceAutomationLoading:
         (tmp_path / "configuration.yaml").write_text(cfg_content)
         (tmp_path / "automations.yaml").write_text("[]")
         hass = MockHass(config_dir=str(tmp_path))
-        er_mock = MockEntityRegistry()
         aa = self._make_analyzer(hass)
-        with patch("custom_components.config_auditor.automation_analyzer.er") as er_m:
-            er_m.async_get.return_value = er_mock
-            await aa._load_automation_configs()
+        await aa._load_automation_configs()
         found = any(cfg.get("id") == "split_auto" for cfg in aa._automation_configs.values())
         assert found, "Automation from !include_dir_merge_list should be loaded"
 
@@ -716,14 +696,11 @@ class TestEdgeCases:
         }))
         (Path(tmp_path) / "automations.yaml").write_text("[]")
         hass = MockHass(config_dir=str(tmp_path))
-        er_mock = MockEntityRegistry()
 
         async def _run():
-            with patch("custom_components.config_auditor.automation_analyzer.TranslationHelper") as TH, \
-                 patch("custom_components.config_auditor.automation_analyzer.er") as er_m:
+            with patch("custom_components.config_auditor.automation_analyzer.TranslationHelper") as TH:
                 TH.return_value.async_load_language = AsyncMock()
                 TH.return_value.t = lambda k, **kw: k
-                er_m.async_get.return_value = er_mock
                 from custom_components.config_auditor.automation_analyzer import AutomationAnalyzer
                 aa = AutomationAnalyzer(hass)
                 await aa._load_automation_configs()
@@ -26,7 +26,6 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from custom_components.config_auditor.tests.conftest import (
     MockHass,
     MockRegistryEntry,
-    MockEntityRegistry,
     MockState,
 )
 
@@ -38,11 +37,9 @@ BUNDLE = Path(__file__).parent.parent / "www" / "haca-panel.js"
 
 def _make_aa(hass):
     with patch("custom_components.config_auditor.automation_analyzer.TranslationHelper") as TH, \
-         patch("custom_components.config_auditor.automation_analyzer.er") as er_m, \
          patch("custom_components.config_auditor.automation_analyzer.ar") as ar_m:
         TH.return_value.async_load_language = AsyncMock()
         TH.return_value.t = lambda k, **kw: k
-        er_m.async_get.return_value = MockEntityRegistry()
         ar_m.async_get.return_value = MagicMock(async_list_areas=lambda: [])
         from custom_components.config_auditor.automation_analyzer import AutomationAnalyzer
         aa = AutomationAnalyzer(hass)
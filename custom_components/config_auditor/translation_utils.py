@@ -76,12 +76,124 @@ class TranslationHelper:
         return template
 
 
+# ── haca_ignore set cache ────────────────────────────────────────────────────
+# The resolved haca_ignore set (entities labelled directly or through their
+# device) is cached in hass.data and only dropped when a registry event can
+# actually change it.
+
+HACA_IGNORE_CACHE_KEY = "haca_ignore_cache"
+
+HACA_IGNORE_INVALIDATING_EVENTS = (
+    "entity_registry_updated",
+    "device_registry_updated",
+    "label_registry_updated",
+)
+
+# Registry "update" events only matter when one of these fields changed
+_IGNORE_RELEVANT_CHANGES = frozenset({"labels", "device_id", "entity_id"})
+
+
+class HacaIgnoreCache:
+    """Process-wide cache of the resolved haca_ignore entity set."""
+
+    def __init__(self) -> None:
+        self._ignored: frozenset[str] | None = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self) -> frozenset[str] | None:
+        """Return the cached set (counting a hit) or None (counting a miss)."""
+        if self._ignored is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._ignored
+
+    def set(self, ignored: set[str]) -> None:
+        self._ignored = frozenset(ignored)
+
+    def invalidate(self, event=None) -> None:
+        """Drop the cached set if ``event`` may have changed it.
+
+        Registry "update" events carry a ``changes`` dict with the previous
+        values of the modified fields — renames of unrelated attributes
+        (name, icon, area…) keep the cache warm.
+        """
+        data = getattr(event, "data", None) or {}
+        if data.get("action") == "update":
+            changes = data.get("changes")
+            if isinstance(changes, dict) and not (_IGNORE_RELEVANT_CHANGES & changes.keys()):
+                return
+        if self._ignored is not None:
+            self.invalidations += 1
+        self._ignored = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Counters for diagnostics."""
+        total = self.hits + self.misses
+        return {
+            "cached": self._ignored is not None,
+            "size": len(self._ignored) if self._ignored is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+def async_setup_haca_ignore_cache(hass, entry) -> HacaIgnoreCache:
+    """Create the haca_ignore cache and subscribe its invalidation listeners.
+
+    Listeners and the cache itself are removed via ``entry.async_on_unload``.
+    Without this setup (unit tests, standalone analyzers) the lookup simply
+    walks the registries on every call, as before.
+    """
+    from homeassistant.core import callback
+
+    domain_data = hass.data.setdefault("config_auditor", {})
+    cache = HacaIgnoreCache()
+    domain_data[HACA_IGNORE_CACHE_KEY] = cache
+
+    @callback
+    def _on_registry_event(event) -> None:
+        cache.invalidate(event)
+
+    for event_type in HACA_IGNORE_INVALIDATING_EVENTS:
+        entry.async_on_unload(hass.bus.async_listen(event_type, _on_registry_event))
+
+    @callback
+    def _drop_cache() -> None:
+        if hass.data.get("config_auditor", {}).get(HACA_IGNORE_CACHE_KEY) is cache:
+            hass.data["config_auditor"].pop(HACA_IGNORE_CACHE_KEY, None)
+
+    entry.async_on_unload(_drop_cache)
+    return cache
+
+
 async def async_get_haca_ignored_entity_ids(hass) -> set[str]:
     """Return the full set of entity_ids that should be ignored by HACA.
 
     Checks both entity_registry (label on the entity itself) and
     device_registry (label on the device — all its entities are then ignored).
+    Served from :class:`HacaIgnoreCache` when it has been set up.
     """
+    cache: HacaIgnoreCache | None = hass.data.get("config_auditor", {}).get(
+        HACA_IGNORE_CACHE_KEY
+    )
+    if cache is not None:
+        cached = cache.get()
+        if cached is not None:
+            return set(cached)
+
+    ignored = _build_haca_ignored_entity_ids(hass)
+    if cache is not None:
+        cache.set(ignored)
+    return ignored
+
+
+def _build_haca_ignored_entity_ids(hass) -> set[str]:
+    """Walk the entity and device registries to resolve the haca_ignore set."""
     from homeassistant.helpers import entity_registry as er, device_registry as dr
 
     ignored: set[str] = set()
@@ -104,4 +216,4 @@ async def async_get_haca_ignored_entity_ids(hass) -> set[str]:
         _LOGGER.warning("[HACA] Error building haca_ignore set: %s", exc)
 
     _LOGGER.debug("[HACA] haca_ignore: %d entity_ids will be skipped", len(ignored))
-    return ignored
\ No newline at end of file
+    return ignored
@@ -0,0 +1,240 @@
+"""Real-time automation / script trigger-rate telemetry (Module 3).
+
+Listens to ``automation_triggered`` and ``script_started`` and keeps, for
+every automation / script, three ring buffers of counters:
+
+    window   buckets        resolution
+    1 min    60 × 1 s       runaway-loop detection within seconds
+    1 h      60 × 1 min     high-frequency / burst checks
+    24 h     24 × 1 h       daily rate
+
+Buckets are plain ``array('I')`` slots with running totals, so recording a
+trigger and reading a rate are O(1).  At most ``MAX_TRACKED_ENTITIES``
+entities are tracked (≈ 600 bytes each); when the limit is reached the
+least active entity is evicted, keeping memory bounded on any install.
+
+A runaway loop (``RUNAWAY_TRIGGERS_PER_MINUTE`` triggers within 60 s) is
+logged and announced with a ``haca_runaway_automation`` event as soon as
+it is detected, at most once per ``RUNAWAY_COOLDOWN_SECONDS``.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from array import array
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+TRIGGER_TELEMETRY_KEY = "trigger_telemetry"
+
+TELEMETRY_EVENTS = ("automation_triggered", "script_started")
+
+MAX_TRACKED_ENTITIES = 1000
+RUNAWAY_TRIGGERS_PER_MINUTE = 20
+RUNAWAY_COOLDOWN_SECONDS = 600
+EVENT_RUNAWAY_AUTOMATION = "haca_runaway_automation"
+
+WINDOWS = ("minute", "hour", "day")
+
+
+class _RateRing:
+    """Fixed-size ring of counters covering ``size × width`` seconds."""
+
+    __slots__ = ("counts", "width", "last", "total")
+
+    def __init__(self, size: int, width: float) -> None:
+        self.counts = array("I", bytes(4 * size))
+        self.width = width
+        self.last = 0
+        self.total = 0
+
+    def _advance(self, bucket: int) -> None:
+        size = len(self.counts)
+        if bucket <= self.last:
+            return
+        if bucket - self.last >= size:
+            for i in range(size):
+                self.counts[i] = 0
+            self.total = 0
+        else:
+            for b in range(self.last + 1, bucket + 1):
+                idx = b % size
+                self.total -= self.counts[idx]
+                self.counts[idx] = 0
+        self.last = bucket
+
+    def add(self, now: float) -> None:
+        bucket = int(now // self.width)
+        self._advance(bucket)
+        self.counts[bucket % len(self.counts)] += 1
+        self.total += 1
+
+    def count(self, now: float, buckets: int | None = None) -> int:
+        """Return the count over the whole ring, or over the last ``buckets``."""
+        current = int(now // self.width)
+        self._advance(current)
+        if buckets is None or buckets >= len(self.counts):
+            return self.total
+        size = len(self.counts)
+        return sum(self.counts[(current - i) % size] for i in range(buckets))
+
+
+class _EntityRates:
+    """Ring buffers of one automation or script."""
+
+    __slots__ = ("second", "minute", "hour", "last_seen", "runaway_at")
+
+    def __init__(self) -> None:
+        self.second = _RateRing(60, 1)
+        self.minute = _RateRing(60, 60)
+        self.hour = _RateRing(24, 3600)
+        self.last_seen = 0.0
+        self.runaway_at = 0.0
+
+    def add(self, now: float) -> None:
+        self.second.add(now)
+        self.minute.add(now)
+        self.hour.add(now)
+        self.last_seen = now
+
+
+class TriggerTelemetry:
+    """Per-entity trigger counters fed by automation/script events."""
+
+    def __init__(self, hass: HomeAssistant, max_tracked: int = MAX_TRACKED_ENTITIES) -> None:
+        self.hass = hass
+        self.max_tracked = max_tracked
+        self.started_at = time.time()
+        self.events_seen = 0
+        self.evictions = 0
+        self.runaways_detected = 0
+        self._rates: dict[str, _EntityRates] = {}
+
+    # ── Recording ─────────────────────────────────────────────────────────
+
+    @callback
+    def async_handle_event(self, event) -> None:
+        """Record one ``automation_triggered`` / ``script_started`` event."""
+        data = getattr(event, "data", None)
+        entity_id = data.get("entity_id") if isinstance(data, dict) else None
+        if isinstance(entity_id, str) and entity_id:
+            self.record(entity_id)
+
+    @callback
+    def record(self, entity_id: str, now: float | None = None) -> None:
+        """Count one trigger of ``entity_id``."""
+        now = time.time() if now is None else now
+        self.events_seen += 1
+        rates = self._rates.get(entity_id)
+        if rates is None:
+            if len(self._rates) >= self.max_tracked:
+                self._evict(now)
+            rates = self._rates[entity_id] = _EntityRates()
+        rates.add(now)
+
+        per_minute = rates.second.total
+        if (
+            per_minute >= RUNAWAY_TRIGGERS_PER_MINUTE
+            and now - rates.runaway_at >= RUNAWAY_COOLDOWN_SECONDS
+        ):
+            rates.runaway_at = now
+            self.runaways_detected += 1
+            _LOGGER.warning(
+                "[HACA Telemetry] Runaway loop suspected: %s triggered %d times in the last minute",
+                entity_id, per_minute,
+            )
+            self.hass.bus.async_fire(EVENT_RUNAWAY_AUTOMATION, {
+                "entity_id": entity_id,
+                "triggers_last_minute": per_minute,
+            })
+
+    def _evict(self, now: float) -> None:
+        """Drop the least active entity (fewest triggers in 24 h, then oldest)."""
+        victim = min(
+            self._rates,
+            key=lambda eid: (self._rates[eid].hour.count(now), self._rates[eid].last_seen),
+        )
+        del self._rates[victim]
+        self.evictions += 1
+
+    # ── Queries ───────────────────────────────────────────────────────────
+
+    def rates(self, entity_id: str, now: float | None = None) -> dict[str, Any]:
+        """Return measured trigger counts for ``entity_id``."""
+        now = time.time() if now is None else now
+        rates = self._rates.get(entity_id)
+        if rates is None:
+            return {"minute": 0, "hour": 0, "day": 0, "runaway": False}
+        return {
+            "minute": rates.second.count(now),
+            "hour": rates.minute.count(now),
+            "day": rates.hour.count(now),
+            "runaway": bool(rates.runaway_at)
+            and now - rates.runaway_at < RUNAWAY_COOLDOWN_SECONDS,
+        }
+
+    def count_in_last_minutes(self, entity_id: str, minutes: int, now: float | None = None) -> int:
+        """Return the trigger count over the last ``minutes`` minutes (≤ 60)."""
+        now = time.time() if now is None else now
+        rates = self._rates.get(entity_id)
+        return rates.minute.count(now, minutes) if rates else 0
+
+    def top(self, limit: int = 10, window: str = "hour", now: float | None = None) -> list[dict[str, Any]]:
+        """Return the ``limit`` most triggered entities over ``window``."""
+        if window not in WINDOWS:
+            raise ValueError(f"window must be one of {', '.join(WINDOWS)}")
+        now = time.time() if now is None else now
+        rows = []
+        for entity_id in self._rates:
+            rates = self.rates(entity_id, now)
+            if rates[window]:
+                rows.append({"entity_id": entity_id, **rates})
+        rows.sort(key=lambda r: (-r[window], r["entity_id"]))
+        return rows[: max(0, limit)]
+
+    @property
+    def observed_seconds(self) -> float:
+        """How long telemetry has been collecting (windows shorter than that are exact)."""
+        return time.time() - self.started_at
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return telemetry state for diagnostics."""
+        return {
+            "tracked_entities": len(self._rates),
+            "max_tracked": self.max_tracked,
+            "events_seen": self.events_seen,
+            "evictions": self.evictions,
+            "runaways_detected": self.runaways_detected,
+            "observed_seconds": int(self.observed_seconds),
+        }
+
+
+def get_trigger_telemetry(hass: HomeAssistant) -> TriggerTelemetry | None:
+    """Return the running telemetry instance, if any."""
+    return hass.data.get(DOMAIN, {}).get(TRIGGER_TELEMETRY_KEY)
+
+
+def async_setup_trigger_telemetry(hass: HomeAssistant, entry: ConfigEntry) -> TriggerTelemetry:
+    """Start collecting trigger rates; cleanup goes through ``entry.async_on_unload``."""
+    telemetry = TriggerTelemetry(hass)
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    domain_data[TRIGGER_TELEMETRY_KEY] = telemetry
+
+    for event_type in TELEMETRY_EVENTS:
+        entry.async_on_unload(
+            hass.bus.async_listen(event_type, telemetry.async_handle_event)
+        )
+
+    @callback
+    def _drop() -> None:
+        if hass.data.get(DOMAIN, {}).get(TRIGGER_TELEMETRY_KEY) is telemetry:
+            hass.data[DOMAIN].pop(TRIGGER_TELEMETRY_KEY, None)
+
+    entry.async_on_unload(_drop)
+    return telemetry
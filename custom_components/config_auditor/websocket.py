@@ -14,6 +14,8 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.translation import async_get_translations
 
 from .const import DOMAIN
+from .lazy import async_import, async_resolve
+from .reload_scheduler import async_reload
 
 def _ts(hass, section: str, key: str, **kwargs) -> str:
     """Get a translation string from the in-memory cache (websocket-local copy)."""
@@ -58,6 +60,7 @@ def async_register_websocket_handlers(hass: HomeAssistant) -> None:
     websocket_api.async_register_command(hass, handle_apply_fix)
     websocket_api.async_register_command(hass, handle_list_backups)
     websocket_api.async_register_command(hass, handle_restore_backup)
+    websocket_api.async_register_command(hass, handle_preview_restore)
     websocket_api.async_register_command(hass, handle_get_translations)
     websocket_api.async_register_command(hass, handle_explain_issue)
     websocket_api.async_register_command(hass, handle_ai_suggest_fix)
@@ -82,6 +85,12 @@ def async_register_websocket_handlers(hass: HomeAssistant) -> None:
     websocket_api.async_register_command(hass, handle_get_recorder_impact)
     websocket_api.async_register_command(hass, handle_get_integrations)
     websocket_api.async_register_command(hass, handle_get_history_diff)
+    websocket_api.async_register_command(hass, handle_get_trigger_rates)
+    websocket_api.async_register_command(hass, handle_generate_report)
+    websocket_api.async_register_command(hass, handle_get_report_job)
+    websocket_api.async_register_command(hass, handle_ai_job_start)
+    websocket_api.async_register_command(hass, handle_ai_job_status)
+    websocket_api.async_register_command(hass, handle_ai_job_cancel)
     _LOGGER.info("[HACA] WebSocket handlers registered")
 
 
@@ -234,6 +243,7 @@ async def handle_scan_all(
     10-30s sur une grande installation). Répond immédiatement avec
     {"accepted": true}, puis fire l'event HA "haca_scan_complete" quand
     le coordinator a fini, ce que le frontend écoute via subscribeEvents.
+    Pendant le scan, "haca_scan_progress" est émis après chaque phase.
     """
     try:
         entry, data = _get_entry_data(hass)
@@ -244,17 +254,16 @@ async def handle_scan_all(
             connection.send_error(msg["id"], "no_data", "No H.A.C.A data found")
             return
 
-        # Guard anti-spam : si un scan est déjà en cours, on rejette sans bloquer
-        if data.get("_scan_in_progress"):
-            connection.send_result(msg["id"], {"accepted": False, "reason": "scan_in_progress"})
-            _LOGGER.warning("[HACA WS] Scan already in progress — request ignored")
-            return
-
+        # Un scan déjà en cours n'est plus rejeté : l'orchestrateur l'annule
+        # et le remplace par ce scan complet (voir scan_orchestrator.py)
         coordinator = data["coordinator"]
-        data["_scan_in_progress"] = True
+        orchestrator = data.get("scan_orchestrator")
+        superseding = bool(orchestrator and orchestrator.is_running)
+        if data.get("scan_scheduler"):
+            data["scan_scheduler"].request_full()
 
         # Répondre IMMÉDIATEMENT — le scan tourne en tâche de fond
-        connection.send_result(msg["id"], {"accepted": True})
+        connection.send_result(msg["id"], {"accepted": True, "superseded": superseding})
 
         async def _run_scan() -> None:
             try:
@@ -263,7 +272,6 @@ async def handle_scan_all(
             except Exception as scan_err:
                 _LOGGER.error("[HACA WS] Background scan error: %s", scan_err, exc_info=True)
             finally:
-                data["_scan_in_progress"] = False
                 # Notifier le frontend via l'event bus HA
                 hass.bus.async_fire("haca_scan_complete", {
                     "entry_id": entry.entry_id,
@@ -299,7 +307,7 @@ async def handle_preview_fix(
             connection.send_error(msg["id"], "no_entry", "No H.A.C.A entry found")
             return
 
-        refactoring = data.get("refactoring_assistant") if data else None
+        refactoring = await async_resolve(data.get("refactoring_assistant") if data else None)
         
         if not refactoring:
             connection.send_error(msg["id"], "no_refactoring", "Refactoring module not available")
@@ -346,7 +354,7 @@ async def handle_apply_fix(
             connection.send_error(msg["id"], "no_entry", "No H.A.C.A entry found")
             return
 
-        refactoring = data.get("refactoring_assistant") if data else None
+        refactoring = await async_resolve(data.get("refactoring_assistant") if data else None)
         
         if not refactoring:
             connection.send_error(msg["id"], "no_refactoring", "Refactoring module not available")
@@ -389,7 +397,7 @@ async def handle_list_backups(
             connection.send_error(msg["id"], "no_entry", "No H.A.C.A entry found")
             return
 
-        refactoring = data.get("refactoring_assistant") if data else None
+        refactoring = await async_resolve(data.get("refactoring_assistant") if data else None)
         
         if not refactoring:
             connection.send_error(msg["id"], "no_refactoring", "Refactoring module not available")
@@ -430,7 +438,7 @@ async def handle_restore_backup(
             connection.send_error(msg["id"], "no_entry", "No H.A.C.A entry found")
             return
 
-        refactoring = data.get("refactoring_assistant") if data else None
+        refactoring = await async_resolve(data.get("refactoring_assistant") if data else None)
         
         if not refactoring:
             connection.send_error(msg["id"], "no_refactoring", "Refactoring module not available")
@@ -446,6 +454,40 @@ async def handle_restore_backup(
         connection.send_error(msg["id"], "error", str(e))
 
 
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "haca/preview_restore",
+        vol.Required("backup_path"): str,
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+async def handle_preview_restore(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Per-automation/script diff of what restoring a backup would change."""
+    try:
+        entry, data = _get_entry_data(hass)
+        if not entry:
+            connection.send_error(msg["id"], "no_entry", "No H.A.C.A entry found")
+            return
+
+        refactoring = await async_resolve(data.get("refactoring_assistant") if data else None)
+
+        if not refactoring:
+            connection.send_error(msg["id"], "no_refactoring", "Refactoring module not available")
+            return
+
+        result = await refactoring.preview_restore(msg["backup_path"])
+        connection.send_result(msg["id"], result)
+
+    except Exception as e:
+        _LOGGER.error("Error previewing backup restore: %s", e, exc_info=True)
+        connection.send_error(msg["id"], "error", str(e))
+
+
 
 @websocket_api.websocket_command(
     {
@@ -840,6 +882,7 @@ async def handle_explain_issue(
 ) -> None:
     """Explain a HACA issue using AI (IA locale ou fallback textuel)."""
     try:
+        await async_import(hass, "conversation")  # first AI call: load off-loop
         from .conversation import explain_issue_ai
         issue_data = msg.get("issue", {})
         explanation = await explain_issue_ai(hass, issue_data)
@@ -869,7 +912,8 @@ async def handle_ai_suggest_fix(
     """
     from pathlib import Path as _Path
     import yaml as _yaml
-    from .conversation import _async_call_ai
+    await async_import(hass, "conversation")
+    from .conversation import _async_call_ai_cached
 
     issue      = msg.get("issue", {})
     issue_type = issue.get("type", "")
@@ -941,7 +985,11 @@ async def handle_ai_suggest_fix(
 
     # ── Appeler l'IA ─────────────────────────────────────────────────────
     try:
-        suggestion = await _async_call_ai(hass, prompt, "HACA Simple Fix")
+        suggestion = await _async_call_ai_cached(
+            hass, prompt, "HACA Simple Fix", "suggest_fix", lang,
+            entity_id=entity_id, config=yaml_snippet,
+            params={"field": field, "alias": alias},
+        )
         suggestion = suggestion.strip().strip('"').strip("'")
         if not suggestion:
             connection.send_error(msg["id"], "no_suggestion", "L'IA n'a pas retourné de suggestion")
@@ -1061,7 +1109,7 @@ async def handle_apply_field_fix(
     try:
         await hass.async_add_executor_job(_apply)
         # Recharger pour que HA prenne en compte
-        await hass.services.async_call(domain, "reload", {}, blocking=True)
+        await async_reload(hass, domain, [entity_id], [target])
         connection.send_result(msg["id"], {"success": True, "field": field, "value": value})
     except Exception as exc:
         _LOGGER.error("[HACA apply_field_fix] %s: %s", entity_id, exc)
@@ -1093,6 +1141,7 @@ async def handle_chat(
     """
     from homeassistant.core import Context
     from homeassistant.components.conversation import async_converse
+    await async_import(hass, "conversation")
     from .conversation import _async_find_all_conversation_agents, _is_llm_error_reply
     import inspect as _inspect
 
@@ -1244,6 +1293,14 @@ async def handle_save_options(
         "notify_high_severity",    # true (default) — persistent notification for HIGH issues
         "notify_medium_severity",  # false (default) — persistent notification for MEDIUM issues
         "notify_low_severity",     # false (default) — persistent notification for LOW issues
+        "state_rate_monitor_enabled",  # true (default) — live noisy-entity counters (reload to apply)
+        "analyzer_intervals",          # {scope: minutes} — per-analyzer schedule, 0 = periodic off
+        "max_scan_budget_seconds",     # 0 (default) = unlimited — defers expensive analyzers
+        "ai_hedging",                  # false (default) — race the two fastest AI providers
+        "ai_provider_timeout",         # 300 (default) — seconds one AI provider may take to answer
+        "ai_job_concurrency",          # 2 (default) — prompts in flight per bulk AI job
+        "ai_job_rate_limit",           # 20 (default) — prompts per minute per bulk AI job, 0 = unlimited
+        "llm_tool_set",                # "all" (default) | "essentials" — tools exposed by the HACA LLM API
     }
     for key, value in incoming.items():
         if key in ALLOWED_KEYS and value is not None:  # ignorer les None (token non modifié)
@@ -1271,14 +1328,17 @@ async def handle_save_options(
         if not isinstance(entry_data, dict):
             continue
 
-        # scan_interval → mettre à jour l'intervalle du coordinator (0 = manual only)
-        if "scan_interval" in incoming:
+        # scan_interval / analyzer_intervals → recalculer le tick du coordinator
+        # (0 = manual only, sinon le plus court intervalle par analyseur)
+        if "scan_interval" in incoming or "analyzer_intervals" in incoming:
             coordinator = entry_data.get("coordinator")
-            if coordinator is not None:
-                from datetime import timedelta as _td
-                val = int(incoming["scan_interval"])
-                coordinator.update_interval = _td(minutes=max(1, val)) if val > 0 else None
-                _LOGGER.info("[HACA] scan_interval updated: %s", "manual" if val == 0 else f"{val} min")
+            scheduler = entry_data.get("scan_scheduler")
+            if coordinator is not None and scheduler is not None:
+                coordinator.update_interval = scheduler.tick_interval()
+                _LOGGER.info(
+                    "[HACA] Scan tick updated: %s",
+                    coordinator.update_interval or "manual",
+                )
 
     _LOGGER.info("[HACA] Options saved via panel: %s", list(incoming.keys()))
     connection.send_result(msg["id"], {"success": True, "options": new_options})
@@ -1540,8 +1600,11 @@ async def handle_export_battery_csv(
         if not MODULE_18_BATTERY_PREDICTOR:
             connection.send_result(msg["id"], {"csv": "date,entity_id,level\n"})
             return
-        from .battery_predictor import BatteryPredictor
-        predictor = BatteryPredictor(hass)
+        _, data = _get_entry_data(hass)
+        predictor = (data or {}).get("battery_predictor")
+        if predictor is None:
+            from .battery_predictor import BatteryPredictor
+            predictor = BatteryPredictor(hass)
         csv_data = await predictor.async_export_csv()
         connection.send_result(msg["id"], {"csv": csv_data})
     except Exception as exc:
@@ -1721,3 +1784,206 @@ async def handle_get_history_diff(
 
 
 
+
+
+# ── Trigger-rate telemetry ─────────────────────────────────────────────────────
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "haca/get_trigger_rates",
+    vol.Optional("limit", default=20): vol.All(int, vol.Range(min=1, max=500)),
+    vol.Optional("window", default="hour"): vol.In(["minute", "hour", "day"]),
+})
+@websocket_api.require_admin
+@websocket_api.async_response
+async def handle_get_trigger_rates(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the most frequently triggered automations/scripts (measured live)."""
+    try:
+        from .trigger_telemetry import get_trigger_telemetry
+        telemetry = get_trigger_telemetry(hass)
+        if telemetry is None:
+            connection.send_error(msg["id"], "not_available", "Trigger telemetry not available")
+            return
+        connection.send_result(msg["id"], {
+            "window": msg["window"],
+            "top": telemetry.top(msg["limit"], msg["window"]),
+            "stats": telemetry.as_dict(),
+        })
+    except Exception as exc:
+        connection.send_error(msg["id"], "trigger_rates_error", str(exc))
+
+
+# ── Report jobs ────────────────────────────────────────────────────────────────
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "haca/generate_report",
+    vol.Optional("language"): str,
+})
+@websocket_api.require_admin
+@websocket_api.async_response
+async def handle_generate_report(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Queue a report job and answer at once (progress: haca_report_progress)."""
+    try:
+        _, data = _get_entry_data(hass)
+        report_jobs = (data or {}).get("report_jobs")
+        if report_jobs is None:
+            connection.send_error(msg["id"], "not_available", "Report generation not available")
+            return
+        job = report_jobs.submit(msg.get("language"))
+        connection.send_result(msg["id"], job.as_dict())
+    except Exception as exc:
+        connection.send_error(msg["id"], "generate_report_error", str(exc))
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "haca/get_report_job",
+    vol.Optional("job_id"): str,
+})
+@websocket_api.require_admin
+@websocket_api.async_response
+async def handle_get_report_job(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return one report job, or all known jobs (newest first) without job_id."""
+    try:
+        _, data = _get_entry_data(hass)
+        report_jobs = (data or {}).get("report_jobs")
+        if report_jobs is None:
+            connection.send_error(msg["id"], "not_available", "Report generation not available")
+            return
+        job_id = msg.get("job_id")
+        if job_id is None:
+            connection.send_result(msg["id"], {
+                "jobs": [job.as_dict() for job in report_jobs.jobs()],
+            })
+            return
+        job = report_jobs.get(job_id)
+        if job is None:
+            connection.send_error(msg["id"], "not_found", f"Report job '{job_id}' not found")
+            return
+        connection.send_result(msg["id"], job.as_dict())
+    except Exception as exc:
+        connection.send_error(msg["id"], "report_job_error", str(exc))
+
+
+# ── Bulk AI jobs ───────────────────────────────────────────────────────────────
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "haca/ai_job_start",
+    vol.Required("kind"): vol.In(["describe", "explain"]),
+    vol.Optional("entity_ids"): [str],
+    vol.Optional("issues"): [dict],
+    vol.Optional("severity", default="high"): vol.In(["high", "medium", "low"]),
+    vol.Optional("apply", default=False): bool,
+    vol.Optional("language"): str,
+    vol.Optional("concurrency"): vol.All(int, vol.Range(min=1, max=8)),
+    vol.Optional("rate_limit"): vol.All(int, vol.Range(min=0)),
+    vol.Optional("batch_size"): vol.All(int, vol.Range(min=1, max=20)),
+})
+@websocket_api.require_admin
+@websocket_api.async_response
+async def handle_ai_job_start(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Queue a bulk AI job and answer at once (progress: haca_ai_job_progress).
+
+    ``describe`` suggests descriptions for ``entity_ids`` (default: every
+    automation / script reported without one) and writes them when
+    ``apply`` is set; ``explain`` explains ``issues`` (default: every issue
+    of ``severity``).
+    """
+    try:
+        _, data = _get_entry_data(hass)
+        ai_jobs = (data or {}).get("ai_jobs")
+        if ai_jobs is None:
+            connection.send_error(msg["id"], "not_available", "AI jobs not available")
+            return
+        items = ai_jobs.select(
+            msg["kind"], msg.get("entity_ids"), msg.get("issues"), msg["severity"]
+        )
+        if not items:
+            connection.send_error(msg["id"], "no_items", "Nothing to process")
+            return
+        job = ai_jobs.submit(
+            msg["kind"],
+            items,
+            language=msg.get("language"),
+            apply=msg["apply"],
+            concurrency=msg.get("concurrency"),
+            rate_limit=msg.get("rate_limit"),
+            batch_size=msg.get("batch_size"),
+        )
+        connection.send_result(msg["id"], job.as_dict(with_results=False))
+    except Exception as exc:
+        connection.send_error(msg["id"], "ai_job_error", str(exc))
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "haca/ai_job_status",
+    vol.Optional("job_id"): str,
+})
+@websocket_api.require_admin
+@websocket_api.async_response
+async def handle_ai_job_status(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return one AI job with its results, or all known jobs without job_id."""
+    try:
+        _, data = _get_entry_data(hass)
+        ai_jobs = (data or {}).get("ai_jobs")
+        if ai_jobs is None:
+            connection.send_error(msg["id"], "not_available", "AI jobs not available")
+            return
+        job_id = msg.get("job_id")
+        if job_id is None:
+            connection.send_result(msg["id"], {
+                "jobs": [job.as_dict(with_results=False) for job in ai_jobs.jobs()],
+            })
+            return
+        job = ai_jobs.get(job_id)
+        if job is None:
+            connection.send_error(msg["id"], "not_found", f"AI job '{job_id}' not found")
+            return
+        connection.send_result(msg["id"], job.as_dict())
+    except Exception as exc:
+        connection.send_error(msg["id"], "ai_job_error", str(exc))
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "haca/ai_job_cancel",
+    vol.Required("job_id"): str,
+})
+@websocket_api.require_admin
+@websocket_api.async_response
+async def handle_ai_job_cancel(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Cancel an AI job; the results it already has are kept, nothing is written."""
+    try:
+        _, data = _get_entry_data(hass)
+        ai_jobs = (data or {}).get("ai_jobs")
+        if ai_jobs is None:
+            connection.send_error(msg["id"], "not_available", "AI jobs not available")
+            return
+        job = await ai_jobs.async_cancel_job(msg["job_id"])
+        if job is None:
+            connection.send_error(msg["id"], "not_found", f"AI job '{msg['job_id']}' not found")
+            return
+        connection.send_result(msg["id"], job.as_dict(with_results=False))
+    except Exception as exc:
+        connection.send_error(msg["id"], "ai_job_error", str(exc))
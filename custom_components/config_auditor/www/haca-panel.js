@@ -1,4 +1,4 @@
-// HACA-BUILD: dedf9af4  2026-04-28T04:39:19Z
+// HACA-BUILD: adbffd1e  2026-10-18T23:49:24Z
 // ── config_tab.js ──────────────────────────────────────────
 // ── config_tab.js ─────────────────────────────────────────────────────────
 // Onglet Configuration du panel HACA
@@ -71,6 +71,7 @@ var ISSUE_TYPES_BY_CATEGORY = [
       { id: 'unavailable_entity',      fixable: false },
       { id: 'unknown_state',           fixable: false },
       { id: 'stale_entity',            fixable: false },
+      { id: 'flapping_entity',         fixable: false },
       { id: 'disabled_but_referenced', fixable: false },
       { id: 'ghost_registry_entry',    fixable: true  },
       { id: 'unused_input_boolean',    fixable: false },
@@ -7042,10 +7043,13 @@ function _updateTypeCounts(el) {
     const SCAN_TIMEOUT_MS = 5 * 60 * 1000;
     let scanTimeoutId = null;
     let unsubScanComplete = null;
+    let unsubScanProgress = null;
+    let lastProgressLoad = 0;
 
     const _cleanup = () => {
       if (scanTimeoutId) { clearTimeout(scanTimeoutId); scanTimeoutId = null; }
       if (unsubScanComplete) { try { unsubScanComplete(); } catch (_) {} unsubScanComplete = null; }
+      if (unsubScanProgress) { try { unsubScanProgress(); } catch (_) {} unsubScanProgress = null; }
       this._scanAllInProgress = false;
       this._setButtonLoading(btn, false, originalContent);
     };
@@ -7058,6 +7062,19 @@ function _updateTypeCounts(el) {
           _cleanup();
           this.loadData();
         }, 'haca_scan_complete');
+        // Résultats progressifs : chaque phase terminée est déjà publiée
+        // côté backend — on affiche le pourcentage et on recharge (max 1×/2 s)
+        unsubScanProgress = await this.hass.connection.subscribeEvents((event) => {
+          const pct = event.data?.percent;
+          if (btn && Number.isFinite(pct) && pct < 100) {
+            btn.innerHTML = `<span class="btn-loader"></span> ${this.t('messages.scan_in_progress')} ${pct}%`;
+          }
+          const now = Date.now();
+          if (now - lastProgressLoad >= 2000) {
+            lastProgressLoad = now;
+            this.loadData();
+          }
+        }, 'haca_scan_progress');
       }
 
       // Timeout de sécurité
@@ -7780,29 +7797,66 @@ function _updateTypeCounts(el) {
       btn.disabled = true;
       btn.innerHTML = `<span class="btn-loader"></span> ${this.t('reports.generating')}`;
     }
-    try {
-      await this.hass.callService('config_auditor', 'generate_report');
 
-      this.showHANotification(
-        this.t('notifications.report_generated'),
-        this.t('notifications.report_generated_full'),
-        'haca_report_generated'
-      );
+    // Job en arrière-plan (haca/generate_report répond immédiatement) :
+    // la progression arrive par l'event haca_report_progress
+    const REPORT_TIMEOUT_MS = 5 * 60 * 1000;
+    let jobId = null;
+    let unsubProgress = null;
+    let timeoutId = null;
+    const pending = [];
 
-      if (this.shadowRoot.querySelector('.tab[data-tab="reports"]')?.classList.contains('active')) {
-        this.loadReports();
+    const _cleanup = () => {
+      if (timeoutId) { clearTimeout(timeoutId); timeoutId = null; }
+      if (unsubProgress) { try { unsubProgress(); } catch (_) {} unsubProgress = null; }
+      if (btn) {
+        btn.disabled = false;
+        btn.innerHTML = originalHTML;
       }
+    };
+
+    const _onProgress = (data) => {
+      if (!data || data.job_id !== jobId) return;
+      if (data.status === 'done') {
+        _cleanup();
+        this.showHANotification(
+          this.t('notifications.report_generated'),
+          this.t('notifications.report_generated_full'),
+          'haca_report_generated'
+        );
+        if (this.shadowRoot.querySelector('.tab[data-tab="reports"]')?.classList.contains('active')) {
+          this.loadReports();
+        }
+      } else if (data.status === 'failed') {
+        _cleanup();
+        this.showHANotification(this.t('notifications.error'), data.error || '', 'haca_error');
+      } else if (btn && Number.isFinite(data.percent)) {
+        btn.innerHTML = `<span class="btn-loader"></span> ${this.t('reports.generating')} ${data.percent}%`;
+      }
+    };
+
+    try {
+      // S'abonner AVANT de lancer le job ; les events reçus avant la
+      // réponse (job_id encore inconnu) sont rejoués ensuite
+      if (this.hass?.connection) {
+        unsubProgress = await this.hass.connection.subscribeEvents((event) => {
+          if (jobId === null) pending.push(event.data);
+          else _onProgress(event.data);
+        }, 'haca_report_progress');
+      }
+      timeoutId = setTimeout(_cleanup, REPORT_TIMEOUT_MS);
+
+      const job = await this.hass.callWS({ type: 'haca/generate_report' });
+      jobId = job.job_id;
+      _onProgress(job);
+      pending.splice(0).forEach(_onProgress);
     } catch (error) {
+      _cleanup();
       this.showHANotification(
         this.t('notifications.error'),
         error.message,
         'haca_error'
       );
-    } finally {
-      if (btn) {
-        btn.disabled = false;
-        btn.innerHTML = originalHTML;
-      }
     }
   }
 
@@ -7899,7 +7953,7 @@ function _updateTypeCounts(el) {
                       </div>
                       <div>
                         <div style="font-weight:600;font-size:14px;white-space:nowrap;">${esc(new Date(s.created).toLocaleString())}${label}</div>
-                        <div style="font-size:11px;color:var(--secondary-text-color);font-family:monospace;">ID: ${esc(s.session_id)}</div>
+                        <div style="font-size:11px;color:var(--secondary-text-color);font-family:monospace;">ID: ${esc(s.session_id)}${s.health_score != null ? ` · ${esc(String(s.health_score))}%` : ''}</div>
                       </div>
                     </div>
                   </td>
@@ -8811,11 +8865,12 @@ function _updateTypeCounts(el) {
 
     modal.querySelector('#predict-modal-title').textContent = pred.friendly_name;
     modal.querySelector('#predict-modal-chart').innerHTML = svg;
+    const range = pred.predicted_date_range;
     modal.querySelector('#predict-modal-stats').innerHTML = `
       <div style="display:flex;gap:12px;flex-wrap:wrap;font-size:13px;padding-top:8px;">
         <span>${this.t('battery_predict.col_current')}: <strong>${pred.current_level}%</strong></span>
         <span>${this.t('battery_predict.col_slope')}: <strong style="color:${pred.slope_per_day < 0 ? '#ef5350' : '#4caf50'}">${pred.slope_per_day > 0 ? '+' : ''}${pred.slope_per_day}%/j</strong></span>
-        ${pred.predicted_date ? `<span>${this.t('battery_predict.col_predicted_date')}: <strong>${pred.predicted_date.slice(0,10)}</strong></span>` : ''}
+        ${pred.predicted_date ? `<span>${this.t('battery_predict.col_predicted_date')}: <strong>${pred.predicted_date.slice(0,10)}</strong>${range ? ` <span style="color:var(--secondary-text-color);">(${range[0]} → ${range[1] || '∞'})</span>` : ''}</span>` : ''}
         <span>R²: <strong>${pred.r2}</strong></span>
       </div>`;
     modal.style.display = 'flex';
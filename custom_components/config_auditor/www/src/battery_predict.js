@@ -213,11 +213,12 @@
 
     modal.querySelector('#predict-modal-title').textContent = pred.friendly_name;
     modal.querySelector('#predict-modal-chart').innerHTML = svg;
+    const range = pred.predicted_date_range;
     modal.querySelector('#predict-modal-stats').innerHTML = `
       <div style="display:flex;gap:12px;flex-wrap:wrap;font-size:13px;padding-top:8px;">
         <span>${this.t('battery_predict.col_current')}: <strong>${pred.current_level}%</strong></span>
         <span>${this.t('battery_predict.col_slope')}: <strong style="color:${pred.slope_per_day < 0 ? '#ef5350' : '#4caf50'}">${pred.slope_per_day > 0 ? '+' : ''}${pred.slope_per_day}%/j</strong></span>
-        ${pred.predicted_date ? `<span>${this.t('battery_predict.col_predicted_date')}: <strong>${pred.predicted_date.slice(0,10)}</strong></span>` : ''}
+        ${pred.predicted_date ? `<span>${this.t('battery_predict.col_predicted_date')}: <strong>${pred.predicted_date.slice(0,10)}</strong>${range ? ` <span style="color:var(--secondary-text-color);">(${range[0]} → ${range[1] || '∞'})</span>` : ''}</span>` : ''}
         <span>R²: <strong>${pred.r2}</strong></span>
       </div>`;
     modal.style.display = 'flex';
@@ -69,6 +69,7 @@ var ISSUE_TYPES_BY_CATEGORY = [
       { id: 'unavailable_entity',      fixable: false },
       { id: 'unknown_state',           fixable: false },
       { id: 'stale_entity',            fixable: false },
+      { id: 'flapping_entity',         fixable: false },
       { id: 'disabled_but_referenced', fixable: false },
       { id: 'ghost_registry_entry',    fixable: true  },
       { id: 'unused_input_boolean',    fixable: false },
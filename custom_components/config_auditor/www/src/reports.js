@@ -9,29 +9,66 @@
       btn.disabled = true;
       btn.innerHTML = `<span class="btn-loader"></span> ${this.t('reports.generating')}`;
     }
-    try {
-      await this.hass.callService('config_auditor', 'generate_report');
 
-      this.showHANotification(
-        this.t('notifications.report_generated'),
-        this.t('notifications.report_generated_full'),
-        'haca_report_generated'
-      );
+    // Job en arrière-plan (haca/generate_report répond immédiatement) :
+    // la progression arrive par l'event haca_report_progress
+    const REPORT_TIMEOUT_MS = 5 * 60 * 1000;
+    let jobId = null;
+    let unsubProgress = null;
+    let timeoutId = null;
+    const pending = [];
 
-      if (this.shadowRoot.querySelector('.tab[data-tab="reports"]')?.classList.contains('active')) {
-        this.loadReports();
+    const _cleanup = () => {
+      if (timeoutId) { clearTimeout(timeoutId); timeoutId = null; }
+      if (unsubProgress) { try { unsubProgress(); } catch (_) {} unsubProgress = null; }
+      if (btn) {
+        btn.disabled = false;
+        btn.innerHTML = originalHTML;
       }
+    };
+
+    const _onProgress = (data) => {
+      if (!data || data.job_id !== jobId) return;
+      if (data.status === 'done') {
+        _cleanup();
+        this.showHANotification(
+          this.t('notifications.report_generated'),
+          this.t('notifications.report_generated_full'),
+          'haca_report_generated'
+        );
+        if (this.shadowRoot.querySelector('.tab[data-tab="reports"]')?.classList.contains('active')) {
+          this.loadReports();
+        }
+      } else if (data.status === 'failed') {
+        _cleanup();
+        this.showHANotification(this.t('notifications.error'), data.error || '', 'haca_error');
+      } else if (btn && Number.isFinite(data.percent)) {
+        btn.innerHTML = `<span class="btn-loader"></span> ${this.t('reports.generating')} ${data.percent}%`;
+      }
+    };
+
+    try {
+      // S'abonner AVANT de lancer le job ; les events reçus avant la
+      // réponse (job_id encore inconnu) sont rejoués ensuite
+      if (this.hass?.connection) {
+        unsubProgress = await this.hass.connection.subscribeEvents((event) => {
+          if (jobId === null) pending.push(event.data);
+          else _onProgress(event.data);
+        }, 'haca_report_progress');
+      }
+      timeoutId = setTimeout(_cleanup, REPORT_TIMEOUT_MS);
+
+      const job = await this.hass.callWS({ type: 'haca/generate_report' });
+      jobId = job.job_id;
+      _onProgress(job);
+      pending.splice(0).forEach(_onProgress);
     } catch (error) {
+      _cleanup();
       this.showHANotification(
         this.t('notifications.error'),
         error.message,
         'haca_error'
       );
-    } finally {
-      if (btn) {
-        btn.disabled = false;
-        btn.innerHTML = originalHTML;
-      }
     }
   }
 
@@ -128,7 +165,7 @@
                       </div>
                       <div>
                         <div style="font-weight:600;font-size:14px;white-space:nowrap;">${esc(new Date(s.created).toLocaleString())}${label}</div>
-                        <div style="font-size:11px;color:var(--secondary-text-color);font-family:monospace;">ID: ${esc(s.session_id)}</div>
+                        <div style="font-size:11px;color:var(--secondary-text-color);font-family:monospace;">ID: ${esc(s.session_id)}${s.health_score != null ? ` · ${esc(String(s.health_score))}%` : ''}</div>
                       </div>
                     </div>
                   </td>
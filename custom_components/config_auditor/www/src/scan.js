@@ -34,10 +34,13 @@
     const SCAN_TIMEOUT_MS = 5 * 60 * 1000;
     let scanTimeoutId = null;
     let unsubScanComplete = null;
+    let unsubScanProgress = null;
+    let lastProgressLoad = 0;
 
     const _cleanup = () => {
       if (scanTimeoutId) { clearTimeout(scanTimeoutId); scanTimeoutId = null; }
       if (unsubScanComplete) { try { unsubScanComplete(); } catch (_) {} unsubScanComplete = null; }
+      if (unsubScanProgress) { try { unsubScanProgress(); } catch (_) {} unsubScanProgress = null; }
       this._scanAllInProgress = false;
       this._setButtonLoading(btn, false, originalContent);
     };
@@ -50,6 +53,19 @@
           _cleanup();
           this.loadData();
         }, 'haca_scan_complete');
+        // Résultats progressifs : chaque phase terminée est déjà publiée
+        // côté backend — on affiche le pourcentage et on recharge (max 1×/2 s)
+        unsubScanProgress = await this.hass.connection.subscribeEvents((event) => {
+          const pct = event.data?.percent;
+          if (btn && Number.isFinite(pct) && pct < 100) {
+            btn.innerHTML = `<span class="btn-loader"></span> ${this.t('messages.scan_in_progress')} ${pct}%`;
+          }
+          const now = Date.now();
+          if (now - lastProgressLoad >= 2000) {
+            lastProgressLoad = now;
+            this.loadData();
+          }
+        }, 'haca_scan_progress');
       }
 
       // Timeout de sécurité